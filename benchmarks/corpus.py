@@ -0,0 +1,166 @@
+"""Generate a reproducible synthetic source tree for the benchmarks.
+
+The tree mixes prose and code-like files with a controlled density of emojis,
+drawn from plain emojis, skin-tone and ZWJ sequences and flags, and nests
+``.gitignore`` files so the walker has ignore rules to honour at every level::
+
+    uv run python benchmarks/corpus.py OUT_DIR [--files 2000] [--file-size 8192] [--emoji-density 0.02]
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+_PLAIN = ["✨", "🐛", "🚀", "📝", "♻️", "🔥", "✅", "🎉", "🍕", "😊", "❤️", "⚡"]
+_SKIN_TONES = ["👍🏽", "👋🏻", "🙌🏿", "💪🏼"]
+_ZWJ = ["👨‍💻", "👩‍🔬", "👨‍👩‍👧", "🏳️‍🌈", "🧑‍🤝‍🧑", "❤️‍🔥"]
+_FLAGS = ["🇳🇱", "🇯🇵", "🇧🇷", "🇺🇸", "🇪🇺", "🇿🇦"]
+_WORDS = [
+    "fix", "the", "parser", "when", "input", "is", "empty", "and", "add", "tests", "for", "edge",
+    "cases", "return", "value", "self", "config", "load", "from", "path", "with", "open", "None",
+]  # fmt: skip
+_EXTENSIONS = [".py", ".md", ".txt", ".ts", ".yaml"]
+# Files per directory before the generator opens a new one.
+_FILES_PER_DIR = 50
+_WORDS_PER_LINE = 12
+# Share of plain emojis given a skin tone, and of lines written as comments.
+_SKIN_TONE_SHARE = 0.2
+_COMMENT_SHARE = 0.5
+
+
+class CorpusSpec(NamedTuple):
+    """The shape of a synthetic corpus.
+
+    Attributes
+    ----------
+    files : int
+        Number of files the scan should see; ignored files come on top.
+    file_size : int
+        Approximate size of each file in characters.
+    emoji_density : float
+        Chance that a word is followed by an emoji.
+    zwj_share : float
+        Share of emojis that are ZWJ sequences.
+    flag_share : float
+        Share of emojis that are flags; the rest are plain or skin-toned.
+    ignore_depth : int
+        Directory nesting depth, with a ``.gitignore`` at every level.
+    seed : int
+        Seed for the random generator, so a spec always yields the same tree.
+    """
+
+    files: int = 2000
+    file_size: int = 8192
+    emoji_density: float = 0.02
+    zwj_share: float = 0.2
+    flag_share: float = 0.1
+    ignore_depth: int = 3
+    seed: int = 0
+
+
+def _emoji(rng: random.Random, spec: CorpusSpec) -> str:
+    """Draw one emoji sequence according to the spec's mix."""
+    roll = rng.random()
+    if roll < spec.zwj_share:
+        return rng.choice(_ZWJ)
+    if roll < spec.zwj_share + spec.flag_share:
+        return rng.choice(_FLAGS)
+    return rng.choice(_SKIN_TONES if rng.random() < _SKIN_TONE_SHARE else _PLAIN)
+
+
+def _text(rng: random.Random, spec: CorpusSpec) -> tuple[str, int]:
+    """Generate one file's text; return it with the number of emojis in it."""
+    lines: list[str] = []
+    line: list[str] = []
+    size = emojis = 0
+    while size < spec.file_size:
+        word = rng.choice(_WORDS)
+        if rng.random() < spec.emoji_density:
+            word += " " + _emoji(rng, spec)
+            emojis += 1
+        line.append(word)
+        size += len(word) + 1
+        if len(line) >= _WORDS_PER_LINE:
+            lines.append(("# " if rng.random() < _COMMENT_SHARE else "    ") + " ".join(line))
+            line = []
+    lines.append(" ".join(line))
+    return "\n".join(lines) + "\n", emojis
+
+
+def _directory(root: Path, index: int, depth: int) -> Path:
+    """Place the ``index``-th directory of files in a tree ``depth`` levels deep."""
+    parts = [f"d{(index >> (2 * level)) % 4}" for level in range(depth)]
+    return root.joinpath("src", *parts, f"pkg{index}")
+
+
+def write_corpus(root: Path, spec: CorpusSpec) -> dict[str, int]:
+    """Write a corpus under ``root``.
+
+    Every directory on the way down gets a ``.gitignore`` that ignores build
+    output and logs, and each leaf gets some of both, so ignored files are
+    present but must be skipped.
+
+    Parameters
+    ----------
+    root : Path
+        An empty or missing directory to fill.
+    spec : CorpusSpec
+        The shape of the corpus.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of visible files, their total size in bytes and their emojis.
+    """
+    rng = random.Random(spec.seed)
+    totals = {"files": 0, "bytes": 0, "emojis": 0}
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".gitignore").write_text("*.log\nbuild/\n", encoding="utf-8")
+    for number in range(spec.files):
+        directory = _directory(root, number // _FILES_PER_DIR, spec.ignore_depth)
+        if not directory.exists():
+            directory.mkdir(parents=True)
+            # Every directory below the root, down to this one, gets its own ignore file.
+            for level in [directory, *directory.parents[: -len(root.parts)]]:
+                ignore = level / ".gitignore"
+                if not ignore.exists():
+                    ignore.write_text(f"*.tmp\n/generated-{len(level.parts)}/\n", encoding="utf-8")
+            (directory / "build").mkdir()
+            (directory / "build" / "out.txt").write_text(_text(rng, spec)[0], encoding="utf-8")
+            (directory / "debug.log").write_text(_text(rng, spec)[0], encoding="utf-8")
+        text, emojis = _text(rng, spec)
+        data = text.encode("utf-8")
+        (directory / f"file{number}{rng.choice(_EXTENSIONS)}").write_bytes(data)
+        totals["files"] += 1
+        totals["bytes"] += len(data)
+        totals["emojis"] += emojis
+    return totals
+
+
+def spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add one option per :class:`CorpusSpec` field to a parser."""
+    defaults = CorpusSpec()
+    for field, default in defaults._asdict().items():
+        flag = "--" + field.replace("_", "-")
+        parser.add_argument(flag, type=type(default), default=default, help=f"Corpus {field} (default: {default}).")
+
+
+def spec_from_arguments(args: argparse.Namespace) -> CorpusSpec:
+    """Build a spec from the options added by :func:`spec_arguments`."""
+    return CorpusSpec(**{field: getattr(args, field) for field in CorpusSpec._fields})
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Write a corpus and print its totals as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", type=Path, help="Directory to write the corpus to.")
+    spec_arguments(parser)
+    args = parser.parse_args(argv)
+    sys.stdout.write(json.dumps(write_corpus(args.out, spec_from_arguments(args))) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure emoji removal throughput in MB/s.
+
+Compares :func:`rmoji.emoji.remove_emojis` with the original per-match
+callback over emoji runs, on source without emojis but with the odd accent or
+typographic symbol, on prose with the odd emoji and on an emoji-dense generated
+changelog::
+
+    uv run python benchmarks/remove.py [--size-mb 8] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections.abc import Callable
+
+from rmoji.constants import EMOJI_PATTERN
+from rmoji.emoji import remove_emojis
+
+_EMOJIS = ["✨", "🐛", "🚀", "📝", "♻️", "🔥", "✅", "👍🏽", "👨‍💻", "🇳🇱"]
+# Non-ASCII text that is not an emoji, as found in comments and strings, so the source corpus is searched.
+_SYMBOLS = ["café", "naïve", "→", "—", "±", "µs", "“quoted”", "©"]
+_WORDS = ["fix", "the", "parser", "when", "input", "is", "empty", "and", "add", "tests", "for", "edge", "cases"]
+
+
+def _legacy_remove(text: str, exclude: list[str]) -> str:
+    """The original callback-based removal of emoji runs, kept as the baseline."""
+
+    def emoji_replacer(match: re.Match[str]) -> str:
+        char = match.group(0)
+        return char if char in exclude else ""
+
+    return EMOJI_PATTERN.sub(emoji_replacer, text)
+
+
+def _corpus(size: int, every: int, marks: list[str] = _EMOJIS, seed: int = 0) -> str:
+    """Generate about ``size`` characters of text with one of ``marks``, emojis by default, every ``every`` words."""
+    rng = random.Random(seed)
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        words = [rng.choice(_WORDS) for _ in range(every)]
+        line = f"- {rng.choice(marks)} {' '.join(words)}\n"
+        parts.append(line)
+        length += len(line)
+    return "".join(parts)
+
+
+def _throughput(remove: Callable[[str, list[str]], str], text: str, exclude: list[str], repeat: int) -> float:
+    """Return the best removal throughput over ``repeat`` runs, in MB of UTF-8 per second."""
+    megabytes = len(text.encode("utf-8")) / 1e6
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        remove(text, exclude)
+        best = min(best, time.perf_counter() - start)
+    return megabytes / best
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print one row per corpus and exclude setting."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8.0, help="Approximate size of each corpus.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best one counts.")
+    args = parser.parse_args(argv)
+
+    size = int(args.size_mb * 1e6)
+    corpora = {
+        "source": _corpus(size, every=200, marks=_SYMBOLS),
+        "prose": _corpus(size, every=200),
+        "changelog": _corpus(size, every=2),
+    }
+    # Compile the matcher up front, so the first corpus is not charged for it.
+    remove_emojis("🍕")
+    excludes = {"none": [], "3 emojis": ["✅", "🚀", "👍🏽"]}
+
+    sys.stdout.write(f"{'corpus':<10} {'exclude':<9} {'callback MB/s':>14} {'rmoji MB/s':>11} {'speedup':>8}\n")
+    for corpus_name, text in corpora.items():
+        for exclude_name, exclude in excludes.items():
+            legacy = _throughput(_legacy_remove, text, exclude, args.repeat)
+            current = _throughput(remove_emojis, text, exclude, args.repeat)
+            sys.stdout.write(
+                f"{corpus_name:<10} {exclude_name:<9} {legacy:>14.1f} {current:>11.1f} {current / legacy:>7.1f}x\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measure how long ``import rmoji.cli`` and ``import rmoji.emoji`` take, and fail if they regressed.
+
+Each run imports the module in a fresh interpreter with ``-X importtime``.
+For the CLI the cumulative time is split into typer's share, which rmoji
+cannot avoid, and rmoji's own; ``rmoji.emoji`` is what library callers and
+editor hooks import. It also checks that heavy modules stay out of both
+startup paths::
+
+    uv run python benchmarks/startup.py [--repeat 7] [--max-ms 40]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Modules only specific commands need; importing any of them at startup is a regression.
+_DEFERRED = [
+    "emoji",
+    "rmoji._emoji_table",
+    "rmoji.index",
+    "sqlite3",
+    "pathspec",
+    "iterfzf",
+    "difflib",
+    "concurrent.futures.process",
+]
+# The modules measured, each with the modules it must not import. Removing
+# emojis from text needs neither the scanner, rich nor git support.
+_TARGETS = {
+    "rmoji.cli": _DEFERRED,
+    "rmoji.emoji": [*_DEFERRED, "rich", "subprocess", "mmap", "rmoji.scanner", "rmoji.git"],
+}
+
+
+def _cumulative_us(stderr: str) -> dict[str, int]:
+    """Parse ``-X importtime`` output into cumulative microseconds per top-level import."""
+    times: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  ") and cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def _measure(module: str) -> tuple[int, int, list[str]]:
+    """Import a module once; return typer's and the module's time in µs and the deferred modules loaded."""
+    # The CLI needs typer anyway, so it is imported first and timed on its own.
+    setup = "import typer; " if module == "rmoji.cli" else ""
+    probe = f"import sys, {module}; print(' '.join(m for m in {_TARGETS[module]!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", setup + probe],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = _cumulative_us(result.stderr)
+    return times.get("typer", 0), times.get(module, 0), result.stdout.split()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark, print the best times and return a non-zero status on regression."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per measurement; the best one counts.")
+    parser.add_argument("--max-ms", type=float, default=40.0, help="Fail if a module's own import time exceeds this.")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module in _TARGETS:
+        runs = [_measure(module) for _ in range(args.repeat)]
+        module_ms = min(run[1] for run in runs) / 1000
+        loaded = sorted({name for run in runs for name in run[2]})
+        if module == "rmoji.cli":
+            sys.stdout.write(f"typer and rich   {min(run[0] for run in runs) / 1000:>7.1f} ms\n")
+        sys.stdout.write(f"{module:<16} {module_ms:>7.1f} ms\n")
+        if module_ms > args.max_ms:
+            failures.append(f"{module} took {module_ms:.1f} ms, over the {args.max_ms:.1f} ms budget")
+        if loaded:
+            failures.append(f"imported by {module}: {', '.join(loaded)}")
+    for failure in failures:
+        sys.stderr.write(f"regression: {failure}\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Benchmark the walk, scan, extract, remove and nuke hot paths on a synthetic corpus.
+
+The corpus comes from ``benchmarks/corpus.py``. Every benchmark runs in a
+fresh interpreter, so the peak RSS it reports is its own, and the best of
+``--repeat`` runs counts. Results can be saved as a JSON baseline and later
+compared against, failing on regressions::
+
+    uv run python benchmarks/suite.py run [--save baseline.json] [--repeat 3] [--files 2000 ...]
+    uv run python benchmarks/suite.py compare baseline.json [--current results.json] [--tolerance 0.1]
+"""
+
+import argparse
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from corpus import CorpusSpec, spec_arguments, spec_from_arguments, write_corpus
+
+from rmoji.emoji import extract_emojis, remove_emojis
+from rmoji.files import get_file_list
+from rmoji.regions import RegionRules
+from rmoji.scanner import Engine, ScanOptions, _nuke_file, _scan_for_emojis
+
+BENCHMARKS = ["walk", "scan", "extract", "remove", "nuke"]
+_BASELINE_VERSION = 1
+# Higher is better for throughput, lower for memory.
+_METRICS = {"mb_per_s": 1, "files_per_s": 1, "peak_rss_mb": -1}
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _best_of(repeat: int, run: Callable[[], object], setup: Callable[[], object] | None = None) -> float:
+    """Return the fastest of ``repeat`` timed runs, in seconds; ``setup`` runs untimed before each."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _measure(name: str, root: Path, repeat: int, jobs: int) -> dict[str, float]:
+    """Run one benchmark in this process and return its time and the data it covered."""
+    files = get_file_list(str(root))
+    size = sum((root / file).stat().st_size for file in files)
+    # Compile the matcher up front: the benchmarks measure steady-state throughput.
+    remove_emojis("🍕")
+
+    if name == "walk":
+        return {"seconds": _best_of(repeat, lambda: get_file_list(str(root))), "files": len(files), "bytes": 0}
+    if name == "scan":
+        options = ScanOptions(Engine.NATIVE, jobs)
+        seconds = _best_of(repeat, lambda: _scan_for_emojis(str(root), options=options))
+    elif name in {"extract", "remove"}:
+        # These work on text already in memory, so reading the files is not timed.
+        texts = [(root / file).read_text(encoding="utf-8") for file in files]
+        function = extract_emojis if name == "extract" else remove_emojis
+        seconds = _best_of(repeat, lambda: [function(text) for text in texts])
+    else:
+        seconds = _measure_nuke(root, files, repeat)
+    return {"seconds": seconds, "files": len(files), "bytes": size}
+
+
+def _measure_nuke(root: Path, files: list[str], repeat: int) -> float:
+    """Time cleaning every file of a fresh copy of the corpus, without fsync."""
+    with tempfile.TemporaryDirectory() as scratch:
+        copy = Path(scratch) / "corpus"
+
+        def fresh_copy() -> None:
+            shutil.rmtree(copy, ignore_errors=True)
+            shutil.copytree(root, copy)
+
+        def nuke() -> None:
+            for file in files:
+                _nuke_file(str(copy / file), None, RegionRules(), fsync=False)
+
+        return _best_of(repeat, nuke, fresh_copy)
+
+
+def _run_one(name: str, root: Path, repeat: int, jobs: int) -> dict[str, float]:
+    """Run one benchmark in a fresh interpreter and turn its measurements into rates."""
+    command = [sys.executable, __file__, "measure", name, str(root), "--repeat", str(repeat), "--jobs", str(jobs)]
+    raw = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+    result = {
+        "seconds": raw["seconds"],
+        "files_per_s": raw["files"] / raw["seconds"],
+        "peak_rss_mb": raw["peak_rss"] / 1e6,
+    }
+    if raw["bytes"]:
+        result["mb_per_s"] = raw["bytes"] / 1e6 / raw["seconds"]
+    return result
+
+
+def run_suite(spec: CorpusSpec, repeat: int, jobs: int, names: list[str]) -> dict[str, Any]:
+    """Generate a corpus, run the benchmarks on it and return the results with their settings.
+
+    Parameters
+    ----------
+    spec : CorpusSpec
+        The corpus to generate.
+    repeat : int
+        Runs per benchmark; the fastest counts.
+    jobs : int
+        Worker processes for the scan benchmark.
+    names : list[str]
+        The benchmarks to run.
+
+    Returns
+    -------
+    dict[str, Any]
+        The settings, environment and per-benchmark results, as saved in a baseline.
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        root = Path(scratch) / "corpus"
+        totals = write_corpus(root, spec)
+        results = {name: _run_one(name, root, repeat, jobs) for name in names}
+    return {
+        "version": _BASELINE_VERSION,
+        "rmoji": metadata.version("rmoji"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": spec._asdict(),
+        "corpus_totals": totals,
+        "repeat": repeat,
+        "jobs": jobs,
+        "results": results,
+    }
+
+
+def _print_results(report: dict[str, Any]) -> None:
+    """Print one row per benchmark."""
+    sys.stdout.write(f"{'benchmark':<10} {'MB/s':>9} {'files/s':>10} {'peak RSS MB':>12}\n")
+    for name, result in report["results"].items():
+        mb_per_s = f"{result['mb_per_s']:.1f}" if "mb_per_s" in result else "-"
+        sys.stdout.write(f"{name:<10} {mb_per_s:>9} {result['files_per_s']:>10.0f} {result['peak_rss_mb']:>12.1f}\n")
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], tolerance: float) -> list[str]:
+    """Compare two reports and describe every metric that regressed beyond ``tolerance``.
+
+    Parameters
+    ----------
+    baseline : dict[str, Any]
+        The saved report to compare against.
+    current : dict[str, Any]
+        The new report.
+    tolerance : float
+        Allowed relative change in the wrong direction, e.g. 0.1 for 10%.
+
+    Returns
+    -------
+    list[str]
+        One line per regression; empty if there are none.
+    """
+    regressions: list[str] = []
+    sys.stdout.write(f"{'benchmark':<10} {'metric':<12} {'baseline':>10} {'current':>10} {'change':>8}\n")
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            continue
+        for metric, direction in _METRICS.items():
+            if metric not in base or metric not in now:
+                continue
+            change = (now[metric] - base[metric]) / base[metric]
+            regressed = change * direction < -tolerance
+            flag = "  REGRESSION" if regressed else ""
+            line = f"{name:<10} {metric:<12} {base[metric]:>10.1f} {now[metric]:>10.1f} {change:>+8.1%}{flag}"
+            sys.stdout.write(line + "\n")
+            if regressed:
+                regressions.append(line)
+    return regressions
+
+
+def _load(path: Path) -> dict[str, Any]:
+    """Read a saved report, refusing files written by an incompatible version of this suite."""
+    report: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    if report.get("version") != _BASELINE_VERSION:
+        sys.exit(f"{path}: not a baseline from this benchmark suite")
+    return report
+
+
+def _command_run(args: argparse.Namespace) -> int:
+    report = run_suite(spec_from_arguments(args), args.repeat, args.jobs, args.only or BENCHMARKS)
+    _print_results(report)
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+def _command_compare(args: argparse.Namespace) -> int:
+    baseline = _load(args.baseline)
+    if args.current:
+        current = _load(args.current)
+        if current["corpus"] != baseline["corpus"]:
+            sys.exit("the reports were measured on different corpora")
+    else:
+        spec = CorpusSpec(**baseline["corpus"])
+        current = run_suite(spec, baseline["repeat"], baseline["jobs"], list(baseline["results"]))
+    regressions = compare(baseline, current, args.tolerance)
+    for regression in regressions:
+        sys.stderr.write(f"regression: {regression.split('  REGRESSION')[0]}\n")
+    return 1 if regressions else 0
+
+
+def _command_measure(args: argparse.Namespace) -> int:
+    result = _measure(args.name, args.corpus, args.repeat, args.jobs)
+    result["peak_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+    sys.stdout.write(json.dumps(result) + "\n")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse the command line and run the chosen command, returning the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and print, and optionally save, the results.")
+    spec_arguments(run)
+    run.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest counts.")
+    run.add_argument("--jobs", type=int, default=1, help="Worker processes for the scan benchmark.")
+    run.add_argument("--only", action="append", choices=BENCHMARKS, help="Only run this benchmark. Repeatable.")
+    run.add_argument("--save", type=Path, help="Write the results to this JSON file as a baseline.")
+    run.set_defaults(handler=_command_run)
+
+    check = commands.add_parser("compare", help="Compare against a baseline and fail on regressions.")
+    check.add_argument("baseline", type=Path, help="A JSON file saved by run --save.")
+    check.add_argument("--current", type=Path, help="Compare this saved report instead of running the suite again.")
+    check.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression (default: 0.1).")
+    check.set_defaults(handler=_command_compare)
+
+    # Used by the suite itself to run each benchmark in a fresh interpreter.
+    measure = commands.add_parser("measure")
+    measure.add_argument("name", choices=BENCHMARKS)
+    measure.add_argument("corpus", type=Path)
+    measure.add_argument("--repeat", type=int, default=3)
+    measure.add_argument("--jobs", type=int, default=1)
+    measure.set_defaults(handler=_command_measure)
+
+    args = parser.parse_args(argv)
+    status: int = args.handler(args)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
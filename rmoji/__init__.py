@@ -0,0 +1,62 @@
+"""Scan, list and remove emojis in files, text and streams.
+
+Everything exported here returns values or generators rather than printing,
+so rmoji can be used in-process, e.g. to clean model output or log lines.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .api import clean_stream, scan_paths
+    from .emoji import clean_many, extract_emojis, iter_clean_many, remove_emojis, remove_emojis_stream
+    from .files import ScanFilters
+    from .scanner import Engine, ScanError, ScanOptions, ScanResult
+
+# The module each export lives in. Exports are imported on first access, so
+# ``import rmoji.emoji`` does not also load the scanner, rich and git support.
+_EXPORTS = {
+    "Engine": "scanner",
+    "ScanError": "scanner",
+    "ScanFilters": "files",
+    "ScanOptions": "scanner",
+    "ScanResult": "scanner",
+    "clean_many": "emoji",
+    "clean_stream": "api",
+    "extract_emojis": "emoji",
+    "iter_clean_many": "emoji",
+    "remove_emojis": "emoji",
+    "remove_emojis_stream": "emoji",
+    "scan_paths": "api",
+}
+
+__all__ = [
+    "Engine",
+    "ScanError",
+    "ScanFilters",
+    "ScanOptions",
+    "ScanResult",
+    "clean_many",
+    "clean_stream",
+    "extract_emojis",
+    "iter_clean_many",
+    "remove_emojis",
+    "remove_emojis_stream",
+    "scan_paths",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import an export from its module on first access and keep it for later lookups."""
+    if (module := _EXPORTS.get(name)) is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    import importlib
+
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the exports alongside the module's own attributes."""
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,5023 @@
+"""Precomputed emoji matcher data, generated by ``make emoji-table``. Do not edit."""
+
+EMOJI_VERSION = "2.14.1"
+KEY = ("2", "2.14.1", "*\u20e3", "*\ufe0f\u20e3")
+SEQUENCES = (
+    "\U0001f947",
+    "\U0001f948",
+    "\U0001f949",
+    "\U0001f18e",
+    "\U0001f3e7",
+    "\U0001f170\ufe0f",
+    "\U0001f1e6\U0001f1eb",
+    "\U0001f1e6\U0001f1f1",
+    "\U0001f1e9\U0001f1ff",
+    "\U0001f1e6\U0001f1f8",
+    "\U0001f1e6\U0001f1e9",
+    "\U0001f1e6\U0001f1f4",
+    "\U0001f1e6\U0001f1ee",
+    "\U0001f1e6\U0001f1f6",
+    "\U0001f1e6\U0001f1ec",
+    "\u2652",
+    "\U0001f1e6\U0001f1f7",
+    "\u2648",
+    "\U0001f1e6\U0001f1f2",
+    "\U0001f1e6\U0001f1fc",
+    "\U0001f1e6\U0001f1e8",
+    "\U0001f1e6\U0001f1fa",
+    "\U0001f1e6\U0001f1f9",
+    "\U0001f1e6\U0001f1ff",
+    "\U0001f519",
+    "\U0001f171\ufe0f",
+    "\U0001f1e7\U0001f1f8",
+    "\U0001f1e7\U0001f1ed",
+    "\U0001f1e7\U0001f1e9",
+    "\U0001f1e7\U0001f1e7",
+    "\U0001f1e7\U0001f1fe",
+    "\U0001f1e7\U0001f1ea",
+    "\U0001f1e7\U0001f1ff",
+    "\U0001f1e7\U0001f1ef",
+    "\U0001f1e7\U0001f1f2",
+    "\U0001f1e7\U0001f1f9",
+    "\U0001f1e7\U0001f1f4",
+    "\U0001f1e7\U0001f1e6",
+    "\U0001f1e7\U0001f1fc",
+    "\U0001f1e7\U0001f1fb",
+    "\U0001f1e7\U0001f1f7",
+    "\U0001f1ee\U0001f1f4",
+    "\U0001f1fb\U0001f1ec",
+    "\U0001f1e7\U0001f1f3",
+    "\U0001f1e7\U0001f1ec",
+    "\U0001f1e7\U0001f1eb",
+    "\U0001f1e7\U0001f1ee",
+    "\U0001f191",
+    "\U0001f192",
+    "\U0001f1f0\U0001f1ed",
+    "\U0001f1e8\U0001f1f2",
+    "\U0001f1e8\U0001f1e6",
+    "\U0001f1ee\U0001f1e8",
+    "\u264b",
+    "\U0001f1e8\U0001f1fb",
+    "\u2651",
+    "\U0001f1e7\U0001f1f6",
+    "\U0001f1f0\U0001f1fe",
+    "\U0001f1e8\U0001f1eb",
+    "\U0001f1ea\U0001f1e6",
+    "\U0001f1f9\U0001f1e9",
+    "\U0001f1e8\U0001f1f1",
+    "\U0001f1e8\U0001f1f3",
+    "\U0001f1e8\U0001f1fd",
+    "\U0001f384",
+    "\U0001f1e8\U0001f1f5",
+    "\U0001f1e8\U0001f1e8",
+    "\U0001f1e8\U0001f1f4",
+    "\U0001f1f0\U0001f1f2",
+    "\U0001f1e8\U0001f1ec",
+    "\U0001f1e8\U0001f1e9",
+    "\U0001f1e8\U0001f1f0",
+    "\U0001f1e8\U0001f1f7",
+    "\U0001f1ed\U0001f1f7",
+    "\U0001f1e8\U0001f1fa",
+    "\U0001f1e8\U0001f1fc",
+    "\U0001f1e8\U0001f1fe",
+    "\U0001f1e8\U0001f1ff",
+    "\U0001f1e8\U0001f1ee",
+    "\U0001f1e9\U0001f1f0",
+    "\U0001f1e9\U0001f1ec",
+    "\U0001f1e9\U0001f1ef",
+    "\U0001f1e9\U0001f1f2",
+    "\U0001f1e9\U0001f1f4",
+    "\U0001f51a",
+    "\U0001f1ea\U0001f1e8",
+    "\U0001f1ea\U0001f1ec",
+    "\U0001f1f8\U0001f1fb",
+    "\U0001f3f4\U000e0067\U000e0062\U000e0065\U000e006e\U000e0067\U000e007f",
+    "\U0001f1ec\U0001f1f6",
+    "\U0001f1ea\U0001f1f7",
+    "\U0001f1ea\U0001f1ea",
+    "\U0001f1f8\U0001f1ff",
+    "\U0001f1ea\U0001f1f9",
+    "\U0001f1ea\U0001f1fa",
+    "\U0001f193",
+    "\U0001f1eb\U0001f1f0",
+    "\U0001f1eb\U0001f1f4",
+    "\U0001f1eb\U0001f1ef",
+    "\U0001f1eb\U0001f1ee",
+    "\U0001f1eb\U0001f1f7",
+    "\U0001f1ec\U0001f1eb",
+    "\U0001f1f5\U0001f1eb",
+    "\U0001f1f9\U0001f1eb",
+    "\U0001f1ec\U0001f1e6",
+    "\U0001f1ec\U0001f1f2",
+    "\u264a",
+    "\U0001f1ec\U0001f1ea",
+    "\U0001f1e9\U0001f1ea",
+    "\U0001f1ec\U0001f1ed",
+    "\U0001f1ec\U0001f1ee",
+    "\U0001f1ec\U0001f1f7",
+    "\U0001f1ec\U0001f1f1",
+    "\U0001f1ec\U0001f1e9",
+    "\U0001f1ec\U0001f1f5",
+    "\U0001f1ec\U0001f1fa",
+    "\U0001f1ec\U0001f1f9",
+    "\U0001f1ec\U0001f1ec",
+    "\U0001f1ec\U0001f1f3",
+    "\U0001f1ec\U0001f1fc",
+    "\U0001f1ec\U0001f1fe",
+    "\U0001f1ed\U0001f1f9",
+    "\U0001f1ed\U0001f1f2",
+    "\U0001f1ed\U0001f1f3",
+    "\U0001f1ed\U0001f1f0",
+    "\U0001f1ed\U0001f1fa",
+    "\U0001f194",
+    "\U0001f1ee\U0001f1f8",
+    "\U0001f1ee\U0001f1f3",
+    "\U0001f1ee\U0001f1e9",
+    "\U0001f1ee\U0001f1f7",
+    "\U0001f1ee\U0001f1f6",
+    "\U0001f1ee\U0001f1ea",
+    "\U0001f1ee\U0001f1f2",
+    "\U0001f1ee\U0001f1f1",
+    "\U0001f1ee\U0001f1f9",
+    "\U0001f1ef\U0001f1f2",
+    "\U0001f1ef\U0001f1f5",
+    "\U0001f251",
+    "\U0001f238",
+    "\U0001f250",
+    "\U0001f3ef",
+    "\u3297\ufe0f",
+    "\u3297",
+    "\U0001f239",
+    "\U0001f38e",
+    "\U0001f21a",
+    "\U0001f201",
+    "\U0001f237\ufe0f",
+    "\U0001f237",
+    "\U0001f235",
+    "\U0001f236",
+    "\U0001f23a",
+    "\U0001f234",
+    "\U0001f3e3",
+    "\U0001f232",
+    "\U0001f22f",
+    "\u3299\ufe0f",
+    "\u3299",
+    "\U0001f202\ufe0f",
+    "\U0001f202",
+    "\U0001f530",
+    "\U0001f233",
+    "\U0001f1ef\U0001f1ea",
+    "\U0001f1ef\U0001f1f4",
+    "\U0001f1f0\U0001f1ff",
+    "\U0001f1f0\U0001f1ea",
+    "\U0001f1f0\U0001f1ee",
+    "\U0001f1fd\U0001f1f0",
+    "\U0001f1f0\U0001f1fc",
+    "\U0001f1f0\U0001f1ec",
+    "\U0001f1f1\U0001f1e6",
+    "\U0001f1f1\U0001f1fb",
+    "\U0001f1f1\U0001f1e7",
+    "\u264c",
+    "\U0001f1f1\U0001f1f8",
+    "\U0001f1f1\U0001f1f7",
+    "\u264e",
+    "\U0001f1f1\U0001f1fe",
+    "\U0001f1f1\U0001f1ee",
+    "\U0001f1f1\U0001f1f9",
+    "\U0001f1f1\U0001f1fa",
+    "\U0001f1f2\U0001f1f4",
+    "\U0001f1f2\U0001f1ec",
+    "\U0001f1f2\U0001f1fc",
+    "\U0001f1f2\U0001f1fe",
+    "\U0001f1f2\U0001f1fb",
+    "\U0001f1f2\U0001f1f1",
+    "\U0001f1f2\U0001f1f9",
+    "\U0001f1f2\U0001f1ed",
+    "\U0001f1f2\U0001f1f6",
+    "\U0001f1f2\U0001f1f7",
+    "\U0001f1f2\U0001f1fa",
+    "\U0001f1fe\U0001f1f9",
+    "\U0001f1f2\U0001f1fd",
+    "\U0001f1eb\U0001f1f2",
+    "\U0001f1f2\U0001f1e9",
+    "\U0001f1f2\U0001f1e8",
+    "\U0001f1f2\U0001f1f3",
+    "\U0001f1f2\U0001f1ea",
+    "\U0001f1f2\U0001f1f8",
+    "\U0001f1f2\U0001f1e6",
+    "\U0001f1f2\U0001f1ff",
+    "\U0001f936",
+    "\U0001f936\U0001f3ff",
+    "\U0001f936\U0001f3fb",
+    "\U0001f936\U0001f3fe",
+    "\U0001f936\U0001f3fc",
+    "\U0001f936\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f384",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f384",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f384",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f384",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f384",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f384",
+    "\U0001f1f2\U0001f1f2",
+    "\U0001f195",
+    "\U0001f196",
+    "\U0001f1f3\U0001f1e6",
+    "\U0001f1f3\U0001f1f7",
+    "\U0001f1f3\U0001f1f5",
+    "\U0001f1f3\U0001f1f1",
+    "\U0001f1f3\U0001f1e8",
+    "\U0001f1f3\U0001f1ff",
+    "\U0001f1f3\U0001f1ee",
+    "\U0001f1f3\U0001f1ea",
+    "\U0001f1f3\U0001f1ec",
+    "\U0001f1f3\U0001f1fa",
+    "\U0001f1f3\U0001f1eb",
+    "\U0001f1f0\U0001f1f5",
+    "\U0001f1f2\U0001f1f0",
+    "\U0001f1f2\U0001f1f5",
+    "\U0001f1f3\U0001f1f4",
+    "\U0001f197",
+    "\U0001f44c",
+    "\U0001f44c\U0001f3ff",
+    "\U0001f44c\U0001f3fb",
+    "\U0001f44c\U0001f3fe",
+    "\U0001f44c\U0001f3fc",
+    "\U0001f44c\U0001f3fd",
+    "\U0001f51b",
+    "\U0001f17e\ufe0f",
+    "\U0001f1f4\U0001f1f2",
+    "\u26ce",
+    "\U0001f17f\ufe0f",
+    "\U0001f1f5\U0001f1f0",
+    "\U0001f1f5\U0001f1fc",
+    "\U0001f1f5\U0001f1f8",
+    "\U0001f1f5\U0001f1e6",
+    "\U0001f1f5\U0001f1ec",
+    "\U0001f1f5\U0001f1fe",
+    "\U0001f1f5\U0001f1ea",
+    "\U0001f1f5\U0001f1ed",
+    "\u2653",
+    "\U0001f1f5\U0001f1f3",
+    "\U0001f1f5\U0001f1f1",
+    "\U0001f1f5\U0001f1f9",
+    "\U0001f1f5\U0001f1f7",
+    "\U0001f1f6\U0001f1e6",
+    "\U0001f1f7\U0001f1f4",
+    "\U0001f1f7\U0001f1fa",
+    "\U0001f1f7\U0001f1fc",
+    "\U0001f1f7\U0001f1ea",
+    "\U0001f51c",
+    "\U0001f198",
+    "\u2650",
+    "\U0001f1fc\U0001f1f8",
+    "\U0001f1f8\U0001f1f2",
+    "\U0001f385",
+    "\U0001f385\U0001f3ff",
+    "\U0001f385\U0001f3fb",
+    "\U0001f385\U0001f3fe",
+    "\U0001f385\U0001f3fc",
+    "\U0001f385\U0001f3fd",
+    "\U0001f1e8\U0001f1f6",
+    "\U0001f1f8\U0001f1e6",
+    "\u264f",
+    "\U0001f3f4\U000e0067\U000e0062\U000e0073\U000e0063\U000e0074\U000e007f",
+    "\U0001f1f8\U0001f1f3",
+    "\U0001f1f7\U0001f1f8",
+    "\U0001f1f8\U0001f1e8",
+    "\U0001f1f8\U0001f1f1",
+    "\U0001f1f8\U0001f1ec",
+    "\U0001f1f8\U0001f1fd",
+    "\U0001f1f8\U0001f1f0",
+    "\U0001f1f8\U0001f1ee",
+    "\U0001f1f8\U0001f1e7",
+    "\U0001f1f8\U0001f1f4",
+    "\U0001f1ff\U0001f1e6",
+    "\U0001f1ec\U0001f1f8",
+    "\U0001f1f0\U0001f1f7",
+    "\U0001f1f8\U0001f1f8",
+    "\U0001f1ea\U0001f1f8",
+    "\U0001f1f1\U0001f1f0",
+    "\U0001f1e7\U0001f1f1",
+    "\U0001f1f8\U0001f1ed",
+    "\U0001f1f0\U0001f1f3",
+    "\U0001f1f1\U0001f1e8",
+    "\U0001f1f2\U0001f1eb",
+    "\U0001f1f5\U0001f1f2",
+    "\U0001f1fb\U0001f1e8",
+    "\U0001f5fd",
+    "\U0001f1f8\U0001f1e9",
+    "\U0001f1f8\U0001f1f7",
+    "\U0001f1f8\U0001f1ef",
+    "\U0001f1f8\U0001f1ea",
+    "\U0001f1e8\U0001f1ed",
+    "\U0001f1f8\U0001f1fe",
+    "\U0001f1f8\U0001f1f9",
+    "\U0001f996",
+    "\U0001f51d",
+    "\U0001f1f9\U0001f1fc",
+    "\U0001f1f9\U0001f1ef",
+    "\U0001f1f9\U0001f1ff",
+    "\u2649",
+    "\U0001f1f9\U0001f1ed",
+    "\U0001f1f9\U0001f1f1",
+    "\U0001f1f9\U0001f1ec",
+    "\U0001f1f9\U0001f1f0",
+    "\U0001f5fc",
+    "\U0001f1f9\U0001f1f4",
+    "\U0001f1f9\U0001f1f9",
+    "\U0001f1f9\U0001f1e6",
+    "\U0001f1f9\U0001f1f3",
+    "\U0001f1f9\U0001f1f2",
+    "\U0001f1f9\U0001f1e8",
+    "\U0001f1f9\U0001f1fb",
+    "\U0001f1f9\U0001f1f7",
+    "\U0001f1fa\U0001f1f2",
+    "\U0001f1fb\U0001f1ee",
+    "\U0001f199",
+    "\U0001f1fa\U0001f1ec",
+    "\U0001f1fa\U0001f1e6",
+    "\U0001f1e6\U0001f1ea",
+    "\U0001f1ec\U0001f1e7",
+    "\U0001f1fa\U0001f1f3",
+    "\U0001f1fa\U0001f1f8",
+    "\U0001f1fa\U0001f1fe",
+    "\U0001f1fa\U0001f1ff",
+    "\U0001f19a",
+    "\U0001f1fb\U0001f1fa",
+    "\U0001f1fb\U0001f1e6",
+    "\U0001f1fb\U0001f1ea",
+    "\U0001f1fb\U0001f1f3",
+    "\u264d",
+    "\U0001f3f4\U000e0067\U000e0062\U000e0077\U000e006c\U000e0073\U000e007f",
+    "\U0001f1fc\U0001f1eb",
+    "\U0001f1ea\U0001f1ed",
+    "\U0001f1fe\U0001f1ea",
+    "\U0001f4a4",
+    "\U0001f1ff\U0001f1f2",
+    "\U0001f1ff\U0001f1fc",
+    "\U0001f9ee",
+    "\U0001fa97",
+    "\U0001fa79",
+    "\U0001f39f\ufe0f",
+    "\U0001f39f",
+    "\U0001f6a1",
+    "\u2708\ufe0f",
+    "\u2708",
+    "\U0001f6ec",
+    "\U0001f6eb",
+    "\u23f0",
+    "\u2697\ufe0f",
+    "\u2697",
+    "\U0001f47d",
+    "\U0001f47e",
+    "\U0001f691",
+    "\U0001f3c8",
+    "\U0001f3fa",
+    "\U0001fac0",
+    "\u2693",
+    "\U0001f4a2",
+    "\U0001f620",
+    "\U0001f47f",
+    "\U0001f627",
+    "\U0001f41c",
+    "\U0001f4f6",
+    "\U0001f630",
+    "\U0001f69b",
+    "\U0001f9d1\u200d\U0001f3a8",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f3a8",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f3a8",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f3a8",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f3a8",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f3a8",
+    "\U0001f3a8",
+    "\U0001f632",
+    "\U0001f9d1\u200d\U0001f680",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f680",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f680",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f680",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f680",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f680",
+    "\u269b\ufe0f",
+    "\u269b",
+    "\U0001f6fa",
+    "\U0001f697",
+    "\U0001f951",
+    "\U0001fa93",
+    "\U0001f476",
+    "\U0001f47c",
+    "\U0001f47c\U0001f3ff",
+    "\U0001f47c\U0001f3fb",
+    "\U0001f47c\U0001f3fe",
+    "\U0001f47c\U0001f3fc",
+    "\U0001f47c\U0001f3fd",
+    "\U0001f37c",
+    "\U0001f424",
+    "\U0001f476\U0001f3ff",
+    "\U0001f476\U0001f3fb",
+    "\U0001f476\U0001f3fe",
+    "\U0001f476\U0001f3fc",
+    "\U0001f476\U0001f3fd",
+    "\U0001f6bc",
+    "\U0001f447",
+    "\U0001f447\U0001f3ff",
+    "\U0001f447\U0001f3fb",
+    "\U0001f447\U0001f3fe",
+    "\U0001f447\U0001f3fc",
+    "\U0001f447\U0001f3fd",
+    "\U0001f448",
+    "\U0001f448\U0001f3ff",
+    "\U0001f448\U0001f3fb",
+    "\U0001f448\U0001f3fe",
+    "\U0001f448\U0001f3fc",
+    "\U0001f448\U0001f3fd",
+    "\U0001f449",
+    "\U0001f449\U0001f3ff",
+    "\U0001f449\U0001f3fb",
+    "\U0001f449\U0001f3fe",
+    "\U0001f449\U0001f3fc",
+    "\U0001f449\U0001f3fd",
+    "\U0001f446",
+    "\U0001f446\U0001f3ff",
+    "\U0001f446\U0001f3fb",
+    "\U0001f446\U0001f3fe",
+    "\U0001f446\U0001f3fc",
+    "\U0001f446\U0001f3fd",
+    "\U0001f392",
+    "\U0001f953",
+    "\U0001f9a1",
+    "\U0001f3f8",
+    "\U0001f96f",
+    "\U0001f6c4",
+    "\U0001f956",
+    "\u2696\ufe0f",
+    "\u2696",
+    "\U0001f9b2",
+    "\U0001fa70",
+    "\U0001f388",
+    "\U0001f5f3\ufe0f",
+    "\U0001f5f3",
+    "\U0001f34c",
+    "\U0001fa95",
+    "\U0001f3e6",
+    "\U0001f4ca",
+    "\U0001f488",
+    "\u26be",
+    "\U0001f9fa",
+    "\U0001f3c0",
+    "\U0001f987",
+    "\U0001f6c1",
+    "\U0001f50b",
+    "\U0001f3d6\ufe0f",
+    "\U0001f3d6",
+    "\U0001f601",
+    "\U0001fad8",
+    "\U0001f43b",
+    "\U0001f493",
+    "\U0001f9ab",
+    "\U0001f6cf\ufe0f",
+    "\U0001f6cf",
+    "\U0001f37a",
+    "\U0001fab2",
+    "\U0001f514",
+    "\U0001fad1",
+    "\U0001f515",
+    "\U0001f6ce\ufe0f",
+    "\U0001f6ce",
+    "\U0001f371",
+    "\U0001f9c3",
+    "\U0001f6b2",
+    "\U0001f459",
+    "\U0001f9e2",
+    "\u2623\ufe0f",
+    "\u2623",
+    "\U0001f426",
+    "\U0001f382",
+    "\U0001f9ac",
+    "\U0001fae6",
+    "\U0001f426\u200d\u2b1b",
+    "\U0001f408\u200d\u2b1b",
+    "\u26ab",
+    "\U0001f3f4",
+    "\U0001f5a4",
+    "\u2b1b",
+    "\u25fe",
+    "\u25fc\ufe0f",
+    "\u2712\ufe0f",
+    "\u2712",
+    "\u25aa\ufe0f",
+    "\U0001f532",
+    "\U0001f33c",
+    "\U0001f421",
+    "\U0001f4d8",
+    "\U0001f535",
+    "\U0001f499",
+    "\U0001f7e6",
+    "\U0001fad0",
+    "\U0001f417",
+    "\U0001f4a3",
+    "\U0001f9b4",
+    "\U0001f516",
+    "\U0001f4d1",
+    "\U0001f4da",
+    "\U0001fa83",
+    "\U0001f37e",
+    "\U0001f490",
+    "\U0001f3f9",
+    "\U0001f963",
+    "\U0001f3b3",
+    "\U0001f94a",
+    "\U0001f466",
+    "\U0001f466\U0001f3ff",
+    "\U0001f466\U0001f3fb",
+    "\U0001f466\U0001f3fe",
+    "\U0001f466\U0001f3fc",
+    "\U0001f466\U0001f3fd",
+    "\U0001f9e0",
+    "\U0001f35e",
+    "\U0001f931",
+    "\U0001f931\U0001f3ff",
+    "\U0001f931\U0001f3fb",
+    "\U0001f931\U0001f3fe",
+    "\U0001f931\U0001f3fc",
+    "\U0001f931\U0001f3fd",
+    "\U0001f9f1",
+    "\U0001f309",
+    "\U0001f4bc",
+    "\U0001fa72",
+    "\U0001f506",
+    "\U0001f966",
+    "\u26d3\ufe0f\u200d\U0001f4a5",
+    "\u26d3\u200d\U0001f4a5",
+    "\U0001f494",
+    "\U0001f9f9",
+    "\U0001f7e4",
+    "\U0001f90e",
+    "\U0001f344\u200d\U0001f7eb",
+    "\U0001f7eb",
+    "\U0001f9cb",
+    "\U0001fae7",
+    "\U0001faa3",
+    "\U0001f41b",
+    "\U0001f3d7\ufe0f",
+    "\U0001f3d7",
+    "\U0001f685",
+    "\U0001f3af",
+    "\U0001f32f",
+    "\U0001f68c",
+    "\U0001f68f",
+    "\U0001f464",
+    "\U0001f465",
+    "\U0001f9c8",
+    "\U0001f98b",
+    "\U0001f335",
+    "\U0001f4c5",
+    "\U0001f919",
+    "\U0001f919\U0001f3ff",
+    "\U0001f919\U0001f3fb",
+    "\U0001f919\U0001f3fe",
+    "\U0001f919\U0001f3fc",
+    "\U0001f919\U0001f3fd",
+    "\U0001f42a",
+    "\U0001f4f7",
+    "\U0001f4f8",
+    "\U0001f3d5\ufe0f",
+    "\U0001f3d5",
+    "\U0001f56f\ufe0f",
+    "\U0001f56f",
+    "\U0001f36c",
+    "\U0001f96b",
+    "\U0001f6f6",
+    "\U0001f5c3\ufe0f",
+    "\U0001f5c3",
+    "\U0001f4c7",
+    "\U0001f5c2\ufe0f",
+    "\U0001f5c2",
+    "\U0001f3a0",
+    "\U0001f38f",
+    "\U0001fa9a",
+    "\U0001f955",
+    "\U0001f3f0",
+    "\U0001f408",
+    "\U0001f431",
+    "\U0001f639",
+    "\U0001f63c",
+    "\u26d3\ufe0f",
+    "\u26d3",
+    "\U0001fa91",
+    "\U0001f4c9",
+    "\U0001f4c8",
+    "\U0001f4b9",
+    "\u2611\ufe0f",
+    "\u2611",
+    "\u2714\ufe0f",
+    "\u2714",
+    "\u2705",
+    "\U0001f9c0",
+    "\U0001f3c1",
+    "\U0001f352",
+    "\U0001f338",
+    "\u265f\ufe0f",
+    "\u265f",
+    "\U0001f330",
+    "\U0001f414",
+    "\U0001f9d2",
+    "\U0001f9d2\U0001f3ff",
+    "\U0001f9d2\U0001f3fb",
+    "\U0001f9d2\U0001f3fe",
+    "\U0001f9d2\U0001f3fc",
+    "\U0001f9d2\U0001f3fd",
+    "\U0001f6b8",
+    "\U0001f43f\ufe0f",
+    "\U0001f43f",
+    "\U0001f36b",
+    "\U0001f962",
+    "\u26ea",
+    "\U0001f6ac",
+    "\U0001f3a6",
+    "\u24c2\ufe0f",
+    "\U0001f3aa",
+    "\U0001f3d9\ufe0f",
+    "\U0001f3d9",
+    "\U0001f306",
+    "\U0001f5dc\ufe0f",
+    "\U0001f5dc",
+    "\U0001f3ac",
+    "\U0001f44f",
+    "\U0001f44f\U0001f3ff",
+    "\U0001f44f\U0001f3fb",
+    "\U0001f44f\U0001f3fe",
+    "\U0001f44f\U0001f3fc",
+    "\U0001f44f\U0001f3fd",
+    "\U0001f3db\ufe0f",
+    "\U0001f3db",
+    "\U0001f37b",
+    "\U0001f942",
+    "\U0001f4cb",
+    "\U0001f503",
+    "\U0001f4d5",
+    "\U0001f4ea",
+    "\U0001f4eb",
+    "\U0001f302",
+    "\u2601\ufe0f",
+    "\u2601",
+    "\U0001f329\ufe0f",
+    "\U0001f329",
+    "\u26c8\ufe0f",
+    "\u26c8",
+    "\U0001f327\ufe0f",
+    "\U0001f327",
+    "\U0001f328\ufe0f",
+    "\U0001f328",
+    "\U0001f921",
+    "\u2663\ufe0f",
+    "\u2663",
+    "\U0001f45d",
+    "\U0001f9e5",
+    "\U0001fab3",
+    "\U0001f378",
+    "\U0001f965",
+    "\u26b0\ufe0f",
+    "\u26b0",
+    "\U0001fa99",
+    "\U0001f976",
+    "\U0001f4a5",
+    "\u2604\ufe0f",
+    "\u2604",
+    "\U0001f9ed",
+    "\U0001f4bd",
+    "\U0001f5b1\ufe0f",
+    "\U0001f5b1",
+    "\U0001f38a",
+    "\U0001f616",
+    "\U0001f615",
+    "\U0001f6a7",
+    "\U0001f477",
+    "\U0001f477\U0001f3ff",
+    "\U0001f477\U0001f3fb",
+    "\U0001f477\U0001f3fe",
+    "\U0001f477\U0001f3fc",
+    "\U0001f477\U0001f3fd",
+    "\U0001f39b\ufe0f",
+    "\U0001f39b",
+    "\U0001f3ea",
+    "\U0001f9d1\u200d\U0001f373",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f373",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f373",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f373",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f373",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f373",
+    "\U0001f35a",
+    "\U0001f36a",
+    "\U0001f373",
+    "\xa9\ufe0f",
+    "\U0001fab8",
+    "\U0001f6cb\ufe0f",
+    "\U0001f6cb",
+    "\U0001f504",
+    "\U0001f491",
+    "\U0001f491\U0001f3ff",
+    "\U0001f491\U0001f3fb",
+    "\U0001f468\u200d\u2764\ufe0f\u200d\U0001f468",
+    "\U0001f468\u200d\u2764\u200d\U0001f468",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f491\U0001f3fe",
+    "\U0001f491\U0001f3fc",
+    "\U0001f491\U0001f3fd",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f469\u200d\u2764\ufe0f\u200d\U0001f468",
+    "\U0001f469\u200d\u2764\u200d\U0001f468",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\u200d\u2764\ufe0f\u200d\U0001f469",
+    "\U0001f469\u200d\u2764\u200d\U0001f469",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f469\U0001f3fc",
+    "\U0001f404",
+    "\U0001f42e",
+    "\U0001f920",
+    "\U0001f980",
+    "\U0001f58d\ufe0f",
+    "\U0001f58d",
+    "\U0001f4b3",
+    "\U0001f319",
+    "\U0001f997",
+    "\U0001f3cf",
+    "\U0001f40a",
+    "\U0001f950",
+    "\u274c",
+    "\u274e",
+    "\U0001f91e",
+    "\U0001f91e\U0001f3ff",
+    "\U0001f91e\U0001f3fb",
+    "\U0001f91e\U0001f3fe",
+    "\U0001f91e\U0001f3fc",
+    "\U0001f91e\U0001f3fd",
+    "\U0001f38c",
+    "\u2694\ufe0f",
+    "\u2694",
+    "\U0001f451",
+    "\U0001fa7c",
+    "\U0001f63f",
+    "\U0001f622",
+    "\U0001f52e",
+    "\U0001f952",
+    "\U0001f964",
+    "\U0001f9c1",
+    "\U0001f94c",
+    "\U0001f9b1",
+    "\u27b0",
+    "\U0001f4b1",
+    "\U0001f35b",
+    "\U0001f36e",
+    "\U0001f6c3",
+    "\U0001f969",
+    "\U0001f300",
+    "\U0001f5e1\ufe0f",
+    "\U0001f5e1",
+    "\U0001f361",
+    "\U0001f3ff",
+    "\U0001f4a8",
+    "\U0001f9cf\u200d\u2642\ufe0f",
+    "\U0001f9cf\u200d\u2642",
+    "\U0001f9cf\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9cf\U0001f3ff\u200d\u2642",
+    "\U0001f9cf\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9cf\U0001f3fb\u200d\u2642",
+    "\U0001f9cf\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9cf\U0001f3fe\u200d\u2642",
+    "\U0001f9cf\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9cf\U0001f3fc\u200d\u2642",
+    "\U0001f9cf\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9cf\U0001f3fd\u200d\u2642",
+    "\U0001f9cf",
+    "\U0001f9cf\U0001f3ff",
+    "\U0001f9cf\U0001f3fb",
+    "\U0001f9cf\U0001f3fe",
+    "\U0001f9cf\U0001f3fc",
+    "\U0001f9cf\U0001f3fd",
+    "\U0001f9cf\u200d\u2640\ufe0f",
+    "\U0001f9cf\u200d\u2640",
+    "\U0001f9cf\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9cf\U0001f3ff\u200d\u2640",
+    "\U0001f9cf\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9cf\U0001f3fb\u200d\u2640",
+    "\U0001f9cf\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9cf\U0001f3fe\u200d\u2640",
+    "\U0001f9cf\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9cf\U0001f3fc\u200d\u2640",
+    "\U0001f9cf\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9cf\U0001f3fd\u200d\u2640",
+    "\U0001f333",
+    "\U0001f98c",
+    "\U0001f69a",
+    "\U0001f3ec",
+    "\U0001f3da\ufe0f",
+    "\U0001f3da",
+    "\U0001f3dc\ufe0f",
+    "\U0001f3dc",
+    "\U0001f3dd\ufe0f",
+    "\U0001f3dd",
+    "\U0001f5a5\ufe0f",
+    "\U0001f5a5",
+    "\U0001f575\ufe0f",
+    "\U0001f575",
+    "\U0001f575\U0001f3ff",
+    "\U0001f575\U0001f3fb",
+    "\U0001f575\U0001f3fe",
+    "\U0001f575\U0001f3fc",
+    "\U0001f575\U0001f3fd",
+    "\u2666\ufe0f",
+    "\u2666",
+    "\U0001f4a0",
+    "\U0001f505",
+    "\U0001f61e",
+    "\U0001f978",
+    "\u2797",
+    "\U0001f93f",
+    "\U0001fa94",
+    "\U0001f4ab",
+    "\U0001f9ec",
+    "\U0001f9a4",
+    "\U0001f415",
+    "\U0001f436",
+    "\U0001f4b5",
+    "\U0001f42c",
+    "\U0001facf",
+    "\U0001f6aa",
+    "\U0001fae5",
+    "\U0001f52f",
+    "\u27bf",
+    "\u203c\ufe0f",
+    "\U0001f369",
+    "\U0001f54a\ufe0f",
+    "\U0001f54a",
+    "\u2199\ufe0f",
+    "\u2198\ufe0f",
+    "\u2b07\ufe0f",
+    "\u2b07",
+    "\U0001f613",
+    "\U0001f53d",
+    "\U0001f409",
+    "\U0001f432",
+    "\U0001f457",
+    "\U0001f924",
+    "\U0001fa78",
+    "\U0001f4a7",
+    "\U0001f941",
+    "\U0001f986",
+    "\U0001f95f",
+    "\U0001f4c0",
+    "\U0001f4e7",
+    "\U0001f985",
+    "\U0001f442",
+    "\U0001f442\U0001f3ff",
+    "\U0001f442\U0001f3fb",
+    "\U0001f442\U0001f3fe",
+    "\U0001f442\U0001f3fc",
+    "\U0001f442\U0001f3fd",
+    "\U0001f33d",
+    "\U0001f9bb",
+    "\U0001f9bb\U0001f3ff",
+    "\U0001f9bb\U0001f3fb",
+    "\U0001f9bb\U0001f3fe",
+    "\U0001f9bb\U0001f3fc",
+    "\U0001f9bb\U0001f3fd",
+    "\U0001f95a",
+    "\U0001f346",
+    "\u2734\ufe0f",
+    "\u2734",
+    "\u2733\ufe0f",
+    "\u2733",
+    "\U0001f563",
+    "\U0001f557",
+    "\u23cf\ufe0f",
+    "\u23cf",
+    "\U0001f50c",
+    "\U0001f418",
+    "\U0001f6d7",
+    "\U0001f566",
+    "\U0001f55a",
+    "\U0001f9dd",
+    "\U0001f9dd\U0001f3ff",
+    "\U0001f9dd\U0001f3fb",
+    "\U0001f9dd\U0001f3fe",
+    "\U0001f9dd\U0001f3fc",
+    "\U0001f9dd\U0001f3fd",
+    "\U0001fab9",
+    "\U0001f621",
+    "\u2709\ufe0f",
+    "\u2709",
+    "\U0001f4e9",
+    "\U0001f4b6",
+    "\U0001f332",
+    "\U0001f411",
+    "\u2049\ufe0f",
+    "\U0001f92f",
+    "\U0001f611",
+    "\U0001f441\ufe0f",
+    "\U0001f441",
+    "\U0001f441\ufe0f\u200d\U0001f5e8\ufe0f",
+    "\U0001f441\u200d\U0001f5e8\ufe0f",
+    "\U0001f441\ufe0f\u200d\U0001f5e8",
+    "\U0001f441\u200d\U0001f5e8",
+    "\U0001f440",
+    "\U0001f618",
+    "\U0001f62e\u200d\U0001f4a8",
+    "\U0001f979",
+    "\U0001f636\u200d\U0001f32b\ufe0f",
+    "\U0001f636\u200d\U0001f32b",
+    "\U0001f60b",
+    "\U0001f631",
+    "\U0001f92e",
+    "\U0001fae9",
+    "\U0001f635",
+    "\U0001fae4",
+    "\U0001f92d",
+    "\U0001f915",
+    "\U0001f637",
+    "\U0001f9d0",
+    "\U0001fae2",
+    "\U0001f62e",
+    "\U0001fae3",
+    "\U0001f928",
+    "\U0001f644",
+    "\U0001f635\u200d\U0001f4ab",
+    "\U0001f624",
+    "\U0001f92c",
+    "\U0001f602",
+    "\U0001f912",
+    "\U0001f61b",
+    "\U0001f636",
+    "\U0001f3ed",
+    "\U0001f9d1\u200d\U0001f3ed",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f3ed",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f3ed",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f3ed",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f3ed",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f3ed",
+    "\U0001f9da",
+    "\U0001f9da\U0001f3ff",
+    "\U0001f9da\U0001f3fb",
+    "\U0001f9da\U0001f3fe",
+    "\U0001f9da\U0001f3fc",
+    "\U0001f9da\U0001f3fd",
+    "\U0001f9c6",
+    "\U0001f342",
+    "\U0001f46a",
+    "\U0001f9d1\u200d\U0001f9d1\u200d\U0001f9d2",
+    "\U0001f9d1\u200d\U0001f9d1\u200d\U0001f9d2\u200d\U0001f9d2",
+    "\U0001f9d1\u200d\U0001f9d2",
+    "\U0001f9d1\u200d\U0001f9d2\u200d\U0001f9d2",
+    "\U0001f468\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f466\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f467",
+    "\U0001f468\u200d\U0001f467\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f467\u200d\U0001f467",
+    "\U0001f468\u200d\U0001f468\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f468\u200d\U0001f466\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f468\u200d\U0001f467",
+    "\U0001f468\u200d\U0001f468\u200d\U0001f467\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f468\u200d\U0001f467\u200d\U0001f467",
+    "\U0001f468\u200d\U0001f469\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f469\u200d\U0001f466\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f469\u200d\U0001f467",
+    "\U0001f468\u200d\U0001f469\u200d\U0001f467\u200d\U0001f466",
+    "\U0001f468\u200d\U0001f469\u200d\U0001f467\u200d\U0001f467",
+    "\U0001f469\u200d\U0001f466",
+    "\U0001f469\u200d\U0001f466\u200d\U0001f466",
+    "\U0001f469\u200d\U0001f467",
+    "\U0001f469\u200d\U0001f467\u200d\U0001f466",
+    "\U0001f469\u200d\U0001f467\u200d\U0001f467",
+    "\U0001f469\u200d\U0001f469\u200d\U0001f466",
+    "\U0001f469\u200d\U0001f469\u200d\U0001f466\u200d\U0001f466",
+    "\U0001f469\u200d\U0001f469\u200d\U0001f467",
+    "\U0001f469\u200d\U0001f469\u200d\U0001f467\u200d\U0001f466",
+    "\U0001f469\u200d\U0001f469\u200d\U0001f467\u200d\U0001f467",
+    "\U0001f9d1\u200d\U0001f33e",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f33e",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f33e",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f33e",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f33e",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f33e",
+    "\u23e9",
+    "\u23ec",
+    "\u23ea",
+    "\u23eb",
+    "\U0001f4e0",
+    "\U0001f628",
+    "\U0001fab6",
+    "\u2640\ufe0f",
+    "\u2640",
+    "\U0001f3a1",
+    "\u26f4\ufe0f",
+    "\u26f4",
+    "\U0001f3d1",
+    "\U0001f5c4\ufe0f",
+    "\U0001f5c4",
+    "\U0001f4c1",
+    "\U0001f39e\ufe0f",
+    "\U0001f39e",
+    "\U0001f4fd\ufe0f",
+    "\U0001f4fd",
+    "\U0001fac6",
+    "\U0001f525",
+    "\U0001f692",
+    "\U0001f9ef",
+    "\U0001f9e8",
+    "\U0001f9d1\u200d\U0001f692",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f692",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f692",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f692",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f692",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f692",
+    "\U0001f386",
+    "\U0001f313",
+    "\U0001f31b",
+    "\U0001f41f",
+    "\U0001f365",
+    "\U0001f3a3",
+    "\U0001f560",
+    "\U0001f554",
+    "\u26f3",
+    "\U0001f9a9",
+    "\U0001f526",
+    "\U0001f97f",
+    "\U0001fad3",
+    "\u269c\ufe0f",
+    "\u269c",
+    "\U0001f4aa",
+    "\U0001f4aa\U0001f3ff",
+    "\U0001f4aa\U0001f3fb",
+    "\U0001f4aa\U0001f3fe",
+    "\U0001f4aa\U0001f3fc",
+    "\U0001f4aa\U0001f3fd",
+    "\U0001f4be",
+    "\U0001f3b4",
+    "\U0001f633",
+    "\U0001fa88",
+    "\U0001fab0",
+    "\U0001f94f",
+    "\U0001f6f8",
+    "\U0001f32b\ufe0f",
+    "\U0001f32b",
+    "\U0001f301",
+    "\U0001f64f",
+    "\U0001f64f\U0001f3ff",
+    "\U0001f64f\U0001f3fb",
+    "\U0001f64f\U0001f3fe",
+    "\U0001f64f\U0001f3fc",
+    "\U0001f64f\U0001f3fd",
+    "\U0001faad",
+    "\U0001fad5",
+    "\U0001f9b6",
+    "\U0001f9b6\U0001f3ff",
+    "\U0001f9b6\U0001f3fb",
+    "\U0001f9b6\U0001f3fe",
+    "\U0001f9b6\U0001f3fc",
+    "\U0001f9b6\U0001f3fd",
+    "\U0001f463",
+    "\U0001f374",
+    "\U0001f37d\ufe0f",
+    "\U0001f37d",
+    "\U0001f960",
+    "\u26f2",
+    "\U0001f58b\ufe0f",
+    "\U0001f58b",
+    "\U0001f55f",
+    "\U0001f340",
+    "\U0001f553",
+    "\U0001f98a",
+    "\U0001f5bc\ufe0f",
+    "\U0001f5bc",
+    "\U0001f35f",
+    "\U0001f364",
+    "\U0001f438",
+    "\U0001f425",
+    "\u2639\ufe0f",
+    "\u2639",
+    "\U0001f626",
+    "\u26fd",
+    "\U0001f315",
+    "\U0001f31d",
+    "\u26b1\ufe0f",
+    "\u26b1",
+    "\U0001f3b2",
+    "\U0001f9c4",
+    "\u2699\ufe0f",
+    "\u2699",
+    "\U0001f48e",
+    "\U0001f9de",
+    "\U0001f47b",
+    "\U0001fada",
+    "\U0001f992",
+    "\U0001f467",
+    "\U0001f467\U0001f3ff",
+    "\U0001f467\U0001f3fb",
+    "\U0001f467\U0001f3fe",
+    "\U0001f467\U0001f3fc",
+    "\U0001f467\U0001f3fd",
+    "\U0001f95b",
+    "\U0001f453",
+    "\U0001f30e",
+    "\U0001f30f",
+    "\U0001f30d",
+    "\U0001f310",
+    "\U0001f9e4",
+    "\U0001f31f",
+    "\U0001f945",
+    "\U0001f410",
+    "\U0001f47a",
+    "\U0001f97d",
+    "\U0001fabf",
+    "\U0001f98d",
+    "\U0001f393",
+    "\U0001f347",
+    "\U0001f34f",
+    "\U0001f4d7",
+    "\U0001f7e2",
+    "\U0001f49a",
+    "\U0001f957",
+    "\U0001f7e9",
+    "\U0001fa76",
+    "\U0001f62c",
+    "\U0001f63a",
+    "\U0001f638",
+    "\U0001f600",
+    "\U0001f603",
+    "\U0001f604",
+    "\U0001f605",
+    "\U0001f606",
+    "\U0001f497",
+    "\U0001f482",
+    "\U0001f482\U0001f3ff",
+    "\U0001f482\U0001f3fb",
+    "\U0001f482\U0001f3fe",
+    "\U0001f482\U0001f3fc",
+    "\U0001f482\U0001f3fd",
+    "\U0001f9ae",
+    "\U0001f3b8",
+    "\U0001faae",
+    "\U0001f354",
+    "\U0001f528",
+    "\u2692\ufe0f",
+    "\u2692",
+    "\U0001f6e0\ufe0f",
+    "\U0001f6e0",
+    "\U0001faac",
+    "\U0001f439",
+    "\U0001f590\ufe0f",
+    "\U0001f590",
+    "\U0001f590\U0001f3ff",
+    "\U0001f590\U0001f3fb",
+    "\U0001f590\U0001f3fe",
+    "\U0001f590\U0001f3fc",
+    "\U0001f590\U0001f3fd",
+    "\U0001faf0",
+    "\U0001faf0\U0001f3ff",
+    "\U0001faf0\U0001f3fb",
+    "\U0001faf0\U0001f3fe",
+    "\U0001faf0\U0001f3fc",
+    "\U0001faf0\U0001f3fd",
+    "\U0001f45c",
+    "\U0001f91d",
+    "\U0001f91d\U0001f3ff",
+    "\U0001faf1\U0001f3ff\u200d\U0001faf2\U0001f3fb",
+    "\U0001faf1\U0001f3ff\u200d\U0001faf2\U0001f3fe",
+    "\U0001faf1\U0001f3ff\u200d\U0001faf2\U0001f3fc",
+    "\U0001faf1\U0001f3ff\u200d\U0001faf2\U0001f3fd",
+    "\U0001f91d\U0001f3fb",
+    "\U0001faf1\U0001f3fb\u200d\U0001faf2\U0001f3ff",
+    "\U0001faf1\U0001f3fb\u200d\U0001faf2\U0001f3fe",
+    "\U0001faf1\U0001f3fb\u200d\U0001faf2\U0001f3fc",
+    "\U0001faf1\U0001f3fb\u200d\U0001faf2\U0001f3fd",
+    "\U0001f91d\U0001f3fe",
+    "\U0001faf1\U0001f3fe\u200d\U0001faf2\U0001f3ff",
+    "\U0001faf1\U0001f3fe\u200d\U0001faf2\U0001f3fb",
+    "\U0001faf1\U0001f3fe\u200d\U0001faf2\U0001f3fc",
+    "\U0001faf1\U0001f3fe\u200d\U0001faf2\U0001f3fd",
+    "\U0001f91d\U0001f3fc",
+    "\U0001faf1\U0001f3fc\u200d\U0001faf2\U0001f3ff",
+    "\U0001faf1\U0001f3fc\u200d\U0001faf2\U0001f3fb",
+    "\U0001faf1\U0001f3fc\u200d\U0001faf2\U0001f3fe",
+    "\U0001faf1\U0001f3fc\u200d\U0001faf2\U0001f3fd",
+    "\U0001f91d\U0001f3fd",
+    "\U0001faf1\U0001f3fd\u200d\U0001faf2\U0001f3ff",
+    "\U0001faf1\U0001f3fd\u200d\U0001faf2\U0001f3fb",
+    "\U0001faf1\U0001f3fd\u200d\U0001faf2\U0001f3fe",
+    "\U0001faf1\U0001f3fd\u200d\U0001faf2\U0001f3fc",
+    "\U0001fa89",
+    "\U0001f423",
+    "\U0001f642\u200d\u2194\ufe0f",
+    "\U0001f642\u200d\u2194",
+    "\U0001f642\u200d\u2195\ufe0f",
+    "\U0001f642\u200d\u2195",
+    "\U0001f3a7",
+    "\U0001faa6",
+    "\U0001f9d1\u200d\u2695\ufe0f",
+    "\U0001f9d1\u200d\u2695",
+    "\U0001f9d1\U0001f3ff\u200d\u2695\ufe0f",
+    "\U0001f9d1\U0001f3ff\u200d\u2695",
+    "\U0001f9d1\U0001f3fb\u200d\u2695\ufe0f",
+    "\U0001f9d1\U0001f3fb\u200d\u2695",
+    "\U0001f9d1\U0001f3fe\u200d\u2695\ufe0f",
+    "\U0001f9d1\U0001f3fe\u200d\u2695",
+    "\U0001f9d1\U0001f3fc\u200d\u2695\ufe0f",
+    "\U0001f9d1\U0001f3fc\u200d\u2695",
+    "\U0001f9d1\U0001f3fd\u200d\u2695\ufe0f",
+    "\U0001f9d1\U0001f3fd\u200d\u2695",
+    "\U0001f649",
+    "\U0001f49f",
+    "\u2763\ufe0f",
+    "\u2763",
+    "\U0001faf6",
+    "\U0001faf6\U0001f3ff",
+    "\U0001faf6\U0001f3fb",
+    "\U0001faf6\U0001f3fe",
+    "\U0001faf6\U0001f3fc",
+    "\U0001faf6\U0001f3fd",
+    "\u2764\ufe0f\u200d\U0001f525",
+    "\u2764\u200d\U0001f525",
+    "\u2665\ufe0f",
+    "\u2665",
+    "\U0001f498",
+    "\U0001f49d",
+    "\U0001f4b2",
+    "\U0001f7f0",
+    "\U0001f994",
+    "\U0001f681",
+    "\U0001f33f",
+    "\U0001f33a",
+    "\U0001f460",
+    "\U0001f684",
+    "\u26a1",
+    "\U0001f97e",
+    "\U0001f6d5",
+    "\U0001f99b",
+    "\U0001f573\ufe0f",
+    "\U0001f573",
+    "\u2b55",
+    "\U0001f36f",
+    "\U0001f41d",
+    "\U0001fa9d",
+    "\U0001f6a5",
+    "\U0001f40e",
+    "\U0001f434",
+    "\U0001f3c7",
+    "\U0001f3c7\U0001f3ff",
+    "\U0001f3c7\U0001f3fb",
+    "\U0001f3c7\U0001f3fe",
+    "\U0001f3c7\U0001f3fc",
+    "\U0001f3c7\U0001f3fd",
+    "\U0001f3e5",
+    "\u2615",
+    "\U0001f32d",
+    "\U0001f975",
+    "\U0001f336\ufe0f",
+    "\U0001f336",
+    "\u2668\ufe0f",
+    "\u2668",
+    "\U0001f3e8",
+    "\u231b",
+    "\u23f3",
+    "\U0001f3e0",
+    "\U0001f3e1",
+    "\U0001f3d8\ufe0f",
+    "\U0001f3d8",
+    "\U0001f4af",
+    "\U0001f62f",
+    "\U0001f6d6",
+    "\U0001fabb",
+    "\U0001f9ca",
+    "\U0001f368",
+    "\U0001f3d2",
+    "\u26f8\ufe0f",
+    "\u26f8",
+    "\U0001faaa",
+    "\U0001f4e5",
+    "\U0001f4e8",
+    "\U0001faf5",
+    "\U0001faf5\U0001f3ff",
+    "\U0001faf5\U0001f3fb",
+    "\U0001faf5\U0001f3fe",
+    "\U0001faf5\U0001f3fc",
+    "\U0001faf5\U0001f3fd",
+    "\u261d\ufe0f",
+    "\u261d",
+    "\u261d\U0001f3ff",
+    "\u261d\U0001f3fb",
+    "\u261d\U0001f3fe",
+    "\u261d\U0001f3fc",
+    "\u261d\U0001f3fd",
+    "\u267e\ufe0f",
+    "\u267e",
+    "\u2139\ufe0f",
+    "\U0001f524",
+    "\U0001f521",
+    "\U0001f520",
+    "\U0001f522",
+    "\U0001f523",
+    "\U0001f383",
+    "\U0001fad9",
+    "\U0001f456",
+    "\U0001fabc",
+    "\U0001f0cf",
+    "\U0001f579\ufe0f",
+    "\U0001f579",
+    "\U0001f9d1\u200d\u2696\ufe0f",
+    "\U0001f9d1\u200d\u2696",
+    "\U0001f9d1\U0001f3ff\u200d\u2696\ufe0f",
+    "\U0001f9d1\U0001f3ff\u200d\u2696",
+    "\U0001f9d1\U0001f3fb\u200d\u2696\ufe0f",
+    "\U0001f9d1\U0001f3fb\u200d\u2696",
+    "\U0001f9d1\U0001f3fe\u200d\u2696\ufe0f",
+    "\U0001f9d1\U0001f3fe\u200d\u2696",
+    "\U0001f9d1\U0001f3fc\u200d\u2696\ufe0f",
+    "\U0001f9d1\U0001f3fc\u200d\u2696",
+    "\U0001f9d1\U0001f3fd\u200d\u2696\ufe0f",
+    "\U0001f9d1\U0001f3fd\u200d\u2696",
+    "\U0001f54b",
+    "\U0001f998",
+    "\U0001f511",
+    "\u2328\ufe0f",
+    "\u2328",
+    "#\ufe0f\u20e3",
+    "#\u20e3",
+    "0\ufe0f\u20e3",
+    "0\u20e3",
+    "1\ufe0f\u20e3",
+    "1\u20e3",
+    "\U0001f51f",
+    "2\ufe0f\u20e3",
+    "2\u20e3",
+    "3\ufe0f\u20e3",
+    "3\u20e3",
+    "4\ufe0f\u20e3",
+    "4\u20e3",
+    "5\ufe0f\u20e3",
+    "5\u20e3",
+    "6\ufe0f\u20e3",
+    "6\u20e3",
+    "7\ufe0f\u20e3",
+    "7\u20e3",
+    "8\ufe0f\u20e3",
+    "8\u20e3",
+    "9\ufe0f\u20e3",
+    "9\u20e3",
+    "\U0001faaf",
+    "\U0001f6f4",
+    "\U0001f458",
+    "\U0001f48f",
+    "\U0001f48f\U0001f3ff",
+    "\U0001f48f\U0001f3fb",
+    "\U0001f468\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468",
+    "\U0001f468\u200d\u2764\u200d\U0001f48b\u200d\U0001f468",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f48b",
+    "\U0001f48f\U0001f3fe",
+    "\U0001f48f\U0001f3fc",
+    "\U0001f48f\U0001f3fd",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f469\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468",
+    "\U0001f469\u200d\u2764\u200d\U0001f48b\u200d\U0001f468",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469",
+    "\U0001f469\u200d\u2764\u200d\U0001f48b\u200d\U0001f469",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3ff\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fb\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fe\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fc\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\u2764\ufe0f\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fd\u200d\u2764\u200d\U0001f48b\u200d\U0001f469\U0001f3fc",
+    "\U0001f63d",
+    "\U0001f617",
+    "\U0001f61a",
+    "\U0001f619",
+    "\U0001f52a",
+    "\U0001fa81",
+    "\U0001f95d",
+    "\U0001faa2",
+    "\U0001f428",
+    "\U0001f97c",
+    "\U0001f3f7\ufe0f",
+    "\U0001f3f7",
+    "\U0001f94d",
+    "\U0001fa9c",
+    "\U0001f41e",
+    "\U0001f4bb",
+    "\U0001f537",
+    "\U0001f536",
+    "\U0001f317",
+    "\U0001f31c",
+    "\u23ee\ufe0f",
+    "\u23ee",
+    "\u271d\ufe0f",
+    "\u271d",
+    "\U0001f343",
+    "\U0001fabe",
+    "\U0001f96c",
+    "\U0001f4d2",
+    "\U0001f91b",
+    "\U0001f91b\U0001f3ff",
+    "\U0001f91b\U0001f3fb",
+    "\U0001f91b\U0001f3fe",
+    "\U0001f91b\U0001f3fc",
+    "\U0001f91b\U0001f3fd",
+    "\u2194\ufe0f",
+    "\u2b05\ufe0f",
+    "\u2b05",
+    "\u21aa\ufe0f",
+    "\U0001f6c5",
+    "\U0001f5e8\ufe0f",
+    "\U0001f5e8",
+    "\U0001faf2",
+    "\U0001faf2\U0001f3ff",
+    "\U0001faf2\U0001f3fb",
+    "\U0001faf2\U0001f3fe",
+    "\U0001faf2\U0001f3fc",
+    "\U0001faf2\U0001f3fd",
+    "\U0001faf7",
+    "\U0001faf7\U0001f3ff",
+    "\U0001faf7\U0001f3fb",
+    "\U0001faf7\U0001f3fe",
+    "\U0001faf7\U0001f3fc",
+    "\U0001faf7\U0001f3fd",
+    "\U0001f9b5",
+    "\U0001f9b5\U0001f3ff",
+    "\U0001f9b5\U0001f3fb",
+    "\U0001f9b5\U0001f3fe",
+    "\U0001f9b5\U0001f3fc",
+    "\U0001f9b5\U0001f3fd",
+    "\U0001f34b",
+    "\U0001f406",
+    "\U0001f39a\ufe0f",
+    "\U0001f39a",
+    "\U0001fa75",
+    "\U0001f4a1",
+    "\U0001f688",
+    "\U0001f3fb",
+    "\U0001f34b\u200d\U0001f7e9",
+    "\U0001f517",
+    "\U0001f587\ufe0f",
+    "\U0001f587",
+    "\U0001f981",
+    "\U0001f484",
+    "\U0001f6ae",
+    "\U0001f98e",
+    "\U0001f999",
+    "\U0001f99e",
+    "\U0001f512",
+    "\U0001f510",
+    "\U0001f50f",
+    "\U0001f682",
+    "\U0001f36d",
+    "\U0001fa98",
+    "\U0001f9f4",
+    "\U0001fab7",
+    "\U0001f62d",
+    "\U0001f4e2",
+    "\U0001f91f",
+    "\U0001f91f\U0001f3ff",
+    "\U0001f91f\U0001f3fb",
+    "\U0001f91f\U0001f3fe",
+    "\U0001f91f\U0001f3fc",
+    "\U0001f91f\U0001f3fd",
+    "\U0001f3e9",
+    "\U0001f48c",
+    "\U0001faab",
+    "\U0001f9f3",
+    "\U0001fac1",
+    "\U0001f925",
+    "\U0001f9d9",
+    "\U0001f9d9\U0001f3ff",
+    "\U0001f9d9\U0001f3fb",
+    "\U0001f9d9\U0001f3fe",
+    "\U0001f9d9\U0001f3fc",
+    "\U0001f9d9\U0001f3fd",
+    "\U0001fa84",
+    "\U0001f9f2",
+    "\U0001f50d",
+    "\U0001f50e",
+    "\U0001f004",
+    "\u2642\ufe0f",
+    "\u2642",
+    "\U0001f9a3",
+    "\U0001f468",
+    "\U0001f468\u200d\U0001f3a8",
+    "\U0001f468\U0001f3ff\u200d\U0001f3a8",
+    "\U0001f468\U0001f3fb\u200d\U0001f3a8",
+    "\U0001f468\U0001f3fe\u200d\U0001f3a8",
+    "\U0001f468\U0001f3fc\u200d\U0001f3a8",
+    "\U0001f468\U0001f3fd\u200d\U0001f3a8",
+    "\U0001f468\u200d\U0001f680",
+    "\U0001f468\U0001f3ff\u200d\U0001f680",
+    "\U0001f468\U0001f3fb\u200d\U0001f680",
+    "\U0001f468\U0001f3fe\u200d\U0001f680",
+    "\U0001f468\U0001f3fc\u200d\U0001f680",
+    "\U0001f468\U0001f3fd\u200d\U0001f680",
+    "\U0001f468\u200d\U0001f9b2",
+    "\U0001f9d4\u200d\u2642\ufe0f",
+    "\U0001f9d4\u200d\u2642",
+    "\U0001f6b4\u200d\u2642\ufe0f",
+    "\U0001f6b4\u200d\u2642",
+    "\U0001f6b4\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f6b4\U0001f3ff\u200d\u2642",
+    "\U0001f6b4\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f6b4\U0001f3fb\u200d\u2642",
+    "\U0001f6b4\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f6b4\U0001f3fe\u200d\u2642",
+    "\U0001f6b4\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f6b4\U0001f3fc\u200d\u2642",
+    "\U0001f6b4\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f6b4\U0001f3fd\u200d\u2642",
+    "\U0001f471\u200d\u2642\ufe0f",
+    "\U0001f471\u200d\u2642",
+    "\u26f9\ufe0f\u200d\u2642\ufe0f",
+    "\u26f9\u200d\u2642\ufe0f",
+    "\u26f9\ufe0f\u200d\u2642",
+    "\u26f9\u200d\u2642",
+    "\u26f9\U0001f3ff\u200d\u2642\ufe0f",
+    "\u26f9\U0001f3ff\u200d\u2642",
+    "\u26f9\U0001f3fb\u200d\u2642\ufe0f",
+    "\u26f9\U0001f3fb\u200d\u2642",
+    "\u26f9\U0001f3fe\u200d\u2642\ufe0f",
+    "\u26f9\U0001f3fe\u200d\u2642",
+    "\u26f9\U0001f3fc\u200d\u2642\ufe0f",
+    "\u26f9\U0001f3fc\u200d\u2642",
+    "\u26f9\U0001f3fd\u200d\u2642\ufe0f",
+    "\u26f9\U0001f3fd\u200d\u2642",
+    "\U0001f647\u200d\u2642\ufe0f",
+    "\U0001f647\u200d\u2642",
+    "\U0001f647\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f647\U0001f3ff\u200d\u2642",
+    "\U0001f647\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f647\U0001f3fb\u200d\u2642",
+    "\U0001f647\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f647\U0001f3fe\u200d\u2642",
+    "\U0001f647\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f647\U0001f3fc\u200d\u2642",
+    "\U0001f647\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f647\U0001f3fd\u200d\u2642",
+    "\U0001f938\u200d\u2642\ufe0f",
+    "\U0001f938\u200d\u2642",
+    "\U0001f938\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f938\U0001f3ff\u200d\u2642",
+    "\U0001f938\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f938\U0001f3fb\u200d\u2642",
+    "\U0001f938\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f938\U0001f3fe\u200d\u2642",
+    "\U0001f938\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f938\U0001f3fc\u200d\u2642",
+    "\U0001f938\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f938\U0001f3fd\u200d\u2642",
+    "\U0001f9d7\u200d\u2642\ufe0f",
+    "\U0001f9d7\u200d\u2642",
+    "\U0001f9d7\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9d7\U0001f3ff\u200d\u2642",
+    "\U0001f9d7\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9d7\U0001f3fb\u200d\u2642",
+    "\U0001f9d7\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9d7\U0001f3fe\u200d\u2642",
+    "\U0001f9d7\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9d7\U0001f3fc\u200d\u2642",
+    "\U0001f9d7\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9d7\U0001f3fd\u200d\u2642",
+    "\U0001f477\u200d\u2642\ufe0f",
+    "\U0001f477\u200d\u2642",
+    "\U0001f477\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f477\U0001f3ff\u200d\u2642",
+    "\U0001f477\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f477\U0001f3fb\u200d\u2642",
+    "\U0001f477\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f477\U0001f3fe\u200d\u2642",
+    "\U0001f477\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f477\U0001f3fc\u200d\u2642",
+    "\U0001f477\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f477\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f373",
+    "\U0001f468\U0001f3ff\u200d\U0001f373",
+    "\U0001f468\U0001f3fb\u200d\U0001f373",
+    "\U0001f468\U0001f3fe\u200d\U0001f373",
+    "\U0001f468\U0001f3fc\u200d\U0001f373",
+    "\U0001f468\U0001f3fd\u200d\U0001f373",
+    "\U0001f468\u200d\U0001f9b1",
+    "\U0001f57a",
+    "\U0001f57a\U0001f3ff",
+    "\U0001f57a\U0001f3fb",
+    "\U0001f57a\U0001f3fe",
+    "\U0001f57a\U0001f3fc",
+    "\U0001f57a\U0001f3fd",
+    "\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3ff\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9d4\U0001f3ff\u200d\u2642",
+    "\U0001f471\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f471\U0001f3ff\u200d\u2642",
+    "\U0001f468\U0001f3ff\u200d\U0001f9b1",
+    "\U0001f468\U0001f3ff\u200d\U0001f9b0",
+    "\U0001f468\U0001f3ff\u200d\U0001f9b3",
+    "\U0001f575\ufe0f\u200d\u2642\ufe0f",
+    "\U0001f575\u200d\u2642\ufe0f",
+    "\U0001f575\ufe0f\u200d\u2642",
+    "\U0001f575\u200d\u2642",
+    "\U0001f575\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f575\U0001f3ff\u200d\u2642",
+    "\U0001f575\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f575\U0001f3fb\u200d\u2642",
+    "\U0001f575\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f575\U0001f3fe\u200d\u2642",
+    "\U0001f575\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f575\U0001f3fc\u200d\u2642",
+    "\U0001f575\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f575\U0001f3fd\u200d\u2642",
+    "\U0001f9dd\u200d\u2642\ufe0f",
+    "\U0001f9dd\u200d\u2642",
+    "\U0001f9dd\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9dd\U0001f3ff\u200d\u2642",
+    "\U0001f9dd\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9dd\U0001f3fb\u200d\u2642",
+    "\U0001f9dd\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9dd\U0001f3fe\u200d\u2642",
+    "\U0001f9dd\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9dd\U0001f3fc\u200d\u2642",
+    "\U0001f9dd\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9dd\U0001f3fd\u200d\u2642",
+    "\U0001f926\u200d\u2642\ufe0f",
+    "\U0001f926\u200d\u2642",
+    "\U0001f926\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f926\U0001f3ff\u200d\u2642",
+    "\U0001f926\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f926\U0001f3fb\u200d\u2642",
+    "\U0001f926\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f926\U0001f3fe\u200d\u2642",
+    "\U0001f926\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f926\U0001f3fc\u200d\u2642",
+    "\U0001f926\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f926\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f3ed",
+    "\U0001f468\U0001f3ff\u200d\U0001f3ed",
+    "\U0001f468\U0001f3fb\u200d\U0001f3ed",
+    "\U0001f468\U0001f3fe\u200d\U0001f3ed",
+    "\U0001f468\U0001f3fc\u200d\U0001f3ed",
+    "\U0001f468\U0001f3fd\u200d\U0001f3ed",
+    "\U0001f9da\u200d\u2642\ufe0f",
+    "\U0001f9da\u200d\u2642",
+    "\U0001f9da\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9da\U0001f3ff\u200d\u2642",
+    "\U0001f9da\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9da\U0001f3fb\u200d\u2642",
+    "\U0001f9da\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9da\U0001f3fe\u200d\u2642",
+    "\U0001f9da\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9da\U0001f3fc\u200d\u2642",
+    "\U0001f9da\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9da\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f33e",
+    "\U0001f468\U0001f3ff\u200d\U0001f33e",
+    "\U0001f468\U0001f3fb\u200d\U0001f33e",
+    "\U0001f468\U0001f3fe\u200d\U0001f33e",
+    "\U0001f468\U0001f3fc\u200d\U0001f33e",
+    "\U0001f468\U0001f3fd\u200d\U0001f33e",
+    "\U0001f468\u200d\U0001f37c",
+    "\U0001f468\U0001f3ff\u200d\U0001f37c",
+    "\U0001f468\U0001f3fb\u200d\U0001f37c",
+    "\U0001f468\U0001f3fe\u200d\U0001f37c",
+    "\U0001f468\U0001f3fc\u200d\U0001f37c",
+    "\U0001f468\U0001f3fd\u200d\U0001f37c",
+    "\U0001f468\u200d\U0001f692",
+    "\U0001f468\U0001f3ff\u200d\U0001f692",
+    "\U0001f468\U0001f3fb\u200d\U0001f692",
+    "\U0001f468\U0001f3fe\u200d\U0001f692",
+    "\U0001f468\U0001f3fc\u200d\U0001f692",
+    "\U0001f468\U0001f3fd\u200d\U0001f692",
+    "\U0001f64d\u200d\u2642\ufe0f",
+    "\U0001f64d\u200d\u2642",
+    "\U0001f64d\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f64d\U0001f3ff\u200d\u2642",
+    "\U0001f64d\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f64d\U0001f3fb\u200d\u2642",
+    "\U0001f64d\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f64d\U0001f3fe\u200d\u2642",
+    "\U0001f64d\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f64d\U0001f3fc\u200d\u2642",
+    "\U0001f64d\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f64d\U0001f3fd\u200d\u2642",
+    "\U0001f9de\u200d\u2642\ufe0f",
+    "\U0001f9de\u200d\u2642",
+    "\U0001f645\u200d\u2642\ufe0f",
+    "\U0001f645\u200d\u2642",
+    "\U0001f645\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f645\U0001f3ff\u200d\u2642",
+    "\U0001f645\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f645\U0001f3fb\u200d\u2642",
+    "\U0001f645\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f645\U0001f3fe\u200d\u2642",
+    "\U0001f645\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f645\U0001f3fc\u200d\u2642",
+    "\U0001f645\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f645\U0001f3fd\u200d\u2642",
+    "\U0001f646\u200d\u2642\ufe0f",
+    "\U0001f646\u200d\u2642",
+    "\U0001f646\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f646\U0001f3ff\u200d\u2642",
+    "\U0001f646\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f646\U0001f3fb\u200d\u2642",
+    "\U0001f646\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f646\U0001f3fe\u200d\u2642",
+    "\U0001f646\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f646\U0001f3fc\u200d\u2642",
+    "\U0001f646\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f646\U0001f3fd\u200d\u2642",
+    "\U0001f487\u200d\u2642\ufe0f",
+    "\U0001f487\u200d\u2642",
+    "\U0001f487\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f487\U0001f3ff\u200d\u2642",
+    "\U0001f487\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f487\U0001f3fb\u200d\u2642",
+    "\U0001f487\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f487\U0001f3fe\u200d\u2642",
+    "\U0001f487\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f487\U0001f3fc\u200d\u2642",
+    "\U0001f487\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f487\U0001f3fd\u200d\u2642",
+    "\U0001f486\u200d\u2642\ufe0f",
+    "\U0001f486\u200d\u2642",
+    "\U0001f486\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f486\U0001f3ff\u200d\u2642",
+    "\U0001f486\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f486\U0001f3fb\u200d\u2642",
+    "\U0001f486\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f486\U0001f3fe\u200d\u2642",
+    "\U0001f486\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f486\U0001f3fc\u200d\u2642",
+    "\U0001f486\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f486\U0001f3fd\u200d\u2642",
+    "\U0001f3cc\ufe0f\u200d\u2642\ufe0f",
+    "\U0001f3cc\u200d\u2642\ufe0f",
+    "\U0001f3cc\ufe0f\u200d\u2642",
+    "\U0001f3cc\u200d\u2642",
+    "\U0001f3cc\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f3cc\U0001f3ff\u200d\u2642",
+    "\U0001f3cc\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f3cc\U0001f3fb\u200d\u2642",
+    "\U0001f3cc\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f3cc\U0001f3fe\u200d\u2642",
+    "\U0001f3cc\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f3cc\U0001f3fc\u200d\u2642",
+    "\U0001f3cc\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f3cc\U0001f3fd\u200d\u2642",
+    "\U0001f482\u200d\u2642\ufe0f",
+    "\U0001f482\u200d\u2642",
+    "\U0001f482\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f482\U0001f3ff\u200d\u2642",
+    "\U0001f482\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f482\U0001f3fb\u200d\u2642",
+    "\U0001f482\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f482\U0001f3fe\u200d\u2642",
+    "\U0001f482\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f482\U0001f3fc\u200d\u2642",
+    "\U0001f482\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f482\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\u2695\ufe0f",
+    "\U0001f468\u200d\u2695",
+    "\U0001f468\U0001f3ff\u200d\u2695\ufe0f",
+    "\U0001f468\U0001f3ff\u200d\u2695",
+    "\U0001f468\U0001f3fb\u200d\u2695\ufe0f",
+    "\U0001f468\U0001f3fb\u200d\u2695",
+    "\U0001f468\U0001f3fe\u200d\u2695\ufe0f",
+    "\U0001f468\U0001f3fe\u200d\u2695",
+    "\U0001f468\U0001f3fc\u200d\u2695\ufe0f",
+    "\U0001f468\U0001f3fc\u200d\u2695",
+    "\U0001f468\U0001f3fd\u200d\u2695\ufe0f",
+    "\U0001f468\U0001f3fd\u200d\u2695",
+    "\U0001f9d8\u200d\u2642\ufe0f",
+    "\U0001f9d8\u200d\u2642",
+    "\U0001f9d8\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9d8\U0001f3ff\u200d\u2642",
+    "\U0001f9d8\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9d8\U0001f3fb\u200d\u2642",
+    "\U0001f9d8\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9d8\U0001f3fe\u200d\u2642",
+    "\U0001f9d8\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9d8\U0001f3fc\u200d\u2642",
+    "\U0001f9d8\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9d8\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f9bd",
+    "\U0001f468\U0001f3ff\u200d\U0001f9bd",
+    "\U0001f468\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f468\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f468\U0001f3ff\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3ff\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f468\U0001f3fb\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fb\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f468\U0001f3fe\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fe\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f468\U0001f3fc\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fc\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f468\U0001f3fd\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fd\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f468\U0001f3fb\u200d\U0001f9bd",
+    "\U0001f468\U0001f3fe\u200d\U0001f9bd",
+    "\U0001f468\U0001f3fc\u200d\U0001f9bd",
+    "\U0001f468\U0001f3fd\u200d\U0001f9bd",
+    "\U0001f468\u200d\U0001f9bc",
+    "\U0001f468\U0001f3ff\u200d\U0001f9bc",
+    "\U0001f468\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f468\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f468\U0001f3ff\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3ff\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f468\U0001f3fb\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fb\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f468\U0001f3fe\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fe\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f468\U0001f3fc\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fc\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f468\U0001f3fd\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fd\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f468\U0001f3fb\u200d\U0001f9bc",
+    "\U0001f468\U0001f3fe\u200d\U0001f9bc",
+    "\U0001f468\U0001f3fc\u200d\U0001f9bc",
+    "\U0001f468\U0001f3fd\u200d\U0001f9bc",
+    "\U0001f9d6\u200d\u2642\ufe0f",
+    "\U0001f9d6\u200d\u2642",
+    "\U0001f9d6\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9d6\U0001f3ff\u200d\u2642",
+    "\U0001f9d6\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9d6\U0001f3fb\u200d\u2642",
+    "\U0001f9d6\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9d6\U0001f3fe\u200d\u2642",
+    "\U0001f9d6\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9d6\U0001f3fc\u200d\u2642",
+    "\U0001f9d6\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9d6\U0001f3fd\u200d\u2642",
+    "\U0001f935\u200d\u2642\ufe0f",
+    "\U0001f935\u200d\u2642",
+    "\U0001f935\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f935\U0001f3ff\u200d\u2642",
+    "\U0001f935\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f935\U0001f3fb\u200d\u2642",
+    "\U0001f935\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f935\U0001f3fe\u200d\u2642",
+    "\U0001f935\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f935\U0001f3fc\u200d\u2642",
+    "\U0001f935\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f935\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\u2696\ufe0f",
+    "\U0001f468\u200d\u2696",
+    "\U0001f468\U0001f3ff\u200d\u2696\ufe0f",
+    "\U0001f468\U0001f3ff\u200d\u2696",
+    "\U0001f468\U0001f3fb\u200d\u2696\ufe0f",
+    "\U0001f468\U0001f3fb\u200d\u2696",
+    "\U0001f468\U0001f3fe\u200d\u2696\ufe0f",
+    "\U0001f468\U0001f3fe\u200d\u2696",
+    "\U0001f468\U0001f3fc\u200d\u2696\ufe0f",
+    "\U0001f468\U0001f3fc\u200d\u2696",
+    "\U0001f468\U0001f3fd\u200d\u2696\ufe0f",
+    "\U0001f468\U0001f3fd\u200d\u2696",
+    "\U0001f939\u200d\u2642\ufe0f",
+    "\U0001f939\u200d\u2642",
+    "\U0001f939\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f939\U0001f3ff\u200d\u2642",
+    "\U0001f939\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f939\U0001f3fb\u200d\u2642",
+    "\U0001f939\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f939\U0001f3fe\u200d\u2642",
+    "\U0001f939\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f939\U0001f3fc\u200d\u2642",
+    "\U0001f939\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f939\U0001f3fd\u200d\u2642",
+    "\U0001f9ce\u200d\u2642\ufe0f",
+    "\U0001f9ce\u200d\u2642",
+    "\U0001f9ce\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9ce\U0001f3ff\u200d\u2642",
+    "\U0001f9ce\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f9ce\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f9ce\u200d\u2642\u200d\u27a1",
+    "\U0001f9ce\U0001f3ff\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3ff\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3ff\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3ff\u200d\u2642\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fb\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fb\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb\u200d\u2642\u200d\u27a1",
+    "\U0001f9ce\U0001f3fe\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fe\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fe\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fe\u200d\u2642\u200d\u27a1",
+    "\U0001f9ce\U0001f3fc\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fc\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fc\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fc\u200d\u2642\u200d\u27a1",
+    "\U0001f9ce\U0001f3fd\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fd\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fd\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fd\u200d\u2642\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9ce\U0001f3fb\u200d\u2642",
+    "\U0001f9ce\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9ce\U0001f3fe\u200d\u2642",
+    "\U0001f9ce\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9ce\U0001f3fc\u200d\u2642",
+    "\U0001f9ce\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9ce\U0001f3fd\u200d\u2642",
+    "\U0001f3cb\ufe0f\u200d\u2642\ufe0f",
+    "\U0001f3cb\u200d\u2642\ufe0f",
+    "\U0001f3cb\ufe0f\u200d\u2642",
+    "\U0001f3cb\u200d\u2642",
+    "\U0001f3cb\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f3cb\U0001f3ff\u200d\u2642",
+    "\U0001f3cb\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f3cb\U0001f3fb\u200d\u2642",
+    "\U0001f3cb\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f3cb\U0001f3fe\u200d\u2642",
+    "\U0001f3cb\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f3cb\U0001f3fc\u200d\u2642",
+    "\U0001f3cb\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f3cb\U0001f3fd\u200d\u2642",
+    "\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fb\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9d4\U0001f3fb\u200d\u2642",
+    "\U0001f471\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f471\U0001f3fb\u200d\u2642",
+    "\U0001f468\U0001f3fb\u200d\U0001f9b1",
+    "\U0001f468\U0001f3fb\u200d\U0001f9b0",
+    "\U0001f468\U0001f3fb\u200d\U0001f9b3",
+    "\U0001f9d9\u200d\u2642\ufe0f",
+    "\U0001f9d9\u200d\u2642",
+    "\U0001f9d9\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9d9\U0001f3ff\u200d\u2642",
+    "\U0001f9d9\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9d9\U0001f3fb\u200d\u2642",
+    "\U0001f9d9\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9d9\U0001f3fe\u200d\u2642",
+    "\U0001f9d9\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9d9\U0001f3fc\u200d\u2642",
+    "\U0001f9d9\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9d9\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f527",
+    "\U0001f468\U0001f3ff\u200d\U0001f527",
+    "\U0001f468\U0001f3fb\u200d\U0001f527",
+    "\U0001f468\U0001f3fe\u200d\U0001f527",
+    "\U0001f468\U0001f3fc\u200d\U0001f527",
+    "\U0001f468\U0001f3fd\u200d\U0001f527",
+    "\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fe\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9d4\U0001f3fe\u200d\u2642",
+    "\U0001f471\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f471\U0001f3fe\u200d\u2642",
+    "\U0001f468\U0001f3fe\u200d\U0001f9b1",
+    "\U0001f468\U0001f3fe\u200d\U0001f9b0",
+    "\U0001f468\U0001f3fe\u200d\U0001f9b3",
+    "\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fc\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9d4\U0001f3fc\u200d\u2642",
+    "\U0001f471\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f471\U0001f3fc\u200d\u2642",
+    "\U0001f468\U0001f3fc\u200d\U0001f9b1",
+    "\U0001f468\U0001f3fc\u200d\U0001f9b0",
+    "\U0001f468\U0001f3fc\u200d\U0001f9b3",
+    "\U0001f468\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9d4\U0001f3fd\u200d\u2642",
+    "\U0001f471\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f471\U0001f3fd\u200d\u2642",
+    "\U0001f468\U0001f3fd\u200d\U0001f9b1",
+    "\U0001f468\U0001f3fd\u200d\U0001f9b0",
+    "\U0001f468\U0001f3fd\u200d\U0001f9b3",
+    "\U0001f6b5\u200d\u2642\ufe0f",
+    "\U0001f6b5\u200d\u2642",
+    "\U0001f6b5\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f6b5\U0001f3ff\u200d\u2642",
+    "\U0001f6b5\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f6b5\U0001f3fb\u200d\u2642",
+    "\U0001f6b5\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f6b5\U0001f3fe\u200d\u2642",
+    "\U0001f6b5\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f6b5\U0001f3fc\u200d\u2642",
+    "\U0001f6b5\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f6b5\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f4bc",
+    "\U0001f468\U0001f3ff\u200d\U0001f4bc",
+    "\U0001f468\U0001f3fb\u200d\U0001f4bc",
+    "\U0001f468\U0001f3fe\u200d\U0001f4bc",
+    "\U0001f468\U0001f3fc\u200d\U0001f4bc",
+    "\U0001f468\U0001f3fd\u200d\U0001f4bc",
+    "\U0001f468\u200d\u2708\ufe0f",
+    "\U0001f468\u200d\u2708",
+    "\U0001f468\U0001f3ff\u200d\u2708\ufe0f",
+    "\U0001f468\U0001f3ff\u200d\u2708",
+    "\U0001f468\U0001f3fb\u200d\u2708\ufe0f",
+    "\U0001f468\U0001f3fb\u200d\u2708",
+    "\U0001f468\U0001f3fe\u200d\u2708\ufe0f",
+    "\U0001f468\U0001f3fe\u200d\u2708",
+    "\U0001f468\U0001f3fc\u200d\u2708\ufe0f",
+    "\U0001f468\U0001f3fc\u200d\u2708",
+    "\U0001f468\U0001f3fd\u200d\u2708\ufe0f",
+    "\U0001f468\U0001f3fd\u200d\u2708",
+    "\U0001f93e\u200d\u2642\ufe0f",
+    "\U0001f93e\u200d\u2642",
+    "\U0001f93e\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f93e\U0001f3ff\u200d\u2642",
+    "\U0001f93e\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f93e\U0001f3fb\u200d\u2642",
+    "\U0001f93e\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f93e\U0001f3fe\u200d\u2642",
+    "\U0001f93e\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f93e\U0001f3fc\u200d\u2642",
+    "\U0001f93e\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f93e\U0001f3fd\u200d\u2642",
+    "\U0001f93d\u200d\u2642\ufe0f",
+    "\U0001f93d\u200d\u2642",
+    "\U0001f93d\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f93d\U0001f3ff\u200d\u2642",
+    "\U0001f93d\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f93d\U0001f3fb\u200d\u2642",
+    "\U0001f93d\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f93d\U0001f3fe\u200d\u2642",
+    "\U0001f93d\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f93d\U0001f3fc\u200d\u2642",
+    "\U0001f93d\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f93d\U0001f3fd\u200d\u2642",
+    "\U0001f46e\u200d\u2642\ufe0f",
+    "\U0001f46e\u200d\u2642",
+    "\U0001f46e\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f46e\U0001f3ff\u200d\u2642",
+    "\U0001f46e\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f46e\U0001f3fb\u200d\u2642",
+    "\U0001f46e\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f46e\U0001f3fe\u200d\u2642",
+    "\U0001f46e\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f46e\U0001f3fc\u200d\u2642",
+    "\U0001f46e\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f46e\U0001f3fd\u200d\u2642",
+    "\U0001f64e\u200d\u2642\ufe0f",
+    "\U0001f64e\u200d\u2642",
+    "\U0001f64e\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f64e\U0001f3ff\u200d\u2642",
+    "\U0001f64e\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f64e\U0001f3fb\u200d\u2642",
+    "\U0001f64e\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f64e\U0001f3fe\u200d\u2642",
+    "\U0001f64e\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f64e\U0001f3fc\u200d\u2642",
+    "\U0001f64e\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f64e\U0001f3fd\u200d\u2642",
+    "\U0001f64b\u200d\u2642\ufe0f",
+    "\U0001f64b\u200d\u2642",
+    "\U0001f64b\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f64b\U0001f3ff\u200d\u2642",
+    "\U0001f64b\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f64b\U0001f3fb\u200d\u2642",
+    "\U0001f64b\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f64b\U0001f3fe\u200d\u2642",
+    "\U0001f64b\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f64b\U0001f3fc\u200d\u2642",
+    "\U0001f64b\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f64b\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f9b0",
+    "\U0001f6a3\u200d\u2642\ufe0f",
+    "\U0001f6a3\u200d\u2642",
+    "\U0001f6a3\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f6a3\U0001f3ff\u200d\u2642",
+    "\U0001f6a3\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f6a3\U0001f3fb\u200d\u2642",
+    "\U0001f6a3\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f6a3\U0001f3fe\u200d\u2642",
+    "\U0001f6a3\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f6a3\U0001f3fc\u200d\u2642",
+    "\U0001f6a3\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f6a3\U0001f3fd\u200d\u2642",
+    "\U0001f3c3\u200d\u2642\ufe0f",
+    "\U0001f3c3\u200d\u2642",
+    "\U0001f3c3\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f3c3\U0001f3ff\u200d\u2642",
+    "\U0001f3c3\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f3c3\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f3c3\u200d\u2642\u200d\u27a1",
+    "\U0001f3c3\U0001f3ff\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3ff\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3ff\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3ff\u200d\u2642\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fb\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fb\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb\u200d\u2642\u200d\u27a1",
+    "\U0001f3c3\U0001f3fe\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fe\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fe\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fe\u200d\u2642\u200d\u27a1",
+    "\U0001f3c3\U0001f3fc\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fc\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fc\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fc\u200d\u2642\u200d\u27a1",
+    "\U0001f3c3\U0001f3fd\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fd\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fd\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fd\u200d\u2642\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f3c3\U0001f3fb\u200d\u2642",
+    "\U0001f3c3\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f3c3\U0001f3fe\u200d\u2642",
+    "\U0001f3c3\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f3c3\U0001f3fc\u200d\u2642",
+    "\U0001f3c3\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f3c3\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f52c",
+    "\U0001f468\U0001f3ff\u200d\U0001f52c",
+    "\U0001f468\U0001f3fb\u200d\U0001f52c",
+    "\U0001f468\U0001f3fe\u200d\U0001f52c",
+    "\U0001f468\U0001f3fc\u200d\U0001f52c",
+    "\U0001f468\U0001f3fd\u200d\U0001f52c",
+    "\U0001f937\u200d\u2642\ufe0f",
+    "\U0001f937\u200d\u2642",
+    "\U0001f937\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f937\U0001f3ff\u200d\u2642",
+    "\U0001f937\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f937\U0001f3fb\u200d\u2642",
+    "\U0001f937\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f937\U0001f3fe\u200d\u2642",
+    "\U0001f937\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f937\U0001f3fc\u200d\u2642",
+    "\U0001f937\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f937\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f3a4",
+    "\U0001f468\U0001f3ff\u200d\U0001f3a4",
+    "\U0001f468\U0001f3fb\u200d\U0001f3a4",
+    "\U0001f468\U0001f3fe\u200d\U0001f3a4",
+    "\U0001f468\U0001f3fc\u200d\U0001f3a4",
+    "\U0001f468\U0001f3fd\u200d\U0001f3a4",
+    "\U0001f9cd\u200d\u2642\ufe0f",
+    "\U0001f9cd\u200d\u2642",
+    "\U0001f9cd\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9cd\U0001f3ff\u200d\u2642",
+    "\U0001f9cd\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9cd\U0001f3fb\u200d\u2642",
+    "\U0001f9cd\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9cd\U0001f3fe\u200d\u2642",
+    "\U0001f9cd\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9cd\U0001f3fc\u200d\u2642",
+    "\U0001f9cd\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9cd\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f393",
+    "\U0001f468\U0001f3ff\u200d\U0001f393",
+    "\U0001f468\U0001f3fb\u200d\U0001f393",
+    "\U0001f468\U0001f3fe\u200d\U0001f393",
+    "\U0001f468\U0001f3fc\u200d\U0001f393",
+    "\U0001f468\U0001f3fd\u200d\U0001f393",
+    "\U0001f9b8\u200d\u2642\ufe0f",
+    "\U0001f9b8\u200d\u2642",
+    "\U0001f9b8\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9b8\U0001f3ff\u200d\u2642",
+    "\U0001f9b8\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9b8\U0001f3fb\u200d\u2642",
+    "\U0001f9b8\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9b8\U0001f3fe\u200d\u2642",
+    "\U0001f9b8\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9b8\U0001f3fc\u200d\u2642",
+    "\U0001f9b8\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9b8\U0001f3fd\u200d\u2642",
+    "\U0001f9b9\u200d\u2642\ufe0f",
+    "\U0001f9b9\u200d\u2642",
+    "\U0001f9b9\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9b9\U0001f3ff\u200d\u2642",
+    "\U0001f9b9\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9b9\U0001f3fb\u200d\u2642",
+    "\U0001f9b9\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9b9\U0001f3fe\u200d\u2642",
+    "\U0001f9b9\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9b9\U0001f3fc\u200d\u2642",
+    "\U0001f9b9\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9b9\U0001f3fd\u200d\u2642",
+    "\U0001f3c4\u200d\u2642\ufe0f",
+    "\U0001f3c4\u200d\u2642",
+    "\U0001f3c4\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f3c4\U0001f3ff\u200d\u2642",
+    "\U0001f3c4\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f3c4\U0001f3fb\u200d\u2642",
+    "\U0001f3c4\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f3c4\U0001f3fe\u200d\u2642",
+    "\U0001f3c4\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f3c4\U0001f3fc\u200d\u2642",
+    "\U0001f3c4\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f3c4\U0001f3fd\u200d\u2642",
+    "\U0001f3ca\u200d\u2642\ufe0f",
+    "\U0001f3ca\u200d\u2642",
+    "\U0001f3ca\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f3ca\U0001f3ff\u200d\u2642",
+    "\U0001f3ca\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f3ca\U0001f3fb\u200d\u2642",
+    "\U0001f3ca\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f3ca\U0001f3fe\u200d\u2642",
+    "\U0001f3ca\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f3ca\U0001f3fc\u200d\u2642",
+    "\U0001f3ca\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f3ca\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f3eb",
+    "\U0001f468\U0001f3ff\u200d\U0001f3eb",
+    "\U0001f468\U0001f3fb\u200d\U0001f3eb",
+    "\U0001f468\U0001f3fe\u200d\U0001f3eb",
+    "\U0001f468\U0001f3fc\u200d\U0001f3eb",
+    "\U0001f468\U0001f3fd\u200d\U0001f3eb",
+    "\U0001f468\u200d\U0001f4bb",
+    "\U0001f468\U0001f3ff\u200d\U0001f4bb",
+    "\U0001f468\U0001f3fb\u200d\U0001f4bb",
+    "\U0001f468\U0001f3fe\u200d\U0001f4bb",
+    "\U0001f468\U0001f3fc\u200d\U0001f4bb",
+    "\U0001f468\U0001f3fd\u200d\U0001f4bb",
+    "\U0001f481\u200d\u2642\ufe0f",
+    "\U0001f481\u200d\u2642",
+    "\U0001f481\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f481\U0001f3ff\u200d\u2642",
+    "\U0001f481\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f481\U0001f3fb\u200d\u2642",
+    "\U0001f481\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f481\U0001f3fe\u200d\u2642",
+    "\U0001f481\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f481\U0001f3fc\u200d\u2642",
+    "\U0001f481\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f481\U0001f3fd\u200d\u2642",
+    "\U0001f9db\u200d\u2642\ufe0f",
+    "\U0001f9db\u200d\u2642",
+    "\U0001f9db\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9db\U0001f3ff\u200d\u2642",
+    "\U0001f9db\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9db\U0001f3fb\u200d\u2642",
+    "\U0001f9db\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9db\U0001f3fe\u200d\u2642",
+    "\U0001f9db\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9db\U0001f3fc\u200d\u2642",
+    "\U0001f9db\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9db\U0001f3fd\u200d\u2642",
+    "\U0001f6b6\u200d\u2642\ufe0f",
+    "\U0001f6b6\u200d\u2642",
+    "\U0001f6b6\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f6b6\U0001f3ff\u200d\u2642",
+    "\U0001f6b6\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f6b6\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f6b6\u200d\u2642\u200d\u27a1",
+    "\U0001f6b6\U0001f3ff\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3ff\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3ff\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3ff\u200d\u2642\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fb\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fb\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb\u200d\u2642\u200d\u27a1",
+    "\U0001f6b6\U0001f3fe\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fe\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fe\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fe\u200d\u2642\u200d\u27a1",
+    "\U0001f6b6\U0001f3fc\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fc\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fc\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fc\u200d\u2642\u200d\u27a1",
+    "\U0001f6b6\U0001f3fd\u200d\u2642\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fd\u200d\u2642\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fd\u200d\u2642\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fd\u200d\u2642\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f6b6\U0001f3fb\u200d\u2642",
+    "\U0001f6b6\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f6b6\U0001f3fe\u200d\u2642",
+    "\U0001f6b6\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f6b6\U0001f3fc\u200d\u2642",
+    "\U0001f6b6\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f6b6\U0001f3fd\u200d\u2642",
+    "\U0001f473\u200d\u2642\ufe0f",
+    "\U0001f473\u200d\u2642",
+    "\U0001f473\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f473\U0001f3ff\u200d\u2642",
+    "\U0001f473\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f473\U0001f3fb\u200d\u2642",
+    "\U0001f473\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f473\U0001f3fe\u200d\u2642",
+    "\U0001f473\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f473\U0001f3fc\u200d\u2642",
+    "\U0001f473\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f473\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f9b3",
+    "\U0001f470\u200d\u2642\ufe0f",
+    "\U0001f470\u200d\u2642",
+    "\U0001f470\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f470\U0001f3ff\u200d\u2642",
+    "\U0001f470\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f470\U0001f3fb\u200d\u2642",
+    "\U0001f470\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f470\U0001f3fe\u200d\u2642",
+    "\U0001f470\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f470\U0001f3fc\u200d\u2642",
+    "\U0001f470\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f470\U0001f3fd\u200d\u2642",
+    "\U0001f468\u200d\U0001f9af",
+    "\U0001f468\U0001f3ff\u200d\U0001f9af",
+    "\U0001f468\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f468\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f468\U0001f3ff\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3ff\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f468\U0001f3fb\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fb\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f468\U0001f3fe\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fe\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f468\U0001f3fc\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fc\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f468\U0001f3fd\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f468\U0001f3fd\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f468\U0001f3fb\u200d\U0001f9af",
+    "\U0001f468\U0001f3fe\u200d\U0001f9af",
+    "\U0001f468\U0001f3fc\u200d\U0001f9af",
+    "\U0001f468\U0001f3fd\u200d\U0001f9af",
+    "\U0001f9df\u200d\u2642\ufe0f",
+    "\U0001f9df\u200d\u2642",
+    "\U0001f96d",
+    "\U0001f570\ufe0f",
+    "\U0001f570",
+    "\U0001f9bd",
+    "\U0001f45e",
+    "\U0001f5fe",
+    "\U0001f341",
+    "\U0001fa87",
+    "\U0001f94b",
+    "\U0001f9c9",
+    "\U0001f356",
+    "\U0001f9d1\u200d\U0001f527",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f527",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f527",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f527",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f527",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f527",
+    "\U0001f9be",
+    "\U0001f9bf",
+    "\u2695\ufe0f",
+    "\u2695",
+    "\U0001f3fe",
+    "\U0001f3fc",
+    "\U0001f3fd",
+    "\U0001f4e3",
+    "\U0001f348",
+    "\U0001fae0",
+    "\U0001f4dd",
+    "\U0001f46c",
+    "\U0001f46c\U0001f3ff",
+    "\U0001f468\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46c\U0001f3fb",
+    "\U0001f468\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46c\U0001f3fe",
+    "\U0001f468\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f468\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46c\U0001f3fc",
+    "\U0001f468\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46c\U0001f3fd",
+    "\U0001f468\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f468\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f468\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f468\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f46f\u200d\u2642\ufe0f",
+    "\U0001f46f\u200d\u2642",
+    "\U0001f93c\u200d\u2642\ufe0f",
+    "\U0001f93c\u200d\u2642",
+    "\u2764\ufe0f\u200d\U0001fa79",
+    "\u2764\u200d\U0001fa79",
+    "\U0001f54e",
+    "\U0001f6b9",
+    "\U0001f9dc\u200d\u2640\ufe0f",
+    "\U0001f9dc\u200d\u2640",
+    "\U0001f9dc\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9dc\U0001f3ff\u200d\u2640",
+    "\U0001f9dc\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9dc\U0001f3fb\u200d\u2640",
+    "\U0001f9dc\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9dc\U0001f3fe\u200d\u2640",
+    "\U0001f9dc\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9dc\U0001f3fc\u200d\u2640",
+    "\U0001f9dc\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9dc\U0001f3fd\u200d\u2640",
+    "\U0001f9dc\u200d\u2642\ufe0f",
+    "\U0001f9dc\u200d\u2642",
+    "\U0001f9dc\U0001f3ff\u200d\u2642\ufe0f",
+    "\U0001f9dc\U0001f3ff\u200d\u2642",
+    "\U0001f9dc\U0001f3fb\u200d\u2642\ufe0f",
+    "\U0001f9dc\U0001f3fb\u200d\u2642",
+    "\U0001f9dc\U0001f3fe\u200d\u2642\ufe0f",
+    "\U0001f9dc\U0001f3fe\u200d\u2642",
+    "\U0001f9dc\U0001f3fc\u200d\u2642\ufe0f",
+    "\U0001f9dc\U0001f3fc\u200d\u2642",
+    "\U0001f9dc\U0001f3fd\u200d\u2642\ufe0f",
+    "\U0001f9dc\U0001f3fd\u200d\u2642",
+    "\U0001f9dc",
+    "\U0001f9dc\U0001f3ff",
+    "\U0001f9dc\U0001f3fb",
+    "\U0001f9dc\U0001f3fe",
+    "\U0001f9dc\U0001f3fc",
+    "\U0001f9dc\U0001f3fd",
+    "\U0001f687",
+    "\U0001f9a0",
+    "\U0001f3a4",
+    "\U0001f52c",
+    "\U0001f595",
+    "\U0001f595\U0001f3ff",
+    "\U0001f595\U0001f3fb",
+    "\U0001f595\U0001f3fe",
+    "\U0001f595\U0001f3fc",
+    "\U0001f595\U0001f3fd",
+    "\U0001fa96",
+    "\U0001f396\ufe0f",
+    "\U0001f396",
+    "\U0001f30c",
+    "\U0001f690",
+    "\u2796",
+    "\U0001fa9e",
+    "\U0001faa9",
+    "\U0001f5ff",
+    "\U0001f4f1",
+    "\U0001f4f4",
+    "\U0001f4f2",
+    "\U0001f911",
+    "\U0001f4b0",
+    "\U0001f4b8",
+    "\U0001f412",
+    "\U0001f435",
+    "\U0001f69d",
+    "\U0001f96e",
+    "\U0001f391",
+    "\U0001face",
+    "\U0001f54c",
+    "\U0001f99f",
+    "\U0001f6e5\ufe0f",
+    "\U0001f6e5",
+    "\U0001f6f5",
+    "\U0001f3cd\ufe0f",
+    "\U0001f3cd",
+    "\U0001f9bc",
+    "\U0001f6e3\ufe0f",
+    "\U0001f6e3",
+    "\U0001f5fb",
+    "\u26f0\ufe0f",
+    "\u26f0",
+    "\U0001f6a0",
+    "\U0001f69e",
+    "\U0001f401",
+    "\U0001f42d",
+    "\U0001faa4",
+    "\U0001f444",
+    "\U0001f3a5",
+    "\u2716\ufe0f",
+    "\u2716",
+    "\U0001f344",
+    "\U0001f3b9",
+    "\U0001f3b5",
+    "\U0001f3b6",
+    "\U0001f3bc",
+    "\U0001f507",
+    "\U0001f485",
+    "\U0001f485\U0001f3ff",
+    "\U0001f485\U0001f3fb",
+    "\U0001f485\U0001f3fe",
+    "\U0001f485\U0001f3fc",
+    "\U0001f485\U0001f3fd",
+    "\U0001f4db",
+    "\U0001f3de\ufe0f",
+    "\U0001f3de",
+    "\U0001f922",
+    "\U0001f9ff",
+    "\U0001f454",
+    "\U0001f913",
+    "\U0001faba",
+    "\U0001fa86",
+    "\U0001f610",
+    "\U0001f311",
+    "\U0001f31a",
+    "\U0001f4f0",
+    "\u23ed\ufe0f",
+    "\u23ed",
+    "\U0001f303",
+    "\U0001f564",
+    "\U0001f558",
+    "\U0001f977",
+    "\U0001f977\U0001f3ff",
+    "\U0001f977\U0001f3fb",
+    "\U0001f977\U0001f3fe",
+    "\U0001f977\U0001f3fc",
+    "\U0001f977\U0001f3fd",
+    "\U0001f6b3",
+    "\u26d4",
+    "\U0001f6af",
+    "\U0001f4f5",
+    "\U0001f51e",
+    "\U0001f6b7",
+    "\U0001f6ad",
+    "\U0001f6b1",
+    "\U0001f443",
+    "\U0001f443\U0001f3ff",
+    "\U0001f443\U0001f3fb",
+    "\U0001f443\U0001f3fe",
+    "\U0001f443\U0001f3fc",
+    "\U0001f443\U0001f3fd",
+    "\U0001f4d3",
+    "\U0001f4d4",
+    "\U0001f529",
+    "\U0001f419",
+    "\U0001f362",
+    "\U0001f3e2",
+    "\U0001f9d1\u200d\U0001f4bc",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f4bc",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f4bc",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f4bc",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f4bc",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f4bc",
+    "\U0001f479",
+    "\U0001f6e2\ufe0f",
+    "\U0001f6e2",
+    "\U0001f5dd\ufe0f",
+    "\U0001f5dd",
+    "\U0001f474",
+    "\U0001f474\U0001f3ff",
+    "\U0001f474\U0001f3fb",
+    "\U0001f474\U0001f3fe",
+    "\U0001f474\U0001f3fc",
+    "\U0001f474\U0001f3fd",
+    "\U0001f475",
+    "\U0001f475\U0001f3ff",
+    "\U0001f475\U0001f3fb",
+    "\U0001f475\U0001f3fe",
+    "\U0001f475\U0001f3fc",
+    "\U0001f475\U0001f3fd",
+    "\U0001f9d3",
+    "\U0001f9d3\U0001f3ff",
+    "\U0001f9d3\U0001f3fb",
+    "\U0001f9d3\U0001f3fe",
+    "\U0001f9d3\U0001f3fc",
+    "\U0001f9d3\U0001f3fd",
+    "\U0001fad2",
+    "\U0001f549\ufe0f",
+    "\U0001f549",
+    "\U0001f698",
+    "\U0001f68d",
+    "\U0001f44a",
+    "\U0001f44a\U0001f3ff",
+    "\U0001f44a\U0001f3fb",
+    "\U0001f44a\U0001f3fe",
+    "\U0001f44a\U0001f3fc",
+    "\U0001f44a\U0001f3fd",
+    "\U0001f694",
+    "\U0001f696",
+    "\U0001fa71",
+    "\U0001f55c",
+    "\U0001f550",
+    "\U0001f9c5",
+    "\U0001f4d6",
+    "\U0001f4c2",
+    "\U0001f450",
+    "\U0001f450\U0001f3ff",
+    "\U0001f450\U0001f3fb",
+    "\U0001f450\U0001f3fe",
+    "\U0001f450\U0001f3fc",
+    "\U0001f450\U0001f3fd",
+    "\U0001f4ed",
+    "\U0001f4ec",
+    "\U0001f4bf",
+    "\U0001f4d9",
+    "\U0001f7e0",
+    "\U0001f9e1",
+    "\U0001f7e7",
+    "\U0001f9a7",
+    "\u2626\ufe0f",
+    "\u2626",
+    "\U0001f9a6",
+    "\U0001f4e4",
+    "\U0001f989",
+    "\U0001f402",
+    "\U0001f9aa",
+    "\U0001f4e6",
+    "\U0001f4c4",
+    "\U0001f4c3",
+    "\U0001f4df",
+    "\U0001f58c\ufe0f",
+    "\U0001f58c",
+    "\U0001faf3",
+    "\U0001faf3\U0001f3ff",
+    "\U0001faf3\U0001f3fb",
+    "\U0001faf3\U0001f3fe",
+    "\U0001faf3\U0001f3fc",
+    "\U0001faf3\U0001f3fd",
+    "\U0001f334",
+    "\U0001faf4",
+    "\U0001faf4\U0001f3ff",
+    "\U0001faf4\U0001f3fb",
+    "\U0001faf4\U0001f3fe",
+    "\U0001faf4\U0001f3fc",
+    "\U0001faf4\U0001f3fd",
+    "\U0001f932",
+    "\U0001f932\U0001f3ff",
+    "\U0001f932\U0001f3fb",
+    "\U0001f932\U0001f3fe",
+    "\U0001f932\U0001f3fc",
+    "\U0001f932\U0001f3fd",
+    "\U0001f95e",
+    "\U0001f43c",
+    "\U0001f4ce",
+    "\U0001fa82",
+    "\U0001f99c",
+    "\u303d\ufe0f",
+    "\u303d",
+    "\U0001f389",
+    "\U0001f973",
+    "\U0001f6f3\ufe0f",
+    "\U0001f6f3",
+    "\U0001f6c2",
+    "\u23f8\ufe0f",
+    "\u23f8",
+    "\U0001f43e",
+    "\U0001fadb",
+    "\u262e\ufe0f",
+    "\u262e",
+    "\U0001f351",
+    "\U0001f99a",
+    "\U0001f95c",
+    "\U0001f350",
+    "\U0001f58a\ufe0f",
+    "\U0001f58a",
+    "\u270f\ufe0f",
+    "\u270f",
+    "\U0001f427",
+    "\U0001f614",
+    "\U0001f9d1\u200d\U0001f91d\u200d\U0001f9d1",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f91d\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f91d\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f91d\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f91d\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f91d\u200d\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f91d\u200d\U0001f9d1\U0001f3fc",
+    "\U0001fac2",
+    "\U0001f46f",
+    "\U0001f93c",
+    "\U0001f3ad",
+    "\U0001f623",
+    "\U0001f9d1",
+    "\U0001f9d1\u200d\U0001f9b2",
+    "\U0001f9d4",
+    "\U0001f6b4",
+    "\U0001f6b4\U0001f3ff",
+    "\U0001f6b4\U0001f3fb",
+    "\U0001f6b4\U0001f3fe",
+    "\U0001f6b4\U0001f3fc",
+    "\U0001f6b4\U0001f3fd",
+    "\U0001f471",
+    "\u26f9\ufe0f",
+    "\u26f9",
+    "\u26f9\U0001f3ff",
+    "\u26f9\U0001f3fb",
+    "\u26f9\U0001f3fe",
+    "\u26f9\U0001f3fc",
+    "\u26f9\U0001f3fd",
+    "\U0001f647",
+    "\U0001f647\U0001f3ff",
+    "\U0001f647\U0001f3fb",
+    "\U0001f647\U0001f3fe",
+    "\U0001f647\U0001f3fc",
+    "\U0001f647\U0001f3fd",
+    "\U0001f938",
+    "\U0001f938\U0001f3ff",
+    "\U0001f938\U0001f3fb",
+    "\U0001f938\U0001f3fe",
+    "\U0001f938\U0001f3fc",
+    "\U0001f938\U0001f3fd",
+    "\U0001f9d7",
+    "\U0001f9d7\U0001f3ff",
+    "\U0001f9d7\U0001f3fb",
+    "\U0001f9d7\U0001f3fe",
+    "\U0001f9d7\U0001f3fc",
+    "\U0001f9d7\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f9b1",
+    "\U0001f9d1\U0001f3ff",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3ff",
+    "\U0001f471\U0001f3ff",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9b1",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9b0",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9b3",
+    "\U0001f926",
+    "\U0001f926\U0001f3ff",
+    "\U0001f926\U0001f3fb",
+    "\U0001f926\U0001f3fe",
+    "\U0001f926\U0001f3fc",
+    "\U0001f926\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f37c",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f37c",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f37c",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f37c",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f37c",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f37c",
+    "\U0001f93a",
+    "\U0001f64d",
+    "\U0001f64d\U0001f3ff",
+    "\U0001f64d\U0001f3fb",
+    "\U0001f64d\U0001f3fe",
+    "\U0001f64d\U0001f3fc",
+    "\U0001f64d\U0001f3fd",
+    "\U0001f645",
+    "\U0001f645\U0001f3ff",
+    "\U0001f645\U0001f3fb",
+    "\U0001f645\U0001f3fe",
+    "\U0001f645\U0001f3fc",
+    "\U0001f645\U0001f3fd",
+    "\U0001f646",
+    "\U0001f646\U0001f3ff",
+    "\U0001f646\U0001f3fb",
+    "\U0001f646\U0001f3fe",
+    "\U0001f646\U0001f3fc",
+    "\U0001f646\U0001f3fd",
+    "\U0001f487",
+    "\U0001f487\U0001f3ff",
+    "\U0001f487\U0001f3fb",
+    "\U0001f487\U0001f3fe",
+    "\U0001f487\U0001f3fc",
+    "\U0001f487\U0001f3fd",
+    "\U0001f486",
+    "\U0001f486\U0001f3ff",
+    "\U0001f486\U0001f3fb",
+    "\U0001f486\U0001f3fe",
+    "\U0001f486\U0001f3fc",
+    "\U0001f486\U0001f3fd",
+    "\U0001f3cc\ufe0f",
+    "\U0001f3cc",
+    "\U0001f3cc\U0001f3ff",
+    "\U0001f3cc\U0001f3fb",
+    "\U0001f3cc\U0001f3fe",
+    "\U0001f3cc\U0001f3fc",
+    "\U0001f3cc\U0001f3fd",
+    "\U0001f6cc",
+    "\U0001f6cc\U0001f3ff",
+    "\U0001f6cc\U0001f3fb",
+    "\U0001f6cc\U0001f3fe",
+    "\U0001f6cc\U0001f3fc",
+    "\U0001f6cc\U0001f3fd",
+    "\U0001f9d8",
+    "\U0001f9d8\U0001f3ff",
+    "\U0001f9d8\U0001f3fb",
+    "\U0001f9d8\U0001f3fe",
+    "\U0001f9d8\U0001f3fc",
+    "\U0001f9d8\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f9bd",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9bd",
+    "\U0001f9d1\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f9d1\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9bd",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9bd",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9bd",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9bd",
+    "\U0001f9d1\u200d\U0001f9bc",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9bc",
+    "\U0001f9d1\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f9d1\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9bc",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9bc",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9bc",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9bc",
+    "\U0001f9d6",
+    "\U0001f9d6\U0001f3ff",
+    "\U0001f9d6\U0001f3fb",
+    "\U0001f9d6\U0001f3fe",
+    "\U0001f9d6\U0001f3fc",
+    "\U0001f9d6\U0001f3fd",
+    "\U0001f574\ufe0f",
+    "\U0001f574",
+    "\U0001f574\U0001f3ff",
+    "\U0001f574\U0001f3fb",
+    "\U0001f574\U0001f3fe",
+    "\U0001f574\U0001f3fc",
+    "\U0001f574\U0001f3fd",
+    "\U0001f935",
+    "\U0001f935\U0001f3ff",
+    "\U0001f935\U0001f3fb",
+    "\U0001f935\U0001f3fe",
+    "\U0001f935\U0001f3fc",
+    "\U0001f935\U0001f3fd",
+    "\U0001f939",
+    "\U0001f939\U0001f3ff",
+    "\U0001f939\U0001f3fb",
+    "\U0001f939\U0001f3fe",
+    "\U0001f939\U0001f3fc",
+    "\U0001f939\U0001f3fd",
+    "\U0001f9ce",
+    "\U0001f9ce\U0001f3ff",
+    "\U0001f9ce\u200d\u27a1\ufe0f",
+    "\U0001f9ce\u200d\u27a1",
+    "\U0001f9ce\U0001f3ff\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3ff\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fb\u200d\u27a1",
+    "\U0001f9ce\U0001f3fe\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fe\u200d\u27a1",
+    "\U0001f9ce\U0001f3fc\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fc\u200d\u27a1",
+    "\U0001f9ce\U0001f3fd\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fd\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb",
+    "\U0001f9ce\U0001f3fe",
+    "\U0001f9ce\U0001f3fc",
+    "\U0001f9ce\U0001f3fd",
+    "\U0001f3cb\ufe0f",
+    "\U0001f3cb",
+    "\U0001f3cb\U0001f3ff",
+    "\U0001f3cb\U0001f3fb",
+    "\U0001f3cb\U0001f3fe",
+    "\U0001f3cb\U0001f3fc",
+    "\U0001f3cb\U0001f3fd",
+    "\U0001f9d1\U0001f3fb",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fb",
+    "\U0001f471\U0001f3fb",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9b1",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9b0",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9b3",
+    "\U0001f9d1\U0001f3fe",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fe",
+    "\U0001f471\U0001f3fe",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9b1",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9b0",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9b3",
+    "\U0001f9d1\U0001f3fc",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fc",
+    "\U0001f471\U0001f3fc",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9b1",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9b0",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9b3",
+    "\U0001f9d1\U0001f3fd",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fd",
+    "\U0001f471\U0001f3fd",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9b1",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9b0",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9b3",
+    "\U0001f6b5",
+    "\U0001f6b5\U0001f3ff",
+    "\U0001f6b5\U0001f3fb",
+    "\U0001f6b5\U0001f3fe",
+    "\U0001f6b5\U0001f3fc",
+    "\U0001f6b5\U0001f3fd",
+    "\U0001f93e",
+    "\U0001f93e\U0001f3ff",
+    "\U0001f93e\U0001f3fb",
+    "\U0001f93e\U0001f3fe",
+    "\U0001f93e\U0001f3fc",
+    "\U0001f93e\U0001f3fd",
+    "\U0001f93d",
+    "\U0001f93d\U0001f3ff",
+    "\U0001f93d\U0001f3fb",
+    "\U0001f93d\U0001f3fe",
+    "\U0001f93d\U0001f3fc",
+    "\U0001f93d\U0001f3fd",
+    "\U0001f64e",
+    "\U0001f64e\U0001f3ff",
+    "\U0001f64e\U0001f3fb",
+    "\U0001f64e\U0001f3fe",
+    "\U0001f64e\U0001f3fc",
+    "\U0001f64e\U0001f3fd",
+    "\U0001f64b",
+    "\U0001f64b\U0001f3ff",
+    "\U0001f64b\U0001f3fb",
+    "\U0001f64b\U0001f3fe",
+    "\U0001f64b\U0001f3fc",
+    "\U0001f64b\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f9b0",
+    "\U0001f6a3",
+    "\U0001f6a3\U0001f3ff",
+    "\U0001f6a3\U0001f3fb",
+    "\U0001f6a3\U0001f3fe",
+    "\U0001f6a3\U0001f3fc",
+    "\U0001f6a3\U0001f3fd",
+    "\U0001f3c3",
+    "\U0001f3c3\U0001f3ff",
+    "\U0001f3c3\u200d\u27a1\ufe0f",
+    "\U0001f3c3\u200d\u27a1",
+    "\U0001f3c3\U0001f3ff\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3ff\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fb\u200d\u27a1",
+    "\U0001f3c3\U0001f3fe\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fe\u200d\u27a1",
+    "\U0001f3c3\U0001f3fc\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fc\u200d\u27a1",
+    "\U0001f3c3\U0001f3fd\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fd\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb",
+    "\U0001f3c3\U0001f3fe",
+    "\U0001f3c3\U0001f3fc",
+    "\U0001f3c3\U0001f3fd",
+    "\U0001f937",
+    "\U0001f937\U0001f3ff",
+    "\U0001f937\U0001f3fb",
+    "\U0001f937\U0001f3fe",
+    "\U0001f937\U0001f3fc",
+    "\U0001f937\U0001f3fd",
+    "\U0001f9cd",
+    "\U0001f9cd\U0001f3ff",
+    "\U0001f9cd\U0001f3fb",
+    "\U0001f9cd\U0001f3fe",
+    "\U0001f9cd\U0001f3fc",
+    "\U0001f9cd\U0001f3fd",
+    "\U0001f3c4",
+    "\U0001f3c4\U0001f3ff",
+    "\U0001f3c4\U0001f3fb",
+    "\U0001f3c4\U0001f3fe",
+    "\U0001f3c4\U0001f3fc",
+    "\U0001f3c4\U0001f3fd",
+    "\U0001f3ca",
+    "\U0001f3ca\U0001f3ff",
+    "\U0001f3ca\U0001f3fb",
+    "\U0001f3ca\U0001f3fe",
+    "\U0001f3ca\U0001f3fc",
+    "\U0001f3ca\U0001f3fd",
+    "\U0001f6c0",
+    "\U0001f6c0\U0001f3ff",
+    "\U0001f6c0\U0001f3fb",
+    "\U0001f6c0\U0001f3fe",
+    "\U0001f6c0\U0001f3fc",
+    "\U0001f6c0\U0001f3fd",
+    "\U0001f481",
+    "\U0001f481\U0001f3ff",
+    "\U0001f481\U0001f3fb",
+    "\U0001f481\U0001f3fe",
+    "\U0001f481\U0001f3fc",
+    "\U0001f481\U0001f3fd",
+    "\U0001f6b6",
+    "\U0001f6b6\U0001f3ff",
+    "\U0001f6b6\u200d\u27a1\ufe0f",
+    "\U0001f6b6\u200d\u27a1",
+    "\U0001f6b6\U0001f3ff\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3ff\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fb\u200d\u27a1",
+    "\U0001f6b6\U0001f3fe\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fe\u200d\u27a1",
+    "\U0001f6b6\U0001f3fc\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fc\u200d\u27a1",
+    "\U0001f6b6\U0001f3fd\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fd\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb",
+    "\U0001f6b6\U0001f3fe",
+    "\U0001f6b6\U0001f3fc",
+    "\U0001f6b6\U0001f3fd",
+    "\U0001f473",
+    "\U0001f473\U0001f3ff",
+    "\U0001f473\U0001f3fb",
+    "\U0001f473\U0001f3fe",
+    "\U0001f473\U0001f3fc",
+    "\U0001f473\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f9b3",
+    "\U0001fac5",
+    "\U0001fac5\U0001f3ff",
+    "\U0001fac5\U0001f3fb",
+    "\U0001fac5\U0001f3fe",
+    "\U0001fac5\U0001f3fc",
+    "\U0001fac5\U0001f3fd",
+    "\U0001f472",
+    "\U0001f472\U0001f3ff",
+    "\U0001f472\U0001f3fb",
+    "\U0001f472\U0001f3fe",
+    "\U0001f472\U0001f3fc",
+    "\U0001f472\U0001f3fd",
+    "\U0001f470",
+    "\U0001f470\U0001f3ff",
+    "\U0001f470\U0001f3fb",
+    "\U0001f470\U0001f3fe",
+    "\U0001f470\U0001f3fc",
+    "\U0001f470\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f9af",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9af",
+    "\U0001f9d1\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f9d1\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f9af",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f9af",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f9af",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f9af",
+    "\U0001f9eb",
+    "\U0001f426\u200d\U0001f525",
+    "\u26cf\ufe0f",
+    "\u26cf",
+    "\U0001f6fb",
+    "\U0001f967",
+    "\U0001f416",
+    "\U0001f437",
+    "\U0001f43d",
+    "\U0001f4a9",
+    "\U0001f48a",
+    "\U0001f9d1\u200d\u2708\ufe0f",
+    "\U0001f9d1\u200d\u2708",
+    "\U0001f9d1\U0001f3ff\u200d\u2708\ufe0f",
+    "\U0001f9d1\U0001f3ff\u200d\u2708",
+    "\U0001f9d1\U0001f3fb\u200d\u2708\ufe0f",
+    "\U0001f9d1\U0001f3fb\u200d\u2708",
+    "\U0001f9d1\U0001f3fe\u200d\u2708\ufe0f",
+    "\U0001f9d1\U0001f3fe\u200d\u2708",
+    "\U0001f9d1\U0001f3fc\u200d\u2708\ufe0f",
+    "\U0001f9d1\U0001f3fc\u200d\u2708",
+    "\U0001f9d1\U0001f3fd\u200d\u2708\ufe0f",
+    "\U0001f9d1\U0001f3fd\u200d\u2708",
+    "\U0001f90c",
+    "\U0001f90c\U0001f3ff",
+    "\U0001f90c\U0001f3fb",
+    "\U0001f90c\U0001f3fe",
+    "\U0001f90c\U0001f3fc",
+    "\U0001f90c\U0001f3fd",
+    "\U0001f90f",
+    "\U0001f90f\U0001f3ff",
+    "\U0001f90f\U0001f3fb",
+    "\U0001f90f\U0001f3fe",
+    "\U0001f90f\U0001f3fc",
+    "\U0001f90f\U0001f3fd",
+    "\U0001f38d",
+    "\U0001f34d",
+    "\U0001f3d3",
+    "\U0001fa77",
+    "\U0001f3f4\u200d\u2620\ufe0f",
+    "\U0001f3f4\u200d\u2620",
+    "\U0001f355",
+    "\U0001fa85",
+    "\U0001faa7",
+    "\U0001f6d0",
+    "\u25b6\ufe0f",
+    "\u23ef\ufe0f",
+    "\u23ef",
+    "\U0001f6dd",
+    "\U0001f97a",
+    "\U0001faa0",
+    "\u2795",
+    "\U0001f43b\u200d\u2744\ufe0f",
+    "\U0001f43b\u200d\u2744",
+    "\U0001f693",
+    "\U0001f6a8",
+    "\U0001f46e",
+    "\U0001f46e\U0001f3ff",
+    "\U0001f46e\U0001f3fb",
+    "\U0001f46e\U0001f3fe",
+    "\U0001f46e\U0001f3fc",
+    "\U0001f46e\U0001f3fd",
+    "\U0001f429",
+    "\U0001f3b1",
+    "\U0001f37f",
+    "\U0001f3e4",
+    "\U0001f4ef",
+    "\U0001f4ee",
+    "\U0001f372",
+    "\U0001f6b0",
+    "\U0001f954",
+    "\U0001fab4",
+    "\U0001f357",
+    "\U0001f4b7",
+    "\U0001fad7",
+    "\U0001f63e",
+    "\U0001f4ff",
+    "\U0001fac3",
+    "\U0001fac3\U0001f3ff",
+    "\U0001fac3\U0001f3fb",
+    "\U0001fac3\U0001f3fe",
+    "\U0001fac3\U0001f3fc",
+    "\U0001fac3\U0001f3fd",
+    "\U0001fac4",
+    "\U0001fac4\U0001f3ff",
+    "\U0001fac4\U0001f3fb",
+    "\U0001fac4\U0001f3fe",
+    "\U0001fac4\U0001f3fc",
+    "\U0001fac4\U0001f3fd",
+    "\U0001f930",
+    "\U0001f930\U0001f3ff",
+    "\U0001f930\U0001f3fb",
+    "\U0001f930\U0001f3fe",
+    "\U0001f930\U0001f3fc",
+    "\U0001f930\U0001f3fd",
+    "\U0001f968",
+    "\U0001f934",
+    "\U0001f934\U0001f3ff",
+    "\U0001f934\U0001f3fb",
+    "\U0001f934\U0001f3fe",
+    "\U0001f934\U0001f3fc",
+    "\U0001f934\U0001f3fd",
+    "\U0001f478",
+    "\U0001f478\U0001f3ff",
+    "\U0001f478\U0001f3fb",
+    "\U0001f478\U0001f3fe",
+    "\U0001f478\U0001f3fc",
+    "\U0001f478\U0001f3fd",
+    "\U0001f5a8\ufe0f",
+    "\U0001f5a8",
+    "\U0001f6ab",
+    "\U0001f7e3",
+    "\U0001f49c",
+    "\U0001f7ea",
+    "\U0001f45b",
+    "\U0001f4cc",
+    "\U0001f9e9",
+    "\U0001f407",
+    "\U0001f430",
+    "\U0001f99d",
+    "\U0001f3ce\ufe0f",
+    "\U0001f3ce",
+    "\U0001f4fb",
+    "\U0001f518",
+    "\u2622\ufe0f",
+    "\u2622",
+    "\U0001f683",
+    "\U0001f6e4\ufe0f",
+    "\U0001f6e4",
+    "\U0001f308",
+    "\U0001f3f3\ufe0f\u200d\U0001f308",
+    "\U0001f3f3\u200d\U0001f308",
+    "\U0001f91a",
+    "\U0001f91a\U0001f3ff",
+    "\U0001f91a\U0001f3fb",
+    "\U0001f91a\U0001f3fe",
+    "\U0001f91a\U0001f3fc",
+    "\U0001f91a\U0001f3fd",
+    "\u270a",
+    "\u270a\U0001f3ff",
+    "\u270a\U0001f3fb",
+    "\u270a\U0001f3fe",
+    "\u270a\U0001f3fc",
+    "\u270a\U0001f3fd",
+    "\u270b",
+    "\u270b\U0001f3ff",
+    "\u270b\U0001f3fb",
+    "\u270b\U0001f3fe",
+    "\u270b\U0001f3fc",
+    "\u270b\U0001f3fd",
+    "\U0001f64c",
+    "\U0001f64c\U0001f3ff",
+    "\U0001f64c\U0001f3fb",
+    "\U0001f64c\U0001f3fe",
+    "\U0001f64c\U0001f3fc",
+    "\U0001f64c\U0001f3fd",
+    "\U0001f40f",
+    "\U0001f400",
+    "\U0001fa92",
+    "\U0001f9fe",
+    "\u23fa\ufe0f",
+    "\u23fa",
+    "\u267b\ufe0f",
+    "\u267b",
+    "\U0001f34e",
+    "\U0001f534",
+    "\U0001f9e7",
+    "\u2757",
+    "\U0001f9b0",
+    "\u2764\ufe0f",
+    "\u2764",
+    "\U0001f3ee",
+    "\u2753",
+    "\U0001f7e5",
+    "\U0001f53b",
+    "\U0001f53a",
+    "\xae\ufe0f",
+    "\U0001f60c",
+    "\U0001f397\ufe0f",
+    "\U0001f397",
+    "\U0001f501",
+    "\U0001f502",
+    "\u26d1\ufe0f",
+    "\u26d1",
+    "\U0001f6bb",
+    "\u25c0\ufe0f",
+    "\U0001f49e",
+    "\U0001f98f",
+    "\U0001f380",
+    "\U0001f359",
+    "\U0001f358",
+    "\U0001f91c",
+    "\U0001f91c\U0001f3ff",
+    "\U0001f91c\U0001f3fb",
+    "\U0001f91c\U0001f3fe",
+    "\U0001f91c\U0001f3fc",
+    "\U0001f91c\U0001f3fd",
+    "\U0001f5ef\ufe0f",
+    "\U0001f5ef",
+    "\u27a1\ufe0f",
+    "\u27a1",
+    "\u2935\ufe0f",
+    "\u2935",
+    "\u21a9\ufe0f",
+    "\u2934\ufe0f",
+    "\u2934",
+    "\U0001faf1",
+    "\U0001faf1\U0001f3ff",
+    "\U0001faf1\U0001f3fb",
+    "\U0001faf1\U0001f3fe",
+    "\U0001faf1\U0001f3fc",
+    "\U0001faf1\U0001f3fd",
+    "\U0001faf8",
+    "\U0001faf8\U0001f3ff",
+    "\U0001faf8\U0001f3fb",
+    "\U0001faf8\U0001f3fe",
+    "\U0001faf8\U0001f3fc",
+    "\U0001faf8\U0001f3fd",
+    "\U0001f48d",
+    "\U0001f6df",
+    "\U0001fa90",
+    "\U0001f360",
+    "\U0001f916",
+    "\U0001faa8",
+    "\U0001f680",
+    "\U0001f9fb",
+    "\U0001f5de\ufe0f",
+    "\U0001f5de",
+    "\U0001f3a2",
+    "\U0001f6fc",
+    "\U0001f923",
+    "\U0001f413",
+    "\U0001fadc",
+    "\U0001f339",
+    "\U0001f3f5\ufe0f",
+    "\U0001f3f5",
+    "\U0001f4cd",
+    "\U0001f3c9",
+    "\U0001f3bd",
+    "\U0001f45f",
+    "\U0001f625",
+    "\U0001f9f7",
+    "\U0001f9ba",
+    "\u26f5",
+    "\U0001f376",
+    "\U0001f9c2",
+    "\U0001fae1",
+    "\U0001f96a",
+    "\U0001f97b",
+    "\U0001f6f0\ufe0f",
+    "\U0001f6f0",
+    "\U0001f4e1",
+    "\U0001f995",
+    "\U0001f3b7",
+    "\U0001f9e3",
+    "\U0001f3eb",
+    "\U0001f9d1\u200d\U0001f52c",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f52c",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f52c",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f52c",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f52c",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f52c",
+    "\u2702\ufe0f",
+    "\u2702",
+    "\U0001f982",
+    "\U0001fa9b",
+    "\U0001f4dc",
+    "\U0001f9ad",
+    "\U0001f4ba",
+    "\U0001f648",
+    "\U0001f331",
+    "\U0001f933",
+    "\U0001f933\U0001f3ff",
+    "\U0001f933\U0001f3fb",
+    "\U0001f933\U0001f3fe",
+    "\U0001f933\U0001f3fc",
+    "\U0001f933\U0001f3fd",
+    "\U0001f415\u200d\U0001f9ba",
+    "\U0001f562",
+    "\U0001f556",
+    "\U0001faa1",
+    "\U0001fae8",
+    "\U0001f958",
+    "\u2618\ufe0f",
+    "\u2618",
+    "\U0001f988",
+    "\U0001f367",
+    "\U0001f33e",
+    "\U0001f6e1\ufe0f",
+    "\U0001f6e1",
+    "\u26e9\ufe0f",
+    "\u26e9",
+    "\U0001f6a2",
+    "\U0001f320",
+    "\U0001f6cd\ufe0f",
+    "\U0001f6cd",
+    "\U0001f6d2",
+    "\U0001f370",
+    "\U0001fa73",
+    "\U0001fa8f",
+    "\U0001f6bf",
+    "\U0001f990",
+    "\U0001f500",
+    "\U0001f92b",
+    "\U0001f918",
+    "\U0001f918\U0001f3ff",
+    "\U0001f918\U0001f3fb",
+    "\U0001f918\U0001f3fe",
+    "\U0001f918\U0001f3fc",
+    "\U0001f918\U0001f3fd",
+    "\U0001f9d1\u200d\U0001f3a4",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f3a4",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f3a4",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f3a4",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f3a4",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f3a4",
+    "\U0001f561",
+    "\U0001f555",
+    "\U0001f6f9",
+    "\u26f7\ufe0f",
+    "\u26f7",
+    "\U0001f3bf",
+    "\U0001f480",
+    "\u2620\ufe0f",
+    "\u2620",
+    "\U0001f9a8",
+    "\U0001f6f7",
+    "\U0001f634",
+    "\U0001f62a",
+    "\U0001f641",
+    "\U0001f642",
+    "\U0001f3b0",
+    "\U0001f9a5",
+    "\U0001f6e9\ufe0f",
+    "\U0001f6e9",
+    "\U0001f539",
+    "\U0001f538",
+    "\U0001f63b",
+    "\u263a\ufe0f",
+    "\u263a",
+    "\U0001f607",
+    "\U0001f60d",
+    "\U0001f970",
+    "\U0001f608",
+    "\U0001f917",
+    "\U0001f60a",
+    "\U0001f60e",
+    "\U0001f972",
+    "\U0001f60f",
+    "\U0001f40c",
+    "\U0001f40d",
+    "\U0001f927",
+    "\U0001f3d4\ufe0f",
+    "\U0001f3d4",
+    "\U0001f3c2",
+    "\U0001f3c2\U0001f3ff",
+    "\U0001f3c2\U0001f3fb",
+    "\U0001f3c2\U0001f3fe",
+    "\U0001f3c2\U0001f3fc",
+    "\U0001f3c2\U0001f3fd",
+    "\u2744\ufe0f",
+    "\u2744",
+    "\u2603\ufe0f",
+    "\u2603",
+    "\u26c4",
+    "\U0001f9fc",
+    "\u26bd",
+    "\U0001f9e6",
+    "\U0001f366",
+    "\U0001f94e",
+    "\u2660\ufe0f",
+    "\u2660",
+    "\U0001f35d",
+    "\u2747\ufe0f",
+    "\u2747",
+    "\U0001f387",
+    "\u2728",
+    "\U0001f496",
+    "\U0001f64a",
+    "\U0001f50a",
+    "\U0001f508",
+    "\U0001f509",
+    "\U0001f5e3\ufe0f",
+    "\U0001f5e3",
+    "\U0001f4ac",
+    "\U0001f6a4",
+    "\U0001f577\ufe0f",
+    "\U0001f577",
+    "\U0001f578\ufe0f",
+    "\U0001f578",
+    "\U0001f5d3\ufe0f",
+    "\U0001f5d3",
+    "\U0001f5d2\ufe0f",
+    "\U0001f5d2",
+    "\U0001f41a",
+    "\U0001fadf",
+    "\U0001f9fd",
+    "\U0001f944",
+    "\U0001f699",
+    "\U0001f3c5",
+    "\U0001f433",
+    "\U0001f991",
+    "\U0001f61d",
+    "\U0001f3df\ufe0f",
+    "\U0001f3df",
+    "\u2b50",
+    "\U0001f929",
+    "\u262a\ufe0f",
+    "\u262a",
+    "\u2721\ufe0f",
+    "\u2721",
+    "\U0001f689",
+    "\U0001f35c",
+    "\U0001fa7a",
+    "\u23f9\ufe0f",
+    "\u23f9",
+    "\U0001f6d1",
+    "\u23f1\ufe0f",
+    "\u23f1",
+    "\U0001f4cf",
+    "\U0001f353",
+    "\U0001f9d1\u200d\U0001f393",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f393",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f393",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f393",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f393",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f393",
+    "\U0001f399\ufe0f",
+    "\U0001f399",
+    "\U0001f959",
+    "\u2600\ufe0f",
+    "\u2600",
+    "\u26c5",
+    "\U0001f325\ufe0f",
+    "\U0001f325",
+    "\U0001f326\ufe0f",
+    "\U0001f326",
+    "\U0001f324\ufe0f",
+    "\U0001f324",
+    "\U0001f31e",
+    "\U0001f33b",
+    "\U0001f576\ufe0f",
+    "\U0001f576",
+    "\U0001f305",
+    "\U0001f304",
+    "\U0001f307",
+    "\U0001f9b8",
+    "\U0001f9b8\U0001f3ff",
+    "\U0001f9b8\U0001f3fb",
+    "\U0001f9b8\U0001f3fe",
+    "\U0001f9b8\U0001f3fc",
+    "\U0001f9b8\U0001f3fd",
+    "\U0001f9b9",
+    "\U0001f9b9\U0001f3ff",
+    "\U0001f9b9\U0001f3fb",
+    "\U0001f9b9\U0001f3fe",
+    "\U0001f9b9\U0001f3fc",
+    "\U0001f9b9\U0001f3fd",
+    "\U0001f363",
+    "\U0001f69f",
+    "\U0001f9a2",
+    "\U0001f4a6",
+    "\U0001f54d",
+    "\U0001f489",
+    "\U0001f455",
+    "\U0001f32e",
+    "\U0001f961",
+    "\U0001fad4",
+    "\U0001f38b",
+    "\U0001f34a",
+    "\U0001f695",
+    "\U0001f9d1\u200d\U0001f3eb",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f3eb",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f3eb",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f3eb",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f3eb",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f3eb",
+    "\U0001f375",
+    "\U0001fad6",
+    "\U0001f4c6",
+    "\U0001f9d1\u200d\U0001f4bb",
+    "\U0001f9d1\U0001f3ff\u200d\U0001f4bb",
+    "\U0001f9d1\U0001f3fb\u200d\U0001f4bb",
+    "\U0001f9d1\U0001f3fe\u200d\U0001f4bb",
+    "\U0001f9d1\U0001f3fc\u200d\U0001f4bb",
+    "\U0001f9d1\U0001f3fd\u200d\U0001f4bb",
+    "\U0001f9f8",
+    "\u260e\ufe0f",
+    "\u260e",
+    "\U0001f4de",
+    "\U0001f52d",
+    "\U0001f4fa",
+    "\U0001f565",
+    "\U0001f559",
+    "\U0001f3be",
+    "\u26fa",
+    "\U0001f9ea",
+    "\U0001f321\ufe0f",
+    "\U0001f321",
+    "\U0001f914",
+    "\U0001fa74",
+    "\U0001f4ad",
+    "\U0001f9f5",
+    "\U0001f55e",
+    "\U0001f552",
+    "\U0001f44e",
+    "\U0001f44e\U0001f3ff",
+    "\U0001f44e\U0001f3fb",
+    "\U0001f44e\U0001f3fe",
+    "\U0001f44e\U0001f3fc",
+    "\U0001f44e\U0001f3fd",
+    "\U0001f44d",
+    "\U0001f44d\U0001f3ff",
+    "\U0001f44d\U0001f3fb",
+    "\U0001f44d\U0001f3fe",
+    "\U0001f44d\U0001f3fc",
+    "\U0001f44d\U0001f3fd",
+    "\U0001f3ab",
+    "\U0001f405",
+    "\U0001f42f",
+    "\u23f2\ufe0f",
+    "\u23f2",
+    "\U0001f62b",
+    "\U0001f6bd",
+    "\U0001f345",
+    "\U0001f445",
+    "\U0001f9f0",
+    "\U0001f9b7",
+    "\U0001faa5",
+    "\U0001f3a9",
+    "\U0001f32a\ufe0f",
+    "\U0001f32a",
+    "\U0001f5b2\ufe0f",
+    "\U0001f5b2",
+    "\U0001f69c",
+    "\u2122\ufe0f",
+    "\U0001f686",
+    "\U0001f68a",
+    "\U0001f68b",
+    "\U0001f3f3\ufe0f\u200d\u26a7\ufe0f",
+    "\U0001f3f3\u200d\u26a7\ufe0f",
+    "\U0001f3f3\ufe0f\u200d\u26a7",
+    "\U0001f3f3\u200d\u26a7",
+    "\u26a7\ufe0f",
+    "\u26a7",
+    "\U0001f6a9",
+    "\U0001f4d0",
+    "\U0001f531",
+    "\U0001f9cc",
+    "\U0001f68e",
+    "\U0001f3c6",
+    "\U0001f379",
+    "\U0001f420",
+    "\U0001f3ba",
+    "\U0001f337",
+    "\U0001f943",
+    "\U0001f983",
+    "\U0001f422",
+    "\U0001f567",
+    "\U0001f55b",
+    "\U0001f42b",
+    "\U0001f55d",
+    "\U0001f495",
+    "\U0001f551",
+    "\u2602\ufe0f",
+    "\u2602",
+    "\u26f1\ufe0f",
+    "\u26f1",
+    "\u2614",
+    "\U0001f612",
+    "\U0001f984",
+    "\U0001f513",
+    "\u2195\ufe0f",
+    "\u2196\ufe0f",
+    "\u2197\ufe0f",
+    "\u2b06\ufe0f",
+    "\u2b06",
+    "\U0001f643",
+    "\U0001f53c",
+    "\U0001f9db",
+    "\U0001f9db\U0001f3ff",
+    "\U0001f9db\U0001f3fb",
+    "\U0001f9db\U0001f3fe",
+    "\U0001f9db\U0001f3fc",
+    "\U0001f9db\U0001f3fd",
+    "\U0001f6a6",
+    "\U0001f4f3",
+    "\u270c\ufe0f",
+    "\u270c",
+    "\u270c\U0001f3ff",
+    "\u270c\U0001f3fb",
+    "\u270c\U0001f3fe",
+    "\u270c\U0001f3fc",
+    "\u270c\U0001f3fd",
+    "\U0001f4f9",
+    "\U0001f3ae",
+    "\U0001f4fc",
+    "\U0001f3bb",
+    "\U0001f30b",
+    "\U0001f3d0",
+    "\U0001f596",
+    "\U0001f596\U0001f3ff",
+    "\U0001f596\U0001f3fb",
+    "\U0001f596\U0001f3fe",
+    "\U0001f596\U0001f3fc",
+    "\U0001f596\U0001f3fd",
+    "\U0001f9c7",
+    "\U0001f318",
+    "\U0001f316",
+    "\u26a0\ufe0f",
+    "\u26a0",
+    "\U0001f5d1\ufe0f",
+    "\U0001f5d1",
+    "\u231a",
+    "\U0001f403",
+    "\U0001f6be",
+    "\U0001f52b",
+    "\U0001f30a",
+    "\U0001f349",
+    "\U0001f44b",
+    "\U0001f44b\U0001f3ff",
+    "\U0001f44b\U0001f3fb",
+    "\U0001f44b\U0001f3fe",
+    "\U0001f44b\U0001f3fc",
+    "\U0001f44b\U0001f3fd",
+    "\u3030\ufe0f",
+    "\u3030",
+    "\U0001f312",
+    "\U0001f314",
+    "\U0001f640",
+    "\U0001f629",
+    "\U0001f492",
+    "\U0001f40b",
+    "\U0001f6de",
+    "\u2638\ufe0f",
+    "\u2638",
+    "\u267f",
+    "\U0001f9af",
+    "\u26aa",
+    "\u2755",
+    "\U0001f3f3\ufe0f",
+    "\U0001f3f3",
+    "\U0001f4ae",
+    "\U0001f9b3",
+    "\U0001f90d",
+    "\u2b1c",
+    "\u25fd",
+    "\u25fb\ufe0f",
+    "\u2754",
+    "\u25ab\ufe0f",
+    "\U0001f533",
+    "\U0001f940",
+    "\U0001f390",
+    "\U0001f32c\ufe0f",
+    "\U0001f32c",
+    "\U0001fa9f",
+    "\U0001f377",
+    "\U0001fabd",
+    "\U0001f609",
+    "\U0001f61c",
+    "\U0001f6dc",
+    "\U0001f43a",
+    "\U0001f469",
+    "\U0001f46b",
+    "\U0001f46b\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46b\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46b\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46b\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f468\U0001f3fd",
+    "\U0001f46b\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f468\U0001f3fc",
+    "\U0001f469\u200d\U0001f3a8",
+    "\U0001f469\U0001f3ff\u200d\U0001f3a8",
+    "\U0001f469\U0001f3fb\u200d\U0001f3a8",
+    "\U0001f469\U0001f3fe\u200d\U0001f3a8",
+    "\U0001f469\U0001f3fc\u200d\U0001f3a8",
+    "\U0001f469\U0001f3fd\u200d\U0001f3a8",
+    "\U0001f469\u200d\U0001f680",
+    "\U0001f469\U0001f3ff\u200d\U0001f680",
+    "\U0001f469\U0001f3fb\u200d\U0001f680",
+    "\U0001f469\U0001f3fe\u200d\U0001f680",
+    "\U0001f469\U0001f3fc\u200d\U0001f680",
+    "\U0001f469\U0001f3fd\u200d\U0001f680",
+    "\U0001f469\u200d\U0001f9b2",
+    "\U0001f9d4\u200d\u2640\ufe0f",
+    "\U0001f9d4\u200d\u2640",
+    "\U0001f6b4\u200d\u2640\ufe0f",
+    "\U0001f6b4\u200d\u2640",
+    "\U0001f6b4\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f6b4\U0001f3ff\u200d\u2640",
+    "\U0001f6b4\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f6b4\U0001f3fb\u200d\u2640",
+    "\U0001f6b4\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f6b4\U0001f3fe\u200d\u2640",
+    "\U0001f6b4\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f6b4\U0001f3fc\u200d\u2640",
+    "\U0001f6b4\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f6b4\U0001f3fd\u200d\u2640",
+    "\U0001f471\u200d\u2640\ufe0f",
+    "\U0001f471\u200d\u2640",
+    "\u26f9\ufe0f\u200d\u2640\ufe0f",
+    "\u26f9\u200d\u2640\ufe0f",
+    "\u26f9\ufe0f\u200d\u2640",
+    "\u26f9\u200d\u2640",
+    "\u26f9\U0001f3ff\u200d\u2640\ufe0f",
+    "\u26f9\U0001f3ff\u200d\u2640",
+    "\u26f9\U0001f3fb\u200d\u2640\ufe0f",
+    "\u26f9\U0001f3fb\u200d\u2640",
+    "\u26f9\U0001f3fe\u200d\u2640\ufe0f",
+    "\u26f9\U0001f3fe\u200d\u2640",
+    "\u26f9\U0001f3fc\u200d\u2640\ufe0f",
+    "\u26f9\U0001f3fc\u200d\u2640",
+    "\u26f9\U0001f3fd\u200d\u2640\ufe0f",
+    "\u26f9\U0001f3fd\u200d\u2640",
+    "\U0001f647\u200d\u2640\ufe0f",
+    "\U0001f647\u200d\u2640",
+    "\U0001f647\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f647\U0001f3ff\u200d\u2640",
+    "\U0001f647\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f647\U0001f3fb\u200d\u2640",
+    "\U0001f647\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f647\U0001f3fe\u200d\u2640",
+    "\U0001f647\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f647\U0001f3fc\u200d\u2640",
+    "\U0001f647\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f647\U0001f3fd\u200d\u2640",
+    "\U0001f938\u200d\u2640\ufe0f",
+    "\U0001f938\u200d\u2640",
+    "\U0001f938\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f938\U0001f3ff\u200d\u2640",
+    "\U0001f938\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f938\U0001f3fb\u200d\u2640",
+    "\U0001f938\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f938\U0001f3fe\u200d\u2640",
+    "\U0001f938\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f938\U0001f3fc\u200d\u2640",
+    "\U0001f938\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f938\U0001f3fd\u200d\u2640",
+    "\U0001f9d7\u200d\u2640\ufe0f",
+    "\U0001f9d7\u200d\u2640",
+    "\U0001f9d7\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9d7\U0001f3ff\u200d\u2640",
+    "\U0001f9d7\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9d7\U0001f3fb\u200d\u2640",
+    "\U0001f9d7\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9d7\U0001f3fe\u200d\u2640",
+    "\U0001f9d7\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9d7\U0001f3fc\u200d\u2640",
+    "\U0001f9d7\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9d7\U0001f3fd\u200d\u2640",
+    "\U0001f477\u200d\u2640\ufe0f",
+    "\U0001f477\u200d\u2640",
+    "\U0001f477\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f477\U0001f3ff\u200d\u2640",
+    "\U0001f477\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f477\U0001f3fb\u200d\u2640",
+    "\U0001f477\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f477\U0001f3fe\u200d\u2640",
+    "\U0001f477\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f477\U0001f3fc\u200d\u2640",
+    "\U0001f477\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f477\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f373",
+    "\U0001f469\U0001f3ff\u200d\U0001f373",
+    "\U0001f469\U0001f3fb\u200d\U0001f373",
+    "\U0001f469\U0001f3fe\u200d\U0001f373",
+    "\U0001f469\U0001f3fc\u200d\U0001f373",
+    "\U0001f469\U0001f3fd\u200d\U0001f373",
+    "\U0001f469\u200d\U0001f9b1",
+    "\U0001f483",
+    "\U0001f483\U0001f3ff",
+    "\U0001f483\U0001f3fb",
+    "\U0001f483\U0001f3fe",
+    "\U0001f483\U0001f3fc",
+    "\U0001f483\U0001f3fd",
+    "\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9d4\U0001f3ff\u200d\u2640",
+    "\U0001f471\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f471\U0001f3ff\u200d\u2640",
+    "\U0001f469\U0001f3ff\u200d\U0001f9b1",
+    "\U0001f469\U0001f3ff\u200d\U0001f9b0",
+    "\U0001f469\U0001f3ff\u200d\U0001f9b3",
+    "\U0001f575\ufe0f\u200d\u2640\ufe0f",
+    "\U0001f575\u200d\u2640\ufe0f",
+    "\U0001f575\ufe0f\u200d\u2640",
+    "\U0001f575\u200d\u2640",
+    "\U0001f575\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f575\U0001f3ff\u200d\u2640",
+    "\U0001f575\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f575\U0001f3fb\u200d\u2640",
+    "\U0001f575\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f575\U0001f3fe\u200d\u2640",
+    "\U0001f575\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f575\U0001f3fc\u200d\u2640",
+    "\U0001f575\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f575\U0001f3fd\u200d\u2640",
+    "\U0001f9dd\u200d\u2640\ufe0f",
+    "\U0001f9dd\u200d\u2640",
+    "\U0001f9dd\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9dd\U0001f3ff\u200d\u2640",
+    "\U0001f9dd\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9dd\U0001f3fb\u200d\u2640",
+    "\U0001f9dd\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9dd\U0001f3fe\u200d\u2640",
+    "\U0001f9dd\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9dd\U0001f3fc\u200d\u2640",
+    "\U0001f9dd\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9dd\U0001f3fd\u200d\u2640",
+    "\U0001f926\u200d\u2640\ufe0f",
+    "\U0001f926\u200d\u2640",
+    "\U0001f926\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f926\U0001f3ff\u200d\u2640",
+    "\U0001f926\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f926\U0001f3fb\u200d\u2640",
+    "\U0001f926\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f926\U0001f3fe\u200d\u2640",
+    "\U0001f926\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f926\U0001f3fc\u200d\u2640",
+    "\U0001f926\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f926\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f3ed",
+    "\U0001f469\U0001f3ff\u200d\U0001f3ed",
+    "\U0001f469\U0001f3fb\u200d\U0001f3ed",
+    "\U0001f469\U0001f3fe\u200d\U0001f3ed",
+    "\U0001f469\U0001f3fc\u200d\U0001f3ed",
+    "\U0001f469\U0001f3fd\u200d\U0001f3ed",
+    "\U0001f9da\u200d\u2640\ufe0f",
+    "\U0001f9da\u200d\u2640",
+    "\U0001f9da\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9da\U0001f3ff\u200d\u2640",
+    "\U0001f9da\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9da\U0001f3fb\u200d\u2640",
+    "\U0001f9da\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9da\U0001f3fe\u200d\u2640",
+    "\U0001f9da\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9da\U0001f3fc\u200d\u2640",
+    "\U0001f9da\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9da\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f33e",
+    "\U0001f469\U0001f3ff\u200d\U0001f33e",
+    "\U0001f469\U0001f3fb\u200d\U0001f33e",
+    "\U0001f469\U0001f3fe\u200d\U0001f33e",
+    "\U0001f469\U0001f3fc\u200d\U0001f33e",
+    "\U0001f469\U0001f3fd\u200d\U0001f33e",
+    "\U0001f469\u200d\U0001f37c",
+    "\U0001f469\U0001f3ff\u200d\U0001f37c",
+    "\U0001f469\U0001f3fb\u200d\U0001f37c",
+    "\U0001f469\U0001f3fe\u200d\U0001f37c",
+    "\U0001f469\U0001f3fc\u200d\U0001f37c",
+    "\U0001f469\U0001f3fd\u200d\U0001f37c",
+    "\U0001f469\u200d\U0001f692",
+    "\U0001f469\U0001f3ff\u200d\U0001f692",
+    "\U0001f469\U0001f3fb\u200d\U0001f692",
+    "\U0001f469\U0001f3fe\u200d\U0001f692",
+    "\U0001f469\U0001f3fc\u200d\U0001f692",
+    "\U0001f469\U0001f3fd\u200d\U0001f692",
+    "\U0001f64d\u200d\u2640\ufe0f",
+    "\U0001f64d\u200d\u2640",
+    "\U0001f64d\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f64d\U0001f3ff\u200d\u2640",
+    "\U0001f64d\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f64d\U0001f3fb\u200d\u2640",
+    "\U0001f64d\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f64d\U0001f3fe\u200d\u2640",
+    "\U0001f64d\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f64d\U0001f3fc\u200d\u2640",
+    "\U0001f64d\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f64d\U0001f3fd\u200d\u2640",
+    "\U0001f9de\u200d\u2640\ufe0f",
+    "\U0001f9de\u200d\u2640",
+    "\U0001f645\u200d\u2640\ufe0f",
+    "\U0001f645\u200d\u2640",
+    "\U0001f645\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f645\U0001f3ff\u200d\u2640",
+    "\U0001f645\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f645\U0001f3fb\u200d\u2640",
+    "\U0001f645\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f645\U0001f3fe\u200d\u2640",
+    "\U0001f645\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f645\U0001f3fc\u200d\u2640",
+    "\U0001f645\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f645\U0001f3fd\u200d\u2640",
+    "\U0001f646\u200d\u2640\ufe0f",
+    "\U0001f646\u200d\u2640",
+    "\U0001f646\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f646\U0001f3ff\u200d\u2640",
+    "\U0001f646\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f646\U0001f3fb\u200d\u2640",
+    "\U0001f646\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f646\U0001f3fe\u200d\u2640",
+    "\U0001f646\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f646\U0001f3fc\u200d\u2640",
+    "\U0001f646\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f646\U0001f3fd\u200d\u2640",
+    "\U0001f487\u200d\u2640\ufe0f",
+    "\U0001f487\u200d\u2640",
+    "\U0001f487\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f487\U0001f3ff\u200d\u2640",
+    "\U0001f487\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f487\U0001f3fb\u200d\u2640",
+    "\U0001f487\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f487\U0001f3fe\u200d\u2640",
+    "\U0001f487\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f487\U0001f3fc\u200d\u2640",
+    "\U0001f487\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f487\U0001f3fd\u200d\u2640",
+    "\U0001f486\u200d\u2640\ufe0f",
+    "\U0001f486\u200d\u2640",
+    "\U0001f486\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f486\U0001f3ff\u200d\u2640",
+    "\U0001f486\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f486\U0001f3fb\u200d\u2640",
+    "\U0001f486\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f486\U0001f3fe\u200d\u2640",
+    "\U0001f486\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f486\U0001f3fc\u200d\u2640",
+    "\U0001f486\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f486\U0001f3fd\u200d\u2640",
+    "\U0001f3cc\ufe0f\u200d\u2640\ufe0f",
+    "\U0001f3cc\u200d\u2640\ufe0f",
+    "\U0001f3cc\ufe0f\u200d\u2640",
+    "\U0001f3cc\u200d\u2640",
+    "\U0001f3cc\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f3cc\U0001f3ff\u200d\u2640",
+    "\U0001f3cc\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f3cc\U0001f3fb\u200d\u2640",
+    "\U0001f3cc\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f3cc\U0001f3fe\u200d\u2640",
+    "\U0001f3cc\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f3cc\U0001f3fc\u200d\u2640",
+    "\U0001f3cc\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f3cc\U0001f3fd\u200d\u2640",
+    "\U0001f482\u200d\u2640\ufe0f",
+    "\U0001f482\u200d\u2640",
+    "\U0001f482\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f482\U0001f3ff\u200d\u2640",
+    "\U0001f482\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f482\U0001f3fb\u200d\u2640",
+    "\U0001f482\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f482\U0001f3fe\u200d\u2640",
+    "\U0001f482\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f482\U0001f3fc\u200d\u2640",
+    "\U0001f482\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f482\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\u2695\ufe0f",
+    "\U0001f469\u200d\u2695",
+    "\U0001f469\U0001f3ff\u200d\u2695\ufe0f",
+    "\U0001f469\U0001f3ff\u200d\u2695",
+    "\U0001f469\U0001f3fb\u200d\u2695\ufe0f",
+    "\U0001f469\U0001f3fb\u200d\u2695",
+    "\U0001f469\U0001f3fe\u200d\u2695\ufe0f",
+    "\U0001f469\U0001f3fe\u200d\u2695",
+    "\U0001f469\U0001f3fc\u200d\u2695\ufe0f",
+    "\U0001f469\U0001f3fc\u200d\u2695",
+    "\U0001f469\U0001f3fd\u200d\u2695\ufe0f",
+    "\U0001f469\U0001f3fd\u200d\u2695",
+    "\U0001f9d8\u200d\u2640\ufe0f",
+    "\U0001f9d8\u200d\u2640",
+    "\U0001f9d8\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9d8\U0001f3ff\u200d\u2640",
+    "\U0001f9d8\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9d8\U0001f3fb\u200d\u2640",
+    "\U0001f9d8\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9d8\U0001f3fe\u200d\u2640",
+    "\U0001f9d8\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9d8\U0001f3fc\u200d\u2640",
+    "\U0001f9d8\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9d8\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f9bd",
+    "\U0001f469\U0001f3ff\u200d\U0001f9bd",
+    "\U0001f469\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f469\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f469\U0001f3ff\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3ff\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f469\U0001f3fb\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fb\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f469\U0001f3fe\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fe\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f469\U0001f3fc\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fc\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f469\U0001f3fd\u200d\U0001f9bd\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fd\u200d\U0001f9bd\u200d\u27a1",
+    "\U0001f469\U0001f3fb\u200d\U0001f9bd",
+    "\U0001f469\U0001f3fe\u200d\U0001f9bd",
+    "\U0001f469\U0001f3fc\u200d\U0001f9bd",
+    "\U0001f469\U0001f3fd\u200d\U0001f9bd",
+    "\U0001f469\u200d\U0001f9bc",
+    "\U0001f469\U0001f3ff\u200d\U0001f9bc",
+    "\U0001f469\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f469\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f469\U0001f3ff\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3ff\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f469\U0001f3fb\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fb\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f469\U0001f3fe\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fe\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f469\U0001f3fc\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fc\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f469\U0001f3fd\u200d\U0001f9bc\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fd\u200d\U0001f9bc\u200d\u27a1",
+    "\U0001f469\U0001f3fb\u200d\U0001f9bc",
+    "\U0001f469\U0001f3fe\u200d\U0001f9bc",
+    "\U0001f469\U0001f3fc\u200d\U0001f9bc",
+    "\U0001f469\U0001f3fd\u200d\U0001f9bc",
+    "\U0001f9d6\u200d\u2640\ufe0f",
+    "\U0001f9d6\u200d\u2640",
+    "\U0001f9d6\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9d6\U0001f3ff\u200d\u2640",
+    "\U0001f9d6\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9d6\U0001f3fb\u200d\u2640",
+    "\U0001f9d6\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9d6\U0001f3fe\u200d\u2640",
+    "\U0001f9d6\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9d6\U0001f3fc\u200d\u2640",
+    "\U0001f9d6\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9d6\U0001f3fd\u200d\u2640",
+    "\U0001f935\u200d\u2640\ufe0f",
+    "\U0001f935\u200d\u2640",
+    "\U0001f935\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f935\U0001f3ff\u200d\u2640",
+    "\U0001f935\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f935\U0001f3fb\u200d\u2640",
+    "\U0001f935\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f935\U0001f3fe\u200d\u2640",
+    "\U0001f935\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f935\U0001f3fc\u200d\u2640",
+    "\U0001f935\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f935\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\u2696\ufe0f",
+    "\U0001f469\u200d\u2696",
+    "\U0001f469\U0001f3ff\u200d\u2696\ufe0f",
+    "\U0001f469\U0001f3ff\u200d\u2696",
+    "\U0001f469\U0001f3fb\u200d\u2696\ufe0f",
+    "\U0001f469\U0001f3fb\u200d\u2696",
+    "\U0001f469\U0001f3fe\u200d\u2696\ufe0f",
+    "\U0001f469\U0001f3fe\u200d\u2696",
+    "\U0001f469\U0001f3fc\u200d\u2696\ufe0f",
+    "\U0001f469\U0001f3fc\u200d\u2696",
+    "\U0001f469\U0001f3fd\u200d\u2696\ufe0f",
+    "\U0001f469\U0001f3fd\u200d\u2696",
+    "\U0001f939\u200d\u2640\ufe0f",
+    "\U0001f939\u200d\u2640",
+    "\U0001f939\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f939\U0001f3ff\u200d\u2640",
+    "\U0001f939\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f939\U0001f3fb\u200d\u2640",
+    "\U0001f939\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f939\U0001f3fe\u200d\u2640",
+    "\U0001f939\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f939\U0001f3fc\u200d\u2640",
+    "\U0001f939\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f939\U0001f3fd\u200d\u2640",
+    "\U0001f9ce\u200d\u2640\ufe0f",
+    "\U0001f9ce\u200d\u2640",
+    "\U0001f9ce\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9ce\U0001f3ff\u200d\u2640",
+    "\U0001f9ce\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f9ce\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f9ce\u200d\u2640\u200d\u27a1",
+    "\U0001f9ce\U0001f3ff\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3ff\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3ff\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3ff\u200d\u2640\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fb\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fb\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb\u200d\u2640\u200d\u27a1",
+    "\U0001f9ce\U0001f3fe\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fe\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fe\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fe\u200d\u2640\u200d\u27a1",
+    "\U0001f9ce\U0001f3fc\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fc\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fc\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fc\u200d\u2640\u200d\u27a1",
+    "\U0001f9ce\U0001f3fd\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fd\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f9ce\U0001f3fd\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f9ce\U0001f3fd\u200d\u2640\u200d\u27a1",
+    "\U0001f9ce\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9ce\U0001f3fb\u200d\u2640",
+    "\U0001f9ce\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9ce\U0001f3fe\u200d\u2640",
+    "\U0001f9ce\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9ce\U0001f3fc\u200d\u2640",
+    "\U0001f9ce\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9ce\U0001f3fd\u200d\u2640",
+    "\U0001f3cb\ufe0f\u200d\u2640\ufe0f",
+    "\U0001f3cb\u200d\u2640\ufe0f",
+    "\U0001f3cb\ufe0f\u200d\u2640",
+    "\U0001f3cb\u200d\u2640",
+    "\U0001f3cb\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f3cb\U0001f3ff\u200d\u2640",
+    "\U0001f3cb\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f3cb\U0001f3fb\u200d\u2640",
+    "\U0001f3cb\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f3cb\U0001f3fe\u200d\u2640",
+    "\U0001f3cb\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f3cb\U0001f3fc\u200d\u2640",
+    "\U0001f3cb\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f3cb\U0001f3fd\u200d\u2640",
+    "\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9d4\U0001f3fb\u200d\u2640",
+    "\U0001f471\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f471\U0001f3fb\u200d\u2640",
+    "\U0001f469\U0001f3fb\u200d\U0001f9b1",
+    "\U0001f469\U0001f3fb\u200d\U0001f9b0",
+    "\U0001f469\U0001f3fb\u200d\U0001f9b3",
+    "\U0001f9d9\u200d\u2640\ufe0f",
+    "\U0001f9d9\u200d\u2640",
+    "\U0001f9d9\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9d9\U0001f3ff\u200d\u2640",
+    "\U0001f9d9\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9d9\U0001f3fb\u200d\u2640",
+    "\U0001f9d9\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9d9\U0001f3fe\u200d\u2640",
+    "\U0001f9d9\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9d9\U0001f3fc\u200d\u2640",
+    "\U0001f9d9\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9d9\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f527",
+    "\U0001f469\U0001f3ff\u200d\U0001f527",
+    "\U0001f469\U0001f3fb\u200d\U0001f527",
+    "\U0001f469\U0001f3fe\u200d\U0001f527",
+    "\U0001f469\U0001f3fc\u200d\U0001f527",
+    "\U0001f469\U0001f3fd\u200d\U0001f527",
+    "\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9d4\U0001f3fe\u200d\u2640",
+    "\U0001f471\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f471\U0001f3fe\u200d\u2640",
+    "\U0001f469\U0001f3fe\u200d\U0001f9b1",
+    "\U0001f469\U0001f3fe\u200d\U0001f9b0",
+    "\U0001f469\U0001f3fe\u200d\U0001f9b3",
+    "\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9d4\U0001f3fc\u200d\u2640",
+    "\U0001f471\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f471\U0001f3fc\u200d\u2640",
+    "\U0001f469\U0001f3fc\u200d\U0001f9b1",
+    "\U0001f469\U0001f3fc\u200d\U0001f9b0",
+    "\U0001f469\U0001f3fc\u200d\U0001f9b3",
+    "\U0001f469\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\U0001f9b2",
+    "\U0001f9d4\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9d4\U0001f3fd\u200d\u2640",
+    "\U0001f471\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f471\U0001f3fd\u200d\u2640",
+    "\U0001f469\U0001f3fd\u200d\U0001f9b1",
+    "\U0001f469\U0001f3fd\u200d\U0001f9b0",
+    "\U0001f469\U0001f3fd\u200d\U0001f9b3",
+    "\U0001f6b5\u200d\u2640\ufe0f",
+    "\U0001f6b5\u200d\u2640",
+    "\U0001f6b5\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f6b5\U0001f3ff\u200d\u2640",
+    "\U0001f6b5\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f6b5\U0001f3fb\u200d\u2640",
+    "\U0001f6b5\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f6b5\U0001f3fe\u200d\u2640",
+    "\U0001f6b5\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f6b5\U0001f3fc\u200d\u2640",
+    "\U0001f6b5\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f6b5\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f4bc",
+    "\U0001f469\U0001f3ff\u200d\U0001f4bc",
+    "\U0001f469\U0001f3fb\u200d\U0001f4bc",
+    "\U0001f469\U0001f3fe\u200d\U0001f4bc",
+    "\U0001f469\U0001f3fc\u200d\U0001f4bc",
+    "\U0001f469\U0001f3fd\u200d\U0001f4bc",
+    "\U0001f469\u200d\u2708\ufe0f",
+    "\U0001f469\u200d\u2708",
+    "\U0001f469\U0001f3ff\u200d\u2708\ufe0f",
+    "\U0001f469\U0001f3ff\u200d\u2708",
+    "\U0001f469\U0001f3fb\u200d\u2708\ufe0f",
+    "\U0001f469\U0001f3fb\u200d\u2708",
+    "\U0001f469\U0001f3fe\u200d\u2708\ufe0f",
+    "\U0001f469\U0001f3fe\u200d\u2708",
+    "\U0001f469\U0001f3fc\u200d\u2708\ufe0f",
+    "\U0001f469\U0001f3fc\u200d\u2708",
+    "\U0001f469\U0001f3fd\u200d\u2708\ufe0f",
+    "\U0001f469\U0001f3fd\u200d\u2708",
+    "\U0001f93e\u200d\u2640\ufe0f",
+    "\U0001f93e\u200d\u2640",
+    "\U0001f93e\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f93e\U0001f3ff\u200d\u2640",
+    "\U0001f93e\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f93e\U0001f3fb\u200d\u2640",
+    "\U0001f93e\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f93e\U0001f3fe\u200d\u2640",
+    "\U0001f93e\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f93e\U0001f3fc\u200d\u2640",
+    "\U0001f93e\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f93e\U0001f3fd\u200d\u2640",
+    "\U0001f93d\u200d\u2640\ufe0f",
+    "\U0001f93d\u200d\u2640",
+    "\U0001f93d\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f93d\U0001f3ff\u200d\u2640",
+    "\U0001f93d\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f93d\U0001f3fb\u200d\u2640",
+    "\U0001f93d\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f93d\U0001f3fe\u200d\u2640",
+    "\U0001f93d\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f93d\U0001f3fc\u200d\u2640",
+    "\U0001f93d\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f93d\U0001f3fd\u200d\u2640",
+    "\U0001f46e\u200d\u2640\ufe0f",
+    "\U0001f46e\u200d\u2640",
+    "\U0001f46e\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f46e\U0001f3ff\u200d\u2640",
+    "\U0001f46e\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f46e\U0001f3fb\u200d\u2640",
+    "\U0001f46e\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f46e\U0001f3fe\u200d\u2640",
+    "\U0001f46e\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f46e\U0001f3fc\u200d\u2640",
+    "\U0001f46e\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f46e\U0001f3fd\u200d\u2640",
+    "\U0001f64e\u200d\u2640\ufe0f",
+    "\U0001f64e\u200d\u2640",
+    "\U0001f64e\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f64e\U0001f3ff\u200d\u2640",
+    "\U0001f64e\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f64e\U0001f3fb\u200d\u2640",
+    "\U0001f64e\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f64e\U0001f3fe\u200d\u2640",
+    "\U0001f64e\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f64e\U0001f3fc\u200d\u2640",
+    "\U0001f64e\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f64e\U0001f3fd\u200d\u2640",
+    "\U0001f64b\u200d\u2640\ufe0f",
+    "\U0001f64b\u200d\u2640",
+    "\U0001f64b\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f64b\U0001f3ff\u200d\u2640",
+    "\U0001f64b\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f64b\U0001f3fb\u200d\u2640",
+    "\U0001f64b\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f64b\U0001f3fe\u200d\u2640",
+    "\U0001f64b\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f64b\U0001f3fc\u200d\u2640",
+    "\U0001f64b\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f64b\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f9b0",
+    "\U0001f6a3\u200d\u2640\ufe0f",
+    "\U0001f6a3\u200d\u2640",
+    "\U0001f6a3\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f6a3\U0001f3ff\u200d\u2640",
+    "\U0001f6a3\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f6a3\U0001f3fb\u200d\u2640",
+    "\U0001f6a3\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f6a3\U0001f3fe\u200d\u2640",
+    "\U0001f6a3\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f6a3\U0001f3fc\u200d\u2640",
+    "\U0001f6a3\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f6a3\U0001f3fd\u200d\u2640",
+    "\U0001f3c3\u200d\u2640\ufe0f",
+    "\U0001f3c3\u200d\u2640",
+    "\U0001f3c3\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f3c3\U0001f3ff\u200d\u2640",
+    "\U0001f3c3\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f3c3\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f3c3\u200d\u2640\u200d\u27a1",
+    "\U0001f3c3\U0001f3ff\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3ff\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3ff\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3ff\u200d\u2640\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fb\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fb\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb\u200d\u2640\u200d\u27a1",
+    "\U0001f3c3\U0001f3fe\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fe\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fe\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fe\u200d\u2640\u200d\u27a1",
+    "\U0001f3c3\U0001f3fc\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fc\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fc\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fc\u200d\u2640\u200d\u27a1",
+    "\U0001f3c3\U0001f3fd\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fd\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f3c3\U0001f3fd\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f3c3\U0001f3fd\u200d\u2640\u200d\u27a1",
+    "\U0001f3c3\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f3c3\U0001f3fb\u200d\u2640",
+    "\U0001f3c3\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f3c3\U0001f3fe\u200d\u2640",
+    "\U0001f3c3\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f3c3\U0001f3fc\u200d\u2640",
+    "\U0001f3c3\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f3c3\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f52c",
+    "\U0001f469\U0001f3ff\u200d\U0001f52c",
+    "\U0001f469\U0001f3fb\u200d\U0001f52c",
+    "\U0001f469\U0001f3fe\u200d\U0001f52c",
+    "\U0001f469\U0001f3fc\u200d\U0001f52c",
+    "\U0001f469\U0001f3fd\u200d\U0001f52c",
+    "\U0001f937\u200d\u2640\ufe0f",
+    "\U0001f937\u200d\u2640",
+    "\U0001f937\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f937\U0001f3ff\u200d\u2640",
+    "\U0001f937\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f937\U0001f3fb\u200d\u2640",
+    "\U0001f937\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f937\U0001f3fe\u200d\u2640",
+    "\U0001f937\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f937\U0001f3fc\u200d\u2640",
+    "\U0001f937\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f937\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f3a4",
+    "\U0001f469\U0001f3ff\u200d\U0001f3a4",
+    "\U0001f469\U0001f3fb\u200d\U0001f3a4",
+    "\U0001f469\U0001f3fe\u200d\U0001f3a4",
+    "\U0001f469\U0001f3fc\u200d\U0001f3a4",
+    "\U0001f469\U0001f3fd\u200d\U0001f3a4",
+    "\U0001f9cd\u200d\u2640\ufe0f",
+    "\U0001f9cd\u200d\u2640",
+    "\U0001f9cd\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9cd\U0001f3ff\u200d\u2640",
+    "\U0001f9cd\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9cd\U0001f3fb\u200d\u2640",
+    "\U0001f9cd\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9cd\U0001f3fe\u200d\u2640",
+    "\U0001f9cd\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9cd\U0001f3fc\u200d\u2640",
+    "\U0001f9cd\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9cd\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f393",
+    "\U0001f469\U0001f3ff\u200d\U0001f393",
+    "\U0001f469\U0001f3fb\u200d\U0001f393",
+    "\U0001f469\U0001f3fe\u200d\U0001f393",
+    "\U0001f469\U0001f3fc\u200d\U0001f393",
+    "\U0001f469\U0001f3fd\u200d\U0001f393",
+    "\U0001f9b8\u200d\u2640\ufe0f",
+    "\U0001f9b8\u200d\u2640",
+    "\U0001f9b8\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9b8\U0001f3ff\u200d\u2640",
+    "\U0001f9b8\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9b8\U0001f3fb\u200d\u2640",
+    "\U0001f9b8\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9b8\U0001f3fe\u200d\u2640",
+    "\U0001f9b8\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9b8\U0001f3fc\u200d\u2640",
+    "\U0001f9b8\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9b8\U0001f3fd\u200d\u2640",
+    "\U0001f9b9\u200d\u2640\ufe0f",
+    "\U0001f9b9\u200d\u2640",
+    "\U0001f9b9\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9b9\U0001f3ff\u200d\u2640",
+    "\U0001f9b9\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9b9\U0001f3fb\u200d\u2640",
+    "\U0001f9b9\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9b9\U0001f3fe\u200d\u2640",
+    "\U0001f9b9\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9b9\U0001f3fc\u200d\u2640",
+    "\U0001f9b9\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9b9\U0001f3fd\u200d\u2640",
+    "\U0001f3c4\u200d\u2640\ufe0f",
+    "\U0001f3c4\u200d\u2640",
+    "\U0001f3c4\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f3c4\U0001f3ff\u200d\u2640",
+    "\U0001f3c4\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f3c4\U0001f3fb\u200d\u2640",
+    "\U0001f3c4\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f3c4\U0001f3fe\u200d\u2640",
+    "\U0001f3c4\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f3c4\U0001f3fc\u200d\u2640",
+    "\U0001f3c4\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f3c4\U0001f3fd\u200d\u2640",
+    "\U0001f3ca\u200d\u2640\ufe0f",
+    "\U0001f3ca\u200d\u2640",
+    "\U0001f3ca\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f3ca\U0001f3ff\u200d\u2640",
+    "\U0001f3ca\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f3ca\U0001f3fb\u200d\u2640",
+    "\U0001f3ca\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f3ca\U0001f3fe\u200d\u2640",
+    "\U0001f3ca\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f3ca\U0001f3fc\u200d\u2640",
+    "\U0001f3ca\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f3ca\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f3eb",
+    "\U0001f469\U0001f3ff\u200d\U0001f3eb",
+    "\U0001f469\U0001f3fb\u200d\U0001f3eb",
+    "\U0001f469\U0001f3fe\u200d\U0001f3eb",
+    "\U0001f469\U0001f3fc\u200d\U0001f3eb",
+    "\U0001f469\U0001f3fd\u200d\U0001f3eb",
+    "\U0001f469\u200d\U0001f4bb",
+    "\U0001f469\U0001f3ff\u200d\U0001f4bb",
+    "\U0001f469\U0001f3fb\u200d\U0001f4bb",
+    "\U0001f469\U0001f3fe\u200d\U0001f4bb",
+    "\U0001f469\U0001f3fc\u200d\U0001f4bb",
+    "\U0001f469\U0001f3fd\u200d\U0001f4bb",
+    "\U0001f481\u200d\u2640\ufe0f",
+    "\U0001f481\u200d\u2640",
+    "\U0001f481\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f481\U0001f3ff\u200d\u2640",
+    "\U0001f481\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f481\U0001f3fb\u200d\u2640",
+    "\U0001f481\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f481\U0001f3fe\u200d\u2640",
+    "\U0001f481\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f481\U0001f3fc\u200d\u2640",
+    "\U0001f481\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f481\U0001f3fd\u200d\u2640",
+    "\U0001f9db\u200d\u2640\ufe0f",
+    "\U0001f9db\u200d\u2640",
+    "\U0001f9db\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f9db\U0001f3ff\u200d\u2640",
+    "\U0001f9db\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f9db\U0001f3fb\u200d\u2640",
+    "\U0001f9db\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f9db\U0001f3fe\u200d\u2640",
+    "\U0001f9db\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f9db\U0001f3fc\u200d\u2640",
+    "\U0001f9db\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f9db\U0001f3fd\u200d\u2640",
+    "\U0001f6b6\u200d\u2640\ufe0f",
+    "\U0001f6b6\u200d\u2640",
+    "\U0001f6b6\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f6b6\U0001f3ff\u200d\u2640",
+    "\U0001f6b6\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f6b6\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f6b6\u200d\u2640\u200d\u27a1",
+    "\U0001f6b6\U0001f3ff\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3ff\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3ff\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3ff\u200d\u2640\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fb\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fb\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb\u200d\u2640\u200d\u27a1",
+    "\U0001f6b6\U0001f3fe\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fe\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fe\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fe\u200d\u2640\u200d\u27a1",
+    "\U0001f6b6\U0001f3fc\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fc\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fc\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fc\u200d\u2640\u200d\u27a1",
+    "\U0001f6b6\U0001f3fd\u200d\u2640\ufe0f\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fd\u200d\u2640\u200d\u27a1\ufe0f",
+    "\U0001f6b6\U0001f3fd\u200d\u2640\ufe0f\u200d\u27a1",
+    "\U0001f6b6\U0001f3fd\u200d\u2640\u200d\u27a1",
+    "\U0001f6b6\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f6b6\U0001f3fb\u200d\u2640",
+    "\U0001f6b6\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f6b6\U0001f3fe\u200d\u2640",
+    "\U0001f6b6\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f6b6\U0001f3fc\u200d\u2640",
+    "\U0001f6b6\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f6b6\U0001f3fd\u200d\u2640",
+    "\U0001f473\u200d\u2640\ufe0f",
+    "\U0001f473\u200d\u2640",
+    "\U0001f473\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f473\U0001f3ff\u200d\u2640",
+    "\U0001f473\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f473\U0001f3fb\u200d\u2640",
+    "\U0001f473\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f473\U0001f3fe\u200d\u2640",
+    "\U0001f473\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f473\U0001f3fc\u200d\u2640",
+    "\U0001f473\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f473\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f9b3",
+    "\U0001f9d5",
+    "\U0001f9d5\U0001f3ff",
+    "\U0001f9d5\U0001f3fb",
+    "\U0001f9d5\U0001f3fe",
+    "\U0001f9d5\U0001f3fc",
+    "\U0001f9d5\U0001f3fd",
+    "\U0001f470\u200d\u2640\ufe0f",
+    "\U0001f470\u200d\u2640",
+    "\U0001f470\U0001f3ff\u200d\u2640\ufe0f",
+    "\U0001f470\U0001f3ff\u200d\u2640",
+    "\U0001f470\U0001f3fb\u200d\u2640\ufe0f",
+    "\U0001f470\U0001f3fb\u200d\u2640",
+    "\U0001f470\U0001f3fe\u200d\u2640\ufe0f",
+    "\U0001f470\U0001f3fe\u200d\u2640",
+    "\U0001f470\U0001f3fc\u200d\u2640\ufe0f",
+    "\U0001f470\U0001f3fc\u200d\u2640",
+    "\U0001f470\U0001f3fd\u200d\u2640\ufe0f",
+    "\U0001f470\U0001f3fd\u200d\u2640",
+    "\U0001f469\u200d\U0001f9af",
+    "\U0001f469\U0001f3ff\u200d\U0001f9af",
+    "\U0001f469\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f469\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f469\U0001f3ff\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3ff\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f469\U0001f3fb\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fb\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f469\U0001f3fe\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fe\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f469\U0001f3fc\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fc\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f469\U0001f3fd\u200d\U0001f9af\u200d\u27a1\ufe0f",
+    "\U0001f469\U0001f3fd\u200d\U0001f9af\u200d\u27a1",
+    "\U0001f469\U0001f3fb\u200d\U0001f9af",
+    "\U0001f469\U0001f3fe\u200d\U0001f9af",
+    "\U0001f469\U0001f3fc\u200d\U0001f9af",
+    "\U0001f469\U0001f3fd\u200d\U0001f9af",
+    "\U0001f9df\u200d\u2640\ufe0f",
+    "\U0001f9df\u200d\u2640",
+    "\U0001f462",
+    "\U0001f45a",
+    "\U0001f452",
+    "\U0001f461",
+    "\U0001f46d",
+    "\U0001f46d\U0001f3ff",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3ff\u200d\U0001f91d\u200d\U0001f469\U0001f3fd",
+    "\U0001f46d\U0001f3fb",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fb\u200d\U0001f91d\u200d\U0001f469\U0001f3fd",
+    "\U0001f46d\U0001f3fe",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f469\U0001f3fc",
+    "\U0001f469\U0001f3fe\u200d\U0001f91d\u200d\U0001f469\U0001f3fd",
+    "\U0001f46d\U0001f3fc",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fc\u200d\U0001f91d\u200d\U0001f469\U0001f3fd",
+    "\U0001f46d\U0001f3fd",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f469\U0001f3ff",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f469\U0001f3fb",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f469\U0001f3fe",
+    "\U0001f469\U0001f3fd\u200d\U0001f91d\u200d\U0001f469\U0001f3fc",
+    "\U0001f46f\u200d\u2640\ufe0f",
+    "\U0001f46f\u200d\u2640",
+    "\U0001f93c\u200d\u2640\ufe0f",
+    "\U0001f93c\u200d\u2640",
+    "\U0001f6ba",
+    "\U0001fab5",
+    "\U0001f974",
+    "\U0001f5fa\ufe0f",
+    "\U0001f5fa",
+    "\U0001fab1",
+    "\U0001f61f",
+    "\U0001f381",
+    "\U0001f527",
+    "\u270d\ufe0f",
+    "\u270d",
+    "\u270d\U0001f3ff",
+    "\u270d\U0001f3fb",
+    "\u270d\U0001f3fe",
+    "\u270d\U0001f3fc",
+    "\u270d\U0001f3fd",
+    "\U0001fa7b",
+    "\U0001f9f6",
+    "\U0001f971",
+    "\U0001f7e1",
+    "\U0001f49b",
+    "\U0001f7e8",
+    "\U0001f4b4",
+    "\u262f\ufe0f",
+    "\u262f",
+    "\U0001fa80",
+    "\U0001f92a",
+    "\U0001f993",
+    "\U0001f910",
+    "\U0001f9df",
+    "\U0001f1e6\U0001f1fd",
+)
+REGEX = "(?:\\#(?:\ufe0f\u20e3|\u20e3)|0(?:\ufe0f\u20e3|\u20e3)|1(?:\ufe0f\u20e3|\u20e3)|2(?:\ufe0f\u20e3|\u20e3)|3(?:\ufe0f\u20e3|\u20e3)|4(?:\ufe0f\u20e3|\u20e3)|5(?:\ufe0f\u20e3|\u20e3)|6(?:\ufe0f\u20e3|\u20e3)|7(?:\ufe0f\u20e3|\u20e3)|8(?:\ufe0f\u20e3|\u20e3)|9(?:\ufe0f\u20e3|\u20e3)|\xa9\ufe0f|\xae\ufe0f|\u203c\ufe0f|\u2049\ufe0f|\u2122\ufe0f|\u2139\ufe0f|\u2194\ufe0f|\u2195\ufe0f|\u2196\ufe0f|\u2197\ufe0f|\u2198\ufe0f|\u2199\ufe0f|\u21a9\ufe0f|\u21aa\ufe0f|\u2328\ufe0f?|\u23cf\ufe0f?|\u23ed\ufe0f?|\u23ee\ufe0f?|\u23ef\ufe0f?|\u23f1\ufe0f?|\u23f2\ufe0f?|\u23f8\ufe0f?|\u23f9\ufe0f?|\u23fa\ufe0f?|\u24c2\ufe0f|\u25aa\ufe0f|\u25ab\ufe0f|\u25b6\ufe0f|\u25c0\ufe0f|\u25fb\ufe0f|\u25fc\ufe0f|\u2600\ufe0f?|\u2601\ufe0f?|\u2602\ufe0f?|\u2603\ufe0f?|\u2604\ufe0f?|\u260e\ufe0f?|\u2611\ufe0f?|\u2618\ufe0f?|\u261d[\ufe0f\U0001f3fb-\U0001f3ff]?|\u2620\ufe0f?|\u2622\ufe0f?|\u2623\ufe0f?|\u2626\ufe0f?|\u262a\ufe0f?|\u262e\ufe0f?|\u262f\ufe0f?|\u2638\ufe0f?|\u2639\ufe0f?|\u263a\ufe0f?|\u2640\ufe0f?|\u2642\ufe0f?|\u265f\ufe0f?|\u2660\ufe0f?|\u2663\ufe0f?|\u2665\ufe0f?|\u2666\ufe0f?|\u2668\ufe0f?|\u267b\ufe0f?|\u267e\ufe0f?|\u2692\ufe0f?|\u2694\ufe0f?|\u2695\ufe0f?|\u2696\ufe0f?|\u2697\ufe0f?|\u2699\ufe0f?|\u269b\ufe0f?|\u269c\ufe0f?|\u26a0\ufe0f?|\u26a7\ufe0f?|\u26b0\ufe0f?|\u26b1\ufe0f?|\u26c8\ufe0f?|\u26cf\ufe0f?|\u26d1\ufe0f?|\u26d3(?:\u200d\U0001f4a5|\ufe0f(?:\u200d\U0001f4a5)?)?|\u26e9\ufe0f?|\u26f0\ufe0f?|\u26f1\ufe0f?|\u26f4\ufe0f?|\u26f7\ufe0f?|\u26f8\ufe0f?|\u26f9(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\ufe0f(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\u2702\ufe0f?|\u2708\ufe0f?|\u2709\ufe0f?|\u270a[\U0001f3fb-\U0001f3ff]?|\u270b[\U0001f3fb-\U0001f3ff]?|\u270c[\ufe0f\U0001f3fb-\U0001f3ff]?|\u270d[\ufe0f\U0001f3fb-\U0001f3ff]?|\u270f\ufe0f?|\u2712\ufe0f?|\u2714\ufe0f?|\u2716\ufe0f?|\u271d\ufe0f?|\u2721\ufe0f?|\u2733\ufe0f?|\u2734\ufe0f?|\u2744\ufe0f?|\u2747\ufe0f?|\u2763\ufe0f?|\u2764(?:\u200d[\U0001f525\U0001fa79]|\ufe0f(?:\u200d[\U0001f525\U0001fa79])?)?|\u27a1\ufe0f?|\u2934\ufe0f?|\u2935\ufe0f?|\u2b05\ufe0f?|\u2b06\ufe0f?|\u2b07\ufe0f?|\u3030\ufe0f?|\u303d\ufe0f?|\u3297\ufe0f?|\u3299\ufe0f?|\U0001f170\ufe0f|\U0001f171\ufe0f|\U0001f17e\ufe0f|\U0001f17f\ufe0f|\U0001f1e6[\U0001f1e8-\U0001f1ec\U0001f1ee\U0001f1f1-\U0001f1f2\U0001f1f4\U0001f1f6-\U0001f1fa\U0001f1fc-\U0001f1fd\U0001f1ff]|\U0001f1e7[\U0001f1e6-\U0001f1e7\U0001f1e9-\U0001f1ef\U0001f1f1-\U0001f1f4\U0001f1f6-\U0001f1f9\U0001f1fb-\U0001f1fc\U0001f1fe-\U0001f1ff]|\U0001f1e8[\U0001f1e6\U0001f1e8-\U0001f1e9\U0001f1eb-\U0001f1ee\U0001f1f0-\U0001f1f7\U0001f1fa-\U0001f1ff]|\U0001f1e9[\U0001f1ea\U0001f1ec\U0001f1ef-\U0001f1f0\U0001f1f2\U0001f1f4\U0001f1ff]|\U0001f1ea[\U0001f1e6\U0001f1e8\U0001f1ea\U0001f1ec-\U0001f1ed\U0001f1f7-\U0001f1fa]|\U0001f1eb[\U0001f1ee-\U0001f1f0\U0001f1f2\U0001f1f4\U0001f1f7]|\U0001f1ec[\U0001f1e6-\U0001f1e7\U0001f1e9-\U0001f1ee\U0001f1f1-\U0001f1f3\U0001f1f5-\U0001f1fa\U0001f1fc\U0001f1fe]|\U0001f1ed[\U0001f1f0\U0001f1f2-\U0001f1f3\U0001f1f7\U0001f1f9-\U0001f1fa]|\U0001f1ee[\U0001f1e8-\U0001f1ea\U0001f1f1-\U0001f1f4\U0001f1f6-\U0001f1f9]|\U0001f1ef[\U0001f1ea\U0001f1f2\U0001f1f4-\U0001f1f5]|\U0001f1f0[\U0001f1ea\U0001f1ec-\U0001f1ee\U0001f1f2-\U0001f1f3\U0001f1f5\U0001f1f7\U0001f1fc\U0001f1fe-\U0001f1ff]|\U0001f1f1[\U0001f1e6-\U0001f1e8\U0001f1ee\U0001f1f0\U0001f1f7-\U0001f1fb\U0001f1fe]|\U0001f1f2[\U0001f1e6\U0001f1e8-\U0001f1ed\U0001f1f0-\U0001f1ff]|\U0001f1f3[\U0001f1e6\U0001f1e8\U0001f1ea-\U0001f1ec\U0001f1ee\U0001f1f1\U0001f1f4-\U0001f1f5\U0001f1f7\U0001f1fa\U0001f1ff]|\U0001f1f4\U0001f1f2|\U0001f1f5[\U0001f1e6\U0001f1ea-\U0001f1ed\U0001f1f0-\U0001f1f3\U0001f1f7-\U0001f1f9\U0001f1fc\U0001f1fe]|\U0001f1f6\U0001f1e6|\U0001f1f7[\U0001f1ea\U0001f1f4\U0001f1f8\U0001f1fa\U0001f1fc]|\U0001f1f8[\U0001f1e6-\U0001f1ea\U0001f1ec-\U0001f1f4\U0001f1f7-\U0001f1f9\U0001f1fb\U0001f1fd-\U0001f1ff]|\U0001f1f9[\U0001f1e6\U0001f1e8-\U0001f1e9\U0001f1eb-\U0001f1ed\U0001f1ef-\U0001f1f4\U0001f1f7\U0001f1f9\U0001f1fb-\U0001f1fc\U0001f1ff]|\U0001f1fa[\U0001f1e6\U0001f1ec\U0001f1f2-\U0001f1f3\U0001f1f8\U0001f1fe-\U0001f1ff]|\U0001f1fb[\U0001f1e6\U0001f1e8\U0001f1ea\U0001f1ec\U0001f1ee\U0001f1f3\U0001f1fa]|\U0001f1fc[\U0001f1eb\U0001f1f8]|\U0001f1fd\U0001f1f0|\U0001f1fe[\U0001f1ea\U0001f1f9]|\U0001f1ff[\U0001f1e6\U0001f1f2\U0001f1fc]|\U0001f202\ufe0f?|\U0001f237\ufe0f?|\U0001f321\ufe0f?|\U0001f324\ufe0f?|\U0001f325\ufe0f?|\U0001f326\ufe0f?|\U0001f327\ufe0f?|\U0001f328\ufe0f?|\U0001f329\ufe0f?|\U0001f32a\ufe0f?|\U0001f32b\ufe0f?|\U0001f32c\ufe0f?|\U0001f336\ufe0f?|\U0001f344(?:\u200d\U0001f7eb)?|\U0001f34b(?:\u200d\U0001f7e9)?|\U0001f37d\ufe0f?|\U0001f385[\U0001f3fb-\U0001f3ff]?|\U0001f396\ufe0f?|\U0001f397\ufe0f?|\U0001f399\ufe0f?|\U0001f39a\ufe0f?|\U0001f39b\ufe0f?|\U0001f39e\ufe0f?|\U0001f39f\ufe0f?|\U0001f3c2[\U0001f3fb-\U0001f3ff]?|\U0001f3c3(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?)?|\U0001f3c4(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f3c7[\U0001f3fb-\U0001f3ff]?|\U0001f3ca(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f3cb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\ufe0f(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f3cc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\ufe0f(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f3cd\ufe0f?|\U0001f3ce\ufe0f?|\U0001f3d4\ufe0f?|\U0001f3d5\ufe0f?|\U0001f3d6\ufe0f?|\U0001f3d7\ufe0f?|\U0001f3d8\ufe0f?|\U0001f3d9\ufe0f?|\U0001f3da\ufe0f?|\U0001f3db\ufe0f?|\U0001f3dc\ufe0f?|\U0001f3dd\ufe0f?|\U0001f3de\ufe0f?|\U0001f3df\ufe0f?|\U0001f3f3(?:\u200d(?:\u26a7\ufe0f?|\U0001f308)|\ufe0f(?:\u200d(?:\u26a7\ufe0f?|\U0001f308))?)?|\U0001f3f4(?:\u200d\u2620\ufe0f?|\U000e0067\U000e0062(?:\U000e0065\U000e006e\U000e0067\U000e007f|\U000e0073\U000e0063\U000e0074\U000e007f|\U000e0077\U000e006c\U000e0073\U000e007f))?|\U0001f3f5\ufe0f?|\U0001f3f7\ufe0f?|\U0001f408(?:\u200d\u2b1b)?|\U0001f415(?:\u200d\U0001f9ba)?|\U0001f426(?:\u200d[\u2b1b\U0001f525])?|\U0001f43b(?:\u200d\u2744\ufe0f?)?|\U0001f43f\ufe0f?|\U0001f441(?:\u200d\U0001f5e8\ufe0f?|\ufe0f(?:\u200d\U0001f5e8\ufe0f?)?)?|\U0001f442[\U0001f3fb-\U0001f3ff]?|\U0001f443[\U0001f3fb-\U0001f3ff]?|\U0001f446[\U0001f3fb-\U0001f3ff]?|\U0001f447[\U0001f3fb-\U0001f3ff]?|\U0001f448[\U0001f3fb-\U0001f3ff]?|\U0001f449[\U0001f3fb-\U0001f3ff]?|\U0001f44a[\U0001f3fb-\U0001f3ff]?|\U0001f44b[\U0001f3fb-\U0001f3ff]?|\U0001f44c[\U0001f3fb-\U0001f3ff]?|\U0001f44d[\U0001f3fb-\U0001f3ff]?|\U0001f44e[\U0001f3fb-\U0001f3ff]?|\U0001f44f[\U0001f3fb-\U0001f3ff]?|\U0001f450[\U0001f3fb-\U0001f3ff]?|\U0001f466[\U0001f3fb-\U0001f3ff]?|\U0001f467[\U0001f3fb-\U0001f3ff]?|\U0001f468(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f48b\u200d\U0001f468|\U0001f468)|\ufe0f\u200d(?:\U0001f48b\u200d\U0001f468|\U0001f468))|\U0001f466(?:\u200d\U0001f466)?|\U0001f467(?:\u200d[\U0001f466-\U0001f467])?|\U0001f468\u200d(?:\U0001f466(?:\u200d\U0001f466)?|\U0001f467(?:\u200d[\U0001f466-\U0001f467])?)|\U0001f469\u200d(?:\U0001f466(?:\u200d\U0001f466)?|\U0001f467(?:\u200d[\U0001f466-\U0001f467])?)|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3])|\U0001f3fb(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff])|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff]))|\U0001f91d\u200d\U0001f468[\U0001f3fc-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fc(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff])|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff]))|\U0001f91d\u200d\U0001f468[\U0001f3fb\U0001f3fd-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fd(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff])|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff]))|\U0001f91d\u200d\U0001f468[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fe(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff])|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff]))|\U0001f91d\u200d\U0001f468[\U0001f3fb-\U0001f3fd\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3ff(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff])|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d\U0001f468[\U0001f3fb-\U0001f3ff]))|\U0001f91d\u200d\U0001f468[\U0001f3fb-\U0001f3fe]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?)?|\U0001f469(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f48b\u200d[\U0001f468-\U0001f469]|[\U0001f468-\U0001f469])|\ufe0f\u200d(?:\U0001f48b\u200d[\U0001f468-\U0001f469]|[\U0001f468-\U0001f469]))|\U0001f466(?:\u200d\U0001f466)?|\U0001f467(?:\u200d[\U0001f466-\U0001f467])?|\U0001f469\u200d(?:\U0001f466(?:\u200d\U0001f466)?|\U0001f467(?:\u200d[\U0001f466-\U0001f467])?)|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3])|\U0001f3fb(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]))|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff])))|\U0001f91d\u200d(?:\U0001f468[\U0001f3fc-\U0001f3ff]|\U0001f469[\U0001f3fc-\U0001f3ff])|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fc(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]))|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff])))|\U0001f91d\u200d(?:\U0001f468[\U0001f3fb\U0001f3fd-\U0001f3ff]|\U0001f469[\U0001f3fb\U0001f3fd-\U0001f3ff])|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fd(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]))|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff])))|\U0001f91d\u200d(?:\U0001f468[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff])|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fe(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]))|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff])))|\U0001f91d\u200d(?:\U0001f468[\U0001f3fb-\U0001f3fd\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3fd\U0001f3ff])|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3ff(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]))|\ufe0f\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff]|\U0001f48b\u200d(?:\U0001f468[\U0001f3fb-\U0001f3ff]|\U0001f469[\U0001f3fb-\U0001f3ff])))|\U0001f91d\u200d(?:\U0001f468[\U0001f3fb-\U0001f3fe]|\U0001f469[\U0001f3fb-\U0001f3fe])|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?)?|\U0001f46b[\U0001f3fb-\U0001f3ff]?|\U0001f46c[\U0001f3fb-\U0001f3ff]?|\U0001f46d[\U0001f3fb-\U0001f3ff]?|\U0001f46e(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f46f(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f470(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f471(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f472[\U0001f3fb-\U0001f3ff]?|\U0001f473(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f474[\U0001f3fb-\U0001f3ff]?|\U0001f475[\U0001f3fb-\U0001f3ff]?|\U0001f476[\U0001f3fb-\U0001f3ff]?|\U0001f477(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f478[\U0001f3fb-\U0001f3ff]?|\U0001f47c[\U0001f3fb-\U0001f3ff]?|\U0001f481(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f482(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f483[\U0001f3fb-\U0001f3ff]?|\U0001f485[\U0001f3fb-\U0001f3ff]?|\U0001f486(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f487(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f48f[\U0001f3fb-\U0001f3ff]?|\U0001f491[\U0001f3fb-\U0001f3ff]?|\U0001f4aa[\U0001f3fb-\U0001f3ff]?|\U0001f4fd\ufe0f?|\U0001f549\ufe0f?|\U0001f54a\ufe0f?|\U0001f56f\ufe0f?|\U0001f570\ufe0f?|\U0001f573\ufe0f?|\U0001f574[\ufe0f\U0001f3fb-\U0001f3ff]?|\U0001f575(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\ufe0f(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f576\ufe0f?|\U0001f577\ufe0f?|\U0001f578\ufe0f?|\U0001f579\ufe0f?|\U0001f57a[\U0001f3fb-\U0001f3ff]?|\U0001f587\ufe0f?|\U0001f58a\ufe0f?|\U0001f58b\ufe0f?|\U0001f58c\ufe0f?|\U0001f58d\ufe0f?|\U0001f590[\ufe0f\U0001f3fb-\U0001f3ff]?|\U0001f595[\U0001f3fb-\U0001f3ff]?|\U0001f596[\U0001f3fb-\U0001f3ff]?|\U0001f5a5\ufe0f?|\U0001f5a8\ufe0f?|\U0001f5b1\ufe0f?|\U0001f5b2\ufe0f?|\U0001f5bc\ufe0f?|\U0001f5c2\ufe0f?|\U0001f5c3\ufe0f?|\U0001f5c4\ufe0f?|\U0001f5d1\ufe0f?|\U0001f5d2\ufe0f?|\U0001f5d3\ufe0f?|\U0001f5dc\ufe0f?|\U0001f5dd\ufe0f?|\U0001f5de\ufe0f?|\U0001f5e1\ufe0f?|\U0001f5e3\ufe0f?|\U0001f5e8\ufe0f?|\U0001f5ef\ufe0f?|\U0001f5f3\ufe0f?|\U0001f5fa\ufe0f?|\U0001f62e(?:\u200d\U0001f4a8)?|\U0001f635(?:\u200d\U0001f4ab)?|\U0001f636(?:\u200d\U0001f32b\ufe0f?)?|\U0001f642(?:\u200d(?:\u2194\ufe0f?|\u2195\ufe0f?))?|\U0001f645(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f646(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f647(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f64b(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f64c[\U0001f3fb-\U0001f3ff]?|\U0001f64d(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f64e(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f64f[\U0001f3fb-\U0001f3ff]?|\U0001f6a3(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f6b4(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f6b5(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f6b6(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?)?|\U0001f6c0[\U0001f3fb-\U0001f3ff]?|\U0001f6cb\ufe0f?|\U0001f6cc[\U0001f3fb-\U0001f3ff]?|\U0001f6cd\ufe0f?|\U0001f6ce\ufe0f?|\U0001f6cf\ufe0f?|\U0001f6e0\ufe0f?|\U0001f6e1\ufe0f?|\U0001f6e2\ufe0f?|\U0001f6e3\ufe0f?|\U0001f6e4\ufe0f?|\U0001f6e5\ufe0f?|\U0001f6e9\ufe0f?|\U0001f6f0\ufe0f?|\U0001f6f3\ufe0f?|\U0001f90c[\U0001f3fb-\U0001f3ff]?|\U0001f90f[\U0001f3fb-\U0001f3ff]?|\U0001f918[\U0001f3fb-\U0001f3ff]?|\U0001f919[\U0001f3fb-\U0001f3ff]?|\U0001f91a[\U0001f3fb-\U0001f3ff]?|\U0001f91b[\U0001f3fb-\U0001f3ff]?|\U0001f91c[\U0001f3fb-\U0001f3ff]?|\U0001f91d[\U0001f3fb-\U0001f3ff]?|\U0001f91e[\U0001f3fb-\U0001f3ff]?|\U0001f91f[\U0001f3fb-\U0001f3ff]?|\U0001f926(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f930[\U0001f3fb-\U0001f3ff]?|\U0001f931[\U0001f3fb-\U0001f3ff]?|\U0001f932[\U0001f3fb-\U0001f3ff]?|\U0001f933[\U0001f3fb-\U0001f3ff]?|\U0001f934[\U0001f3fb-\U0001f3ff]?|\U0001f935(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f936[\U0001f3fb-\U0001f3ff]?|\U0001f937(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f938(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f939(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f93c(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f93d(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f93e(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f977[\U0001f3fb-\U0001f3ff]?|\U0001f9b5[\U0001f3fb-\U0001f3ff]?|\U0001f9b6[\U0001f3fb-\U0001f3ff]?|\U0001f9b8(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9b9(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9bb[\U0001f3fb-\U0001f3ff]?|\U0001f9cd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9ce(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u2642(?:\u200d\u27a1\ufe0f?|\ufe0f(?:\u200d\u27a1\ufe0f?)?)?|\u27a1\ufe0f?))?)?|\U0001f9cf(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9d1(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\U0001f91d\u200d\U0001f9d1|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|\U0001f9d1\u200d\U0001f9d2(?:\u200d\U0001f9d2)?|\U0001f9d2(?:\u200d\U0001f9d2)?|[\U0001f33e\U0001f373\U0001f37c\U0001f384\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3])|\U0001f3fb(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fc-\U0001f3ff]|\U0001f9d1[\U0001f3fc-\U0001f3ff])|\ufe0f\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fc-\U0001f3ff]|\U0001f9d1[\U0001f3fc-\U0001f3ff]))|\U0001f91d\u200d\U0001f9d1[\U0001f3fb-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f384\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fc(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb\U0001f3fd-\U0001f3ff]|\U0001f9d1[\U0001f3fb\U0001f3fd-\U0001f3ff])|\ufe0f\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb\U0001f3fd-\U0001f3ff]|\U0001f9d1[\U0001f3fb\U0001f3fd-\U0001f3ff]))|\U0001f91d\u200d\U0001f9d1[\U0001f3fb-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f384\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fd(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff]|\U0001f9d1[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff])|\ufe0f\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff]|\U0001f9d1[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff]))|\U0001f91d\u200d\U0001f9d1[\U0001f3fb-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f384\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3fe(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb-\U0001f3fd\U0001f3ff]|\U0001f9d1[\U0001f3fb-\U0001f3fd\U0001f3ff])|\ufe0f\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb-\U0001f3fd\U0001f3ff]|\U0001f9d1[\U0001f3fb-\U0001f3fd\U0001f3ff]))|\U0001f91d\u200d\U0001f9d1[\U0001f3fb-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f384\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?|\U0001f3ff(?:\u200d(?:\u2695\ufe0f?|\u2696\ufe0f?|\u2708\ufe0f?|\u2764(?:\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb-\U0001f3fe]|\U0001f9d1[\U0001f3fb-\U0001f3fe])|\ufe0f\u200d(?:\U0001f48b\u200d\U0001f9d1[\U0001f3fb-\U0001f3fe]|\U0001f9d1[\U0001f3fb-\U0001f3fe]))|\U0001f91d\u200d\U0001f9d1[\U0001f3fb-\U0001f3ff]|\U0001f9af(?:\u200d\u27a1\ufe0f?)?|\U0001f9bc(?:\u200d\u27a1\ufe0f?)?|\U0001f9bd(?:\u200d\u27a1\ufe0f?)?|[\U0001f33e\U0001f373\U0001f37c\U0001f384\U0001f393\U0001f3a4\U0001f3a8\U0001f3eb\U0001f3ed\U0001f4bb-\U0001f4bc\U0001f527\U0001f52c\U0001f680\U0001f692\U0001f9b0-\U0001f9b3]))?)?|\U0001f9d2[\U0001f3fb-\U0001f3ff]?|\U0001f9d3[\U0001f3fb-\U0001f3ff]?|\U0001f9d4(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9d5[\U0001f3fb-\U0001f3ff]?|\U0001f9d6(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9d7(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9d8(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9d9(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9da(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9db(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9dc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9dd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?)|\U0001f3fb(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fc(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fd(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3fe(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f3ff(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?)?|\U0001f9de(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001f9df(?:\u200d(?:\u2640\ufe0f?|\u2642\ufe0f?))?|\U0001fac3[\U0001f3fb-\U0001f3ff]?|\U0001fac4[\U0001f3fb-\U0001f3ff]?|\U0001fac5[\U0001f3fb-\U0001f3ff]?|\U0001faf0[\U0001f3fb-\U0001f3ff]?|\U0001faf1(?:\U0001f3fb(?:\u200d\U0001faf2[\U0001f3fc-\U0001f3ff])?|\U0001f3fc(?:\u200d\U0001faf2[\U0001f3fb\U0001f3fd-\U0001f3ff])?|\U0001f3fd(?:\u200d\U0001faf2[\U0001f3fb-\U0001f3fc\U0001f3fe-\U0001f3ff])?|\U0001f3fe(?:\u200d\U0001faf2[\U0001f3fb-\U0001f3fd\U0001f3ff])?|\U0001f3ff(?:\u200d\U0001faf2[\U0001f3fb-\U0001f3fe])?)?|\U0001faf2[\U0001f3fb-\U0001f3ff]?|\U0001faf3[\U0001f3fb-\U0001f3ff]?|\U0001faf4[\U0001f3fb-\U0001f3ff]?|\U0001faf5[\U0001f3fb-\U0001f3ff]?|\U0001faf6[\U0001f3fb-\U0001f3ff]?|\U0001faf7[\U0001f3fb-\U0001f3ff]?|\U0001faf8[\U0001f3fb-\U0001f3ff]?|[\u231a-\u231b\u23e9-\u23ec\u23f0\u23f3\u25fd-\u25fe\u2614-\u2615\u2648-\u2653\u267f\u2693\u26a1\u26aa-\u26ab\u26bd-\u26be\u26c4-\u26c5\u26ce\u26d4\u26ea\u26f2-\u26f3\u26f5\u26fa\u26fd\u2705\u2728\u274c\u274e\u2753-\u2755\u2757\u2795-\u2797\u27b0\u27bf\u2b1b-\u2b1c\u2b50\u2b55\U0001f004\U0001f0cf\U0001f18e\U0001f191-\U0001f19a\U0001f201\U0001f21a\U0001f22f\U0001f232-\U0001f236\U0001f238-\U0001f23a\U0001f250-\U0001f251\U0001f300-\U0001f320\U0001f32d-\U0001f335\U0001f337-\U0001f343\U0001f345-\U0001f34a\U0001f34c-\U0001f37c\U0001f37e-\U0001f384\U0001f386-\U0001f393\U0001f3a0-\U0001f3c1\U0001f3c5-\U0001f3c6\U0001f3c8-\U0001f3c9\U0001f3cf-\U0001f3d3\U0001f3e0-\U0001f3f0\U0001f3f8-\U0001f407\U0001f409-\U0001f414\U0001f416-\U0001f425\U0001f427-\U0001f43a\U0001f43c-\U0001f43e\U0001f440\U0001f444-\U0001f445\U0001f451-\U0001f465\U0001f46a\U0001f479-\U0001f47b\U0001f47d-\U0001f480\U0001f484\U0001f488-\U0001f48e\U0001f490\U0001f492-\U0001f4a9\U0001f4ab-\U0001f4fc\U0001f4ff-\U0001f53d\U0001f54b-\U0001f54e\U0001f550-\U0001f567\U0001f5a4\U0001f5fb-\U0001f62d\U0001f62f-\U0001f634\U0001f637-\U0001f641\U0001f643-\U0001f644\U0001f648-\U0001f64a\U0001f680-\U0001f6a2\U0001f6a4-\U0001f6b3\U0001f6b7-\U0001f6bf\U0001f6c1-\U0001f6c5\U0001f6d0-\U0001f6d2\U0001f6d5-\U0001f6d7\U0001f6dc-\U0001f6df\U0001f6eb-\U0001f6ec\U0001f6f4-\U0001f6fc\U0001f7e0-\U0001f7eb\U0001f7f0\U0001f90d-\U0001f90e\U0001f910-\U0001f917\U0001f920-\U0001f925\U0001f927-\U0001f92f\U0001f93a\U0001f93f-\U0001f945\U0001f947-\U0001f976\U0001f978-\U0001f9b4\U0001f9b7\U0001f9ba\U0001f9bc-\U0001f9cc\U0001f9d0\U0001f9e0-\U0001f9ff\U0001fa70-\U0001fa7c\U0001fa80-\U0001fa89\U0001fa8f-\U0001fac2\U0001fac6\U0001face-\U0001fadc\U0001fadf-\U0001fae9])"
+BYTES_REGEX = "(?:\\#(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|0(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|1(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|2(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|3(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|4(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|5(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|6(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|7(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|8(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|9(?:\xe2\x83\xa3|\xef\xb8\x8f\xe2\x83\xa3)|\xc2(?:\xa9\xef\xb8\x8f|\xae\xef\xb8\x8f)|\xe2(?:\x80\xbc\xef\xb8\x8f|\x81\x89\xef\xb8\x8f|\x84(?:\xa2\xef\xb8\x8f|\xb9\xef\xb8\x8f)|\x86(?:\x94\xef\xb8\x8f|\x95\xef\xb8\x8f|\x96\xef\xb8\x8f|\x97\xef\xb8\x8f|\x98\xef\xb8\x8f|\x99\xef\xb8\x8f|\xa9\xef\xb8\x8f|\xaa\xef\xb8\x8f)|\x8c(?:\xa8(?:\xef\xb8\x8f)?|[\x9a-\x9b])|\x8f(?:\x8f(?:\xef\xb8\x8f)?|\xad(?:\xef\xb8\x8f)?|\xae(?:\xef\xb8\x8f)?|\xaf(?:\xef\xb8\x8f)?|\xb1(?:\xef\xb8\x8f)?|\xb2(?:\xef\xb8\x8f)?|\xb8(?:\xef\xb8\x8f)?|\xb9(?:\xef\xb8\x8f)?|\xba(?:\xef\xb8\x8f)?|[\xa9-\xac\xb0\xb3])|\x93\x82\xef\xb8\x8f|\x96(?:\xaa\xef\xb8\x8f|\xab\xef\xb8\x8f|\xb6\xef\xb8\x8f)|\x97(?:\x80\xef\xb8\x8f|\xbb\xef\xb8\x8f|\xbc\xef\xb8\x8f|[\xbd-\xbe])|\x98(?:\x80(?:\xef\xb8\x8f)?|\x81(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?|\x83(?:\xef\xb8\x8f)?|\x84(?:\xef\xb8\x8f)?|\x8e(?:\xef\xb8\x8f)?|\x91(?:\xef\xb8\x8f)?|\x98(?:\xef\xb8\x8f)?|\x9d(?:\xef\xb8\x8f|\xf0\x9f\x8f[\xbb-\xbf])?|\xa0(?:\xef\xb8\x8f)?|\xa2(?:\xef\xb8\x8f)?|\xa3(?:\xef\xb8\x8f)?|\xa6(?:\xef\xb8\x8f)?|\xaa(?:\xef\xb8\x8f)?|\xae(?:\xef\xb8\x8f)?|\xaf(?:\xef\xb8\x8f)?|\xb8(?:\xef\xb8\x8f)?|\xb9(?:\xef\xb8\x8f)?|\xba(?:\xef\xb8\x8f)?|[\x94-\x95])|\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?|\x9f(?:\xef\xb8\x8f)?|\xa0(?:\xef\xb8\x8f)?|\xa3(?:\xef\xb8\x8f)?|\xa5(?:\xef\xb8\x8f)?|\xa6(?:\xef\xb8\x8f)?|\xa8(?:\xef\xb8\x8f)?|\xbb(?:\xef\xb8\x8f)?|\xbe(?:\xef\xb8\x8f)?|[\x88-\x93\xbf])|\x9a(?:\x92(?:\xef\xb8\x8f)?|\x94(?:\xef\xb8\x8f)?|\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?|\x97(?:\xef\xb8\x8f)?|\x99(?:\xef\xb8\x8f)?|\x9b(?:\xef\xb8\x8f)?|\x9c(?:\xef\xb8\x8f)?|\xa0(?:\xef\xb8\x8f)?|\xa7(?:\xef\xb8\x8f)?|\xb0(?:\xef\xb8\x8f)?|\xb1(?:\xef\xb8\x8f)?|[\x93\xa1\xaa-\xab\xbd-\xbe])|\x9b(?:\x88(?:\xef\xb8\x8f)?|\x8f(?:\xef\xb8\x8f)?|\x91(?:\xef\xb8\x8f)?|\x93(?:\xe2\x80\x8d\xf0\x9f\x92\xa5|\xef\xb8\x8f(?:\xe2\x80\x8d\xf0\x9f\x92\xa5)?)?|\xa9(?:\xef\xb8\x8f)?|\xb0(?:\xef\xb8\x8f)?|\xb1(?:\xef\xb8\x8f)?|\xb4(?:\xef\xb8\x8f)?|\xb7(?:\xef\xb8\x8f)?|\xb8(?:\xef\xb8\x8f)?|\xb9(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|[\x84-\x85\x8e\x94\xaa\xb2-\xb3\xb5\xba\xbd])|\x9c(?:\x82(?:\xef\xb8\x8f)?|\x88(?:\xef\xb8\x8f)?|\x89(?:\xef\xb8\x8f)?|\x8a(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8b(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8c(?:\xef\xb8\x8f|\xf0\x9f\x8f[\xbb-\xbf])?|\x8d(?:\xef\xb8\x8f|\xf0\x9f\x8f[\xbb-\xbf])?|\x8f(?:\xef\xb8\x8f)?|\x92(?:\xef\xb8\x8f)?|\x94(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?|\x9d(?:\xef\xb8\x8f)?|\xa1(?:\xef\xb8\x8f)?|\xb3(?:\xef\xb8\x8f)?|\xb4(?:\xef\xb8\x8f)?|[\x85\xa8])|\x9d(?:\x84(?:\xef\xb8\x8f)?|\x87(?:\xef\xb8\x8f)?|\xa3(?:\xef\xb8\x8f)?|\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x94\xa5|\xa9\xb9)|\xef\xb8\x8f(?:\xe2\x80\x8d\xf0\x9f(?:\x94\xa5|\xa9\xb9))?)?|[\x8c\x8e\x93-\x95\x97])|\x9e(?:\xa1(?:\xef\xb8\x8f)?|[\x95-\x97\xb0\xbf])|\xa4(?:\xb4(?:\xef\xb8\x8f)?|\xb5(?:\xef\xb8\x8f)?)|\xac(?:\x85(?:\xef\xb8\x8f)?|\x86(?:\xef\xb8\x8f)?|\x87(?:\xef\xb8\x8f)?|[\x9b-\x9c])|\xad[\x90\x95])|\xe3(?:\x80(?:\xb0(?:\xef\xb8\x8f)?|\xbd(?:\xef\xb8\x8f)?)|\x8a(?:\x97(?:\xef\xb8\x8f)?|\x99(?:\xef\xb8\x8f)?))|\xf0\x9f(?:\x80\x84|\x83\x8f|\x85(?:\xb0\xef\xb8\x8f|\xb1\xef\xb8\x8f|\xbe\xef\xb8\x8f|\xbf\xef\xb8\x8f)|\x86[\x8e\x91-\x9a]|\x87(?:\xa6\xf0\x9f\x87[\xa8-\xac\xae\xb1-\xb2\xb4\xb6-\xba\xbc-\xbd\xbf]|\xa7\xf0\x9f\x87[\xa6-\xa7\xa9-\xaf\xb1-\xb4\xb6-\xb9\xbb-\xbc\xbe-\xbf]|\xa8\xf0\x9f\x87[\xa6\xa8-\xa9\xab-\xae\xb0-\xb7\xba-\xbf]|\xa9\xf0\x9f\x87[\xaa\xac\xaf-\xb0\xb2\xb4\xbf]|\xaa\xf0\x9f\x87[\xa6\xa8\xaa\xac-\xad\xb7-\xba]|\xab\xf0\x9f\x87[\xae-\xb0\xb2\xb4\xb7]|\xac\xf0\x9f\x87[\xa6-\xa7\xa9-\xae\xb1-\xb3\xb5-\xba\xbc\xbe]|\xad\xf0\x9f\x87[\xb0\xb2-\xb3\xb7\xb9-\xba]|\xae\xf0\x9f\x87[\xa8-\xaa\xb1-\xb4\xb6-\xb9]|\xaf\xf0\x9f\x87[\xaa\xb2\xb4-\xb5]|\xb0\xf0\x9f\x87[\xaa\xac-\xae\xb2-\xb3\xb5\xb7\xbc\xbe-\xbf]|\xb1\xf0\x9f\x87[\xa6-\xa8\xae\xb0\xb7-\xbb\xbe]|\xb2\xf0\x9f\x87[\xa6\xa8-\xad\xb0-\xbf]|\xb3\xf0\x9f\x87[\xa6\xa8\xaa-\xac\xae\xb1\xb4-\xb5\xb7\xba\xbf]|\xb4\xf0\x9f\x87\xb2|\xb5\xf0\x9f\x87[\xa6\xaa-\xad\xb0-\xb3\xb7-\xb9\xbc\xbe]|\xb6\xf0\x9f\x87\xa6|\xb7\xf0\x9f\x87[\xaa\xb4\xb8\xba\xbc]|\xb8\xf0\x9f\x87[\xa6-\xaa\xac-\xb4\xb7-\xb9\xbb\xbd-\xbf]|\xb9\xf0\x9f\x87[\xa6\xa8-\xa9\xab-\xad\xaf-\xb4\xb7\xb9\xbb-\xbc\xbf]|\xba\xf0\x9f\x87[\xa6\xac\xb2-\xb3\xb8\xbe-\xbf]|\xbb\xf0\x9f\x87[\xa6\xa8\xaa\xac\xae\xb3\xba]|\xbc\xf0\x9f\x87[\xab\xb8]|\xbd\xf0\x9f\x87\xb0|\xbe\xf0\x9f\x87[\xaa\xb9]|\xbf\xf0\x9f\x87[\xa6\xb2\xbc])|\x88(?:\x82(?:\xef\xb8\x8f)?|\xb7(?:\xef\xb8\x8f)?|[\x81\x9a\xaf\xb2-\xb6\xb8-\xba])|\x89[\x90-\x91]|\x8c(?:\xa1(?:\xef\xb8\x8f)?|\xa4(?:\xef\xb8\x8f)?|\xa5(?:\xef\xb8\x8f)?|\xa6(?:\xef\xb8\x8f)?|\xa7(?:\xef\xb8\x8f)?|\xa8(?:\xef\xb8\x8f)?|\xa9(?:\xef\xb8\x8f)?|\xaa(?:\xef\xb8\x8f)?|\xab(?:\xef\xb8\x8f)?|\xac(?:\xef\xb8\x8f)?|\xb6(?:\xef\xb8\x8f)?|[\x80-\xa0\xad-\xb5\xb7-\xbf])|\x8d(?:\x84(?:\xe2\x80\x8d\xf0\x9f\x9f\xab)?|\x8b(?:\xe2\x80\x8d\xf0\x9f\x9f\xa9)?|\xbd(?:\xef\xb8\x8f)?|[\x80-\x83\x85-\x8a\x8c-\xbc\xbe-\xbf])|\x8e(?:\x85(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x96(?:\xef\xb8\x8f)?|\x97(?:\xef\xb8\x8f)?|\x99(?:\xef\xb8\x8f)?|\x9a(?:\xef\xb8\x8f)?|\x9b(?:\xef\xb8\x8f)?|\x9e(?:\xef\xb8\x8f)?|\x9f(?:\xef\xb8\x8f)?|[\x80-\x84\x86-\x93\xa0-\xbf])|\x8f(?:\x82(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x83(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?))?|\x84(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x87(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8a(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8b(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8c(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8d(?:\xef\xb8\x8f)?|\x8e(?:\xef\xb8\x8f)?|\x94(?:\xef\xb8\x8f)?|\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?|\x97(?:\xef\xb8\x8f)?|\x98(?:\xef\xb8\x8f)?|\x99(?:\xef\xb8\x8f)?|\x9a(?:\xef\xb8\x8f)?|\x9b(?:\xef\xb8\x8f)?|\x9c(?:\xef\xb8\x8f)?|\x9d(?:\xef\xb8\x8f)?|\x9e(?:\xef\xb8\x8f)?|\x9f(?:\xef\xb8\x8f)?|\xb3(?:\xe2\x80\x8d(?:\xe2\x9a\xa7(?:\xef\xb8\x8f)?|\xf0\x9f\x8c\x88)|\xef\xb8\x8f(?:\xe2\x80\x8d(?:\xe2\x9a\xa7(?:\xef\xb8\x8f)?|\xf0\x9f\x8c\x88))?)?|\xb4(?:\xe2\x80\x8d\xe2\x98\xa0(?:\xef\xb8\x8f)?|\xf3\xa0\x81\xa7\xf3\xa0\x81\xa2\xf3\xa0\x81(?:\xa5\xf3\xa0\x81\xae\xf3\xa0\x81\xa7\xf3\xa0\x81\xbf|\xb3\xf3\xa0\x81\xa3\xf3\xa0\x81\xb4\xf3\xa0\x81\xbf|\xb7\xf3\xa0\x81\xac\xf3\xa0\x81\xb3\xf3\xa0\x81\xbf))?|\xb5(?:\xef\xb8\x8f)?|\xb7(?:\xef\xb8\x8f)?|[\x80-\x81\x85-\x86\x88-\x89\x8f-\x93\xa0-\xb0\xb8-\xbf])|\x90(?:\x88(?:\xe2\x80\x8d\xe2\xac\x9b)?|\x95(?:\xe2\x80\x8d\xf0\x9f\xa6\xba)?|\xa6(?:\xe2\x80\x8d(?:\xe2\xac\x9b|\xf0\x9f\x94\xa5))?|\xbb(?:\xe2\x80\x8d\xe2\x9d\x84(?:\xef\xb8\x8f)?)?|\xbf(?:\xef\xb8\x8f)?|[\x80-\x87\x89-\x94\x96-\xa5\xa7-\xba\xbc-\xbe])|\x91(?:\x81(?:\xe2\x80\x8d\xf0\x9f\x97\xa8(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xf0\x9f\x97\xa8(?:\xef\xb8\x8f)?)?)?|\x82(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x83(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x86(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x87(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x88(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x89(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8a(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8b(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8c(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8d(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8e(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8f(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x90(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xa6(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xa7(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xa8(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91\xa8|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8)|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91\xa8|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8)))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x91(?:\xa6(?:\xe2\x80\x8d\xf0\x9f\x91\xa6)?|\xa7(?:\xe2\x80\x8d\xf0\x9f\x91[\xa6-\xa7])?|\xa8\xe2\x80\x8d\xf0\x9f\x91(?:\xa6(?:\xe2\x80\x8d\xf0\x9f\x91\xa6)?|\xa7(?:\xe2\x80\x8d\xf0\x9f\x91[\xa6-\xa7])?)|\xa9\xe2\x80\x8d\xf0\x9f\x91(?:\xa6(?:\xe2\x80\x8d\xf0\x9f\x91\xa6)?|\xa7(?:\xe2\x80\x8d\xf0\x9f\x91[\xa6-\xa7])?))|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3])))|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbc-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbc(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb\xbd-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbd(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbe(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbd\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbf(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91\xa8\xf0\x9f\x8f[\xbb-\xbf]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91\xa8\xf0\x9f\x8f[\xbb-\xbe]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?))?|\xa9(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91[\xa8-\xa9]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91[\xa8-\xa9])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91[\xa8-\xa9]|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91[\xa8-\xa9])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x91(?:\xa6(?:\xe2\x80\x8d\xf0\x9f\x91\xa6)?|\xa7(?:\xe2\x80\x8d\xf0\x9f\x91[\xa6-\xa7])?|\xa9\xe2\x80\x8d\xf0\x9f\x91(?:\xa6(?:\xe2\x80\x8d\xf0\x9f\x91\xa6)?|\xa7(?:\xe2\x80\x8d\xf0\x9f\x91[\xa6-\xa7])?))|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3])))|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbc-\xbf]|\xa9\xf0\x9f\x8f[\xbc-\xbf])|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbc(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb\xbd-\xbf]|\xa9\xf0\x9f\x8f[\xbb\xbd-\xbf])|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbd(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf])|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbe(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbd\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbd\xbf])|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbf(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf])|\x92\x8b\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbf]|\xa9\xf0\x9f\x8f[\xbb-\xbf]))))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\x91(?:\xa8\xf0\x9f\x8f[\xbb-\xbe]|\xa9\xf0\x9f\x8f[\xbb-\xbe])|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?))?|\xab(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xac(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xad(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xae(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xaf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xb0(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb1(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb2(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb3(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb4(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb5(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb6(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb7(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb8(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xbc(?:\xf0\x9f\x8f[\xbb-\xbf])?|[\x80\x84-\x85\x91-\xa5\xaa\xb9-\xbb\xbd-\xbf])|\x92(?:\x81(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x82(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x83(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x85(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x86(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x87(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8f(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x91(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xaa(?:\xf0\x9f\x8f[\xbb-\xbf])?|[\x80\x84\x88-\x8e\x90\x92-\xa9\xab-\xbf])|\x93(?:\xbd(?:\xef\xb8\x8f)?|[\x80-\xbc\xbf])|\x94[\x80-\xbd]|\x95(?:\x89(?:\xef\xb8\x8f)?|\x8a(?:\xef\xb8\x8f)?|\xaf(?:\xef\xb8\x8f)?|\xb0(?:\xef\xb8\x8f)?|\xb3(?:\xef\xb8\x8f)?|\xb4(?:\xef\xb8\x8f|\xf0\x9f\x8f[\xbb-\xbf])?|\xb5(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb6(?:\xef\xb8\x8f)?|\xb7(?:\xef\xb8\x8f)?|\xb8(?:\xef\xb8\x8f)?|\xb9(?:\xef\xb8\x8f)?|\xba(?:\xf0\x9f\x8f[\xbb-\xbf])?|[\x8b-\x8e\x90-\xa7])|\x96(?:\x87(?:\xef\xb8\x8f)?|\x8a(?:\xef\xb8\x8f)?|\x8b(?:\xef\xb8\x8f)?|\x8c(?:\xef\xb8\x8f)?|\x8d(?:\xef\xb8\x8f)?|\x90(?:\xef\xb8\x8f|\xf0\x9f\x8f[\xbb-\xbf])?|\x95(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x96(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xa5(?:\xef\xb8\x8f)?|\xa8(?:\xef\xb8\x8f)?|\xb1(?:\xef\xb8\x8f)?|\xb2(?:\xef\xb8\x8f)?|\xbc(?:\xef\xb8\x8f)?|\xa4)|\x97(?:\x82(?:\xef\xb8\x8f)?|\x83(?:\xef\xb8\x8f)?|\x84(?:\xef\xb8\x8f)?|\x91(?:\xef\xb8\x8f)?|\x92(?:\xef\xb8\x8f)?|\x93(?:\xef\xb8\x8f)?|\x9c(?:\xef\xb8\x8f)?|\x9d(?:\xef\xb8\x8f)?|\x9e(?:\xef\xb8\x8f)?|\xa1(?:\xef\xb8\x8f)?|\xa3(?:\xef\xb8\x8f)?|\xa8(?:\xef\xb8\x8f)?|\xaf(?:\xef\xb8\x8f)?|\xb3(?:\xef\xb8\x8f)?|\xba(?:\xef\xb8\x8f)?|[\xbb-\xbf])|\x98(?:\xae(?:\xe2\x80\x8d\xf0\x9f\x92\xa8)?|\xb5(?:\xe2\x80\x8d\xf0\x9f\x92\xab)?|\xb6(?:\xe2\x80\x8d\xf0\x9f\x8c\xab(?:\xef\xb8\x8f)?)?|[\x80-\xad\xaf-\xb4\xb7-\xbf])|\x99(?:\x82(?:\xe2\x80\x8d\xe2\x86(?:\x94(?:\xef\xb8\x8f)?|\x95(?:\xef\xb8\x8f)?))?|\x85(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x86(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x87(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8b(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8c(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8d(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8e(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8f(?:\xf0\x9f\x8f[\xbb-\xbf])?|[\x80-\x81\x83-\x84\x88-\x8a])|\x9a(?:\xa3(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb4(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb5(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb6(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?))?|[\x80-\xa2\xa4-\xb3\xb7-\xbf])|\x9b(?:\x80(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8b(?:\xef\xb8\x8f)?|\x8c(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8d(?:\xef\xb8\x8f)?|\x8e(?:\xef\xb8\x8f)?|\x8f(?:\xef\xb8\x8f)?|\xa0(?:\xef\xb8\x8f)?|\xa1(?:\xef\xb8\x8f)?|\xa2(?:\xef\xb8\x8f)?|\xa3(?:\xef\xb8\x8f)?|\xa4(?:\xef\xb8\x8f)?|\xa5(?:\xef\xb8\x8f)?|\xa9(?:\xef\xb8\x8f)?|\xb0(?:\xef\xb8\x8f)?|\xb3(?:\xef\xb8\x8f)?|[\x81-\x85\x90-\x92\x95-\x97\x9c-\x9f\xab-\xac\xb4-\xbc])|\x9f[\xa0-\xab\xb0]|\xa4(?:\x8c(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x8f(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x98(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x99(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x9a(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x9b(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x9c(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x9d(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x9e(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x9f(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xa6(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb0(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb1(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb2(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb3(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb4(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb5(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb6(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb7(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb8(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb9(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|[\x8d-\x8e\x90-\x97\xa0-\xa5\xa7-\xaf\xba\xbf])|\xa5(?:\xb7(?:\xf0\x9f\x8f[\xbb-\xbf])?|[\x80-\x85\x87-\xb6\xb8-\xbf])|\xa6(?:\xb5(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb6(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb8(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xb9(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\xbb(?:\xf0\x9f\x8f[\xbb-\xbf])?|[\x80-\xb4\xb7\xba\xbc-\xbf])|\xa7(?:\x8d(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x8e(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2(?:\x99(?:\x80(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?|\x82(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?|\xef\xb8\x8f(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?)?)|\x9e\xa1(?:\xef\xb8\x8f)?))?))?|\x8f(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x91(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?)|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x84\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\xa7\x91|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3])|\xa7(?:\x91\xe2\x80\x8d\xf0\x9f\xa7\x92(?:\xe2\x80\x8d\xf0\x9f\xa7\x92)?|\x92(?:\xe2\x80\x8d\xf0\x9f\xa7\x92)?)))|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbc-\xbf]|\xa7\x91\xf0\x9f\x8f[\xbc-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbc-\xbf]|\xa7\x91\xf0\x9f\x8f[\xbc-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x84\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbc(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb\xbd-\xbf]|\xa7\x91\xf0\x9f\x8f[\xbb\xbd-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb\xbd-\xbf]|\xa7\x91\xf0\x9f\x8f[\xbb\xbd-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x84\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbd(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf]|\xa7\x91\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf]|\xa7\x91\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x84\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbe(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbd\xbf]|\xa7\x91\xf0\x9f\x8f[\xbb-\xbd\xbf])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbd\xbf]|\xa7\x91\xf0\x9f\x8f[\xbb-\xbd\xbf])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x84\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?|\xbf(?:\xe2\x80\x8d(?:\xe2(?:\x9a(?:\x95(?:\xef\xb8\x8f)?|\x96(?:\xef\xb8\x8f)?)|\x9c\x88(?:\xef\xb8\x8f)?|\x9d\xa4(?:\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbe]|\xa7\x91\xf0\x9f\x8f[\xbb-\xbe])|\xef\xb8\x8f\xe2\x80\x8d\xf0\x9f(?:\x92\x8b\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbe]|\xa7\x91\xf0\x9f\x8f[\xbb-\xbe])))|\xf0\x9f(?:\x8c\xbe|\x8d[\xb3\xbc]|\x8e[\x84\x93\xa4\xa8]|\x8f[\xab\xad]|\x92[\xbb-\xbc]|\x94[\xa7\xac]|\x9a[\x80\x92]|\xa4\x9d\xe2\x80\x8d\xf0\x9f\xa7\x91\xf0\x9f\x8f[\xbb-\xbf]|\xa6(?:\xaf(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbc(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|\xbd(?:\xe2\x80\x8d\xe2\x9e\xa1(?:\xef\xb8\x8f)?)?|[\xb0-\xb3]))))?))?|\x92(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x93(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x94(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x95(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x96(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x97(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x98(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x99(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x9a(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x9b(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x9c(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x9d(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?)|\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbc(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbd(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbe(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\xbf(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?))?|\x9e(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|\x9f(?:\xe2\x80\x8d\xe2\x99(?:\x80(?:\xef\xb8\x8f)?|\x82(?:\xef\xb8\x8f)?))?|[\x80-\x8c\x90\xa0-\xbf])|\xa9[\xb0-\xbc]|\xaa[\x80-\x89\x8f-\xbf]|\xab(?:\x83(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x84(?:\xf0\x9f\x8f[\xbb-\xbf])?|\x85(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb0(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb1(?:\xf0\x9f\x8f(?:\xbb(?:\xe2\x80\x8d\xf0\x9f\xab\xb2\xf0\x9f\x8f[\xbc-\xbf])?|\xbc(?:\xe2\x80\x8d\xf0\x9f\xab\xb2\xf0\x9f\x8f[\xbb\xbd-\xbf])?|\xbd(?:\xe2\x80\x8d\xf0\x9f\xab\xb2\xf0\x9f\x8f[\xbb-\xbc\xbe-\xbf])?|\xbe(?:\xe2\x80\x8d\xf0\x9f\xab\xb2\xf0\x9f\x8f[\xbb-\xbd\xbf])?|\xbf(?:\xe2\x80\x8d\xf0\x9f\xab\xb2\xf0\x9f\x8f[\xbb-\xbe])?))?|\xb2(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb3(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb4(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb5(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb6(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb7(?:\xf0\x9f\x8f[\xbb-\xbf])?|\xb8(?:\xf0\x9f\x8f[\xbb-\xbf])?|[\x80-\x82\x86\x8e-\x9c\x9f-\xa9])))"
@@ -0,0 +1,69 @@
+"""Library API: generators over cleaned text and scan results, for use in-process."""
+
+from collections.abc import Iterable, Iterator
+
+from .files import ScanFilters
+from .regions import RegionRules
+from .scanner import ScanOptions, ScanResult, _clean_chunks, _iter_scan_results
+
+
+def clean_stream(
+    chunks: Iterable[str], exclude: list[str] | None = None, exclude_task_lists: bool = False
+) -> Iterator[str]:
+    """Remove emojis from text arriving in chunks, yielding cleaned text as soon as it is safe.
+
+    Nothing is buffered beyond what is needed to see a whole emoji sequence,
+    or, with ``exclude_task_lists``, a whole line. The cleaned chunks join up
+    to exactly what :func:`rmoji.emoji.remove_emojis` returns for the whole text.
+
+    Parameters
+    ----------
+    chunks : Iterable[str]
+        Consecutive pieces of the text, such as tokens from a model or lines of a log.
+    exclude : list[str] | None, optional
+        Emojis to keep; by default all emojis are removed.
+    exclude_task_lists : bool, optional
+        If True, leave markdown task list lines such as ``- [x] done`` untouched.
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the cleaned text.
+
+    Examples
+    --------
+    >>> "".join(clean_stream(["Ship it 🚀", "🎉 now"]))
+    'Ship it  now'
+    """
+    yield from _clean_chunks(chunks, exclude, RegionRules(task_lists=exclude_task_lists))
+
+
+def scan_paths(
+    paths: str | Iterable[str], filters: ScanFilters | None = None, options: ScanOptions | None = None
+) -> Iterator[ScanResult]:
+    """Scan files and directories for emojis, yielding each file's result as it is found.
+
+    Parameters
+    ----------
+    paths : str | Iterable[str]
+        A file or directory, or several, scanned one after another.
+    filters : ScanFilters | None, optional
+        Depth, size, glob and type limits, as for ``rmoji scan``.
+    options : ScanOptions | None, optional
+        Engine, worker count, index and location settings.
+
+    Yields
+    ------
+    ScanResult
+        The result for each file containing emojis, in the order the search
+        finishes with them. Unreadable files have ``occurrences`` of -1.
+
+    Raises
+    ------
+    FileNotFoundError
+        If a path does not exist.
+    rmoji.scanner.ScanError
+        If ripgrep fails.
+    """
+    for path in [paths] if isinstance(paths, str) else paths:
+        yield from _iter_scan_results(path, filters, options)
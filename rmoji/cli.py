@@ -1,20 +1,216 @@
 """CLI commands for rmoji."""
 
+import codecs
+import functools
+import itertools
+import os
 import re
-from pathlib import Path
+import sys
+from collections import Counter
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, cast
 
-import emoji
 import typer
-from iterfzf import iterfzf
 from rich import print
 
-from .constants import BLACKLIST
-from .emoji import extract_emojis, remove_emojis
-from .files import get_file_list
-from .scanner import _display_scan_results, _nuke_file, _scan_for_emojis
+from .api import clean_stream
+from .emoji import _excluded, extract_emojis
+from .files import (
+    FILE_TYPES,
+    BinaryFileError,
+    FsyncMode,
+    ScanFilters,
+    SyncBatch,
+    atomic_write_text,
+    get_file_list,
+    read_text,
+)
+from .git import Changes, GitError, LineRanges, diff_changes
+from .matcher import emoji_sequences
+from .regions import RegionRules
+from .report import OutputFormat, RecordWriter
+from .scanner import (
+    Engine,
+    ScanError,
+    ScanOptions,
+    ScanResult,
+    _BatchedPrinter,
+    _clean_content,
+    _describe_change,
+    _display_histogram,
+    _display_scan_results,
+    _file_targets,
+    _is_streamed,
+    _iter_changed_scan_results,
+    _iter_scan_results,
+    _mapped_emojis,
+    _nuke_files,
+    _nuke_large_file,
+    _preview_target,
+    _run_file_tasks,
+    _stream_scan_results,
+    _summarize_scan_results,
+    _total_histogram,
+)
+
+if TYPE_CHECKING:
+    import io
+
+    from .watch import FileChange
 
 app = typer.Typer()
 
+_STAGED_OPTION = typer.Option(False, "--staged", help="Only consider files with staged changes.")
+_SINCE_OPTION = typer.Option(
+    None, "--since", metavar="REF", help="Only consider files changed since this git revision."
+)
+_HUNKS_ONLY_OPTION = typer.Option(
+    False,
+    "--hunks-only",
+    help="Only consider changed lines. Without --staged or --since, unstaged changes are used.",
+)
+_FORMAT_OPTION = typer.Option(
+    OutputFormat.TABLE,
+    "--format",
+    help="Output format: a Rich table, or JSON Lines or CSV records written straight to stdout.",
+)
+_QUIET_OPTION = typer.Option(False, "--quiet", "-q", help="Only print the summary, not each file.")
+_SIZE_SUFFIXES = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+_PARTIALLY_STAGED = "has unstaged changes; stage or stash them before nuking with --staged"
+# filter reads stdin in blocks of at most this many bytes, writing out each as it arrives.
+_FILTER_READ_SIZE = 64 * 1024
+
+
+def _parse_size(value: str) -> int:
+    """Parse a ripgrep-style size such as ``512``, ``100K``, ``10M`` or ``2G`` into bytes."""
+    match = re.fullmatch(r"(\d+)([KMG]?)", value.strip().upper())
+    if not match:
+        msg = "expected a size like 512, 100K, 10M or 2G"
+        raise typer.BadParameter(msg)
+    return int(match[1]) * _SIZE_SUFFIXES[match[2]]
+
+
+def _parse_file_type(value: str) -> str:
+    """Check a ``--type`` value against the known file types."""
+    if value not in FILE_TYPES:
+        msg = f"unknown file type, choose from: {', '.join(sorted(FILE_TYPES))}"
+        raise typer.BadParameter(msg)
+    return value
+
+
+def _parse_region_pattern(value: str) -> str:
+    """Check that a ``--protect`` value is a valid regex."""
+    try:
+        re.compile(value)
+    except re.error as e:
+        msg = f"invalid regex: {e}"
+        raise typer.BadParameter(msg) from e
+    return value
+
+
+_ONLY_COMMENTS_OPTION = typer.Option(
+    False,
+    "--only-comments",
+    help="Only remove emojis from comments. Files of an unknown type are left alone.",
+)
+_SKIP_CODE_FENCES_OPTION = typer.Option(
+    False, "--skip-code-fences", help="Do not remove emojis from fenced code blocks or inline code."
+)
+_SKIP_STRINGS_OPTION = typer.Option(False, "--skip-strings", help="Do not remove emojis from string literals.")
+_PROTECT_OPTION = typer.Option(
+    None,
+    "--protect",
+    metavar="REGEX",
+    parser=_parse_region_pattern,
+    help="Do not remove emojis from text matching this regex (multiline mode). Repeatable.",
+)
+_MAX_FILESIZE_OPTION = typer.Option(
+    None,
+    "--max-filesize",
+    metavar="SIZE",
+    parser=_parse_size,
+    help="Skip files larger than SIZE bytes; K, M and G suffixes are accepted.",
+)
+_GLOB_OPTION = typer.Option(
+    None,
+    "--glob",
+    "-g",
+    help="Only scan files matching this gitignore-style glob; prefix with ! to exclude. Repeatable.",
+)
+_IGLOB_OPTION = typer.Option(None, "--iglob", help="Like --glob, but case-insensitive. Repeatable.")
+_TYPE_OPTION = typer.Option(
+    None,
+    "--type",
+    "-t",
+    metavar="TYPE",
+    parser=_parse_file_type,
+    help=f"Only scan files of this type ({', '.join(sorted(FILE_TYPES))}). Repeatable.",
+)
+
+_HIDDEN_OPTION = typer.Option(
+    False, "--hidden", help="Also scan hidden files and directories, whose names start with a dot."
+)
+
+
+def _scan_filters(
+    depth: int,
+    max_filesize: int | None,
+    globs: list[str] | None,
+    iglobs: list[str] | None,
+    types: list[str] | None,
+    hidden: bool = False,
+) -> ScanFilters:
+    """Bundle the file selection options shared by scan and nuke."""
+    return ScanFilters(depth, max_filesize, tuple(globs or ()), tuple(iglobs or ()), tuple(types or ()), hidden)
+
+
+def _region_rules(
+    exclude_task_lists: bool,
+    only_comments: bool,
+    skip_code_fences: bool,
+    skip_strings: bool,
+    protect: list[str] | None,
+) -> RegionRules:
+    """Bundle the options choosing which regions of a file removal leaves alone."""
+    return RegionRules(exclude_task_lists, skip_code_fences, skip_strings, only_comments, tuple(protect or ()))
+
+
+def _git_changes(path: str, staged: bool, since: str | None, hunks_only: bool) -> Changes | None:
+    """Ask git for the changes to limit a scan to, if any git option was given."""
+    if not (staged or since or hunks_only):
+        return None
+    return diff_changes(path, staged=staged, since=since, hunks_only=hunks_only)
+
+
+def _scan_results(
+    path: str, filters: ScanFilters, options: ScanOptions, changes: Changes | None
+) -> Iterator[ScanResult]:
+    """Stream scan results for ``path``, limited to git changes when given."""
+    results: Iterator[ScanResult]
+    if changes is not None:
+        results = _iter_changed_scan_results(path, changes, filters, options)
+    else:
+        results = _iter_scan_results(path, filters, options)
+    return results
+
+
+def _staged_conflicts(file_paths: list[str], changes: Changes | None) -> list[str]:
+    """Return the files nuke must leave alone because their work tree differs from what is staged.
+
+    Staged line ranges do not apply to such files, and rewriting them would
+    not clean what is about to be committed anyway.
+    """
+    if changes is None or not changes.staged:
+        return []
+    return [file_path for file_path in file_paths if file_path in changes.partially_staged]
+
+
+def _nuke_scope(file_paths: list[str], changes: Changes | None) -> dict[str, LineRanges | None]:
+    """Map files to the only line ranges nuke may touch, None meaning the whole file."""
+    if changes is None or not changes.hunks_only:
+        return dict.fromkeys(file_paths)
+    return {file_path: changes.lines.get(file_path, []) for file_path in file_paths}
+
 
 @app.command()
 def interactive(
@@ -41,6 +237,8 @@ def interactive(
     exclude_task_lists : bool, optional
         If True, preserves emojis on markdown task list lines.
     """
+    from iterfzf import iterfzf
+
     files = get_file_list()
     if not files:
         typer.echo("No files found.")
@@ -51,32 +249,30 @@ def interactive(
         typer.echo("No file selected.")
         raise typer.Exit()
 
-    with Path(selected_file).open(encoding="utf-8") as f:
-        content = f.read()
+    try:
+        content, encoding = read_text(selected_file)
+    except (BinaryFileError, UnicodeDecodeError, OSError) as e:
+        print(f"[red]Error reading file {selected_file}: {e}[/red]")
+        raise typer.Exit(1) from e
 
     emojis = extract_emojis(content)
 
     if exclude:
-        emojis = list(filter(lambda x: x not in exclude, emojis))
+        excluded = _excluded(exclude)
+        emojis = [e for e in emojis if not excluded(e)]
 
     if not emojis:
         print(f"[yellow]No emojis found in {selected_file}.[/yellow]")
         raise typer.Exit()
     print(f"[green]Found {len(emojis)} emojis in {selected_file}.[/green]")
     if typer.confirm("Do you want to remove them?", abort=True):
-        if exclude_task_lists:
-            lines = content.splitlines(keepends=True)
-            new_lines = []
-            for line in lines:
-                if re.match(r"^\s*[-+*]\s*\[[ xX]\]", line):
-                    new_lines.append(line)
-                else:
-                    new_lines.append(remove_emojis(line, exclude=exclude or []))
-            cleaned_content = "".join(new_lines)
-        else:
-            cleaned_content = remove_emojis(content, exclude=exclude or [])
-        with Path(selected_file).open("w", encoding="utf-8") as f:
-            f.write(cleaned_content)
+        cleaned_content = _clean_content(
+            content, exclude, RegionRules(task_lists=exclude_task_lists), file_path=selected_file
+        )
+        if cleaned_content == content:
+            typer.echo("No changes needed.")
+            return
+        atomic_write_text(selected_file, cleaned_content, encoding=encoding, newline="")
         typer.echo("Emojis removed.")
 
 
@@ -99,6 +295,20 @@ def remove_emojis_from_file(
         "--exclude-task-lists",
         help="Do not remove emojis from markdown task list lines.",
     ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help="Show the per-file byte delta of the removal without writing anything.",
+    ),
+    diff: bool = typer.Option(
+        False,
+        "--diff",
+        help="Show a unified diff of the removal without writing anything (implies --dry-run).",
+    ),
+    only_comments: bool = _ONLY_COMMENTS_OPTION,
+    skip_code_fences: bool = _SKIP_CODE_FENCES_OPTION,
+    skip_strings: bool = _SKIP_STRINGS_OPTION,
+    protect: list[str] = _PROTECT_OPTION,
 ) -> None:
     """Remove emojis from the specified file.
 
@@ -115,35 +325,50 @@ def remove_emojis_from_file(
         If True, skip confirmation prompt.
     exclude_task_lists : bool, optional
         If True, preserves emojis on markdown task list lines.
+    dry_run : bool, optional
+        If True, report the byte delta instead of writing.
+    diff : bool, optional
+        If True, print a unified diff instead of writing.
+    only_comments : bool, optional
+        If True, only remove emojis from comments.
+    skip_code_fences : bool, optional
+        If True, preserves emojis in fenced code blocks and inline code.
+    skip_strings : bool, optional
+        If True, preserves emojis in string literals.
+    protect : list[str], optional
+        Regexes whose matches are preserved.
     """
+    rules = _region_rules(exclude_task_lists, only_comments, skip_code_fences, skip_strings, protect)
     try:
-        with Path(filename).open(encoding="utf-8") as f:
-            content = f.read()
-
-        emojis = extract_emojis(content)
+        # Files too large to hold in memory are counted from their memory map and cleaned in chunks.
+        streamed = not (dry_run or diff) and _is_streamed(filename, rules)
+        if streamed:
+            emojis = _mapped_emojis(filename)
+        else:
+            content, encoding = read_text(filename)
+            emojis = Counter(extract_emojis(content))
         if exclude:
-            emojis = [e for e in emojis if e not in exclude]
+            excluded = _excluded(exclude)
+            emojis = Counter({e: count for e, count in emojis.items() if not excluded(e)})
 
         if emojis:
-            print(f"[green]Found {len(emojis)} emojis in {filename}.[/green]")
+            print(f"[green]Found {emojis.total()} emojis in {filename}.[/green]")
             print(f"[yellow]{' '.join(emojis)}[/yellow]")
 
-            if yes or typer.confirm("Do you want to remove them?", abort=True):
+            if dry_run or diff:
+                cleaned_content = _clean_content(content, exclude, rules, file_path=filename)
+                unchanged = cleaned_content == content
+                typer.echo("No changes." if unchanged else _describe_change(filename, content, cleaned_content, diff))
+            elif yes or typer.confirm("Do you want to remove them?", abort=True):
                 if exclude_task_lists:
                     print("[yellow]exclude-task-lists is set: Excluding task lists from emoji removal[/yellow]")
-                    lines = content.splitlines(keepends=True)
-                    new_lines = []
-                    for line in lines:
-                        if re.match(r"^\s*[-+*]\s*\[[ xX]\]", line):
-                            new_lines.append(line)
-                        else:
-                            new_lines.append(remove_emojis(line, exclude=exclude or []))
-                    cleaned_content = "".join(new_lines)
+                if streamed:
+                    changed = _nuke_large_file(filename, exclude, rules, True, None)
                 else:
-                    cleaned_content = remove_emojis(content, exclude=exclude or [])
-                with Path(filename).open("w", encoding="utf-8") as f:
-                    f.write(cleaned_content)
-                typer.echo("Emojis removed.")
+                    cleaned_content = _clean_content(content, exclude, rules, file_path=filename)
+                    if changed := cleaned_content != content:
+                        atomic_write_text(filename, cleaned_content, encoding=encoding, newline="")
+                typer.echo("Emojis removed." if changed else "No changes needed.")
         else:
             print("[red]No emojis found in the file.[/red]")
 
@@ -158,11 +383,54 @@ def print_emojis() -> None:
     Outputs all emojis from the emoji database (excluding blacklisted ones)
     as a pipe-separated string, useful for piping to ripgrep or other tools.
     """
-    all_emojis = list(emoji.EMOJI_DATA.keys())  # type: ignore[attr-defined]
+    print("|".join(emoji_sequences()))
 
-    # remove the blacklist emojis
-    all_emojis = list(filter(lambda x: x not in BLACKLIST, all_emojis))
-    print("|".join(all_emojis))
+
+@app.command("filter")
+def filter_stream(
+    exclude: list[str] = typer.Option(
+        None,
+        "--exclude",
+        help="Emoji(s) to exclude from removal. Can be used multiple times.",
+    ),
+    exclude_task_lists: bool = typer.Option(
+        False,
+        "--exclude-task-lists",
+        help="Do not remove emojis from markdown task list lines.",
+    ),
+) -> None:
+    """Remove emojis from stdin and write the cleaned text to stdout.
+
+    Text is written out as soon as it arrives, holding back only an
+    unfinished emoji sequence or, with --exclude-task-lists, an unfinished
+    line. Bytes that are not valid UTF-8 are passed through unchanged.
+
+    Parameters
+    ----------
+    exclude : list[str], optional
+        Emoji(s) to preserve during removal.
+    exclude_task_lists : bool, optional
+        If True, preserves emojis on markdown task list lines.
+    """
+    stdout = sys.stdout.buffer
+    try:
+        for piece in clean_stream(_stdin_chunks(), exclude, exclude_task_lists):
+            stdout.write(piece.encode("utf-8", "surrogateescape"))
+            stdout.flush()
+    except BrokenPipeError:
+        # The reader went away, as with `| head`; there is nobody left to tell.
+        raise typer.Exit(1) from None
+
+
+def _stdin_chunks() -> Iterator[str]:
+    """Yield stdin as text as soon as each block arrives, keeping undecodable bytes as surrogates."""
+    stdin = cast("io.BufferedIOBase", sys.stdin.buffer)
+    decoder = codecs.getincrementaldecoder("utf-8")("surrogateescape")
+    while block := stdin.read1(_FILTER_READ_SIZE):
+        if text := decoder.decode(block):
+            yield text
+    if tail := decoder.decode(b"", final=True):
+        yield tail
 
 
 @app.command("scan")
@@ -170,14 +438,58 @@ def scan(
     depth: int = typer.Option(
         10,
         "-D",
-        help="Max depth to recurse through directories",
+        "--depth",
+        help="Max depth to recurse through directories; 1 only scans the top-level files.",
     ),
     path: str = typer.Argument(".", help="Path to scan for emojis"),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Print each file as soon as it has been scanned instead of sorting at the end.",
+    ),
+    engine: Engine = typer.Option(
+        Engine.AUTO,
+        "--engine",
+        help="Search backend: ripgrep, the built-in native scanner, or auto (ripgrep when installed).",
+    ),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        help="Worker processes for the native engine (default: CPU count).",
+    ),
+    use_index: bool = typer.Option(
+        False,
+        "--index",
+        help="Cache per-file results in .rmoji/ and only rescan files that changed since the last indexed scan.",
+    ),
+    staged: bool = _STAGED_OPTION,
+    since: str | None = _SINCE_OPTION,
+    hunks_only: bool = _HUNKS_ONLY_OPTION,
+    max_filesize: int | None = _MAX_FILESIZE_OPTION,
+    glob: list[str] = _GLOB_OPTION,
+    iglob: list[str] = _IGLOB_OPTION,
+    file_type: list[str] = _TYPE_OPTION,
+    hidden: bool = _HIDDEN_OPTION,
+    histogram: bool = typer.Option(
+        False,
+        "--histogram",
+        help="Show how often each emoji occurs, per file and across the whole scan.",
+    ),
+    locations: bool = typer.Option(
+        False,
+        "--locations",
+        help="Show the line and column of every emoji. Bypasses --index.",
+    ),
+    output_format: OutputFormat = _FORMAT_OPTION,
+    quiet: bool = _QUIET_OPTION,
 ) -> None:
     """Scan the specified directory for files containing emojis.
 
     Uses ripgrep to find files containing emojis and displays a summary
-    with emoji counts per file, sorted by count in descending order.
+    with the number of emoji occurrences per file, sorted by count in
+    descending order. With --stream, files are printed in the order they
+    finish instead.
 
     Parameters
     ----------
@@ -185,15 +497,174 @@ def scan(
         Maximum recursion depth for directory traversal.
     path : str, optional
         Directory path to scan, defaults to current directory.
+    stream : bool, optional
+        If True, print results incrementally and unsorted.
+    engine : Engine, optional
+        Search backend used for scanning.
+    jobs : int | None, optional
+        Worker processes for the native engine.
+    use_index : bool, optional
+        If True, only rescan files changed since the last indexed scan.
+    staged : bool, optional
+        If True, only scan files with staged changes.
+    since : str | None, optional
+        If given, only scan files changed since this git revision.
+    hunks_only : bool, optional
+        If True, only count emojis on changed lines.
+    max_filesize : int | None, optional
+        Skip files larger than this many bytes.
+    glob : list[str], optional
+        Globs selecting or, with a ``!`` prefix, excluding files.
+    iglob : list[str], optional
+        Case-insensitive globs.
+    file_type : list[str], optional
+        File types to limit the scan to.
+    hidden : bool, optional
+        If True, also scan hidden files and directories.
+    histogram : bool, optional
+        If True, show per-emoji counts for each file and for the whole scan.
+    locations : bool, optional
+        If True, show the line and column of every emoji.
+    output_format : OutputFormat, optional
+        Rich table, JSON Lines or CSV output.
+    quiet : bool, optional
+        If True, only print the summary.
     """
-    total_emojis, display_tuples = _scan_for_emojis(path, depth)
+    filters = _scan_filters(depth, max_filesize, glob, iglob, file_type, hidden)
+    options = ScanOptions(engine, jobs, use_index, locations)
+    try:
+        changes = _git_changes(path, staged, since, hunks_only)
+        results = _scan_results(path, filters, options, changes)
+        if output_format is OutputFormat.TABLE:
+            _print_scan_table(results, stream, quiet, histogram, locations)
+        else:
+            _write_scan_records(results, RecordWriter(output_format, locations), stream, quiet)
+    except (ScanError, GitError, OSError) as e:
+        print(f"[red]Error scanning {path}: {e}[/red]")
+        raise typer.Exit(1) from e
 
-    if not display_tuples:
+
+def _print_scan_table(
+    results: Iterator[ScanResult], stream: bool, quiet: bool, histogram: bool, locations: bool
+) -> None:
+    """Print scan results with Rich, sorted by count unless streaming, or only their summary."""
+    streamed = stream and not quiet
+    ordered: list[ScanResult] = []
+    if streamed:
+        totals, file_count = _stream_scan_results(results, histogram, locations)
+    else:
+        ordered = list(results) if quiet else _summarize_scan_results(results)[1]
+        totals, file_count = _total_histogram(ordered), len(ordered)
+
+    if not file_count:
         typer.echo("No emoji-ridden files found. Get some at https://www.chatgpt.com")
         return
 
-    print(f"[green]Found {total_emojis} emojis in {len(display_tuples)} files.[/green]")
-    _display_scan_results(display_tuples)
+    print(f"[green]Found {totals.total()} emojis in {file_count} files.[/green]")
+    if not streamed and not quiet:
+        _display_scan_results(ordered, histogram, locations)
+    if histogram:
+        print("\n[yellow]Emojis across all files:[/yellow]")
+        _display_histogram(totals)
+
+
+def _write_scan_records(results: Iterator[ScanResult], writer: RecordWriter, stream: bool, quiet: bool) -> None:
+    """Write scan results as JSON Lines or CSV records, sorted by count unless streaming.
+
+    JSON Lines end with a summary record; CSV only holds the summary when quiet.
+    """
+    if not (stream or quiet):
+        results = iter(_summarize_scan_results(results)[1])
+    totals: Counter[str] = Counter()
+    file_count = errors = 0
+    for result in results:
+        if result.occurrences == -1:
+            errors += 1
+        else:
+            file_count += 1
+            totals.update(result.emojis)
+        if not quiet:
+            writer.scan_result(result)
+    if quiet or writer.output_format is OutputFormat.JSONL:
+        writer.summary(file_count, totals, errors)
+
+
+def _run_nuke(
+    targets: dict[str, str],
+    exclude: list[str] | None,
+    rules: RegionRules,
+    jobs: int | None,
+    fsync: FsyncMode,
+    changes: Changes | None = None,
+    writer: RecordWriter | None = None,
+    quiet: bool = False,
+) -> tuple[int, int]:
+    """Remove emojis from every target file, printing progress in batches.
+
+    With a ``writer`` each file's outcome is written as a record instead,
+    and with ``quiet`` progress is not reported at all.
+
+    Returns
+    -------
+    tuple[int, int]
+        The number of files processed successfully and the number that failed.
+    """
+    success_count = error_count = 0
+    output = _BatchedPrinter()
+    conflicts = _staged_conflicts(list(targets), changes)
+    results = itertools.chain(
+        ((file_path, GitError(_PARTIALLY_STAGED)) for file_path in conflicts),
+        _nuke_files(
+            _nuke_scope([file_path for file_path in targets if file_path not in conflicts], changes),
+            exclude,
+            rules,
+            jobs or os.cpu_count() or 1,
+            fsync=fsync,
+        ),
+    )
+
+    with SyncBatch() as batch:
+        for file_path, error in results:
+            if error is None:
+                success_count += 1
+                if fsync is FsyncMode.DIR:
+                    batch.add(file_path)
+            else:
+                error_count += 1
+            if quiet:
+                continue
+            if writer is not None:
+                writer.nuke_result(targets[file_path], None if error is None else str(error))
+            elif error is None:
+                output.add(f"[green][/green] [cyan]{targets[file_path]}[/cyan]")
+            else:
+                output.add(f"[red][/red] [cyan]{targets[file_path]}[/cyan] - {error}")
+    output.flush()
+    return success_count, error_count
+
+
+def _preview_nuke(
+    file_paths: list[str],
+    exclude: list[str] | None,
+    rules: RegionRules,
+    jobs: int | None,
+    diff: bool,
+    changes: Changes | None = None,
+) -> None:
+    """Print what nuke would change in each file without writing anything."""
+    task = functools.partial(_preview_target, exclude=exclude, rules=rules, diff=diff)
+    conflicts = _staged_conflicts(file_paths, changes)
+    for file_path in conflicts:
+        print(f"[red]Skipping {file_path}: {_PARTIALLY_STAGED}[/red]")
+    targets = _file_targets(_nuke_scope([p for p in file_paths if p not in conflicts], changes))
+    changed = 0
+    for (file_path, _), preview in _run_file_tasks(task, targets, jobs or os.cpu_count() or 1):
+        if isinstance(preview, Exception):
+            print(f"[red]Error reading file {file_path}: {preview}[/red]")
+        elif preview:
+            changed += 1
+            typer.echo(preview)
+    print(f"\n[yellow]Dry run: {changed} files would change.[/yellow]")
 
 
 @app.command("nuke")
@@ -201,7 +672,8 @@ def nuke(
     depth: int = typer.Option(
         10,
         "-D",
-        help="Max depth to recurse through directories",
+        "--depth",
+        help="Max depth to recurse through directories; 1 only scans the top-level files.",
     ),
     path: str = typer.Argument(".", help="Path to scan and nuke emojis from"),
     exclude: list[str] = typer.Option(
@@ -220,6 +692,51 @@ def nuke(
         "--exclude-task-lists",
         help="Do not remove emojis from markdown task list lines.",
     ),
+    engine: Engine = typer.Option(
+        Engine.AUTO,
+        "--engine",
+        help="Search backend: ripgrep, the built-in native scanner, or auto (ripgrep when installed).",
+    ),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        help="Worker processes for removal and the native scan engine (default: CPU count).",
+    ),
+    use_index: bool = typer.Option(
+        False,
+        "--index",
+        help="Cache per-file results in .rmoji/ and only rescan files that changed since the last indexed scan.",
+    ),
+    fsync: FsyncMode = typer.Option(
+        FsyncMode.DIR,
+        "--fsync",
+        help="Durability of rewrites: fsync each file and directory, each file plus each directory once, or none.",
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help="Show the per-file byte delta of the removal without writing anything.",
+    ),
+    diff: bool = typer.Option(
+        False,
+        "--diff",
+        help="Show a unified diff of the removal without writing anything (implies --dry-run).",
+    ),
+    staged: bool = _STAGED_OPTION,
+    since: str | None = _SINCE_OPTION,
+    hunks_only: bool = _HUNKS_ONLY_OPTION,
+    max_filesize: int | None = _MAX_FILESIZE_OPTION,
+    glob: list[str] = _GLOB_OPTION,
+    iglob: list[str] = _IGLOB_OPTION,
+    file_type: list[str] = _TYPE_OPTION,
+    hidden: bool = _HIDDEN_OPTION,
+    output_format: OutputFormat = _FORMAT_OPTION,
+    quiet: bool = _QUIET_OPTION,
+    only_comments: bool = _ONLY_COMMENTS_OPTION,
+    skip_code_fences: bool = _SKIP_CODE_FENCES_OPTION,
+    skip_strings: bool = _SKIP_STRINGS_OPTION,
+    protect: list[str] = _PROTECT_OPTION,
 ) -> None:
     """Scan directory and remove all emojis from all files.
 
@@ -238,51 +755,290 @@ def nuke(
         If True, skip confirmation prompt.
     exclude_task_lists : bool, optional
         If True, preserves emojis on markdown task list lines.
+    engine : Engine, optional
+        Search backend used for scanning.
+    jobs : int | None, optional
+        Worker processes for removal and the native scan engine.
+    use_index : bool, optional
+        If True, only rescan files changed since the last indexed scan.
+    fsync : FsyncMode, optional
+        How rewritten files are made durable.
+    dry_run : bool, optional
+        If True, report each file's byte delta instead of writing.
+    diff : bool, optional
+        If True, print unified diffs instead of writing.
+    staged : bool, optional
+        If True, only nuke files with staged changes.
+    since : str | None, optional
+        If given, only nuke files changed since this git revision.
+    hunks_only : bool, optional
+        If True, only remove emojis from changed lines.
+    max_filesize : int | None, optional
+        Skip files larger than this many bytes.
+    glob : list[str], optional
+        Globs selecting or, with a ``!`` prefix, excluding files.
+    iglob : list[str], optional
+        Case-insensitive globs.
+    file_type : list[str], optional
+        File types to limit the scan to.
+    hidden : bool, optional
+        If True, also scan hidden files and directories.
+    output_format : OutputFormat, optional
+        Rich output, or JSON Lines or CSV records of each file's outcome.
+    quiet : bool, optional
+        If True, only print the summary.
+    only_comments : bool, optional
+        If True, only remove emojis from comments.
+    skip_code_fences : bool, optional
+        If True, preserves emojis in fenced code blocks and inline code.
+    skip_strings : bool, optional
+        If True, preserves emojis in string literals.
+    protect : list[str], optional
+        Regexes whose matches are preserved.
     """
-    print(f"[yellow]Scanning {path} for emoji files...[/yellow]")
+    writer = _nuke_record_writer(output_format, dry_run or diff)
+    rules = _region_rules(exclude_task_lists, only_comments, skip_code_fences, skip_strings, protect)
+    filters = _scan_filters(depth, max_filesize, glob, iglob, file_type, hidden)
+    if writer is None:
+        print(f"[yellow]Scanning {path} for emoji files...[/yellow]")
 
-    total_emojis, display_tuples = _scan_for_emojis(path, depth)
+    try:
+        changes = _git_changes(path, staged, since, hunks_only)
+        total_emojis, display_tuples = _summarize_scan_results(
+            _scan_results(path, filters, ScanOptions(engine, jobs, use_index), changes)
+        )
+    except (ScanError, GitError, OSError) as e:
+        print(f"[red]Error scanning {path}: {e}[/red]")
+        raise typer.Exit(1) from e
 
-    if not display_tuples:
-        typer.echo("No emoji-ridden files found. Nothing to nuke!")
+    if writer is not None:
+        if not display_tuples:
+            _write_nuke_summary(writer, display_tuples, 0, quiet)
+            return
+    elif not _announce_nuke(display_tuples, total_emojis, exclude, rules, quiet):
         return
 
-    # Show scan results and options
+    targets = {r.file_path: r.display_path for r in display_tuples if r.occurrences != -1}
+    if dry_run or diff:
+        _preview_nuke(list(targets), exclude, rules, jobs, diff, changes)
+        return
+
+    # Get confirmation; with records on stdout, prompt on stderr.
+    if not yes and not typer.confirm("NUKE ALL EMOJIS? This cannot be undone!", err=writer is not None):
+        if writer is None:
+            print("[yellow]Nuke cancelled.[/yellow]")
+        return
+
+    # Process all files
+    success_count, error_count = _run_nuke(targets, exclude, rules, jobs, fsync, changes, writer, quiet)
+    if writer is not None:
+        _write_nuke_summary(writer, display_tuples, success_count, quiet)
+        return
+    _print_nuke_summary(success_count, error_count + sum(1 for r in display_tuples if r.occurrences == -1))
+
+
+def _print_nuke_summary(success_count: int, error_count: int) -> None:
+    """Print how many files nuke cleaned and how many failed."""
+    print("\n[green] Nuke complete![/green]")
+    print(f"[green]Files processed: {success_count}[/green]")
+    if error_count > 0:
+        print(f"[red]Files with errors: {error_count}[/red]")
+
+
+def _nuke_record_writer(output_format: OutputFormat, preview: bool) -> RecordWriter | None:
+    """Return the record writer for nuke's output format, or None for the Rich table."""
+    if output_format is OutputFormat.TABLE:
+        return None
+    if preview:
+        msg = "--dry-run and --diff only support the table format."
+        raise typer.BadParameter(msg, param_hint="--format")
+    return RecordWriter(output_format)
+
+
+def _announce_nuke(
+    display_tuples: list[ScanResult],
+    total_emojis: int,
+    exclude: list[str] | None,
+    rules: RegionRules,
+    quiet: bool,
+) -> bool:
+    """Show what nuke found and is about to remove; with ``quiet`` the file list is left out.
+
+    Returns False, after saying so, if there is nothing to remove.
+    """
+    if not display_tuples:
+        typer.echo("No emoji-ridden files found. Nothing to nuke!")
+        return False
     print(f"[green]Found {total_emojis} emojis in {len(display_tuples)} files.[/green]")
-    _display_scan_results(display_tuples)
+    if not quiet:
+        _display_scan_results(display_tuples)
     print(f"\n[yellow]This will remove emojis from {len(display_tuples)} files.[/yellow]")
 
-    if exclude_task_lists:
+    if rules.task_lists:
         print("[yellow]exclude-task-lists is set: Task lists will be preserved[/yellow]")
     if exclude:
         print(f"[yellow]Excluding emojis: {' '.join(exclude)}[/yellow]")
+    return True
 
-    # Get confirmation
-    if not yes and not typer.confirm("NUKE ALL EMOJIS? This cannot be undone!"):
-        print("[yellow]Nuke cancelled.[/yellow]")
-        return
 
-    # Process all files
-    success_count = 0
-    error_count = sum(1 for count, _, _ in display_tuples if count == -1)
+def _write_nuke_summary(
+    writer: RecordWriter, display_tuples: list[ScanResult], success_count: int, quiet: bool
+) -> None:
+    """Finish nuke's records with the files that could not be scanned and a summary.
+
+    The summary counts cleaned files, the emojis found in them and errors,
+    whether from scanning or from removal.
+    """
+    unreadable = [r.display_path for r in display_tuples if r.occurrences == -1]
+    if not quiet:
+        for display_path in unreadable:
+            writer.nuke_result(display_path, "could not be read")
+    if quiet or writer.output_format is OutputFormat.JSONL:
+        error_count = len(display_tuples) - success_count
+        writer.summary(success_count, _total_histogram(display_tuples), error_count)
+
+
+@app.command("watch")
+def watch(
+    depth: int = typer.Option(
+        10,
+        "-D",
+        "--depth",
+        help="Max depth to recurse through directories; 1 only watches the top-level files.",
+    ),
+    path: str = typer.Argument(".", help="Directory to watch for emojis"),
+    clean: bool = typer.Option(False, "--clean", help="Remove emojis from files as soon as they change."),
+    exclude: list[str] = typer.Option(
+        None,
+        "--exclude",
+        help="Emoji(s) to exclude from removal with --clean. Can be used multiple times.",
+    ),
+    exclude_task_lists: bool = typer.Option(
+        False,
+        "--exclude-task-lists",
+        help="Do not remove emojis from markdown task list lines.",
+    ),
+    only_comments: bool = _ONLY_COMMENTS_OPTION,
+    skip_code_fences: bool = _SKIP_CODE_FENCES_OPTION,
+    skip_strings: bool = _SKIP_STRINGS_OPTION,
+    protect: list[str] = _PROTECT_OPTION,
+    max_filesize: int | None = _MAX_FILESIZE_OPTION,
+    glob: list[str] = _GLOB_OPTION,
+    iglob: list[str] = _IGLOB_OPTION,
+    file_type: list[str] = _TYPE_OPTION,
+    hidden: bool = _HIDDEN_OPTION,
+    socket_path: str | None = typer.Option(
+        None,
+        "--socket",
+        metavar="PATH",
+        help="Unix socket answering queries, defaults to .rmoji/watch.sock in the watched directory.",
+    ),
+    no_socket: bool = typer.Option(False, "--no-socket", help="Do not answer queries on a Unix socket."),
+    poll: bool = typer.Option(False, "--poll", help="Poll for changes even where inotify is available."),
+    interval: float = typer.Option(1.0, "--interval", min=0.05, help="Seconds between polls."),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        help="Worker processes for the initial scan (default: CPU count).",
+    ),
+    output_format: OutputFormat = _FORMAT_OPTION,
+) -> None:
+    """Watch a directory and report emojis in files as they change.
 
-    for count, emoji_file_display, file_path in display_tuples:
-        if count == -1:
-            continue
+    The whole tree is scanned once; after that only changed files are
+    rescanned, as reported by inotify or, elsewhere, by polling file stats.
+    Results stay in memory and are served over a Unix socket, one JSON
+    request per line such as ``{"command": "results", "path": "src"}``.
 
+    Parameters
+    ----------
+    depth : int, optional
+        Maximum recursion depth for directory traversal.
+    path : str, optional
+        Directory to watch, defaults to current directory.
+    clean : bool, optional
+        If True, remove emojis from files as soon as they change.
+    exclude : list[str], optional
+        Emoji(s) to preserve when cleaning.
+    exclude_task_lists : bool, optional
+        If True, preserves emojis on markdown task list lines.
+    only_comments : bool, optional
+        If True, only remove emojis from comments.
+    skip_code_fences : bool, optional
+        If True, preserves emojis in fenced code blocks and inline code.
+    skip_strings : bool, optional
+        If True, preserves emojis in string literals.
+    protect : list[str], optional
+        Regexes whose matches are preserved.
+    max_filesize : int | None, optional
+        Skip files larger than this many bytes.
+    glob : list[str], optional
+        Globs selecting or, with a ``!`` prefix, excluding files.
+    iglob : list[str], optional
+        Case-insensitive globs.
+    file_type : list[str], optional
+        File types to limit watching to.
+    hidden : bool, optional
+        If True, also watch hidden files and directories.
+    socket_path : str | None, optional
+        Where to answer queries.
+    no_socket : bool, optional
+        If True, do not answer queries.
+    poll : bool, optional
+        If True, poll even where inotify is available.
+    interval : float, optional
+        Seconds between polls.
+    jobs : int | None, optional
+        Worker processes for the initial scan.
+    output_format : OutputFormat, optional
+        Rich output, or JSON Lines or CSV records of each change.
+    """
+    from .watch import Watcher, WatchOptions
+
+    rules = _region_rules(exclude_task_lists, only_comments, skip_code_fences, skip_strings, protect)
+    options = WatchOptions(clean, tuple(exclude or ()), rules, poll, interval, jobs)
+    writer = None if output_format is OutputFormat.TABLE else RecordWriter(output_format)
+    with Watcher(path, _scan_filters(depth, max_filesize, glob, iglob, file_type, hidden), options) as watcher:
         try:
-            _nuke_file(file_path, exclude, exclude_task_lists)
-            success_count += 1
-            print(f"[green][/green] [cyan]{emoji_file_display}[/cyan]")
-        except Exception as e:
-            error_count += 1
-            print(f"[red][/red] [cyan]{emoji_file_display}[/cyan] - {e}")
-
-    # Summary
-    print("\n[green] Nuke complete![/green]")
-    print(f"[green]Files processed: {success_count}[/green]")
-    if error_count > 0:
-        print(f"[red]Files with errors: {error_count}[/red]")
+            results = watcher.start()
+            listening = None if no_socket else watcher.serve(socket_path)
+        except OSError as e:
+            print(f"[red]Error watching {path}: {e}[/red]")
+            raise typer.Exit(1) from e
+        if writer is None:
+            total = sum(r.occurrences for r in results if r.occurrences > 0)
+            print(f"[green]Watching {watcher.file_count()} files with {watcher.backend}.[/green]")
+            print(f"[yellow]Found {total} emojis in {len(results)} files.[/yellow]")
+            if listening is not None:
+                print(f"[green]Answering queries on {listening}[/green]")
+        else:
+            for result in results:
+                writer.scan_result(result)
+            writer.out.flush()
+        try:
+            watcher.run(functools.partial(_report_change, writer=writer))
+        except KeyboardInterrupt:
+            if writer is None:
+                print("\n[yellow]Stopped watching.[/yellow]")
+
+
+def _report_change(change: "FileChange", writer: RecordWriter | None) -> None:
+    """Print one file whose emojis changed while watching, or write its records."""
+    result, removed = change
+    if writer is not None:
+        if removed:
+            writer.nuke_result(result.display_path, None)
+        writer.scan_result(result)
+        writer.out.flush()
+    elif removed:
+        print(f"[green]Removed {removed} emojis from {result.display_path}[/green]")
+    elif result.occurrences == -1:
+        print(f"[red]{result.display_path}: could not be read[/red]")
+    elif result.occurrences:
+        print(f"[yellow]{result.display_path}: {result.occurrences} emojis[/yellow]")
+    else:
+        print(f"[green]{result.display_path}: no emojis[/green]")
 
 
 if __name__ == "__main__":
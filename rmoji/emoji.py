@@ -1,8 +1,28 @@
 """Core emoji extraction and removal functions."""
 
+import functools
+import os
 import re
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
 
-from .constants import EMOJI_PATTERN
+from .matcher import emoji_bytes_regex, emoji_matcher, emoji_sequences
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor, ProcessPoolExecutor
+
+_VS16 = "\ufe0f".encode()
+_ZWJ = "\u200d".encode()
+_DEBRIS = frozenset("\ufe0f\u200d")
+# Stray joiners and selectors a stream carries over after the longest sequence.
+_DEBRIS_ALLOWANCE = 8
+# Documents shorter than this are cleaned on the event loop: shipping them to
+# a worker process costs more than removing their emojis.
+_INLINE_LIMIT = 32 * 1024
+# Documents in flight per worker process before the input is read any further.
+_PENDING_PER_WORKER = 4
 
 
 def extract_emojis(text: str) -> list[str]:
@@ -16,12 +36,37 @@ def extract_emojis(text: str) -> list[str]:
     Returns
     -------
     list[str]
-        List of emoji characters found in the text.
+        Every emoji sequence found in the text, in order, repeated as often as it occurs.
     """
-    result = EMOJI_PATTERN.findall(text)
-    if not result:
+    if text.isascii():
         return []
-    return list(map(str, set(result)))
+    data = text.encode("utf-8", "surrogatepass")
+    return [seq.decode("utf-8") for seq in _sequence_pattern().findall(data)]
+
+
+@functools.cache
+def _sequence_pattern() -> re.Pattern[bytes]:
+    """Compile a pattern matching one emoji sequence in UTF-8 bytes.
+
+    The group captures a single sequence from the matcher, longest first. Any
+    stray U+FE0F or dangling ZWJ right after it is matched too, but left out
+    of the group: it would be invisible debris once the sequence is gone. A
+    ZWJ joining two sequences that are not a known combination therefore goes
+    with the first one. Extraction and removal share this one pattern, so a
+    process only pays for compiling the large trie regex once.
+    """
+    return re.compile(b"(" + emoji_bytes_regex() + b")(?:" + _VS16 + b"|" + _ZWJ + b")*")
+
+
+def _base_sequence(sequence: bytes) -> bytes:
+    """Drop variation selectors, so ``❤`` and ``❤️`` compare equal."""
+    return sequence.replace(_VS16, b"")
+
+
+def _excluded(exclude: Iterable[str] | None) -> Callable[[str], bool]:
+    """Return a test for whether an emoji is one of ``exclude``, compared as :func:`remove_emojis` does."""
+    bases = {_base_sequence(emoji.encode("utf-8")) for emoji in exclude or ()}
+    return lambda emoji: _base_sequence(emoji.encode("utf-8")) in bases
 
 
 def remove_emojis(text: str, exclude: list[str] | None = None) -> str:
@@ -39,12 +84,194 @@ def remove_emojis(text: str, exclude: list[str] | None = None) -> str:
     str
         string with emojis removed
     """
-    if exclude is None:
-        exclude = []
+    if text.isascii():
+        return text
+    data = text.encode("utf-8", "surrogatepass")
+    kept = {base for emoji in exclude or () if (base := _base_sequence(emoji.encode("utf-8"))) in data}
+    if kept:
+        # Sequences land at odd indices, without their debris; put back the excluded ones.
+        pieces = _sequence_pattern().split(data)
+        keep = {seq for seq in set(pieces[1::2]) if _base_sequence(seq) in kept}
+        pieces[1::2] = [seq if seq in keep else b"" for seq in pieces[1::2]]
+        data = b"".join(pieces)
+    else:
+        data = _sequence_pattern().sub(b"", data)
+    return data.decode("utf-8", "surrogatepass")
+
+
+@functools.cache
+def _sequence_chars() -> frozenset[str]:
+    """Return every character that can belong to an emoji sequence or to the debris after one."""
+    return frozenset("".join(emoji_sequences())) | _DEBRIS
+
+
+@functools.cache
+def _carry_limit() -> int:
+    """Return the most text a stream carries over: the longest sequence plus some trailing debris."""
+    return max(map(len, emoji_sequences())) + _DEBRIS_ALLOWANCE
+
+
+def _split_safe(text: str) -> tuple[str, str]:
+    """Split where no emoji sequence can straddle the cut.
+
+    Usually that is after the last character no sequence contains: everything
+    from there on may be the start of a sequence that continues in the next
+    chunk, so it is carried over. The carry is capped at :func:`_carry_limit`,
+    so a long tail of characters that sequences may contain, such as digits
+    or a run of emojis, is cut between two sequences instead.
+    """
+    chars = _sequence_chars()
+    limit = len(text) - _carry_limit()
+    cut = len(text)
+    while cut and text[cut - 1] in chars:
+        if cut <= limit:
+            return _split_between_sequences(text, limit)
+        cut -= 1
+    return text[:cut], text[cut:]
+
+
+def _split_between_sequences(text: str, limit: int) -> tuple[str, str]:
+    """Split at ``limit``, or just before the emoji sequence covering it.
+
+    Matching starts from the beginning of ``text``, which is itself a safe
+    cut, so sequences such as pairs of regional indicators line up with how
+    the whole text would be matched.
+    """
+    cut = limit
+    for match in emoji_matcher().finditer(text):
+        if match.end() > limit:
+            cut = min(cut, match.start())
+            break
+    # A stray joiner or selector belongs with the sequence before it.
+    while cut < len(text) and text[cut] in _DEBRIS:
+        cut += 1
+    return text[:cut], text[cut:]
+
+
+def remove_emojis_stream(chunks: Iterable[str], exclude: list[str] | None = None) -> Iterator[str]:
+    """Remove emojis from text arriving in chunks, in bounded memory.
 
-    def emoji_replacer(match: re.Match[str]) -> str:
-        char = match.group(0)
-        return char if char in exclude else ""
+    Emoji sequences split across chunk boundaries, such as ZWJ sequences, are
+    held back until they are complete, so the output matches :func:`remove_emojis`
+    on the whole text.
+
+    Parameters
+    ----------
+    chunks : Iterable[str]
+        Consecutive pieces of the text, e.g. from reading a file in blocks.
+    exclude : list[str], optional
+        the list of emojis to exclude, by default all emojis are removed
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the text with emojis removed.
+    """
+    carry = ""
+    for chunk in chunks:
+        ready, carry = _split_safe(carry + chunk)
+        if ready:
+            yield remove_emojis(ready, exclude)
+    if carry:
+        yield remove_emojis(carry, exclude)
 
-    result: str = EMOJI_PATTERN.sub(emoji_replacer, text)
-    return result
+
+@functools.cache
+def _shared_pool() -> "ProcessPoolExecutor":
+    """Create the worker pool :func:`iter_clean_many` uses when given no executor."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor()
+
+
+async def _as_async(docs: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    """Iterate over plain and asynchronous iterables alike."""
+    if isinstance(docs, AsyncIterable):
+        async for doc in docs:
+            yield doc
+    else:
+        for doc in docs:
+            yield doc
+
+
+async def iter_clean_many(
+    docs: Iterable[str] | AsyncIterable[str],
+    exclude: list[str] | None = None,
+    executor: "Executor | None" = None,
+) -> AsyncIterator[str]:
+    """Remove emojis from many documents concurrently, yielding them in input order.
+
+    Small and pure ASCII documents are cleaned inline. Larger ones go to a
+    process pool, so they are cleaned in parallel without blocking the event
+    loop. Only a bounded window of documents is in flight: the next document
+    is not read from ``docs`` until the oldest one has been yielded, so a slow
+    consumer holds back a fast producer.
+
+    Parameters
+    ----------
+    docs : Iterable[str] | AsyncIterable[str]
+        The documents to clean.
+    exclude : list[str], optional
+        the list of emojis to exclude, by default all emojis are removed
+    executor : Executor | None, optional
+        Where to clean large documents; by default a process pool shared by
+        every call, with one worker per CPU.
+
+    Yields
+    ------
+    str
+        Each document with emojis removed, in the order of ``docs``.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    pool = executor or _shared_pool()
+    limit = (os.cpu_count() or 1) * _PENDING_PER_WORKER
+    window: deque[str | asyncio.Future[str]] = deque()
+    try:
+        async for doc in _as_async(docs):
+            if len(doc) < _INLINE_LIMIT or doc.isascii():
+                window.append(remove_emojis(doc, exclude))
+            else:
+                window.append(loop.run_in_executor(pool, remove_emojis, doc, exclude))
+            # Hand over whatever is finished at the front, waiting only once the window is full.
+            while window and (len(window) >= limit or isinstance(window[0], str) or window[0].done()):
+                yield await _result(window.popleft())
+        while window:
+            yield await _result(window.popleft())
+    finally:
+        for pending in window:
+            if not isinstance(pending, str):
+                pending.cancel()
+
+
+async def _result(item: "str | asyncio.Future[str]") -> str:
+    """Return a document cleaned inline, or wait for one cleaned by a worker."""
+    return item if isinstance(item, str) else await item
+
+
+async def clean_many(
+    docs: Iterable[str] | AsyncIterable[str],
+    exclude: list[str] | None = None,
+    executor: "Executor | None" = None,
+) -> list[str]:
+    """Remove emojis from many documents concurrently.
+
+    A batch form of :func:`remove_emojis` for use from asyncio; see
+    :func:`iter_clean_many` for how the work is spread out.
+
+    Parameters
+    ----------
+    docs : Iterable[str] | AsyncIterable[str]
+        The documents to clean.
+    exclude : list[str], optional
+        the list of emojis to exclude, by default all emojis are removed
+    executor : Executor | None, optional
+        Where to clean large documents; by default a shared process pool.
+
+    Returns
+    -------
+    list[str]
+        The documents with emojis removed, in the order of ``docs``.
+    """
+    return [doc async for doc in iter_clean_many(docs, exclude, executor)]
@@ -1,13 +1,206 @@
-"""File utilities for directory traversal and gitignore handling."""
+"""File utilities for directory traversal, gitignore handling and safe rewrites."""
 
+import codecs
+import contextlib
+import fnmatch
+import mmap
 import os
-from pathlib import Path
-from typing import Any
+import re
+import shutil
+import stat
+import subprocess
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from enum import StrEnum
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, NamedTuple, Self, TextIO
 
-import pathspec
+if TYPE_CHECKING:
+    import pathspec
 
+_SKIP_DIRS = frozenset({".git", ".rmoji"})
+# Per-directory ignore files, lowest precedence first, as ripgrep reads them.
+_IGNORE_FILES = (".gitignore", ".ignore", ".rgignore")
+# Suffix of the sibling temp files rewrites go through before replacing the target.
+TEMP_SUFFIX = ".rmoji-tmp"
 
-def _load_gitignore_spec(root: Path) -> pathspec.PathSpec | None:
+# A subset of ripgrep's built-in file types, so --type selects the same files with either engine.
+FILE_TYPES: dict[str, tuple[str, ...]] = {
+    "c": ("*.[chH]", "*.[chH].in", "*.cats"),
+    "cpp": ("*.[ChH]", "*.cc", "*.cpp", "*.cxx", "*.hh", "*.hpp", "*.hxx", "*.inl", "*.[ChH].in", "*.cc.in"),
+    "css": ("*.css", "*.scss"),
+    "go": ("*.go",),
+    "html": ("*.ejs", "*.htm", "*.html"),
+    "java": ("*.java", "*.jsp", "*.jspx", "*.properties"),
+    "js": ("*.cjs", "*.js", "*.jsx", "*.mjs", "*.vue"),
+    "json": ("*.json", "composer.lock", "*.sarif"),
+    "markdown": ("*.markdown", "*.md", "*.mdown", "*.mdwn", "*.mkd", "*.mkdn", "*.mdx"),
+    "md": ("*.markdown", "*.md", "*.mdown", "*.mdwn", "*.mkd", "*.mkdn", "*.mdx"),
+    "py": ("*.py", "*.pyi"),
+    "rst": ("*.rst",),
+    "rust": ("*.rs",),
+    "sh": ("*.bash", "*.bashrc", "*.sh", "*.zsh", ".bashrc", ".bash_profile", ".profile", ".zshrc"),
+    "toml": ("*.toml", "Cargo.lock"),
+    "ts": ("*.cts", "*.mts", "*.ts", "*.tsx"),
+    "txt": ("*.txt",),
+    "yaml": ("*.yaml", "*.yml"),
+}
+
+
+# Enough of a file to spot a BOM or the NUL bytes that mark it as binary.
+_SNIFF_SIZE = 8192
+# UTF-32 comes first because its little-endian BOM starts with UTF-16's.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+class BinaryFileError(ValueError):
+    """Raised when a file that looks binary is read as text."""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(f"{path} looks like a binary file")
+
+
+def sniff_encoding(head: bytes) -> str | None:
+    """Classify a file from its first block of bytes.
+
+    Parameters
+    ----------
+    head : bytes
+        The file's contents, or at least their first block. Only the first
+        block is examined.
+
+    Returns
+    -------
+    str | None
+        The encoding named by a byte order mark, None if the block contains
+        NUL bytes and the file is presumably binary, or UTF-8 otherwise.
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None if b"\0" in head[:_SNIFF_SIZE] else "utf-8"
+
+
+def detect_encoding(path: str | Path) -> str:
+    """Return the encoding :func:`read_text` would use for a file, reading only its first block.
+
+    Raises
+    ------
+    BinaryFileError
+        If the first block of the file contains NUL bytes.
+    """
+    with Path(path).open("rb") as f:
+        encoding = sniff_encoding(f.read(_SNIFF_SIZE))
+    if encoding is None:
+        raise BinaryFileError(path)
+    return encoding
+
+
+@contextlib.contextmanager
+def map_file(path: str | Path) -> Iterator[tuple[bytes | mmap.mmap, str | None]]:
+    """Memory-map a file read-only, without copying or decoding it.
+
+    Parameters
+    ----------
+    path : str | Path
+        The file to map.
+
+    Yields
+    ------
+    tuple[bytes | mmap.mmap, str | None]
+        The mapped contents (``b""`` for an empty file, which cannot be mapped)
+        and the encoding :func:`sniff_encoding` reports for them.
+    """
+    with Path(path).open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b"", "utf-8"
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped, sniff_encoding(mapped[:_SNIFF_SIZE])
+
+
+def read_text(path: str | Path, errors: str = "strict") -> tuple[str, str]:
+    """Read a text file in the encoding its BOM names, defaulting to UTF-8.
+
+    Binary files are rejected after reading a single block. Line endings are
+    left untouched and a BOM is kept as a leading U+FEFF, so writing the text
+    back with :func:`atomic_write_text` using the returned encoding and
+    ``newline=""`` reproduces the file byte for byte.
+
+    Parameters
+    ----------
+    path : str | Path
+        The file to read.
+    errors : str, optional
+        How undecodable bytes are handled, as for :meth:`bytes.decode`.
+
+    Returns
+    -------
+    tuple[str, str]
+        The text and the encoding it was read with.
+
+    Raises
+    ------
+    BinaryFileError
+        If the first block of the file contains NUL bytes.
+    UnicodeDecodeError
+        If the file is not valid in its encoding and ``errors`` is strict.
+    """
+    with Path(path).open("rb") as f:
+        head = f.read(_SNIFF_SIZE)
+        encoding = sniff_encoding(head)
+        if encoding is None:
+            raise BinaryFileError(path)
+        data = head + f.read()
+    return data.decode(encoding, errors), encoding
+
+
+class ScanFilters(NamedTuple):
+    """Which files a scan visits, applied alike by ripgrep and :func:`get_file_list`.
+
+    Attributes
+    ----------
+    max_depth : int | None
+        Maximum depth below the root; 1 only visits the root's own files.
+    max_filesize : int | None
+        Skip files larger than this many bytes.
+    globs : tuple[str, ...]
+        Gitignore-style globs relative to the root, overriding ignore files.
+        A leading ``!`` excludes matches; if any glob is not negated, only
+        files matching one are visited.
+    iglobs : tuple[str, ...]
+        Like ``globs``, but matched case-insensitively.
+    types : tuple[str, ...]
+        Only visit files of these :data:`FILE_TYPES`.
+    hidden : bool
+        If True, also visit hidden files and directories, whose names start
+        with a dot. Globs can select hidden files either way.
+    """
+
+    max_depth: int | None = None
+    max_filesize: int | None = None
+    globs: tuple[str, ...] = ()
+    iglobs: tuple[str, ...] = ()
+    types: tuple[str, ...] = ()
+    hidden: bool = False
+
+
+class FsyncMode(StrEnum):
+    """How rewritten files are made durable."""
+
+    FILE = "file"  # fsync every file and its directory
+    DIR = "dir"  # fsync every file, then each touched directory once per batch
+    NONE = "none"  # leave flushing to the operating system
+
+
+def _load_gitignore_spec(root: Path) -> "pathspec.PathSpec | None":
     """Load .gitignore patterns from the given root directory.
 
     Parameters
@@ -20,46 +213,452 @@ def _load_gitignore_spec(root: Path) -> pathspec.PathSpec | None:
     pathspec.PathSpec | None
         A PathSpec object if .gitignore exists, None otherwise.
     """
-    gitignore_path = root / ".gitignore"
-    if not gitignore_path.exists():
+    return _load_ignore_file(root / ".gitignore")
+
+
+def _load_ignore_file(path: Path) -> "pathspec.PathSpec | None":
+    """Compile a gitignore-style file, or return None if it does not exist."""
+    import pathspec
+
+    try:
+        with path.open(encoding="utf-8", errors="replace") as f:
+            return pathspec.PathSpec.from_lines("gitwildmatch", f)
+    except OSError:
+        return None
+
+
+def _find_git_dir(start: Path) -> tuple[Path, Path] | None:
+    """Find the work tree root and git directory containing ``start``.
+
+    Returns
+    -------
+    tuple[Path, Path] | None
+        The work tree root and its (common) git directory, or None outside a repository.
+    """
+    for directory in (start, *start.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            # Worktrees and submodules point at their git directory from a file.
+            content = dot_git.read_text(encoding="utf-8", errors="replace").strip()
+            git_dir = directory / content.removeprefix("gitdir:").strip()
+            commondir = git_dir / "commondir"
+            if commondir.is_file():
+                git_dir = git_dir / commondir.read_text(encoding="utf-8").strip()
+            return directory, git_dir
+    return None
+
+
+def _global_excludes_file(work_tree: Path) -> Path:
+    """Locate git's global excludes file: ``core.excludesFile`` or ``$XDG_CONFIG_HOME/git/ignore``."""
+    if git := shutil.which("git"):
+        result = subprocess.run(
+            [git, "config", "--path", "--get", "core.excludesFile"],
+            cwd=work_tree,
+            capture_output=True,
+            encoding="utf-8",
+            check=False,
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return Path(result.stdout.strip()).expanduser()
+    xdg = os.environ.get("XDG_CONFIG_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".config"
+    return base / "git" / "ignore"
+
+
+class IgnoreMatcher:
+    """Gitignore-style rules gathered from every level of a directory tree.
+
+    Rules come from nested ``.gitignore``, ``.ignore`` and ``.rgignore`` files
+    and, inside a git repository, from ``.git/info/exclude`` and the global
+    excludes file. As in ripgrep, deeper files override shallower ones,
+    ``.rgignore`` overrides ``.ignore``, which overrides ``.gitignore`` in the
+    same directory, and the last matching pattern wins.
+    Ignore files above ``root`` up to the repository root are honoured too.
+
+    Per-directory files are read lazily via :meth:`load_dir` as a walk reaches
+    each directory, so ignored subtrees are never read.
+
+    Parameters
+    ----------
+    root : Path
+        The resolved directory being walked.
+    """
+
+    def __init__(self, root: Path) -> None:
+        repo = _find_git_dir(root)
+        base = repo[0] if repo else root
+        self.prefix = PurePosixPath(*root.relative_to(base).parts)
+        self._dir_specs: dict[PurePosixPath, list[pathspec.PathSpec]] = {}
+        self._repo_specs: list[pathspec.PathSpec] = []
+        self._base = base
+
+        if repo:
+            work_tree, git_dir = repo
+            for path in (git_dir / "info" / "exclude", _global_excludes_file(work_tree)):
+                if spec := _load_ignore_file(path):
+                    self._repo_specs.append(spec)
+            for directory in reversed(self.prefix.parents):
+                self.load_dir(directory)
+
+    def load_dir(self, directory: PurePosixPath) -> None:
+        """Read the ignore files in ``directory``, given relative to the repository root."""
+        specs = [spec for name in _IGNORE_FILES if (spec := _load_ignore_file(self._base / directory / name))]
+        if specs:
+            self._dir_specs[directory] = specs[::-1]
+
+    def is_ignored(self, path: PurePosixPath, is_dir: bool = False) -> bool:
+        """Return True if ``path``, relative to the repository root, is ignored."""
+        return self.match(path, is_dir) is True
+
+    def match(self, path: PurePosixPath, is_dir: bool = False) -> bool | None:
+        """Return True if ``path`` is ignored, False if a negated pattern whitelists it, or None if no rule matches."""
+        target = path.as_posix() + ("/" if is_dir else "")
+        for directory in path.parents:
+            specs = self._dir_specs.get(directory)
+            if not specs:
+                continue
+            relative = target if directory.name == "" else target[len(directory.as_posix()) + 1 :]
+            for spec in specs:
+                include = spec.check_file(relative).include
+                if include is not None:
+                    return include
+        for spec in self._repo_specs:
+            include = spec.check_file(target).include
+            if include is not None:
+                return include
+        return None
+
+
+class _GlobOverrides:
+    """ripgrep-style ``--glob``/``--iglob`` overrides, which take precedence over ignore files."""
+
+    def __init__(self, globs: tuple[str, ...], iglobs: tuple[str, ...]) -> None:
+        # Later flags win in ripgrep, and case-insensitive globs come last.
+        self._specs = [(self._compile(g.lower() for g in iglobs), True), (self._compile(globs), False)]
+        self.has_whitelist = any(not g.startswith("!") for g in (*globs, *iglobs))
+
+    @staticmethod
+    def _compile(globs: Iterable[str]) -> "pathspec.PathSpec":
+        import pathspec
+
+        # Invert into gitignore terms: a plain glob whitelists and a negated one ignores.
+        return pathspec.PathSpec.from_lines("gitwildmatch", [g[1:] if g.startswith("!") else f"!{g}" for g in globs])
+
+    def match(self, path: PurePosixPath, is_dir: bool) -> bool | None:
+        """Return True if ``path`` is whitelisted, False if excluded, or None if no glob decides."""
+        target = path.as_posix() + ("/" if is_dir else "")
+        for spec, fold in self._specs:
+            include = spec.check_file(target.lower() if fold else target).include
+            if include is not None:
+                return not include
+        if self.has_whitelist and not is_dir:
+            return False
         return None
 
-    with gitignore_path.open(encoding="utf-8") as f:
-        return pathspec.PathSpec.from_lines("gitwildmatch", f)
 
+def _type_pattern(types: tuple[str, ...]) -> re.Pattern[str] | None:
+    """Compile the file name globs of the selected file types into one regex."""
+    if not types:
+        return None
+    globs = {glob for name in types for glob in FILE_TYPES[name]}
+    return re.compile("|".join(fnmatch.translate(glob) for glob in sorted(globs)))
+
+
+class _FileSelector:
+    """Decide which entries a walk visits, combining globs, ignore files, types and size."""
+
+    def __init__(self, root: Path, filters: ScanFilters) -> None:
+        self.root = root
+        self.filters = filters
+        self.ignore = IgnoreMatcher(root)
+        self.overrides = _GlobOverrides(filters.globs, filters.iglobs)
+        self.types = _type_pattern(filters.types)
+
+    def enter(self, rel_dir: PurePosixPath) -> None:
+        """Load the ignore files of a directory the walk has reached."""
+        self.ignore.load_dir(self.ignore.prefix / rel_dir)
+
+    def _skips(self, rel_path: PurePosixPath, is_dir: bool) -> bool:
+        """Tell whether an entry is ignored, or hidden and not whitelisted by an ignore file, as in ripgrep."""
+        ignored = self.ignore.match(self.ignore.prefix / rel_path, is_dir)
+        if ignored is None:
+            return not self.filters.hidden and rel_path.name.startswith(".")
+        return ignored
+
+    def keep_dir(self, rel_path: PurePosixPath) -> bool:
+        """Return True if the walk should descend into a directory."""
+        if rel_path.name in _SKIP_DIRS:
+            return False
+        override = self.overrides.match(rel_path, is_dir=True)
+        if override is not None:
+            return override
+        return not self._skips(rel_path, is_dir=True)
+
+    def keep_file(self, rel_path: PurePosixPath) -> bool:
+        """Return True if a file should be listed."""
+        override = self.overrides.match(rel_path, is_dir=False)
+        if override is False:
+            return False
+        if override is None:
+            if self._skips(rel_path, is_dir=False):
+                return False
+            if self.types and not self.types.match(rel_path.name):
+                return False
+        if self.filters.max_filesize is not None:
+            try:
+                return (self.root / rel_path).stat().st_size <= self.filters.max_filesize
+            except OSError:
+                return True
+        return True
 
-def get_file_list(root: str = ".") -> list[str] | list[Any]:
-    """Get a list of all files in the directory, respecting .gitignore patterns.
+
+def _walk(
+    root_path: Path, filters: ScanFilters, selector: _FileSelector, start: PurePosixPath | None = None
+) -> Iterator[tuple[PurePosixPath, list[str]]]:
+    """Walk the visible part of a tree, or of the subtree at ``start`` within it.
+
+    Yields
+    ------
+    tuple[PurePosixPath, list[str]]
+        Each visited directory, relative to ``root_path``, with the names of
+        the files in it that ``selector`` keeps.
+    """
+    for dirpath, dirnames, filenames in os.walk(root_path / (start or "")):
+        rel_dir = PurePosixPath(*Path(dirpath).relative_to(root_path).parts)
+        depth = len(rel_dir.parts)
+        if filters.max_depth is not None and depth >= filters.max_depth:
+            dirnames.clear()
+            continue
+        selector.enter(rel_dir)
+
+        # Filter out the .git directory, rmoji's own scan index and ignored trees
+        descend = filters.max_depth is None or depth + 1 < filters.max_depth
+        dirnames[:] = [d for d in dirnames if descend and selector.keep_dir(rel_dir / d)]
+
+        yield rel_dir, [filename for filename in filenames if selector.keep_file(rel_dir / filename)]
+
+
+def get_file_list(root: str = ".", filters: ScanFilters | None = None) -> list[str] | list[Any]:
+    """Get a list of all files in the directory, respecting ignore files.
+
+    Nested ``.gitignore``, ``.ignore`` and ``.rgignore`` files,
+    ``.git/info/exclude`` and the global excludes file are honoured, and
+    ignored directories are pruned without being descended into. With
+    ``filters``, hidden files and directories are skipped unless
+    ``filters.hidden`` is set, as ripgrep does; without, they are listed.
 
     Parameters
     ----------
     root : str
         The root directory to scan, defaults to current directory.
+    filters : ScanFilters | None, optional
+        Depth, size, glob, type and hidden-file limits, with the same meaning
+        as ripgrep's. Scans always pass them.
 
     Returns
     -------
     list[str]
-        List of file paths relative to root, excluding gitignored files.
+        List of file paths relative to root, excluding ignored files.
     """
+    filters = filters or ScanFilters(hidden=True)
     root_path = Path(root).resolve()
-    spec = _load_gitignore_spec(root_path)
+    selector = _FileSelector(root_path, filters)
 
     files: list[str] = []
-    for dirpath, dirnames, filenames in os.walk(root_path):
-        rel_dir = Path(dirpath).relative_to(root_path)
+    for rel_dir, filenames in _walk(root_path, filters, selector):
+        files.extend(str(Path(*rel_dir.parts, filename)) for filename in filenames)
+
+    return files
 
-        # Filter out .git directory
-        if ".git" in dirnames:
-            dirnames.remove(".git")
 
-        for filename in filenames:
-            rel_path = rel_dir / filename if str(rel_dir) != "." else Path(filename)
-            rel_path_str = str(rel_path)
+def select_files(root: str, file_paths: Iterable[str], filters: ScanFilters | None = None) -> list[str]:
+    """Keep the files a walk of ``root`` with ``filters`` would visit.
 
-            # Skip if matches gitignore patterns
-            if spec and spec.match_file(rel_path_str):
-                continue
+    This applies the same ignore files, globs, types, size and depth limits
+    as :func:`get_file_list` to files found some other way, such as from git.
 
-            files.append(rel_path_str)
+    Parameters
+    ----------
+    root : str
+        The directory the filters are relative to.
+    file_paths : Iterable[str]
+        Files under ``root``, as paths joined onto it.
+    filters : ScanFilters | None, optional
+        Depth, size, glob and type limits.
 
-    return files
+    Returns
+    -------
+    list[str]
+        The selected files, in their original order.
+    """
+    filters = filters or ScanFilters()
+    root_path = Path(root).absolute()
+    selector = _FileSelector(root_path.resolve(), filters)
+    entered: set[PurePosixPath] = set()
+
+    def visible(rel: PurePosixPath) -> bool:
+        if filters.max_depth is not None and len(rel.parts) > filters.max_depth:
+            return False
+        for rel_dir in reversed(rel.parents):
+            if rel_dir not in entered:
+                if rel_dir.parts and not selector.keep_dir(rel_dir):
+                    return False
+                selector.enter(rel_dir)
+                entered.add(rel_dir)
+        return selector.keep_file(rel)
+
+    return [
+        file_path
+        for file_path in file_paths
+        if visible(PurePosixPath(*Path(file_path).absolute().relative_to(root_path).parts))
+    ]
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Flush a directory entry so a rename into it survives a crash."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _copy_owner_and_mode(src: os.stat_result, dst: str) -> None:
+    """Give ``dst`` the permission bits and, where allowed, the ownership of ``src``."""
+    Path(dst).chmod(stat.S_IMODE(src.st_mode))
+    if hasattr(os, "chown") and (src.st_uid, src.st_gid) != (os.getuid(), os.getgid()):
+        with contextlib.suppress(PermissionError):
+            os.chown(dst, src.st_uid, src.st_gid)
+
+
+def atomic_rewrite(
+    path: str | Path,
+    write: Callable[[TextIO], bool],
+    encoding: str = "utf-8",
+    fsync: bool | FsyncMode = True,
+    newline: str | None = None,
+) -> bool:
+    """Replace a file's contents without ever leaving it truncated.
+
+    ``write`` fills a sibling temp file that inherits the target's mode and
+    ownership, which is then renamed over the target. Symlinks are followed,
+    so the link itself is preserved. Output can be written incrementally, so
+    the new contents never need to be held in memory at once.
+
+    Parameters
+    ----------
+    path : str | Path
+        The file to rewrite.
+    write : Callable[[TextIO], bool]
+        Writes the new contents to the temp file it is given, returning False
+        to abandon the rewrite and leave the original untouched.
+    encoding : str, optional
+        Encoding used to write the text, defaults to UTF-8.
+    fsync : bool | FsyncMode, optional
+        ``FsyncMode.FILE`` (or True) fsyncs the temp file before it replaces
+        the target and the directory afterwards. ``FsyncMode.DIR`` only
+        fsyncs the temp file, leaving the directory to a :class:`SyncBatch`.
+        ``FsyncMode.NONE`` (or False) fsyncs nothing.
+    newline : str | None, optional
+        Newline translation, as for :func:`open`. Pass ``""`` to write text
+        from :func:`read_text` with its line endings unchanged.
+
+    Returns
+    -------
+    bool
+        True if the file was replaced.
+    """
+    mode = fsync if isinstance(fsync, FsyncMode) else FsyncMode.FILE if fsync else FsyncMode.NONE
+    target = Path(os.path.realpath(path))
+    original = target.stat() if target.exists() else None
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=TEMP_SUFFIX)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline=newline) as f:
+            if not write(f):
+                Path(tmp).unlink()
+                return False
+            f.flush()
+            # The data must be on disk before the rename, or a crash could leave the target empty.
+            if mode is not FsyncMode.NONE:
+                os.fsync(f.fileno())
+        if original is not None:
+            _copy_owner_and_mode(original, tmp)
+        Path(tmp).replace(target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    if mode is FsyncMode.FILE:
+        _fsync_dir(target.parent)
+    return True
+
+
+def atomic_write_text(
+    path: str | Path,
+    text: str,
+    encoding: str = "utf-8",
+    fsync: bool | FsyncMode = True,
+    newline: str | None = None,
+) -> None:
+    """Replace a file's contents without ever leaving it truncated.
+
+    See :func:`atomic_rewrite`, which this wraps for text already in memory.
+
+    Parameters
+    ----------
+    path : str | Path
+        The file to rewrite.
+    text : str
+        The new contents.
+    encoding : str, optional
+        Encoding used to write the text, defaults to UTF-8.
+    fsync : bool | FsyncMode, optional
+        What to fsync, as for :func:`atomic_rewrite`.
+    newline : str | None, optional
+        Newline translation, as for :func:`open`. Pass ``""`` to write text
+        from :func:`read_text` with its line endings unchanged.
+    """
+
+    def write(f: TextIO) -> bool:
+        f.write(text)
+        return True
+
+    atomic_rewrite(path, write, encoding, fsync, newline)
+
+
+class SyncBatch:
+    """Make the renames of a batch of atomic rewrites durable at once.
+
+    Files written with ``atomic_write_text(..., fsync=FsyncMode.DIR)`` have
+    their data fsynced before they replace the original, so a crash leaves
+    each one either old or new, never truncated. They are registered with
+    :meth:`add`, and on :meth:`commit`, or when the context exits, each
+    touched directory is fsynced once to make the renames themselves durable.
+    """
+
+    def __init__(self) -> None:
+        self.directories: set[Path] = set()
+
+    def add(self, path: str | Path) -> None:
+        """Register a rewritten file whose rename still needs to be made durable."""
+        self.directories.add(Path(os.path.realpath(path)).parent)
+
+    def commit(self) -> None:
+        """Flush the directory entries of all registered rewrites to stable storage."""
+        for directory in sorted(self.directories):
+            _fsync_dir(directory)
+        self.directories.clear()
+
+    def __enter__(self) -> Self:
+        """Start collecting rewrites."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Commit whatever was written, even if the batch was interrupted."""
+        self.commit()
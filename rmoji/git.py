@@ -0,0 +1,179 @@
+"""Git integration for limiting scans and removals to changed files and lines."""
+
+import bisect
+import os
+import re
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+type LineRanges = list[tuple[int, int]]
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_QUOTED_ESCAPE_RE = re.compile(rb"\\([0-7]{3}|.)")
+_ESCAPES = {b"a": 7, b"b": 8, b"t": 9, b"n": 10, b"v": 11, b"f": 12, b"r": 13, b'"': 34, b"\\": 92}
+
+
+class GitError(Exception):
+    """Raised when git cannot report changes, e.g. outside a repository."""
+
+
+class Changes(NamedTuple):
+    """Files changed in git, with the line ranges added or modified in each.
+
+    Attributes
+    ----------
+    lines : dict[str, LineRanges]
+        Changed file paths (joined onto the scan root) mapped to inclusive,
+        1-based line ranges in the new version of each file.
+    hunks_only : bool
+        If True, only the changed line ranges should be scanned or cleaned.
+    staged : bool
+        If True, the line ranges refer to the staged contents of each file,
+        which :func:`read_staged` returns, rather than to the work tree.
+    partially_staged : frozenset[str]
+        With ``staged``, the changed files whose work tree differs from what
+        is staged, so the line ranges do not apply to the work tree copy.
+    """
+
+    lines: dict[str, LineRanges]
+    hunks_only: bool = False
+    staged: bool = False
+    partially_staged: frozenset[str] = frozenset()
+
+
+def _unquote(path: str) -> str:
+    """Undo git's C-style quoting of unusual file names."""
+    if not path.startswith('"'):
+        return path
+
+    def unescape(match: re.Match[bytes]) -> bytes:
+        code = match[1]
+        return bytes([int(code, 8) if code.isdigit() else _ESCAPES.get(code, code[0])])
+
+    raw = _QUOTED_ESCAPE_RE.sub(unescape, path[1:-1].encode("utf-8"))
+    return raw.decode("utf-8", errors="replace")
+
+
+def parse_unified_diff(diff: str) -> dict[str, LineRanges]:
+    """Extract changed line ranges per file from ``git diff -U0`` output.
+
+    Parameters
+    ----------
+    diff : str
+        Unified diff text produced with zero context lines.
+
+    Returns
+    -------
+    dict[str, LineRanges]
+        File paths (as named after ``+++ b/``) mapped to their changed line
+        ranges. Files with no added lines, such as binaries, map to an empty list.
+    """
+    changes: dict[str, LineRanges] = {}
+    ranges: LineRanges | None = None
+    # Lines left in the current hunk's body, which may themselves start with "+++ " or "@@".
+    body = 0
+    for line in diff.splitlines():
+        if body:
+            if not line.startswith("\\"):
+                body -= 1
+        elif line.startswith("+++ "):
+            target = line[4:]
+            ranges = None if target == "/dev/null" else changes.setdefault(_unquote(target)[2:], [])
+        elif line.startswith("diff --git "):
+            ranges = None
+        elif match := _HUNK_RE.match(line):
+            start, count = int(match[2]), int(match[3] or 1)
+            body = int(match[1] or 1) + count
+            if ranges is not None and count:
+                ranges.append((start, start + count - 1))
+    return changes
+
+
+def diff_changes(path: str, staged: bool = False, since: str | None = None, hunks_only: bool = False) -> Changes:
+    """Ask git which files and lines under ``path`` changed.
+
+    Parameters
+    ----------
+    path : str
+        File or directory inside a git work tree.
+    staged : bool, optional
+        If True, diff the index instead of the working tree.
+    since : str | None, optional
+        Revision to compare against. Defaults to the index for unstaged changes,
+        or to ``HEAD`` for staged changes.
+    hunks_only : bool, optional
+        Recorded on the result to limit work to the changed lines.
+
+    Returns
+    -------
+    Changes
+        Changed files joined onto ``path`` and their changed line ranges.
+
+    Raises
+    ------
+    GitError
+        If git fails, for example because ``path`` is not in a repository.
+    """
+    target = Path(path)
+    cwd, pathspec = (target, ".") if target.is_dir() else (target.parent, target.name)
+    command = ["-c", "core.quotePath=false", "diff", "-U0", "--no-color", "--no-ext-diff"]
+    command += ["--src-prefix=a/", "--dst-prefix=b/", "--relative", "--diff-filter=ACMR"]
+    if staged:
+        command.append("--cached")
+    if since:
+        command.append(since)
+    command += ["--", pathspec]
+
+    diff = _git(command, cwd).decode("utf-8", errors="replace")
+    lines = {str(cwd / name): ranges for name, ranges in parse_unified_diff(diff).items()}
+    if not staged:
+        return Changes(lines, hunks_only)
+    # Files with unstaged changes on top of staged ones: the work tree is not what will be committed.
+    unstaged = _git(["diff", "--name-only", "-z", "--relative", "--no-ext-diff", "--", pathspec], cwd)
+    names = os.fsdecode(unstaged).split("\0")
+    partially_staged = frozenset(str(cwd / name) for name in names if name) & lines.keys()
+    return Changes(lines, hunks_only, staged=True, partially_staged=partially_staged)
+
+
+def read_staged(file_path: str) -> bytes:
+    """Return the contents of a file as staged in the git index.
+
+    Parameters
+    ----------
+    file_path : str
+        A file inside a git work tree.
+
+    Returns
+    -------
+    bytes
+        The staged blob, exactly as it will be committed.
+
+    Raises
+    ------
+    GitError
+        If git fails, for example because the file is not in the index.
+    """
+    path = Path(file_path)
+    return _git(["show", f":./{path.name}"], path.parent)
+
+
+def _git(args: list[str], cwd: Path) -> bytes:
+    """Run a git command in ``cwd`` and return its output, raising :class:`GitError` if it fails."""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=False)
+    if result.returncode != 0:
+        raise GitError(result.stderr.decode("utf-8", errors="replace").strip())
+    return result.stdout
+
+
+def in_ranges(ranges: LineRanges) -> Callable[[int], bool]:
+    """Return a predicate telling whether a 1-based line number falls in ``ranges``."""
+    ordered = sorted(ranges)
+    starts = [start for start, _ in ordered]
+
+    def contains(line_number: int) -> bool:
+        i = bisect.bisect_right(starts, line_number) - 1
+        return i >= 0 and line_number <= ordered[i][1]
+
+    return contains
@@ -0,0 +1,153 @@
+"""Persistent per-file scan index for incremental rescans."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple, Self
+
+from .matcher import _cache_key
+
+INDEX_DIR = ".rmoji"
+INDEX_FILE = "index.sqlite"
+
+# Files modified this recently may change again within the filesystem's mtime
+# granularity, so their stat data is not trusted on the next scan.
+_RACY_WINDOW_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    counts TEXT NOT NULL
+);
+"""
+
+
+class _Entry(NamedTuple):
+    mtime_ns: int
+    size: int
+    digest: str
+    counts: Counter[str]
+
+
+def file_digest(data: bytes) -> str:
+    """Return the content hash stored in the index for a file's bytes."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ScanIndex:
+    """Per-file emoji counts cached by path, mtime, size and content hash.
+
+    The index lives in ``<root>/.rmoji/index.sqlite``. It is loaded into memory
+    when opened and written back in a single transaction on :meth:`close`.
+    Entries are discarded wholesale when the emoji matcher changes.
+
+    Parameters
+    ----------
+    root : str | Path
+        The directory whose files are indexed; paths are stored relative to it.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        db_dir = self.root / INDEX_DIR
+        db_dir.mkdir(exist_ok=True)
+        self._db = sqlite3.connect(db_dir / INDEX_FILE)
+        self._db.executescript(_SCHEMA)
+        self._entries: dict[str, _Entry] = {}
+        self._dirty: set[str] = set()
+        self._stale = False
+
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'matcher'").fetchone()
+        if row is None or row[0] != _cache_key():
+            self._stale = True
+            return
+        for path, mtime_ns, size, digest, counts in self._db.execute("SELECT * FROM files"):
+            self._entries[path] = _Entry(mtime_ns, size, digest, Counter(json.loads(counts)))
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.root)
+
+    def lookup(self, file_path: str, st: os.stat_result) -> Counter[str] | None:
+        """Return cached counts if the file's mtime and size are unchanged."""
+        entry = self._entries.get(self._key(file_path))
+        if entry is None or (entry.mtime_ns, entry.size) != (st.st_mtime_ns, st.st_size):
+            return None
+        return entry.counts
+
+    def lookup_content(self, file_path: str, st: os.stat_result) -> Counter[str] | None:
+        """Return cached counts if the file's content hash is unchanged despite new stat data.
+
+        This catches files that were touched or checked out again without
+        being modified; their stat data is refreshed for the next scan.
+        """
+        key = self._key(file_path)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        try:
+            digest = file_digest(Path(file_path).read_bytes())
+        except OSError:
+            return None
+        if digest != entry.digest:
+            return None
+        self._put(key, st, digest, entry.counts)
+        return entry.counts
+
+    def store(self, file_path: str, st: os.stat_result, digest: str, counts: Counter[str]) -> None:
+        """Record the counts for a freshly scanned file."""
+        self._put(self._key(file_path), st, digest, counts)
+
+    def _put(self, key: str, st: os.stat_result, digest: str, counts: Counter[str]) -> None:
+        mtime_ns = st.st_mtime_ns if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS else -1
+        self._entries[key] = _Entry(mtime_ns, st.st_size, digest, counts)
+        self._dirty.add(key)
+
+    def prune(self, file_paths: list[str]) -> None:
+        """Forget every file that is not in ``file_paths`` and no longer exists.
+
+        Files left out of a filtered scan keep their entries.
+        """
+        keep = {self._key(file_path) for file_path in file_paths}
+        for key in self._entries.keys() - keep:
+            if not (self.root / key).exists():
+                del self._entries[key]
+                self._dirty.add(key)
+
+    def close(self) -> None:
+        """Write changed entries back to disk and close the database."""
+        with self._db:
+            if self._stale:
+                self._db.execute("DELETE FROM files")
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('matcher', ?)", (_cache_key(),))
+            removed = self._dirty - self._entries.keys()
+            self._db.executemany("DELETE FROM files WHERE path = ?", [(key,) for key in removed])
+            rows = []
+            for key in self._dirty & self._entries.keys():
+                entry = self._entries[key]
+                rows.append(
+                    (key, entry.mtime_ns, entry.size, entry.digest, json.dumps(entry.counts, ensure_ascii=False))
+                )
+            self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+        self._db.close()
+
+    def __enter__(self) -> Self:
+        """Open the index for a scan."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Persist the index."""
+        self.close()
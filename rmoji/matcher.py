@@ -0,0 +1,259 @@
+"""Compiled emoji matcher shared by the scan, print and remove paths."""
+
+import functools
+import os
+import re
+from pathlib import Path
+
+from .constants import BLACKLIST, EMOJI_PATTERN
+
+type _Trie = dict[str, _Trie]
+
+# Bump when the rules selecting sequences change, so stale disk caches are ignored.
+_MATCHER_VERSION = "2"
+
+# Characters that must be escaped for both Python's ``re`` and ripgrep's Rust regex syntax.
+_META_CHARS = frozenset("\\.+*?()|[]{}^$#&-~")
+
+
+def _table_key() -> tuple[str, ...]:
+    """Identify the emoji data and rules the precomputed table must have been generated with."""
+    return (_MATCHER_VERSION, _installed_emoji_version(), *BLACKLIST)
+
+
+@functools.cache
+def _precomputed() -> dict[str, list[str] | str] | None:
+    """Return the matcher data shipped in :mod:`rmoji._emoji_table`, or None if it is stale.
+
+    The table stands in for ``emoji.EMOJI_DATA`` at runtime, so the ``emoji``
+    package itself is not imported; only its installed version is read from
+    package metadata. The table is stale when that version, the blacklist or
+    the selection rules changed without regenerating it.
+    """
+    from ._emoji_table import BYTES_REGEX, EMOJI_VERSION, KEY, REGEX, SEQUENCES
+
+    if _table_key() != KEY:
+        return None
+    return {"emoji_version": EMOJI_VERSION, "sequences": list(SEQUENCES), "regex": REGEX, "bytes_regex": BYTES_REGEX}
+
+
+def _installed_emoji_version() -> str:
+    """Return the installed ``emoji`` package version without importing it."""
+    from importlib import metadata
+
+    try:
+        return metadata.version("emoji")
+    except metadata.PackageNotFoundError:
+        import emoji
+
+        return str(emoji.__version__)
+
+
+def _cache_key() -> str:
+    """Return a key identifying the emoji set for the emoji version and blacklist."""
+    import hashlib
+
+    raw = "\0".join(_table_key())
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_dir() -> Path:
+    """Return the directory used to persist compiled matchers.
+
+    ``RMOJI_CACHE_DIR`` takes precedence, then ``XDG_CACHE_HOME/rmoji``,
+    then ``~/.cache/rmoji``.
+    """
+    if override := os.environ.get("RMOJI_CACHE_DIR"):
+        return Path(override)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "rmoji"
+
+
+def _escape(char: str) -> str:
+    return "\\" + char if char in _META_CHARS else char
+
+
+def _char_class(chars: list[str]) -> str:
+    """Collapse single characters into a character class of codepoint ranges."""
+    if len(chars) == 1:
+        return _escape(chars[0])
+    codepoints = sorted(ord(c) for c in chars)
+    parts: list[str] = []
+    start = prev = codepoints[0]
+    for cp in [*codepoints[1:], -1]:
+        if cp == prev + 1:
+            prev = cp
+            continue
+        if prev == start:
+            parts.append(_escape(chr(start)))
+        else:
+            parts.append(f"{_escape(chr(start))}-{_escape(chr(prev))}")
+        start = prev = cp
+    return "[" + "".join(parts) + "]"
+
+
+def _trie_to_regex(node: _Trie) -> str:
+    """Render a trie node as a regex that prefers the longest sequence."""
+    singles: list[str] = []
+    branches: list[str] = []
+    for char in sorted(k for k in node if k):
+        child = node[char]
+        if list(child) == [""]:
+            singles.append(char)
+        else:
+            branches.append(_escape(char) + _trie_to_regex(child))
+    if singles:
+        branches.append(_char_class(singles))
+
+    body = "|".join(branches)
+    if "" in node:
+        # A lone character or class can take the quantifier without a group.
+        is_atom = len(branches) == 1 and bool(singles)
+        return f"{body}?" if is_atom else f"(?:{body})?"
+    if len(branches) > 1:
+        return f"(?:{body})"
+    return body
+
+
+def build_trie_regex(sequences: list[str]) -> str:
+    """Compile a list of literal sequences into a compact trie-shaped regex.
+
+    Parameters
+    ----------
+    sequences : list[str]
+        Literal strings to match.
+
+    Returns
+    -------
+    str
+        A regex matching exactly the given sequences, longest first. The syntax
+        is accepted by both Python's ``re`` module and ripgrep.
+    """
+    trie: _Trie = {}
+    for seq in sequences:
+        node = trie
+        for char in seq:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_to_regex(trie)
+
+
+def _is_text_style(sequence: str, status: int) -> bool:
+    """Tell whether a sequence is a symbol that only reads as emoji with U+FE0F.
+
+    Unqualified single characters outside the emoji blocks, such as ``©``,
+    ``™`` or ``↔``, are ordinary typography in licence headers and prose.
+    Their ``U+FE0F`` forms are separate sequences and still match.
+    """
+    import emoji
+
+    unqualified: int = emoji.STATUS["unqualified"]
+    return len(sequence) == 1 and status == unqualified and not EMOJI_PATTERN.match(sequence)
+
+
+def _build() -> dict[str, list[str] | str]:
+    import emoji
+
+    blacklist = set(BLACKLIST)
+    sequences = [
+        e for e, data in emoji.EMOJI_DATA.items() if e not in blacklist and not _is_text_style(e, data["status"])
+    ]
+    # Each UTF-8 byte is stored as the Latin-1 character with the same value.
+    utf8_sequences = [seq.encode("utf-8").decode("latin-1") for seq in sequences]
+    return {
+        "sequences": sequences,
+        "regex": build_trie_regex(sequences),
+        "bytes_regex": build_trie_regex(utf8_sequences),
+    }
+
+
+def _write_cache(path: Path, data: dict[str, list[str] | str]) -> None:
+    """Persist compiled matcher data, ignoring unwritable cache directories."""
+    import json
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+@functools.cache
+def _load() -> dict[str, list[str] | str]:
+    """Load the precomputed matcher data or, if it is stale, the disk cache, building it on a miss."""
+    if (table := _precomputed()) is not None:
+        return table
+    import json
+
+    path = _cache_dir() / f"matcher-{_cache_key()}.json"
+    try:
+        data: dict[str, list[str] | str] = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    if not {"sequences", "regex", "bytes_regex"} <= data.keys():
+        data = _build()
+        _write_cache(path, data)
+    return data
+
+
+def emoji_sequences() -> list[str]:
+    """Return every known emoji sequence, excluding blacklisted and text-style ones.
+
+    Returns
+    -------
+    list[str]
+        Emoji sequences in ``emoji.EMOJI_DATA`` order.
+    """
+    return list(_load()["sequences"])
+
+
+def emoji_regex() -> str:
+    """Return the compiled emoji regex source, suitable for ripgrep.
+
+    Returns
+    -------
+    str
+        A trie-shaped regex matching any non-blacklisted emoji sequence.
+    """
+    return str(_load()["regex"])
+
+
+@functools.cache
+def emoji_matcher() -> re.Pattern[str]:
+    """Return the compiled emoji regex for matching in Python.
+
+    Returns
+    -------
+    re.Pattern[str]
+        The compiled form of :func:`emoji_regex`.
+    """
+    return re.compile(emoji_regex())
+
+
+def emoji_bytes_regex() -> bytes:
+    """Return the regex source matching the UTF-8 encoding of every emoji sequence.
+
+    Returns
+    -------
+    bytes
+        A trie-shaped bytes regex over the UTF-8 encoded sequences.
+    """
+    return str(_load()["bytes_regex"]).encode("latin-1")
+
+
+@functools.cache
+def emoji_bytes_matcher() -> re.Pattern[bytes]:
+    """Return a compiled regex matching the UTF-8 encoding of every emoji sequence.
+
+    It finds the same sequences as :func:`emoji_matcher`, but runs over raw
+    bytes, so UTF-8 files can be searched without being decoded.
+
+    Returns
+    -------
+    re.Pattern[bytes]
+        The compiled form of :func:`emoji_bytes_regex`.
+    """
+    return re.compile(emoji_bytes_regex())
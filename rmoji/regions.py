@@ -0,0 +1,317 @@
+"""Protected regions: spans of text that emoji removal leaves untouched."""
+
+import functools
+import itertools
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import PurePath
+from typing import NamedTuple
+
+from .emoji import remove_emojis
+from .git import LineRanges
+
+# A half-open ``[start, end)`` range of character offsets.
+type Span = tuple[int, int]
+
+# Gaps are cleaned in a single call, joined by a character no emoji sequence can
+# contain and split apart again; text that already holds it is cleaned gap by gap.
+_GAP_SEPARATOR = "\0"
+
+# A block of consecutive markdown task list lines, such as ``- [x] ship it``.
+_TASK_LINES = r"(?:[^\S\n]*[-+*][^\S\n]*\[[ xX]\].*(?:\n|\Z))+"
+_LEADING_TASK_LIST = re.compile(_TASK_LINES)
+# Anchored on the preceding line feed rather than ``^``, so the engine can skip ahead to it.
+_TASK_LIST_BLOCK = re.compile(r"\n(" + _TASK_LINES + ")")
+
+# A fenced markdown code block, from its opening fence to a matching closing fence or the end.
+_CODE_FENCE = re.compile(r"^[ \t]*(`{3,}|~{3,}).*?(?:^[ \t]*\1[ \t]*$|\Z)", re.MULTILINE | re.DOTALL)
+_INLINE_CODE = re.compile(r"`[^`\n]+`")
+
+# Building blocks for the per-language lexers. Unterminated block comments and
+# multi-line strings run to the end of the file.
+_HASH_COMMENT = r"#.*"
+_SLASH_COMMENT = r"//.*"
+_DASH_COMMENT = r"--.*"
+_C_BLOCK_COMMENT = r"/\*[\s\S]*?(?:\*/|\Z)"
+_HTML_COMMENT = r"<!--[\s\S]*?(?:-->|\Z)"
+_DOUBLE_QUOTED = r'"(?:[^"\\\n]|\\.)*"'
+_SINGLE_QUOTED = r"'(?:[^'\\\n]|\\.)*'"
+_BACKTICK_QUOTED = r"`(?:[^`\\]|\\[\s\S])*`"
+_TRIPLE_DOUBLE_QUOTED = r'"""(?:[^\\]|\\[\s\S])*?(?:"""|\Z)'
+_TRIPLE_SINGLE_QUOTED = r"'''(?:[^\\]|\\[\s\S])*?(?:'''|\Z)"
+
+
+class _Syntax(NamedTuple):
+    """The comment and string literal forms of a family of file types, as regex fragments."""
+
+    comments: tuple[str, ...]
+    strings: tuple[str, ...]
+
+
+_PYTHON = _Syntax((_HASH_COMMENT,), (_TRIPLE_DOUBLE_QUOTED, _TRIPLE_SINGLE_QUOTED, _DOUBLE_QUOTED, _SINGLE_QUOTED))
+_HASH = _Syntax((_HASH_COMMENT,), (_DOUBLE_QUOTED, _SINGLE_QUOTED))
+_C = _Syntax((_SLASH_COMMENT, _C_BLOCK_COMMENT), (_DOUBLE_QUOTED, _SINGLE_QUOTED))
+_JS = _Syntax((_SLASH_COMMENT, _C_BLOCK_COMMENT), (_DOUBLE_QUOTED, _SINGLE_QUOTED, _BACKTICK_QUOTED))
+_CSS = _Syntax((_C_BLOCK_COMMENT,), (_DOUBLE_QUOTED, _SINGLE_QUOTED))
+_SQL = _Syntax((_DASH_COMMENT, _C_BLOCK_COMMENT), (_SINGLE_QUOTED, _DOUBLE_QUOTED))
+_MARKUP = _Syntax((_HTML_COMMENT,), ())
+
+_SYNTAX_BY_SUFFIX = {
+    **dict.fromkeys([".py", ".pyi"], _PYTHON),
+    **dict.fromkeys([".sh", ".bash", ".zsh", ".yaml", ".yml", ".toml", ".rb", ".pl", ".r", ".cfg", ".ini"], _HASH),
+    **dict.fromkeys(
+        [".c", ".h", ".cc", ".cpp", ".cxx", ".hh", ".hpp", ".java", ".cs", ".rs", ".swift", ".kt", ".scala", ".php"],
+        _C,
+    ),
+    **dict.fromkeys([".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts", ".go", ".vue"], _JS),
+    **dict.fromkeys([".css", ".scss", ".less"], _CSS),
+    **dict.fromkeys([".sql", ".lua", ".hs"], _SQL),
+    **dict.fromkeys([".html", ".htm", ".xml", ".svg", ".md", ".markdown"], _MARKUP),
+}
+_SYNTAX_BY_NAME = dict.fromkeys(["Makefile", "Dockerfile", ".bashrc", ".zshrc", ".profile"], _HASH)
+
+
+class RegionRules(NamedTuple):
+    """Which parts of a file emoji removal leaves untouched.
+
+    Attributes
+    ----------
+    task_lists : bool
+        Protect markdown task list lines.
+    code_fences : bool
+        Protect fenced code blocks and inline code spans.
+    strings : bool
+        Protect string literals, as lexed for the file's type.
+    only_comments : bool
+        Protect everything but comments, as lexed for the file's type. Files
+        of an unknown type have no comments and are left alone entirely.
+    patterns : tuple[str, ...]
+        Regexes, compiled with ``re.MULTILINE``, whose matches are protected.
+    """
+
+    task_lists: bool = False
+    code_fences: bool = False
+    strings: bool = False
+    only_comments: bool = False
+    patterns: tuple[str, ...] = ()
+
+    @property
+    def line_based(self) -> bool:
+        """Whether every rule can be applied to whole lines in isolation, as when streaming."""
+        return not (self.code_fences or self.strings or self.only_comments or self.patterns)
+
+
+def task_list_spans(text: str) -> Iterator[Span]:
+    """Yield the spans of markdown task list lines, consecutive lines as one span.
+
+    Parameters
+    ----------
+    text : str
+        The text to search.
+
+    Yields
+    ------
+    Span
+        The span of each block of task list lines, including line breaks.
+    """
+    position = 0
+    if leading := _LEADING_TASK_LIST.match(text):
+        yield leading.span()
+        position = leading.end()
+    for match in _TASK_LIST_BLOCK.finditer(text, position):
+        yield match.span(1)
+
+
+def outside_line_spans(text: str, lines: LineRanges) -> Iterator[Span]:
+    """Yield the spans of the lines that fall outside ``lines``.
+
+    Parameters
+    ----------
+    text : str
+        The text, split into lines at line feeds.
+    lines : LineRanges
+        Inclusive 1-based line ranges that should stay open to removal.
+
+    Yields
+    ------
+    Span
+        The span of each run of lines outside every range.
+    """
+    # starts[i] is the offset of line i + 1; the last entry is the end of the text.
+    starts = list(itertools.accumulate((len(line) + 1 for line in text.split("\n")), initial=0))
+    starts[-1] = len(text)
+    line_count = len(starts) - 1
+    first_open = 1
+    for start, end in sorted(lines):
+        if start > first_open:
+            yield starts[first_open - 1], starts[min(start, line_count + 1) - 1]
+        first_open = max(first_open, end + 1)
+        if first_open > line_count:
+            return
+    yield starts[first_open - 1], len(text)
+
+
+def code_spans(text: str) -> Iterator[Span]:
+    """Yield the spans of fenced code blocks and inline code.
+
+    Parameters
+    ----------
+    text : str
+        Markdown text.
+
+    Yields
+    ------
+    Span
+        The span of each code block, fences included, and of each inline code span.
+    """
+    if "```" in text or "~~~" in text:
+        for match in _CODE_FENCE.finditer(text):
+            yield match.span()
+    for match in _INLINE_CODE.finditer(text):
+        yield match.span()
+
+
+@functools.cache
+def _lexer(syntax: _Syntax) -> re.Pattern[str]:
+    """Compile a syntax into one alternation; the empty group marks comment matches."""
+    comments = "|".join(syntax.comments) or "(?!)"
+    return re.compile("|".join([f"(?:{comments})()", *syntax.strings]))
+
+
+def _syntax_for(file_path: str) -> _Syntax | None:
+    """Pick the lexer syntax for a file from its name or suffix."""
+    path = PurePath(file_path)
+    return _SYNTAX_BY_NAME.get(path.name) or _SYNTAX_BY_SUFFIX.get(path.suffix.lower())
+
+
+def lexed_spans(text: str, file_path: str) -> tuple[list[Span], list[Span]]:
+    """Find the comments and string literals of a file in one pass.
+
+    Comments and strings are lexed together, so a ``#`` inside a string does
+    not start a comment and a quote inside a comment does not start a string.
+
+    Parameters
+    ----------
+    text : str
+        The file's content.
+    file_path : str
+        The file's path, whose name or suffix selects the lexer.
+
+    Returns
+    -------
+    tuple[list[Span], list[Span]]
+        The comment spans and the string literal spans, in text order. Both
+        are empty for file types without a lexer.
+    """
+    comments: list[Span] = []
+    strings: list[Span] = []
+    syntax = _syntax_for(file_path)
+    if syntax is None:
+        return comments, strings
+    for match in _lexer(syntax).finditer(text):
+        (comments if match.start(1) != -1 else strings).append(match.span())
+    return comments, strings
+
+
+def _complement(spans: list[Span], length: int) -> Iterator[Span]:
+    """Yield the gaps between sorted, disjoint spans over a text of ``length`` characters."""
+    position = 0
+    for start, end in spans:
+        yield position, start
+        position = end
+    yield position, length
+
+
+@functools.cache
+def _compile_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile a user-supplied region pattern, once per process."""
+    return re.compile(pattern, re.MULTILINE)
+
+
+def protected_spans(text: str, rules: RegionRules, file_path: str = "") -> Iterator[Span]:
+    """Yield every span the rules protect in a file, in no particular order.
+
+    Parameters
+    ----------
+    text : str
+        The file's content.
+    rules : RegionRules
+        Which regions to protect.
+    file_path : str, optional
+        The file's path, used to pick a lexer for strings and comments.
+
+    Yields
+    ------
+    Span
+        Protected spans, possibly overlapping.
+    """
+    if rules.task_lists:
+        yield from task_list_spans(text)
+    if rules.code_fences:
+        yield from code_spans(text)
+    if rules.strings or rules.only_comments:
+        comments, strings = lexed_spans(text, file_path)
+        if rules.strings:
+            yield from strings
+        if rules.only_comments:
+            yield from _complement(comments, len(text))
+    for pattern in rules.patterns:
+        for match in _compile_pattern(pattern).finditer(text):
+            yield match.span()
+
+
+def merge_spans(spans: Iterable[Span]) -> list[Span]:
+    """Sort spans and merge those that overlap or touch.
+
+    Parameters
+    ----------
+    spans : Iterable[Span]
+        Spans in any order, possibly overlapping.
+
+    Returns
+    -------
+    list[Span]
+        Disjoint, non-empty spans in text order.
+    """
+    merged: list[Span] = []
+    for start, end in sorted(spans):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def remove_emojis_outside(text: str, protected: Iterable[Span], exclude: list[str] | None = None) -> str:
+    """Remove emojis from text, except inside the protected spans.
+
+    The protected spans are found up front and every gap between them is
+    cleaned in one bulk removal, rather than line by line.
+
+    Parameters
+    ----------
+    text : str
+        The text to clean.
+    protected : Iterable[Span]
+        Spans to leave untouched, in any order.
+    exclude : list[str], optional
+        the list of emojis to exclude, by default all emojis are removed
+
+    Returns
+    -------
+    str
+        The text with emojis removed outside the protected spans.
+    """
+    if text.isascii():
+        return text
+    spans = merge_spans(protected)
+    bounds = [0, *itertools.chain.from_iterable(spans), len(text)]
+    pieces = [text[start:end] for start, end in itertools.pairwise(bounds)]
+    gaps = pieces[0::2]
+    if _GAP_SEPARATOR in text:
+        pieces[0::2] = [remove_emojis(gap, exclude) for gap in gaps]
+    else:
+        pieces[0::2] = remove_emojis(_GAP_SEPARATOR.join(gaps), exclude).split(_GAP_SEPARATOR)
+    return "".join(pieces)
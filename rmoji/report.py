@@ -0,0 +1,88 @@
+"""Machine-readable output of scan and nuke results as JSON Lines or CSV."""
+
+import csv
+import json
+import sys
+from collections import Counter
+from enum import StrEnum
+from typing import Any, TextIO
+
+from .scanner import ScanResult
+
+_SCAN_COLUMNS = ["path", "count", "emojis"]
+_NUKE_COLUMNS = ["path", "status", "error"]
+_SUMMARY_COLUMNS = ["files", "count", "errors"]
+
+
+class OutputFormat(StrEnum):
+    """How scan and nuke results are written to stdout."""
+
+    TABLE = "table"
+    JSONL = "jsonl"
+    CSV = "csv"
+
+
+def _histogram_field(emojis: Counter[str]) -> str:
+    """Flatten a histogram into ``emoji:count`` pairs, most frequent first, for a CSV cell."""
+    return " ".join(f"{emoji}:{count}" for emoji, count in emojis.most_common())
+
+
+class RecordWriter:
+    """Write scan and nuke results straight to stdout, one record per file.
+
+    JSON Lines records carry a ``type`` of ``file``, ``error``, ``nuke`` or
+    ``summary``. CSV output starts with a header row and holds one kind of
+    record, so summaries are only written as CSV when nothing else is.
+    Nothing goes through Rich, so tens of thousands of records cost no more
+    than the writes themselves.
+    """
+
+    def __init__(self, output_format: OutputFormat, locations: bool = False, out: TextIO | None = None) -> None:
+        self.output_format = output_format
+        self.locations = locations
+        self.out = out or sys.stdout
+        self._csv = csv.writer(self.out, lineterminator="\n")
+        # Fixed by the options, not by whichever record comes first, so an
+        # error record ahead of the first file cannot drop the locations column.
+        self._scan_columns = [*_SCAN_COLUMNS, "locations"] if locations else _SCAN_COLUMNS
+        self._columns: list[str] | None = None
+
+    def _write(self, record: dict[str, Any], columns: list[str]) -> None:
+        """Write one record in the chosen format."""
+        if self.output_format is OutputFormat.JSONL:
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        if self._columns is None:
+            self._columns = columns
+            self._csv.writerow(columns)
+        self._csv.writerow([record.get(column, "") for column in self._columns])
+
+    def scan_result(self, result: ScanResult) -> None:
+        """Write the emojis found in one file; unreadable files get an error record."""
+        if result.occurrences == -1:
+            self._write({"type": "error", "path": result.display_path, "count": -1}, self._scan_columns)
+            return
+        record: dict[str, Any] = {"type": "file", "path": result.display_path, "count": result.occurrences}
+        if self.output_format is OutputFormat.JSONL:
+            record["emojis"] = dict(result.emojis.most_common())
+            if self.locations:
+                record["locations"] = [list(location) for location in result.locations]
+        else:
+            record["emojis"] = _histogram_field(result.emojis)
+            if self.locations:
+                record["locations"] = " ".join(f"{line}:{column}:{emoji}" for line, column, emoji in result.locations)
+        self._write(record, self._scan_columns)
+
+    def nuke_result(self, display_path: str, error: str | None) -> None:
+        """Write whether emojis were removed from one file."""
+        record = {"type": "nuke", "path": display_path, "status": "error" if error else "ok"}
+        if error:
+            record["error"] = error
+        self._write(record, _NUKE_COLUMNS)
+
+    def summary(self, file_count: int, totals: Counter[str], errors: int = 0) -> None:
+        """Write the run totals: files, emoji occurrences, errors and, as JSON, the repo-wide histogram."""
+        record: dict[str, Any] = {"type": "summary", "files": file_count, "count": totals.total(), "errors": errors}
+        if self.output_format is OutputFormat.JSONL:
+            record["emojis"] = dict(totals.most_common())
+        self._write(record, _SUMMARY_COLUMNS)
@@ -1,111 +1,976 @@
 """Scanning and display utilities for emoji detection."""
 
-import re
+import errno
+import functools
+import itertools
+import json
+import mmap
+import os
+import shutil
+import subprocess
+import tempfile
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from enum import StrEnum
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, TextIO, cast
 
-import emoji as emoji_lib
 from rich import print
 
-from .constants import BLACKLIST
-from .emoji import extract_emojis, remove_emojis
+from .emoji import remove_emojis_stream
+from .files import (
+    BinaryFileError,
+    FsyncMode,
+    ScanFilters,
+    atomic_rewrite,
+    atomic_write_text,
+    detect_encoding,
+    get_file_list,
+    map_file,
+    read_text,
+    select_files,
+    sniff_encoding,
+)
+from .git import Changes, LineRanges, in_ranges, read_staged
+from .matcher import emoji_bytes_matcher, emoji_matcher, emoji_regex
+from .regions import RegionRules, outside_line_spans, protected_spans, remove_emojis_outside
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
 
-def _display_scan_results(display_tuples: list[tuple[int, str, str]]) -> None:
-    """Display scan results showing emoji counts per file."""
-    for count, emoji_file_display, _ in display_tuples:
+# Below this many files a process pool costs more to start than it saves.
+_NATIVE_INLINE_LIMIT = 64
+_NATIVE_CHUNKSIZE = 32
+# Removals queued per worker, bounding memory and making Ctrl-C responsive.
+_NUKE_IN_FLIGHT_PER_JOB = 4
+_PRINT_BATCH_SIZE = 200
+# Files larger than this are cleaned in chunks instead of being read whole.
+_STREAM_THRESHOLD = 16 * 1024 * 1024
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class Engine(StrEnum):
+    """Search backend used to scan for emojis."""
+
+    AUTO = "auto"
+    RG = "rg"
+    NATIVE = "native"
+
+
+# A 1-based (line, column, emoji) position; columns count UTF-8 bytes, as ripgrep's do.
+type Location = tuple[int, int, str]
+# A scanned file with its emoji histogram (None if unreadable) and, on request, match locations.
+type _FileMatch = tuple[str, Counter[str] | None, list[Location]]
+
+
+class ScanOptions(NamedTuple):
+    """How a scan runs, as opposed to which files it visits.
+
+    Attributes
+    ----------
+    engine : Engine
+        Search backend; ``auto`` uses ripgrep when available.
+    jobs : int | None
+        Worker processes for the native engine, defaults to the CPU count.
+    use_index : bool
+        If True, serve unchanged files from the ``.rmoji/`` scan index and only
+        rescan changed ones. This always uses the native engine.
+    locations : bool
+        If True, also record the line and column of every emoji. The index
+        does not store locations, so this rescans every file.
+    """
+
+    engine: Engine = Engine.AUTO
+    jobs: int | None = None
+    use_index: bool = False
+    locations: bool = False
+
+
+class ScanResult(NamedTuple):
+    """The emojis found in one file.
+
+    Attributes
+    ----------
+    occurrences : int
+        Number of emoji occurrences, or -1 if the file could not be read.
+    display_path : str
+        The file path relative to the scan root.
+    file_path : str
+        The file path as found by the scan.
+    emojis : Counter[str]
+        Occurrences of each distinct emoji.
+    locations : tuple[Location, ...]
+        Where each occurrence is, if locations were requested.
+    """
+
+    occurrences: int
+    display_path: str
+    file_path: str
+    emojis: Counter[str]
+    locations: tuple[Location, ...] = ()
+
+
+def _format_histogram(emojis: Counter[str]) -> str:
+    """Render a histogram as ``emoji count`` pairs, most frequent first."""
+    return "  ".join(f"{emoji} {count}" for emoji, count in emojis.most_common())
+
+
+def _display_scan_results(
+    display_tuples: Iterable[tuple[int, str, str] | ScanResult], histogram: bool = False, locations: bool = False
+) -> None:
+    """Display scan results showing emoji counts per file.
+
+    With ``histogram`` each file is followed by its per-emoji counts, and with
+    ``locations`` by the line and column of every emoji.
+    """
+    for result in display_tuples:
+        count, emoji_file_display = result[0], result[1]
         if count == -1:
             print(f"[cyan]{emoji_file_display}\t[red][error][/red][/cyan]")
-        else:
-            print(f"[green]{count}[/green]\t[cyan]{emoji_file_display}[/cyan]")
+            continue
+        print(f"[green]{count}[/green]\t[cyan]{emoji_file_display}[/cyan]")
+        if not isinstance(result, ScanResult):
+            continue
+        if histogram:
+            print(f"\t{_format_histogram(result.emojis)}")
+        if locations and result.locations:
+            print("\n".join(f"\t{line}:{column}\t{emoji}" for line, column, emoji in result.locations))
+
+
+def _display_histogram(emojis: Counter[str]) -> None:
+    """Display a repo-wide histogram, one emoji per line, most frequent first."""
+    for emoji, count in emojis.most_common():
+        print(f"[green]{count}[/green]\t{emoji}")
+
+
+def _stream_scan_results(
+    results: Iterable[ScanResult], histogram: bool = False, locations: bool = False
+) -> tuple[Counter[str], int]:
+    """Display scan results as they arrive.
+
+    Returns
+    -------
+    tuple[Counter[str], int]
+        The repo-wide emoji histogram and the number of files displayed.
+    """
+    totals: Counter[str] = Counter()
+    file_count = 0
+    for result in results:
+        _display_scan_results([result], histogram, locations)
+        totals.update(result.emojis)
+        file_count += 1
+    return totals, file_count
+
+
+class _BatchedPrinter:
+    """Collect Rich markup lines and print them in batches to limit rendering overhead."""
+
+    def __init__(self, batch_size: int = _PRINT_BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self.lines: list[str] = []
+
+    def add(self, line: str) -> None:
+        """Queue a line, printing the batch once it is full."""
+        self.lines.append(line)
+        if len(self.lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Print any queued lines."""
+        if self.lines:
+            print("\n".join(self.lines))
+            self.lines.clear()
+
+
+def _clean_content(
+    content: str,
+    exclude: list[str] | None,
+    rules: RegionRules,
+    lines: LineRanges | None = None,
+    file_path: str = "",
+) -> str:
+    """Remove emojis from text, leaving the regions protected by ``rules`` alone.
+
+    If ``lines`` is given, only those 1-based line ranges are cleaned.
+    ``file_path`` picks the lexer for string and comment rules.
+    """
+    protected = protected_spans(content, rules, file_path)
+    if lines is not None:
+        protected = itertools.chain(protected, outside_line_spans(content, lines))
+    cleaned_content: str = remove_emojis_outside(content, protected, exclude)
+    return cleaned_content
+
+
+def _shift_ranges(lines: LineRanges | None, first_line: int) -> LineRanges | None:
+    """Renumber line ranges for a piece of text starting at ``first_line``."""
+    if lines is None:
+        return None
+    return [(start - first_line + 1, end - first_line + 1) for start, end in lines if end >= first_line]
+
+
+def _clean_chunks(
+    chunks: Iterable[str],
+    exclude: list[str] | None,
+    rules: RegionRules,
+    lines: LineRanges | None = None,
+) -> Iterator[str]:
+    """Streaming form of :func:`_clean_content` for text arriving in chunks.
+
+    Line-based rules need whole lines, so with task lists or line ranges each
+    chunk is cut after its last newline and the remainder carried forward.
+    Rules that are not line-based are not supported here.
+    """
+    if not rules.task_lists and lines is None:
+        yield from remove_emojis_stream(chunks, exclude)
+        return
+
+    pending = ""
+    first_line = 1
+    for chunk in chunks:
+        pending += chunk
+        cut = pending.rfind("\n") + 1
+        if cut:
+            piece, pending = pending[:cut], pending[cut:]
+            yield _clean_content(piece, exclude, rules, _shift_ranges(lines, first_line))
+            first_line += piece.count("\n")
+    if pending:
+        yield _clean_content(pending, exclude, rules, _shift_ranges(lines, first_line))
+
+
+def _is_streamed(file_path: str, rules: RegionRules) -> bool:
+    """Tell whether a file is too large to clean in memory and ``rules`` allow cleaning it in chunks."""
+    return rules.line_based and Path(file_path).stat().st_size > _STREAM_THRESHOLD
+
+
+def _nuke_large_file(
+    file_path: str,
+    exclude: list[str] | None,
+    rules: RegionRules,
+    fsync: bool | FsyncMode,
+    lines: LineRanges | None,
+) -> bool:
+    """Clean a file chunk by chunk, so memory use does not grow with its size.
+
+    Returns
+    -------
+    bool
+        True if the file was rewritten, False if nothing needed removing.
+    """
+    encoding = detect_encoding(file_path)
+    read = 0
+
+    def source(f: TextIO) -> Iterator[str]:
+        nonlocal read
+        while chunk := f.read(_STREAM_CHUNK_SIZE):
+            read += len(chunk)
+            yield chunk
+
+    def write(dst: TextIO) -> bool:
+        written = 0
+        with Path(file_path).open(encoding=encoding, newline="") as src:
+            for piece in _clean_chunks(source(src), exclude, rules, lines):
+                dst.write(piece)
+                written += len(piece)
+        # Removal only ever deletes characters, so equal lengths mean nothing changed.
+        return written != read
+
+    rewritten: bool = atomic_rewrite(file_path, write, encoding=encoding, fsync=fsync, newline="")
+    return rewritten
 
 
 def _nuke_file(
     file_path: str,
     exclude: list[str] | None,
-    exclude_task_lists: bool,
+    rules: RegionRules,
+    fsync: bool | FsyncMode = True,
+    lines: LineRanges | None = None,
 ) -> bool:
     """Remove emojis from a single file.
 
-    Returns True on success, False on failure.
-    """
-    with Path(file_path).open(encoding="utf-8") as f:
-        content = f.read()
+    The file is rewritten atomically, and only if removal changed its content,
+    so untouched files keep their mtime. ``fsync`` is passed on to
+    :func:`~rmoji.files.atomic_rewrite`; with ``FsyncMode.DIR`` the caller
+    fsyncs the directory, e.g. with a :class:`~rmoji.files.SyncBatch`. If ``lines``
+    is given, only those line ranges are cleaned.
 
-    if not content:
+    The file keeps the encoding named by its BOM (UTF-8 by default) and its
+    line endings. Binary and undecodable files raise instead of being rewritten.
+    Files over ``_STREAM_THRESHOLD`` bytes are streamed in bounded chunks,
+    unless ``rules`` needs the whole file to find strings, comments or code.
+
+    Always returns True; a file that cannot be cleaned raises instead.
+    """
+    if _is_streamed(file_path, rules):
+        _nuke_large_file(file_path, exclude, rules, fsync, lines)
         return True
 
-    if exclude_task_lists:
-        lines = content.splitlines(keepends=True)
-        cleaned_content = "".join(
-            line if re.match(r"^\s*[-+*]\s*\[[ xX]\]", line) else remove_emojis(line, exclude=exclude or [])
-            for line in lines
-        )
-    else:
-        cleaned_content = remove_emojis(content, exclude=exclude or [])
+    content, encoding = read_text(file_path)
 
-    with Path(file_path).open("w", encoding="utf-8") as f:
-        f.write(cleaned_content)
+    cleaned_content = _clean_content(content, exclude, rules, lines, file_path)
+    if cleaned_content != content:
+        atomic_write_text(file_path, cleaned_content, encoding=encoding, fsync=fsync, newline="")
 
     return True
 
 
-def _scan_for_emojis(path: str, depth: int = 10) -> tuple[int, list[tuple[int, str, str]]]:
-    """Scan a directory for files containing emojis using ripgrep.
+def _describe_change(file_path: str, original: str, cleaned: str, diff: bool) -> str:
+    """Summarise a pending rewrite as a unified diff or a per-file byte delta."""
+    if diff:
+        import difflib
+
+        return "\n".join(
+            difflib.unified_diff(
+                original.splitlines(),
+                cleaned.splitlines(),
+                fromfile=f"a/{file_path}",
+                tofile=f"b/{file_path}",
+                lineterm="",
+            )
+        )
+    delta = len(cleaned.encode("utf-8")) - len(original.encode("utf-8"))
+    return f"{delta:+d} bytes\t{file_path}"
+
+
+def _preview_file(
+    file_path: str,
+    exclude: list[str] | None,
+    rules: RegionRules,
+    diff: bool = False,
+    lines: LineRanges | None = None,
+) -> str:
+    """Describe what :func:`_nuke_file` would change, without touching disk.
+
+    Returns
+    -------
+    str
+        A unified diff (``diff=True``) or a byte-delta line, or an empty string
+        if the file would not change.
+    """
+    content, _ = read_text(file_path)
+
+    cleaned_content = _clean_content(content, exclude, rules, lines, file_path)
+    if cleaned_content == content:
+        return ""
+    return _describe_change(file_path, content, cleaned_content, diff)
+
+
+def _call_file_task[I, T](task: Callable[[I], T], item: I) -> T | Exception:
+    """Run a per-file task, returning the error instead of raising it."""
+    try:
+        return task(item)
+    except Exception as e:
+        return e
+
+
+def _run_file_tasks[I, T](task: Callable[[I], T], items: list[I], jobs: int) -> Iterator[tuple[I, T | Exception]]:
+    """Run a picklable per-file task over many files across a bounded process pool.
+
+    At most ``jobs * _NUKE_IN_FLIGHT_PER_JOB`` tasks are queued at once.
+    Small batches, or ``jobs=1``, are processed inline.
+
+    Parameters
+    ----------
+    task : Callable[[I], T]
+        Module-level function (or ``functools.partial`` of one) taking an item,
+        usually a file path.
+    items : list[I]
+        Files (or per-file work items) to process.
+    jobs : int
+        Maximum number of worker processes.
+
+    Yields
+    ------
+    tuple[I, T | Exception]
+        Each item with the task's result, or the error it raised, in completion order.
+    """
+    if jobs <= 1 or len(items) < _NATIVE_INLINE_LIMIT:
+        for item in items:
+            yield item, _call_file_task(task, item)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # Items may be falsy (an empty path, a 0 index), so only this marks the end.
+    sentinel = object()
+    remaining = iter(items)
+    pending: dict[Future[T | Exception], I] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            while (
+                len(pending) < jobs * _NUKE_IN_FLIGHT_PER_JOB
+                and (next_item := next(remaining, sentinel)) is not sentinel
+            ):
+                item = cast("I", next_item)
+                pending[pool.submit(_call_file_task, task, item)] = item
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def _file_targets(file_paths: Iterable[str] | Mapping[str, LineRanges | None]) -> list[tuple[str, LineRanges | None]]:
+    """Pair each file with the line ranges to restrict work to, if any."""
+    if isinstance(file_paths, Mapping):
+        return list(file_paths.items())
+    return [(file_path, None) for file_path in file_paths]
+
+
+def _nuke_target(
+    target: tuple[str, LineRanges | None], exclude: list[str] | None, rules: RegionRules, fsync: bool | FsyncMode
+) -> bool:
+    """Run :func:`_nuke_file` on a ``(file_path, lines)`` target."""
+    file_path, lines = target
+    return _nuke_file(file_path, exclude, rules, fsync, lines)
+
+
+def _preview_target(
+    target: tuple[str, LineRanges | None], exclude: list[str] | None, rules: RegionRules, diff: bool
+) -> str:
+    """Run :func:`_preview_file` on a ``(file_path, lines)`` target."""
+    file_path, lines = target
+    return _preview_file(file_path, exclude, rules, diff, lines)
+
+
+def _nuke_files(
+    file_paths: Iterable[str] | Mapping[str, LineRanges | None],
+    exclude: list[str] | None,
+    rules: RegionRules,
+    jobs: int,
+    fsync: bool | FsyncMode = True,
+) -> Iterator[tuple[str, Exception | None]]:
+    """Remove emojis from many files across a bounded process pool.
+
+    Parameters
+    ----------
+    file_paths : Iterable[str] | Mapping[str, LineRanges | None]
+        Files to clean, or files mapped to the only line ranges to clean in them.
+    exclude : list[str] | None
+        Emoji(s) to preserve during removal.
+    rules : RegionRules
+        Regions of each file to leave untouched.
+    jobs : int
+        Maximum number of worker processes.
+    fsync : bool | FsyncMode, optional
+        What to fsync for each file, as for :func:`~rmoji.files.atomic_rewrite`.
+
+    Yields
+    ------
+    tuple[str, Exception | None]
+        Each file path with the error raised while cleaning it, if any,
+        in completion order.
+    """
+    task = functools.partial(_nuke_target, exclude=exclude, rules=rules, fsync=fsync)
+    for (file_path, _), outcome in _run_file_tasks(task, _file_targets(file_paths), jobs):
+        yield file_path, outcome if isinstance(outcome, Exception) else None
+
+
+def _display_path(file_path: str, root: str) -> str:
+    """Make a matched file path relative to the scan root for display."""
+    try:
+        return str(Path(file_path).relative_to(Path(root).resolve()))
+    except ValueError:
+        return file_path.replace("./", "")
+
+
+def _submatch_text(submatch: dict[str, Any]) -> str | None:
+    """Return the matched text of a ripgrep submatch, decoding raw bytes if needed."""
+    match = submatch.get("match", {})
+    if "text" in match:
+        return str(match["text"])
+    if "bytes" in match:
+        import base64
+
+        return base64.b64decode(match["bytes"]).decode("utf-8", errors="replace")
+    return None
+
+
+def _rg_submatch_locations(data: dict[str, Any]) -> Iterator[Location]:
+    """Yield the line, 1-based byte column and text of each submatch in a ripgrep match message."""
+    line_number = data.get("line_number") or 0
+    for submatch in data.get("submatches", []):
+        if (text := _submatch_text(submatch)) is not None:
+            yield line_number, submatch.get("start", 0) + 1, text
+
+
+class ScanError(Exception):
+    """Raised when the search backend fails before reporting any result."""
+
+
+def _stream_json_lines(command: list[str]) -> Iterator[dict[str, Any]]:
+    """Run a command and yield each line of its stdout decoded as JSON.
+
+    Output is consumed line by line, so memory use does not grow with the
+    number of matches.
+
+    Raises
+    ------
+    ScanError
+        If the command exits with an error status without producing output.
+    """
+    produced = False
+    with (
+        tempfile.TemporaryFile() as stderr,
+        subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, encoding="utf-8") as proc,
+    ):
+        for line in proc.stdout or ():
+            if line.strip():
+                produced = True
+                yield json.loads(line)
+        returncode = proc.wait()
+        # ripgrep exits 1 when nothing matched and 2 on errors, which may be partial.
+        if returncode > 1 and not produced:
+            stderr.seek(0)
+            raise ScanError(stderr.read().decode("utf-8", errors="replace").strip())
+
+
+def _rg_messages(path: str, filters: ScanFilters) -> Iterator[dict[str, Any]]:
+    """Stream ripgrep ``--json`` messages for an emoji search under ``path``.
+
+    Raises
+    ------
+    ScanError
+        If ripgrep is not installed.
+    """
+    from ripgrepy import RipGrepNotFound, Ripgrepy
+
+    try:
+        rg = Ripgrepy(emoji_regex(), path)
+    except RipGrepNotFound as e:
+        msg = "ripgrep (rg) is not installed; install it or use --engine native"
+        raise ScanError(msg) from e
+    rg.json()
+    # Honour .gitignore outside git repositories too, as the native engine does.
+    rg.command.append("--no-require-git")
+    if filters.hidden:
+        rg.hidden()
+    if filters.max_depth is not None:
+        rg.max_depth(filters.max_depth)
+    if filters.max_filesize is not None:
+        rg.max_filesize(str(filters.max_filesize))
+    for glob in filters.globs:
+        rg.glob(glob)
+    for iglob in filters.iglobs:
+        rg.iglob(iglob)
+    for file_type in filters.types:
+        rg.type_(file_type)
+    return _stream_json_lines([*rg.command, "--regexp", rg.regex_pattern, "--", rg.path])
+
+
+def _iter_rg_file_matches(messages: Iterable[dict[str, Any]], locate: bool = False) -> Iterator[_FileMatch]:
+    """Group ripgrep ``--json`` match messages into per-file emoji tallies.
+
+    A file is yielded as soon as ripgrep reports its ``end`` message.
+
+    Parameters
+    ----------
+    messages : Iterable[dict[str, Any]]
+        Decoded ripgrep JSON messages.
+    locate : bool, optional
+        If True, also collect the line and column of each submatch.
+
+    Yields
+    ------
+    tuple[str, Counter[str], list[Location]]
+        The file path, a counter of the emojis matched in it and, with
+        ``locate``, their locations.
+    """
+    current: str | None = None
+    counts: Counter[str] = Counter()
+    locations: list[Location] = []
+    for message in messages:
+        data = message.get("data", {})
+        if "path" not in data or message.get("type") not in {"match", "end"}:
+            continue
+        file_path = data["path"]["text"]
+        if file_path != current:
+            if current is not None and counts:
+                yield current, counts, locations
+            current, counts, locations = file_path, Counter(), []
+        for location in _rg_submatch_locations(data):
+            counts[location[2]] += 1
+            if locate:
+                locations.append(location)
+        if message["type"] == "end":
+            if counts:
+                yield file_path, counts, locations
+            current, counts, locations = None, Counter(), []
+    if current is not None and counts:
+        yield current, counts, locations
+
+
+def _count_text(
+    text: str, locate: bool = False, in_scope: Callable[[int], bool] | None = None
+) -> tuple[Counter[str], list[Location]]:
+    """Count the emojis in decoded text, optionally locating them or only looking at some lines."""
+    if not locate and in_scope is None:
+        return Counter(emoji_matcher().findall(text)), []
+    counts: Counter[str] = Counter()
+    locations: list[Location] = []
+    for line_number, line in enumerate(text.split("\n"), start=1):
+        if in_scope is not None and not in_scope(line_number):
+            continue
+        for match in emoji_matcher().finditer(line):
+            counts[match[0]] += 1
+            if locate:
+                locations.append((line_number, len(line[: match.start()].encode("utf-8")) + 1, match[0]))
+    return counts, locations
+
+
+def _locate_bytes(buffer: bytes | mmap.mmap) -> tuple[Counter[str], list[Location]]:
+    """Count and locate the emojis in UTF-8 contents in a single pass over the matches.
+
+    Line numbers are advanced by counting the newlines skipped between
+    consecutive matches, so the contents are still only decoded where an
+    emoji was found.
+    """
+    counts: Counter[str] = Counter()
+    locations: list[Location] = []
+    line_number, line_start, position = 1, 0, 0
+    for match in emoji_bytes_matcher().finditer(buffer):
+        start = match.start()
+        skipped = buffer[position:start]
+        if newlines := skipped.count(b"\n"):
+            line_number += newlines
+            line_start = position + skipped.rfind(b"\n") + 1
+        position = start
+        emoji = match[0].decode("utf-8")
+        counts[emoji] += 1
+        locations.append((line_number, start - line_start + 1, emoji))
+    return counts, locations
+
+
+def _count_buffer(
+    buffer: bytes | mmap.mmap, encoding: str | None, locate: bool = False
+) -> tuple[Counter[str], list[Location]]:
+    """Count, and optionally locate, the emojis in raw file contents.
+
+    UTF-8 contents are searched with the bytes matcher, so only the matches
+    are ever decoded. Other encodings are decoded first; binary contents
+    (``encoding=None``) count as empty.
+    """
+    if encoding is None:
+        return Counter(), []
+    if encoding != "utf-8":
+        return _count_text(bytes(buffer).decode(encoding, errors="replace"), locate)
+    if locate:
+        return _locate_bytes(buffer)
+    return Counter(match.decode("utf-8") for match in emoji_bytes_matcher().findall(buffer)), []
+
+
+def _index_file(file_path: str) -> tuple[os.stat_result, str, Counter[str]]:
+    """Stat, hash and count the emojis in a file for the scan index."""
+    from .index import file_digest
+
+    st = Path(file_path).stat()
+    data = Path(file_path).read_bytes()
+    counts, _ = _count_buffer(data, sniff_encoding(data))
+    return st, file_digest(data), counts
+
+
+def _iter_indexed_file_matches(path: str, jobs: int, filters: ScanFilters) -> Iterator[_FileMatch]:
+    """Scan natively, re-examining only files that changed since the last indexed scan.
+
+    Files whose mtime and size match the index are served from it; files whose
+    stat data changed but whose content hash did not are refreshed without
+    being rescanned. The index is stored under ``.rmoji/`` in the scan root.
 
     Parameters
     ----------
     path : str
-        The directory path to scan.
-    depth : int, optional
-        Maximum recursion depth (currently unused, reserved for future use).
+        The file or directory to scan.
+    jobs : int
+        Maximum number of worker processes for rescanning changed files.
+    filters : ScanFilters
+        Limits on which files are visited.
+
+    Yields
+    ------
+    tuple[str, Counter[str] | None, list[Location]]
+        Each file path with its emoji counter, or None if it could not be read.
+        The index does not store locations, so these are always empty.
+    """
+    from .index import ScanIndex
+
+    files = _native_file_list(path, filters)
+    root = Path(path) if Path(path).is_dir() else Path(path).parent
+    with ScanIndex(root) as index:
+        changed: list[str] = []
+        for file_path in files:
+            try:
+                st = Path(file_path).stat()
+            except OSError:
+                yield file_path, None, []
+                continue
+            counts = index.lookup(file_path, st)
+            if counts is None:
+                counts = index.lookup_content(file_path, st)
+            if counts is None:
+                changed.append(file_path)
+            else:
+                yield file_path, counts, []
+
+        for file_path, result in _run_file_tasks(_index_file, changed, jobs):
+            if isinstance(result, Exception):
+                yield file_path, None, []
+                continue
+            st, digest, counts = result
+            index.store(file_path, st, digest, counts)
+            yield file_path, counts, []
+        index.prune(files)
+
+
+def _count_file_emojis(file_path: str, locate: bool = False) -> _FileMatch:
+    """Count the emojis in a single file for the native engine.
+
+    The file is memory-mapped and UTF-8 files are matched as bytes, so files
+    without emojis are never decoded or copied. Binary files are skipped, like
+    ripgrep does, and invalid bytes never abort the scan.
 
     Returns
     -------
-    tuple[int, list[tuple[int, str, str]]]
-        A tuple of (total_emoji_count, files_with_emoji_data) where
-        files_with_emoji_data is a list of (count, display_path, file_path) tuples.
+    tuple[str, Counter[str] | None, list[Location]]
+        The file path, its emoji counter (None if the file could not be read)
+        and, with ``locate``, the emoji locations.
     """
-    from ripgrepy import Ripgrepy
+    try:
+        with map_file(file_path) as (buffer, encoding):
+            counts, locations = _count_buffer(buffer, encoding, locate)
+    except OSError:
+        return file_path, None, []
+    return file_path, counts, locations
 
-    all_emojis = list(emoji_lib.EMOJI_DATA.keys())  # type: ignore[attr-defined]
-    all_emojis = list(filter(lambda x: x not in BLACKLIST, all_emojis))
-    rg = Ripgrepy("|".join(all_emojis), path)
-    rg.json()
 
-    results = rg.run().as_dict
+def _mapped_emojis(file_path: str) -> Counter[str]:
+    """Count the emojis in a file from its memory map, without reading it into memory.
 
-    files_with_matches = set()
+    Raises
+    ------
+    BinaryFileError
+        If the file looks binary.
+    """
+    with map_file(file_path) as (buffer, encoding):
+        if encoding is None:
+            raise BinaryFileError(file_path)
+        counts, _ = _count_buffer(buffer, encoding)
+    return counts
 
-    if not results:
-        return 0, []
 
-    for match in results:
-        if "data" in match and "path" in match["data"]:
-            file_path = match["data"]["path"]["text"]
-            files_with_matches.add(file_path)
-    if not files_with_matches:
-        return 0, []
-    display_tuples = []
-    for emoji_file in files_with_matches:
-        try:
-            with Path(emoji_file).open(encoding="utf-8") as f:
-                text = f.read()
+def _read_staged_text(file_path: str) -> str:
+    """Read a file as staged in the git index, decoding it as :func:`~rmoji.files.read_text` would."""
+    data = read_staged(file_path)
+    encoding = sniff_encoding(data)
+    if encoding is None:
+        raise BinaryFileError(file_path)
+    return data.decode(encoding, errors="replace")
 
-            count = len(extract_emojis(text))
 
-            # Make display path relative to the scan root
-            try:
-                emoji_file_display = str(Path(emoji_file).relative_to(Path(path).resolve()))
-            except ValueError:
-                emoji_file_display = emoji_file.replace("./", "")
-            display_tuples.append((count, emoji_file_display, emoji_file))
-        except Exception as e:
-            print(f"[red]Error reading file {emoji_file}: {e}[/red]")
-            return (-1, [])
+def _count_changed_emojis(
+    target: tuple[str, LineRanges | None], locate: bool = False, staged: bool = False
+) -> tuple[Counter[str], list[Location]]:
+    """Count the emojis in a file, or only in the given 1-based line ranges.
+
+    With ``staged`` the staged contents are counted instead of the work tree.
+    """
+    file_path, lines = target
+    try:
+        text = _read_staged_text(file_path) if staged else read_text(file_path, errors="replace")[0]
+    except BinaryFileError:
+        return Counter(), []
+    return _count_text(text, locate, in_ranges(lines) if lines is not None else None)
+
 
-    # Sort display_tuples by count in descending order
-    display_tuples.sort(key=lambda x: x[0], reverse=True)
+def _iter_changed_file_matches(changes: Changes, jobs: int, locate: bool = False) -> Iterator[_FileMatch]:
+    """Scan only the files git reports as changed, optionally only their changed lines.
 
-    total_emojis = sum(count for count, _, _ in display_tuples if count > 0)
+    Staged changes are scanned as staged, which is what will be committed,
+    whatever the work tree holds.
 
+    Parameters
+    ----------
+    changes : Changes
+        Changed files and line ranges, from :func:`rmoji.git.diff_changes`.
+    jobs : int
+        Maximum number of worker processes.
+    locate : bool, optional
+        If True, also collect the line and column of each emoji.
+
+    Yields
+    ------
+    tuple[str, Counter[str] | None, list[Location]]
+        Each file path with its emoji counter (None if it could not be read)
+        and, with ``locate``, the emoji locations.
+    """
+    targets = [(file_path, lines if changes.hunks_only else None) for file_path, lines in changes.lines.items()]
+    task = functools.partial(_count_changed_emojis, locate=locate, staged=changes.staged)
+    for (file_path, _), result in _run_file_tasks(task, targets, jobs):
+        if isinstance(result, Exception):
+            yield file_path, None, []
+        else:
+            yield file_path, *result
+
+
+def _native_file_list(path: str, filters: ScanFilters) -> list[str]:
+    """List the files under ``path`` for the native engine, respecting ignore files and filters."""
+    root = Path(path)
+    if root.is_file():
+        return [path]
+    if not root.is_dir():
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+    return [str(root / rel) for rel in get_file_list(path, filters)]
+
+
+def _iter_native_file_matches(path: str, jobs: int, filters: ScanFilters, locate: bool = False) -> Iterator[_FileMatch]:
+    """Scan files with the compiled matcher, fanning out across a process pool.
+
+    Parameters
+    ----------
+    path : str
+        The file or directory to scan.
+    jobs : int
+        Maximum number of worker processes; 1 scans inline.
+    filters : ScanFilters
+        Limits on which files are visited.
+    locate : bool, optional
+        If True, also collect the line and column of each emoji.
+
+    Yields
+    ------
+    tuple[str, Counter[str] | None, list[Location]]
+        Each file path with its emoji counter (None if it could not be read)
+        and, with ``locate``, the emoji locations.
+    """
+    files = _native_file_list(path, filters)
+    task = functools.partial(_count_file_emojis, locate=locate)
+    if jobs <= 1 or len(files) < _NATIVE_INLINE_LIMIT:
+        yield from map(task, files)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(task, files, chunksize=_NATIVE_CHUNKSIZE)
+
+
+def _resolve_engine(engine: Engine) -> Engine:
+    """Pick ripgrep when it is installed and the native engine otherwise."""
+    if engine is Engine.AUTO:
+        return Engine.RG if shutil.which("rg") else Engine.NATIVE
+    return engine
+
+
+def _iter_scan_results(
+    path: str, filters: ScanFilters | None = None, options: ScanOptions | None = None
+) -> Iterator[ScanResult]:
+    """Stream scan results for a directory, one file at a time.
+
+    Occurrences, per-emoji histograms and, on request, locations are all
+    gathered in the same pass over each file.
+
+    Parameters
+    ----------
+    path : str
+        The directory path to scan.
+    filters : ScanFilters | None, optional
+        Depth, size, glob and type limits, applied alike by both engines.
+    options : ScanOptions | None, optional
+        Engine, worker count, index and location settings.
+
+    Yields
+    ------
+    ScanResult
+        The result for each file containing emojis, in the order the search
+        finishes with them. Unreadable files have a count of -1.
+    """
+    filters = filters or ScanFilters()
+    options = options or ScanOptions()
+    jobs = options.jobs or os.cpu_count() or 1
+    file_matches: Iterable[_FileMatch]
+    if options.use_index and not options.locations:
+        file_matches = _iter_indexed_file_matches(path, jobs, filters)
+    elif _resolve_engine(options.engine) is Engine.RG:
+        file_matches = _iter_rg_file_matches(_rg_messages(path, filters), options.locations)
+    else:
+        file_matches = _iter_native_file_matches(path, jobs, filters, options.locations)
+    yield from _to_scan_results(path, file_matches)
+
+
+def _iter_changed_scan_results(
+    path: str, changes: Changes, filters: ScanFilters | None = None, options: ScanOptions | None = None
+) -> Iterator[ScanResult]:
+    """Stream scan results for the files git reports as changed under ``path``.
+
+    Parameters
+    ----------
+    path : str
+        The scan root, used for display paths.
+    changes : Changes
+        Changed files and line ranges, from :func:`rmoji.git.diff_changes`.
+        With ``hunks_only`` set, only the changed lines are counted.
+    filters : ScanFilters | None, optional
+        Depth, size, glob and type limits, applied to the changed files as a
+        scan of ``path`` would apply them.
+    options : ScanOptions | None, optional
+        Worker count and location settings; the engine and index are not used.
+
+    Yields
+    ------
+    ScanResult
+        The result for each changed file containing emojis. Unreadable files
+        have a count of -1.
+    """
+    options = options or ScanOptions()
+    jobs = options.jobs or os.cpu_count() or 1
+    if Path(path).is_dir():
+        selected = select_files(path, changes.lines, filters)
+        changes = changes._replace(lines={file_path: changes.lines[file_path] for file_path in selected})
+    yield from _to_scan_results(path, _iter_changed_file_matches(changes, jobs, options.locations))
+
+
+def _to_scan_results(path: str, file_matches: Iterable[_FileMatch]) -> Iterator[ScanResult]:
+    """Turn per-file emoji counters into scan results counting every occurrence."""
+    for emoji_file, counts, locations in file_matches:
+        if counts is None:
+            yield ScanResult(-1, _display_path(emoji_file, path), emoji_file, Counter())
+        elif counts:
+            yield ScanResult(counts.total(), _display_path(emoji_file, path), emoji_file, counts, tuple(locations))
+
+
+def _summarize_scan_results(results: Iterable[ScanResult]) -> tuple[int, list[ScanResult]]:
+    """Collect scan results, sorted by count in descending order, with their emoji total."""
+    display_tuples = sorted(results, key=lambda x: x.occurrences, reverse=True)
+    total_emojis = sum(result.occurrences for result in display_tuples if result.occurrences > 0)
     return total_emojis, display_tuples
+
+
+def _total_histogram(results: Iterable[ScanResult]) -> Counter[str]:
+    """Add up the per-file histograms into a repo-wide one."""
+    totals: Counter[str] = Counter()
+    for result in results:
+        totals.update(result.emojis)
+    return totals
+
+
+def _scan_for_emojis(
+    path: str, filters: ScanFilters | None = None, options: ScanOptions | None = None
+) -> tuple[int, list[ScanResult]]:
+    """Scan a directory for files containing emojis.
+
+    With ripgrep, counts are taken from the submatches it reports, so matched
+    files are never read a second time.
+
+    Parameters
+    ----------
+    path : str
+        The directory path to scan.
+    filters : ScanFilters | None, optional
+        Depth, size, glob and type limits, applied alike by both engines.
+    options : ScanOptions | None, optional
+        Engine, worker count, index and location settings.
+
+    Returns
+    -------
+    tuple[int, list[ScanResult]]
+        The total number of emoji occurrences and the files containing emojis,
+        most emojis first.
+    """
+    return _summarize_scan_results(_iter_scan_results(path, filters, options))
@@ -0,0 +1,556 @@
+"""Watch mode: keep scan results warm in memory and update them as files change."""
+
+import ctypes
+import ctypes.util
+import errno
+import io
+import json
+import os
+import select
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import Any, NamedTuple, Self
+
+from .files import _IGNORE_FILES, TEMP_SUFFIX, BinaryFileError, ScanFilters, _FileSelector, _walk
+from .index import INDEX_DIR
+from .regions import RegionRules
+from .report import OutputFormat, RecordWriter
+from .scanner import (
+    ScanResult,
+    _count_file_emojis,
+    _display_path,
+    _nuke_file,
+    _run_file_tasks,
+    _summarize_scan_results,
+    _total_histogram,
+)
+
+SOCKET_FILE = "watch.sock"
+
+# Event bits from <sys/inotify.h>.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+# Files are rescanned once written and closed, not on every write, so half-saved files are never read.
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+# struct inotify_event without its trailing name: wd, mask, cookie, len.
+_EVENT = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+# How long to keep collecting events after the first one, so a burst of saves is handled as one batch.
+_SETTLE_SECONDS = 0.05
+
+type _Event = tuple[PurePosixPath | None, str, int]
+
+
+class WatchOptions(NamedTuple):
+    """How a watcher reacts to changes.
+
+    Attributes
+    ----------
+    clean : bool
+        If True, remove emojis from files as soon as they change. Files that
+        already held emojis when watching started are only reported.
+    exclude : tuple[str, ...]
+        Emojis to preserve when cleaning.
+    rules : RegionRules
+        Regions of each file cleaning leaves untouched.
+    polling : bool
+        If True, poll for changes even where inotify is available.
+    interval : float
+        Seconds between polls, and the longest a stop request waits.
+    jobs : int | None
+        Worker processes for the initial scan, defaults to the CPU count.
+    """
+
+    clean: bool = False
+    exclude: tuple[str, ...] = ()
+    rules: RegionRules = RegionRules()
+    polling: bool = False
+    interval: float = 1.0
+    jobs: int | None = None
+
+
+class FileChange(NamedTuple):
+    """A watched file whose emojis changed.
+
+    Attributes
+    ----------
+    result : ScanResult
+        The file's emojis now; zero occurrences once it has none or was deleted.
+    removed : int
+        Emoji occurrences removed by cleaning it.
+    """
+
+    result: ScanResult
+    removed: int = 0
+
+
+class _Inotify:
+    """Directory watches through the Linux inotify API, called via ctypes.
+
+    Raises
+    ------
+    OSError
+        If inotify is unavailable, as on other platforms, or out of instances.
+    """
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        try:
+            init, self._add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError as e:
+            msg = "inotify is not available on this platform"
+            raise OSError(msg) from e
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.dirs: dict[int, PurePosixPath] = {}
+
+    def watch(self, path: Path, rel_dir: PurePosixPath) -> None:
+        """Watch a directory; running out of watches raises :class:`OSError`."""
+        wd = self._add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()), str(path))
+        self.dirs[wd] = rel_dir
+
+    def read(self, timeout: float) -> list[_Event]:
+        """Wait up to ``timeout`` seconds for events and return every queued one.
+
+        Each event is the watched directory (None after an overflow), the
+        name of the entry it concerns and its event mask.
+        """
+        events: list[_Event] = []
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return events
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & _IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                else:
+                    events.append((self.dirs.get(wd), os.fsdecode(name), mask))
+
+    def close(self) -> None:
+        """Release the inotify instance and every watch on it."""
+        os.close(self.fd)
+
+
+class Watcher:
+    """Scan results for a directory, kept up to date as its files change.
+
+    The first scan walks the whole tree. After that only files that changed
+    are rescanned: inotify reports them where available, and elsewhere the
+    tree is polled and only files whose mtime or size changed are read. The
+    compiled matcher and every file's result stay in memory, so queries over
+    the query socket are answered without touching the disk.
+
+    Parameters
+    ----------
+    root : str
+        The directory to watch.
+    filters : ScanFilters | None, optional
+        Depth, size, glob and type limits, as for a scan.
+    options : WatchOptions | None, optional
+        Cleaning, polling and worker settings.
+    """
+
+    def __init__(self, root: str, filters: ScanFilters | None = None, options: WatchOptions | None = None) -> None:
+        self.root = root
+        self.filters = filters or ScanFilters()
+        self.options = options or WatchOptions()
+        self._root_path = Path(root).resolve()
+        self._selector = _FileSelector(self._root_path, self.filters)
+        self._inotify: _Inotify | None = None
+        self._server: _QueryServer | None = None
+        # Guards the results read by socket threads; updates are serialised separately,
+        # so queries are answered while a batch of files is being rescanned.
+        self._lock = threading.Lock()
+        self._updating = threading.RLock()
+        self._dirs: set[PurePosixPath] = set()
+        self._stats: dict[PurePosixPath, tuple[int, int]] = {}
+        self._results: dict[PurePosixPath, ScanResult] = {}
+        # Changes found by resyncs requested over the socket, reported by the next poll.
+        self._pending: list[FileChange] = []
+
+    @property
+    def backend(self) -> str:
+        """Return how changes are detected: ``inotify`` or ``polling``."""
+        return "polling" if self._inotify is None else "inotify"
+
+    def start(self) -> list[ScanResult]:
+        """Set up change detection and scan the whole tree.
+
+        Returns
+        -------
+        list[ScanResult]
+            The files containing emojis, most emojis first.
+
+        Raises
+        ------
+        NotADirectoryError
+            If the root is not a directory.
+        """
+        if not self._root_path.is_dir():
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), self.root)
+        if not self.options.polling:
+            try:
+                self._inotify = _Inotify()
+            except OSError:
+                self._inotify = None
+        self._resync(clean=False)
+        return self.results()
+
+    def results(self, prefix: str = "") -> list[ScanResult]:
+        """Return the files containing emojis, or those under ``prefix``, most emojis first.
+
+        Parameters
+        ----------
+        prefix : str, optional
+            A file or directory relative to the watched root.
+
+        Returns
+        -------
+        list[ScanResult]
+            The current result of each matching file with emojis.
+        """
+        scope = PurePosixPath(prefix.strip("/"))
+        with self._lock:
+            results = [result for rel, result in self._results.items() if rel.is_relative_to(scope)]
+        ordered: list[ScanResult] = _summarize_scan_results(results)[1]
+        return ordered
+
+    def file_count(self) -> int:
+        """Return the number of files being watched."""
+        with self._lock:
+            return len(self._stats)
+
+    def resync(self) -> list[FileChange]:
+        """Walk the whole tree again and rescan every file whose stat data changed.
+
+        Returns
+        -------
+        list[FileChange]
+            The files whose emojis changed.
+        """
+        return self._resync(self.options.clean)
+
+    def poll(self) -> list[FileChange]:
+        """Wait for the next batch of changes, at most ``options.interval`` seconds, and apply it.
+
+        Changes found by resyncs requested over the query socket since the
+        last poll are reported first.
+
+        Returns
+        -------
+        list[FileChange]
+            The files whose emojis changed, possibly none.
+        """
+        if self._inotify is None:
+            time.sleep(self.options.interval)
+            changes = self.resync()
+        else:
+            events = self._inotify.read(self.options.interval)
+            if events:
+                time.sleep(_SETTLE_SECONDS)
+                events.extend(self._inotify.read(0))
+            changes = self._apply(events)
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending + changes
+
+    def run(self, on_change: Callable[[FileChange], None], stop: threading.Event | None = None) -> None:
+        """Apply changes as they happen until ``stop`` is set or the process is interrupted.
+
+        Parameters
+        ----------
+        on_change : Callable[[FileChange], None]
+            Called with every file whose emojis changed.
+        stop : threading.Event | None, optional
+            Set from another thread to stop watching.
+        """
+        while stop is None or not stop.is_set():
+            for change in self.poll():
+                on_change(change)
+
+    def serve(self, socket_path: str | Path | None = None) -> Path:
+        """Answer queries on a Unix socket from a background thread.
+
+        Each request is one JSON object per line, such as
+        ``{"command": "results", "path": "src"}``. Commands are ``status``,
+        ``results`` and ``resync``; every reply is JSON Lines in the format of
+        ``rmoji scan --format jsonl`` and ends with a ``summary`` record. The
+        ``status`` reply first has a ``status`` record with the number of
+        ``watched`` files and the change-detection ``backend``.
+
+        Parameters
+        ----------
+        socket_path : str | Path | None, optional
+            Where to listen, defaults to ``.rmoji/watch.sock`` in the watched root.
+
+        Returns
+        -------
+        Path
+            The socket's path.
+        """
+        path = Path(socket_path) if socket_path else self._root_path / INDEX_DIR / SOCKET_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.is_socket():
+            # Left behind by a watcher that did not shut down cleanly.
+            path.unlink()
+        self._server = _QueryServer(str(path), self)
+        threading.Thread(target=self._server.serve_forever, name="rmoji-watch-socket", daemon=True).start()
+        return path
+
+    def query(self, request: dict[str, Any]) -> str:
+        """Answer one query from the socket.
+
+        Parameters
+        ----------
+        request : dict[str, Any]
+            The ``command`` and, for ``results``, an optional ``path`` prefix.
+
+        Returns
+        -------
+        str
+            The reply as JSON Lines.
+        """
+        out = io.StringIO()
+        writer = RecordWriter(OutputFormat.JSONL, out=out)
+        command = request.get("command")
+        if command == "resync":
+            changes = self.resync()
+            with self._lock:
+                self._pending.extend(changes)
+        elif command == "results":
+            for result in self.results(str(request.get("path") or "")):
+                writer.scan_result(result)
+        elif command == "status":
+            status = {"type": "status", "watched": self.file_count(), "backend": self.backend}
+            out.write(json.dumps(status) + "\n")
+        else:
+            out.write(json.dumps({"type": "error", "error": f"unknown command: {command}"}) + "\n")
+        # As in a scan, ``files`` counts the files with emojis; unreadable ones are ``errors``.
+        results = self.results()
+        errors = sum(1 for r in results if r.occurrences == -1)
+        writer.summary(len(results) - errors, _total_histogram(results), errors)
+        return out.getvalue()
+
+    def close(self) -> None:
+        """Stop the query server and release the directory watches."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            Path(self._server.server_address).unlink(missing_ok=True)  # type: ignore[arg-type]
+            self._server = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self) -> Self:
+        """Keep the watcher open for a block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the query server and release the directory watches."""
+        self.close()
+
+    def _file_path(self, rel: PurePosixPath) -> str:
+        """Return a file's path as scans report it, under the root as given."""
+        return str(Path(self.root, *rel.parts))
+
+    def _watch_dir(self, rel_dir: PurePosixPath) -> None:
+        """Watch a directory, falling back to polling if inotify runs out of watches."""
+        self._dirs.add(rel_dir)
+        if self._inotify is None:
+            return
+        try:
+            self._inotify.watch(self._root_path / rel_dir, rel_dir)
+        except OSError:
+            self._inotify.close()
+            self._inotify = None
+
+    def _walk(self, start: PurePosixPath | None = None) -> list[PurePosixPath]:
+        """Walk the visible tree, or a new subtree of it, watching each directory and listing its files."""
+        files: list[PurePosixPath] = []
+        for rel_dir, names in _walk(self._root_path, self.filters, self._selector, start):
+            self._watch_dir(rel_dir)
+            files.extend(rel_dir / name for name in names)
+        return files
+
+    def _resync(self, clean: bool, touched: Iterable[PurePosixPath] = ()) -> list[FileChange]:
+        """Reload ignore files, walk the whole tree and rescan what changed, and every ``touched`` file."""
+        with self._updating:
+            self._selector = _FileSelector(self._root_path, self.filters)
+            self._dirs = set()
+            files = set(self._walk())
+            return self._update(files | self._stats.keys(), clean, frozenset(touched))
+
+    def _apply(self, events: list[_Event]) -> list[FileChange]:
+        """Turn a batch of inotify events into rescans of the files they touched."""
+        if any(mask & _IN_Q_OVERFLOW or name in _IGNORE_FILES for _, name, mask in events):
+            # Events were lost, or which files are visible may have changed. The walk
+            # finds files whose stat data changed; the files the events name are
+            # rescanned regardless, as a rewrite can leave their mtime and size as they were.
+            touched = [
+                rel_dir / name
+                for rel_dir, name, mask in events
+                if rel_dir is not None and not mask & _IN_ISDIR and not name.endswith(TEMP_SUFFIX)
+            ]
+            return self._resync(self.options.clean, touched)
+        candidates: set[PurePosixPath] = set()
+        with self._updating:
+            for rel_dir, name, mask in events:
+                if rel_dir is None or rel_dir not in self._dirs or name.endswith(TEMP_SUFFIX):
+                    continue
+                rel = rel_dir / name
+                if not mask & _IN_ISDIR:
+                    candidates.add(rel)
+                elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                    if self._keeps_dir(rel):
+                        candidates.update(self._walk(rel))
+                else:
+                    self._dirs = {d for d in self._dirs if not d.is_relative_to(rel)}
+                    candidates.update(f for f in self._stats if f.is_relative_to(rel))
+            return self._update(candidates, self.options.clean)
+
+    def _keeps_dir(self, rel: PurePosixPath) -> bool:
+        """Tell whether a new directory is within the depth limit and not ignored."""
+        max_depth = self.filters.max_depth
+        visible: bool = self._selector.keep_dir(rel)
+        return visible and (max_depth is None or len(rel.parts) < max_depth)
+
+    def _stat(self, rel: PurePosixPath) -> tuple[int, int] | None:
+        """Return a visible file's mtime and size, or None if it is gone or no longer selected."""
+        if rel.parent not in self._dirs or not self._selector.keep_file(rel):
+            return None
+        try:
+            st = Path(self._file_path(rel)).stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _update(
+        self, candidates: Iterable[PurePosixPath], clean: bool, touched: frozenset[PurePosixPath] = frozenset()
+    ) -> list[FileChange]:
+        """Rescan the candidates whose stat data changed, or that are ``touched``, and drop those that are gone."""
+        stats: dict[PurePosixPath, tuple[int, int] | None] = {rel: self._stat(rel) for rel in candidates}
+        changed = {
+            rel: st for rel, st in stats.items() if st is not None and (rel in touched or self._stats.get(rel) != st)
+        }
+        gone = [rel for rel, st in stats.items() if st is None and rel in self._stats]
+
+        scanned = self._scan(changed)
+        removed = dict.fromkeys(scanned, 0)
+        if clean:
+            for rel in [rel for rel, result in scanned.items() if result.occurrences > 0]:
+                removed[rel] = self._clean(rel, scanned)
+                # Remember the cleaned file, so its own rewrite is not picked up as a change.
+                changed[rel] = self._stat(rel) or changed[rel]
+
+        changes: list[FileChange] = []
+        with self._lock:
+            for rel in gone:
+                del self._stats[rel]
+                if (old := self._results.pop(rel, None)) is not None:
+                    changes.append(FileChange(old._replace(occurrences=0, emojis=Counter())))
+            for rel, result in scanned.items():
+                self._stats[rel] = changed[rel]
+                old = self._results.pop(rel, None)
+                if result.occurrences != 0:
+                    self._results[rel] = result
+                if old != result or removed[rel]:
+                    changes.append(FileChange(result, removed[rel]))
+        return changes
+
+    def _scan(self, files: Iterable[PurePosixPath]) -> dict[PurePosixPath, ScanResult]:
+        """Count the emojis in files, across a process pool for large batches."""
+        by_path = {self._file_path(rel): rel for rel in files}
+        jobs = self.options.jobs or os.cpu_count() or 1
+        scanned: dict[PurePosixPath, ScanResult] = {}
+        for file_path, match in _run_file_tasks(_count_file_emojis, list(by_path), jobs):
+            counts = None if isinstance(match, Exception) else match[1]
+            occurrences = -1 if counts is None else counts.total()
+            display_path = _display_path(file_path, self.root)
+            scanned[by_path[file_path]] = ScanResult(occurrences, display_path, file_path, counts or Counter())
+        return scanned
+
+    def _clean(self, rel: PurePosixPath, scanned: dict[PurePosixPath, ScanResult]) -> int:
+        """Remove emojis from a changed file and rescan it; return how many were removed."""
+        before: int = scanned[rel].occurrences
+        try:
+            _nuke_file(self._file_path(rel), list(self.options.exclude) or None, self.options.rules)
+        except (OSError, BinaryFileError, UnicodeDecodeError):
+            return 0
+        scanned.update(self._scan([rel]))
+        after: int = scanned[rel].occurrences
+        return before - max(after, 0)
+
+
+def _parse_request(line: bytes) -> dict[str, Any]:
+    """Decode one request line, which must hold a JSON object."""
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        msg = "expected a JSON object"
+        raise TypeError(msg)
+    return request
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Answer each JSON request line on a connection with JSON Lines."""
+
+    server: "_QueryServer"
+
+    def handle(self) -> None:
+        """Reply to every request line until the client disconnects."""
+        for line in self.rfile:
+            try:
+                reply = self.server.watcher.query(_parse_request(line))
+            except (ValueError, TypeError) as e:
+                reply = json.dumps({"type": "error", "error": str(e)}) + "\n"
+            self.wfile.write(reply.encode("utf-8"))
+            self.wfile.flush()
+
+
+class _QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A Unix socket server answering queries about a watcher's results."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, watcher: Watcher) -> None:
+        super().__init__(socket_path, _QueryHandler)
+        self.watcher = watcher
+
+    def server_bind(self) -> None:
+        """Create the socket accessible to its owner only, so other users cannot query or resync the watcher."""
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
@@ -0,0 +1,40 @@
+"""Regenerate ``rmoji/_emoji_table.py`` from the installed ``emoji`` package::
+
+    make emoji-table
+"""
+
+from pathlib import Path
+
+from rmoji import matcher
+
+_TABLE = Path(__file__).resolve().parent.parent / "rmoji" / "_emoji_table.py"
+
+
+def _literal(text: str) -> str:
+    """Render a string as an ASCII-only, double-quoted Python literal."""
+    return '"' + text.encode("unicode_escape").decode("ascii").replace('"', '\\"') + '"'
+
+
+def render() -> str:
+    """Render the table module for the installed ``emoji`` package and the current rules."""
+    data = matcher._build()
+    sequences = "".join(f"    {_literal(seq)},\n" for seq in data["sequences"])
+    key = ", ".join(_literal(part) for part in matcher._table_key())
+    return (
+        '"""Precomputed emoji matcher data, generated by ``make emoji-table``. Do not edit."""\n'
+        "\n"
+        f"EMOJI_VERSION = {_literal(matcher._installed_emoji_version())}\n"
+        f"KEY = ({key})\n"
+        f"SEQUENCES = (\n{sequences})\n"
+        f"REGEX = {_literal(str(data['regex']))}\n"
+        f"BYTES_REGEX = {_literal(str(data['bytes_regex']))}\n"
+    )
+
+
+def main() -> None:
+    """Write the table module next to the matcher."""
+    _TABLE.write_text(render(), encoding="ascii")
+
+
+if __name__ == "__main__":
+    main()
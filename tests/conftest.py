@@ -0,0 +1,31 @@
+import os
+import subprocess
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_cache(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    cache_dir = tmp_path_factory.mktemp("rmoji-cache")
+    previous = os.environ.get("RMOJI_CACHE_DIR")
+    os.environ["RMOJI_CACHE_DIR"] = str(cache_dir)
+    yield cache_dir
+    if previous is None:
+        del os.environ["RMOJI_CACHE_DIR"]
+    else:
+        os.environ["RMOJI_CACHE_DIR"] = previous
+
+
+@pytest.fixture
+def git() -> Callable[..., None]:
+    def run(repo: Path, *args: str) -> None:
+        subprocess.run(
+            ["git", "-c", "user.name=rmoji", "-c", "user.email=rmoji@example.com", *args],
+            cwd=repo,
+            check=True,
+            capture_output=True,
+        )
+
+    return run
@@ -0,0 +1,34 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import rmoji
+from rmoji import ScanOptions, clean_stream, remove_emojis, scan_paths
+
+
+def test_clean_stream_matches_whole_text_removal() -> None:
+    text = "Ship 🚀 it\n- [ ] pizza 🍕\nfamily 👨‍👩‍👧 and 👍🏽 done ✅\n"
+    chunks = [text[i : i + 3] for i in range(0, len(text), 3)]
+    assert "".join(clean_stream(chunks)) == remove_emojis(text)
+    assert "".join(clean_stream(chunks, exclude=["✅"])) == remove_emojis(text, ["✅"])
+    assert "".join(clean_stream(chunks, exclude_task_lists=True)) == "Ship  it\n- [ ] pizza 🍕\nfamily  and  done \n"
+
+
+def test_clean_stream_yields_before_reading_ahead() -> None:
+    def source() -> Iterator[str]:
+        yield "a 🎉 b"
+        raise AssertionError("read past the first chunk")
+
+    assert next(clean_stream(source())) == "a  b"
+
+
+def test_scan_paths_yields_results_per_path(tmp_path: Path) -> None:
+    (tmp_path / "one").mkdir()
+    (tmp_path / "two").mkdir()
+    (tmp_path / "one" / "a.txt").write_text("🍕🍕", encoding="utf-8")
+    (tmp_path / "two" / "b.txt").write_text("🎉", encoding="utf-8")
+    (tmp_path / "two" / "c.txt").write_text("plain", encoding="utf-8")
+
+    options = ScanOptions(engine=rmoji.Engine.NATIVE)
+    results = list(scan_paths([str(tmp_path / "one"), str(tmp_path / "two")], options=options))
+    assert [(r.display_path, r.occurrences) for r in results] == [("a.txt", 2), ("b.txt", 1)]
+    assert [r.occurrences for r in scan_paths(str(tmp_path / "two" / "b.txt"), options=options)] == [1]
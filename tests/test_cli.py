@@ -1,5 +1,11 @@
+import json
+import subprocess
+import sys
+from collections.abc import Callable
 from pathlib import Path
+from unittest.mock import patch
 
+import pytest
 from typer.testing import CliRunner
 
 from rmoji.cli import app
@@ -74,6 +80,30 @@ def test_remove_command_with_exclude_task_lists() -> None:
         task_file.write_text(original, encoding="utf-8")
 
 
+def test_remove_command_streams_large_files(tmp_path: Path) -> None:
+    log = tmp_path / "big.jsonl"
+    log.write_text('{"msg": "ok 🎉"}\n{"msg": "- [ ] 🍕"}\n' * 50, encoding="utf-8")
+    with (
+        patch("rmoji.scanner._STREAM_THRESHOLD", 0),
+        patch("rmoji.scanner._STREAM_CHUNK_SIZE", 7),
+        patch("rmoji.cli.read_text", side_effect=AssertionError("read into memory")),
+    ):
+        result = runner.invoke(app, ["remove", str(log), "--yes"])
+    assert result.exit_code == 0
+    assert "Found 100 emojis" in result.output
+    assert "Emojis removed." in result.output
+    assert log.read_text(encoding="utf-8") == '{"msg": "ok "}\n{"msg": "- [ ] "}\n' * 50
+
+
+def test_remove_command_exclude_ignores_variation_selectors(tmp_path: Path) -> None:
+    heart = tmp_path / "heart.txt"
+    heart.write_text("I \u2764\ufe0f it", encoding="utf-8")
+    result = runner.invoke(app, ["remove", str(heart), "--yes", "--exclude", "\u2764"])
+    assert result.exit_code == 0
+    assert "No emojis found" in result.output
+    assert heart.read_text(encoding="utf-8") == "I \u2764\ufe0f it"
+
+
 def test_remove_command_no_emojis(tmp_path: Path) -> None:
     plain_file = tmp_path / "plain.txt"
     plain_file.write_text("No emojis here", encoding="utf-8")
@@ -133,3 +163,232 @@ def test_nuke_user_cancels(tmp_path: Path) -> None:
     assert "cancelled" in result.output.lower()
     # File should be unchanged
     assert "😊" in emoji_file.read_text(encoding="utf-8")
+
+
+def test_scan_stream_prints_each_file(tmp_path: Path) -> None:
+    emoji_file = tmp_path / "emoji.txt"
+    messages = [
+        {
+            "type": "match",
+            "data": {"path": {"text": str(emoji_file)}, "submatches": [{"match": {"text": "😊"}}]},
+        },
+        {"type": "end", "data": {"path": {"text": str(emoji_file)}}},
+    ]
+    with patch("rmoji.scanner._rg_messages", return_value=iter(messages)):
+        result = runner.invoke(app, ["scan", str(tmp_path), "--stream", "--engine", "rg"])
+    assert result.exit_code == 0
+    assert "emoji.txt" in result.output
+    assert "Found 1 emojis in 1 files." in result.output
+
+
+def test_nuke_command_with_jobs(tmp_path: Path) -> None:
+    for i in range(3):
+        (tmp_path / f"emoji{i}.txt").write_text("Hello 😊", encoding="utf-8")
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--yes", "--jobs", "2"])
+    assert result.exit_code == 0
+    assert "Files processed: 3" in result.output
+    assert all("😊" not in f.read_text(encoding="utf-8") for f in tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("fsync", ["file", "dir", "none"])
+def test_nuke_command_fsync_modes(tmp_path: Path, fsync: str) -> None:
+    emoji_file = tmp_path / "emoji.txt"
+    emoji_file.write_text("Hello 😊", encoding="utf-8")
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--yes", "--fsync", fsync])
+    assert result.exit_code == 0
+    assert emoji_file.read_text(encoding="utf-8") == "Hello "
+
+
+def test_nuke_dry_run_does_not_write(tmp_path: Path) -> None:
+    emoji_file = tmp_path / "emoji.txt"
+    emoji_file.write_text("Hello 😊", encoding="utf-8")
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--dry-run"])
+    assert result.exit_code == 0
+    assert "-4 bytes" in result.output
+    assert "1 files would change" in result.output
+    assert emoji_file.read_text(encoding="utf-8") == "Hello 😊"
+
+
+def test_remove_diff_does_not_write(tmp_path: Path) -> None:
+    emoji_file = tmp_path / "emoji.txt"
+    emoji_file.write_text("Hello 😊\n", encoding="utf-8")
+    result = runner.invoke(app, ["remove", str(emoji_file), "--diff"])
+    assert result.exit_code == 0
+    assert "-Hello 😊" in result.output
+    assert emoji_file.read_text(encoding="utf-8") == "Hello 😊\n"
+
+
+def test_remove_skips_write_when_nothing_changes(tmp_path: Path) -> None:
+    task_file = tmp_path / "tasks.md"
+    task_file.write_text("- [ ] Ship it 🚀\n", encoding="utf-8")
+    result = runner.invoke(app, ["remove", str(task_file), "--yes", "--exclude-task-lists"])
+    assert result.exit_code == 0
+    assert "No changes needed." in result.output
+
+
+def test_nuke_staged_hunks_only(tmp_path: Path, git: Callable[..., None]) -> None:
+    notes = tmp_path / "notes.md"
+    other = tmp_path / "other.md"
+    notes.write_text("old 😊\nkeep\n", encoding="utf-8")
+    other.write_text("untouched 🍕\n", encoding="utf-8")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    notes.write_text("old 😊\nkeep\nnew 🎉\n", encoding="utf-8")
+    git(tmp_path, "add", "notes.md")
+
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--staged", "--hunks-only", "--yes"])
+    assert result.exit_code == 0
+    assert notes.read_text(encoding="utf-8") == "old 😊\nkeep\nnew \n"
+    assert other.read_text(encoding="utf-8") == "untouched 🍕\n"
+
+
+def test_nuke_staged_skips_partially_staged_files(tmp_path: Path, git: Callable[..., None]) -> None:
+    notes = tmp_path / "notes.md"
+    notes.write_text("keep\n", encoding="utf-8")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    notes.write_text("keep\nlaunch 🚀\n", encoding="utf-8")
+    git(tmp_path, "add", "notes.md")
+    notes.write_text("inserted\nkeep\nlaunch 🚀\n", encoding="utf-8")
+
+    scanned = runner.invoke(app, ["scan", str(tmp_path), "--staged", "--hunks-only", "--format", "jsonl"])
+    assert json.loads(scanned.output.splitlines()[0])["emojis"] == {"🚀": 1}
+
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--staged", "--hunks-only", "--yes"])
+    assert "has unstaged changes" in result.output
+    assert "Files with errors: 1" in result.output
+    assert notes.read_text(encoding="utf-8") == "inserted\nkeep\nlaunch 🚀\n"
+
+
+def test_staged_scan_and_nuke_apply_filters(tmp_path: Path, git: Callable[..., None]) -> None:
+    git(tmp_path, "init", "-q")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "app.py").write_text("# ship 🚀\n", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("done 🎉\n", encoding="utf-8")
+    (tmp_path / "sub" / "deep.py").write_text("# deep 🍕\n", encoding="utf-8")
+    git(tmp_path, "add", ".")
+
+    def staged_scan(*options: str) -> list[str]:
+        result = runner.invoke(app, ["scan", str(tmp_path), "--staged", "--format", "jsonl", *options])
+        return sorted(record["path"] for record in map(json.loads, result.output.splitlines()) if "path" in record)
+
+    assert staged_scan() == ["app.py", "notes.md", "sub/deep.py"]
+    assert staged_scan("-t", "py") == ["app.py", "sub/deep.py"]
+    assert staged_scan("-g", "*.md") == ["notes.md"]
+    assert staged_scan("-g", "!sub/") == ["app.py", "notes.md"]
+    assert staged_scan("-D", "1") == ["app.py", "notes.md"]
+
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--staged", "-t", "py", "--yes"])
+    assert result.exit_code == 0
+    assert (tmp_path / "app.py").read_text(encoding="utf-8") == "# ship \n"
+    assert (tmp_path / "notes.md").read_text(encoding="utf-8") == "done 🎉\n"
+
+
+def test_scan_since_outside_git_repository(tmp_path: Path) -> None:
+    result = runner.invoke(app, ["scan", str(tmp_path), "--since", "HEAD"])
+    assert result.exit_code == 1
+
+
+def test_scan_command_filters(tmp_path: Path) -> None:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "top.md").write_text("Hello 😊", encoding="utf-8")
+    (tmp_path / "sub" / "deep.py").write_text("Hello 🍕", encoding="utf-8")
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--engine", "native", "-D", "1"])
+    assert "top.md" in result.output
+    assert "deep.py" not in result.output
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--engine", "native", "--type", "py"])
+    assert "deep.py" in result.output
+    assert "top.md" not in result.output
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--max-filesize", "lots"])
+    assert result.exit_code == 2
+
+
+def test_scan_histogram_and_locations(tmp_path: Path) -> None:
+    (tmp_path / "a.md").write_text("🍕🍕\nHi 😊", encoding="utf-8")
+    (tmp_path / "b.md").write_text("🍕", encoding="utf-8")
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--engine", "native", "--histogram", "--locations"])
+    assert result.exit_code == 0
+    # Rich expands tabs, so compare whitespace-separated fields.
+    lines = [line.split() for line in result.output.splitlines()]
+    assert "Found 4 emojis in 2 files.".split() in lines
+    assert ["3", "a.md"] in lines
+    assert ["🍕", "2", "😊", "1"] in lines
+    assert ["2:4", "😊"] in lines
+    assert lines[-2:] == [["3", "🍕"], ["1", "😊"]]
+
+
+def test_scan_format_jsonl_and_quiet(tmp_path: Path) -> None:
+    (tmp_path / "a.md").write_text("🍕🍕 😊", encoding="utf-8")
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--engine", "native", "--format", "jsonl"])
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert records[0] == {"type": "file", "path": "a.md", "count": 3, "emojis": {"🍕": 2, "😊": 1}}
+    assert records[-1]["type"] == "summary"
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--engine", "native", "--format", "csv", "--quiet"])
+    assert result.output.splitlines() == ["files,count,errors", "1,3,0"]
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--engine", "native", "-q"])
+    assert "a.md" not in result.output
+    assert "Found 3 emojis in 1 files." in result.output
+
+
+def test_nuke_format_csv_writes_only_records(tmp_path: Path) -> None:
+    (tmp_path / "a.md").write_text("Hi 😊", encoding="utf-8")
+
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--engine", "native", "--format", "csv", "-y"])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ["path,status,error", "a.md,ok,"]
+    assert (tmp_path / "a.md").read_text(encoding="utf-8") == "Hi "
+
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--format", "jsonl", "--dry-run"])
+    assert result.exit_code == 2
+
+
+def test_nuke_only_comments_and_skip_strings(tmp_path: Path) -> None:
+    source = tmp_path / "test_fixture.py"
+    source.write_text('# TODO 🚀\nFIXTURE = "party 🎉"  # 😊\nprint("🍕")\n', encoding="utf-8")
+
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--yes", "--engine", "native", "--only-comments"])
+    assert result.exit_code == 0
+    assert source.read_text(encoding="utf-8") == '# TODO \nFIXTURE = "party 🎉"  # \nprint("🍕")\n'
+
+    source.write_text('x = "🍕" 🎉\n', encoding="utf-8")
+    result = runner.invoke(app, ["remove", str(source), "--yes", "--skip-strings"])
+    assert result.exit_code == 0
+    assert source.read_text(encoding="utf-8") == 'x = "🍕" \n'
+
+
+def test_nuke_rejects_invalid_protect_regex(tmp_path: Path) -> None:
+    result = runner.invoke(app, ["nuke", str(tmp_path), "--protect", "("])
+    assert result.exit_code != 0
+    assert "invalid regex" in result.output
+
+
+_DEFERRED = ["emoji", "rmoji._emoji_table", "rmoji.index", "sqlite3", "pathspec", "iterfzf", "difflib"]
+
+
+@pytest.mark.parametrize(
+    ("module", "deferred"),
+    [
+        ("rmoji.cli", _DEFERRED),
+        ("rmoji.emoji", [*_DEFERRED, "rich", "subprocess", "mmap", "rmoji.scanner", "rmoji.git"]),
+    ],
+)
+def test_cli_startup_defers_heavy_imports(module: str, deferred: list[str]) -> None:
+    probe = f"import sys, {module}; print(' '.join(m for m in {deferred!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == []
+
+
+def test_filter_command_cleans_stdin() -> None:
+    text = "Ship 🚀\n- [ ] pizza 🍕\nkeep ✅\n".encode() + b"\xff bytes\n"
+    result = runner.invoke(app, ["filter", "--exclude", "✅", "--exclude-task-lists"], input=text)
+    assert result.exit_code == 0
+    assert result.stdout_bytes == "Ship \n- [ ] pizza 🍕\nkeep ✅\n".encode() + b"\xff bytes\n"
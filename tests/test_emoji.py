@@ -1,6 +1,15 @@
+import asyncio
+import random
+import threading
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
 import pytest
 
-from rmoji.emoji import extract_emojis, remove_emojis
+from rmoji import emoji as emoji_module
+from rmoji.emoji import clean_many, extract_emojis, iter_clean_many, remove_emojis, remove_emojis_stream
+from rmoji.matcher import emoji_sequences
 
 
 @pytest.fixture
@@ -31,3 +40,104 @@ def test_remove_emojis_with_exclude(sample_text: str) -> None:
 def test_extract_emojis_no_emojis(clean_text: str) -> None:
     emojis = extract_emojis(clean_text)
     assert emojis == []
+
+
+@pytest.mark.parametrize("exclude", [None, ["🍕"]])
+def test_remove_emojis_stream_matches_whole_text(exclude: list[str] | None) -> None:
+    text = "Family 👨‍👩‍👧 time, 🍕🍕 and 👍🏽 ok"
+    expected = remove_emojis(text, exclude)
+    for size in range(1, 6):
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        assert "".join(remove_emojis_stream(chunks, exclude)) == expected
+
+
+def test_remove_emojis_excludes_per_sequence() -> None:
+    text = "👍🍕 👍🏽👍 👨‍👩‍👧👍 🇳🇱🇫🇷 ❤️❤"
+    assert remove_emojis(text, ["👍"]) == "👍 👍 👍  "
+    assert remove_emojis(text, ["👨‍👩‍👧", "🇫🇷"]) == "  👨‍👩‍👧 🇫🇷 "
+    assert remove_emojis(text, ["👍🏽", "❤"]) == " 👍🏽   ❤️❤"
+
+
+def test_remove_emojis_takes_stray_joiners_and_selectors_along() -> None:
+    assert remove_emojis("a👨‍🦲‍👧b ✅\ufe0f\ufe0f c") == "ab  c"
+
+
+def test_remove_emojis_leaves_text_style_symbols_and_other_scripts() -> None:
+    text = "© 2024 ACME™ ★ → क्\u200dष"
+    assert remove_emojis(text) == text
+    assert remove_emojis("©\ufe0f ©") == " ©"
+
+
+def test_remove_emojis_stream_splits_at_any_boundary() -> None:
+    sequences = emoji_sequences()
+    rng = random.Random(0)
+    text = "".join(rng.choice([*rng.sample(sequences, 20), "a", " ", "1", "#", "\u200d", "\ufe0f"]) for _ in range(300))
+    expected = remove_emojis(text, ["1️⃣", "👍"])
+    for size in (1, 2, 3, 7):
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        assert "".join(remove_emojis_stream(chunks, ["1️⃣", "👍"])) == expected
+
+
+def test_extract_emojis_returns_whole_sequences() -> None:
+    assert extract_emojis("👍🏽👍 👨‍👩‍👧 🇳🇱") == ["👍🏽", "👍", "👨‍👩‍👧", "🇳🇱"]
+
+
+def test_remove_emojis_keeps_ascii_and_surrogates_intact() -> None:
+    assert remove_emojis("plain ascii", ["😊"]) == "plain ascii"
+    assert remove_emojis("\udcff 😊 é") == "\udcff  é"
+
+
+class _GatedExecutor(ThreadPoolExecutor):
+    """Runs nothing until the gate opens, to hold documents in flight."""
+
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.gate = threading.Event()
+
+    def submit[T](self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        def gated() -> T:
+            self.gate.wait()
+            return fn(*args, **kwargs)
+
+        return super().submit(gated)
+
+
+def test_clean_many_keeps_order_across_inline_and_offloaded_docs() -> None:
+    large = "big 🚀 " * 10_000
+    docs = ["a 🍕", large, "plain", large + "✅", "b 🎉"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        cleaned = asyncio.run(clean_many(docs, exclude=["✅"], executor=pool))
+    assert cleaned == [remove_emojis(doc, ["✅"]) for doc in docs]
+
+
+def test_iter_clean_many_applies_backpressure(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(emoji_module.os, "cpu_count", lambda: 1)
+    read = 0
+
+    async def producer() -> AsyncIterator[str]:
+        nonlocal read
+        for _ in range(100):
+            read += 1
+            yield "big 🚀 " * 10_000
+
+    async def first_two(executor: _GatedExecutor) -> list[str]:
+        docs = iter_clean_many(producer(), executor=executor)
+        first = asyncio.ensure_future(anext(docs))
+        await asyncio.sleep(0.05)
+        assert read == 4  # one window of documents per worker, and no more
+        executor.gate.set()
+        return [await first, await anext(docs)]
+
+    with _GatedExecutor() as executor:
+        assert asyncio.run(first_two(executor)) == ["big  " * 10_000] * 2
+
+
+@pytest.mark.parametrize("unit", ["漢字かなテスト🚀", "Привет👍🏽", "1234🇳🇱🇫🇷#️⃣"])
+def test_remove_emojis_stream_carries_bounded_text(unit: str) -> None:
+    text = unit * (2 * 1024 * 1024 // len(unit))
+    size = 64 * 1024
+    chunks = [text[i : i + size] for i in range(0, len(text), size)]
+    pieces = list(remove_emojis_stream(chunks))
+    assert "".join(pieces) == remove_emojis(text)
+    assert len(pieces) >= len(chunks) - 1
+    assert max(map(len, pieces)) <= size + 64
@@ -1,9 +1,12 @@
+import os
+import stat
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, TextIO
 
 import pytest
 
-from rmoji.files import _load_gitignore_spec, get_file_list
+from rmoji import files
+from rmoji.files import FsyncMode, ScanFilters, SyncBatch, _load_gitignore_spec, atomic_write_text, get_file_list
 
 
 @pytest.fixture
@@ -64,3 +67,236 @@ def test_get_file_list_respects_gitignore(test_dir: Path, gitignore_spec: tuple[
 
     assert len(file_list) == len(expected_files)
     assert set(file_list) == expected_files
+
+
+def test_atomic_write_text_replaces_content_and_keeps_mode(tmp_path: Path) -> None:
+    target = tmp_path / "notes.txt"
+    target.write_text("old 😊", encoding="utf-8")
+    target.chmod(0o640)
+
+    atomic_write_text(target, "new")
+
+    assert target.read_text(encoding="utf-8") == "new"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_atomic_write_text_failure_leaves_original(tmp_path: Path) -> None:
+    target = tmp_path / "notes.txt"
+    target.write_text("original", encoding="utf-8")
+
+    with pytest.raises(UnicodeEncodeError):
+        atomic_write_text(target, "not ascii 😊", encoding="ascii")
+
+    assert target.read_text(encoding="utf-8") == "original"
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_atomic_write_text_follows_symlinks(tmp_path: Path) -> None:
+    target = tmp_path / "real.txt"
+    target.write_text("old", encoding="utf-8")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    atomic_write_text(link, "new", fsync=False)
+
+    assert link.is_symlink()
+    assert target.read_text(encoding="utf-8") == "new"
+
+
+def test_sync_batch_fsyncs_each_file_before_rename_and_each_directory_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    events: list[str] = []
+    synced_dirs: list[Path] = []
+    fsync, replace = os.fsync, os.replace
+    monkeypatch.setattr(os, "sync", lambda: pytest.fail("the whole system was synced"))
+    monkeypatch.setattr(os, "fsync", lambda fd: (events.append("fsync"), fsync(fd)))
+    monkeypatch.setattr(os, "replace", lambda src, dst: (events.append("replace"), replace(src, dst)))
+    monkeypatch.setattr(files, "_fsync_dir", synced_dirs.append)
+    (tmp_path / "sub").mkdir()
+
+    with SyncBatch() as batch:
+        for name in ["a.txt", "b.txt", "sub/c.txt"]:
+            atomic_write_text(tmp_path / name, name, fsync=FsyncMode.DIR)
+            batch.add(tmp_path / name)
+        assert not synced_dirs
+
+    assert events == ["fsync", "replace"] * 3
+    assert sorted(synced_dirs) == [tmp_path.resolve(), (tmp_path / "sub").resolve()]
+    assert (tmp_path / "sub" / "c.txt").read_text(encoding="utf-8") == "sub/c.txt"
+
+
+def test_get_file_list_skips_scan_index(tmp_path: Path) -> None:
+    (tmp_path / ".rmoji").mkdir()
+    (tmp_path / ".rmoji" / "index.sqlite").write_bytes(b"")
+    (tmp_path / "file.txt").write_text("text", encoding="utf-8")
+    assert get_file_list(str(tmp_path)) == ["file.txt"]
+
+
+@pytest.fixture
+def isolated_git_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    config_home = tmp_path / "config"
+    (config_home / "git").mkdir(parents=True)
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(config_home))
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(config_home / "gitconfig"))
+    return config_home
+
+
+def test_get_file_list_nested_ignore_files(tmp_path: Path, isolated_git_config: Path) -> None:
+    root = tmp_path / "repo"
+    (root / "pkg" / "build").mkdir(parents=True)
+    (root / ".gitignore").write_text("*.log\n", encoding="utf-8")
+    (root / "pkg" / ".gitignore").write_text("build/\n!keep.log\n", encoding="utf-8")
+    (root / "pkg" / ".ignore").write_text("secret.txt\n", encoding="utf-8")
+    for name in ["a.log", "pkg/keep.log", "pkg/other.log", "pkg/secret.txt", "pkg/build/out.txt", "pkg/main.py"]:
+        (root / name).write_text("x", encoding="utf-8")
+
+    assert sorted(get_file_list(str(root))) == [
+        ".gitignore",
+        "pkg/.gitignore",
+        "pkg/.ignore",
+        "pkg/keep.log",
+        "pkg/main.py",
+    ]
+
+
+def test_get_file_list_prunes_ignored_directories(
+    tmp_path: Path, isolated_git_config: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    root = tmp_path / "repo"
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "node_modules" / "dep" / "index.js").write_text("x", encoding="utf-8")
+    (root / "main.js").write_text("x", encoding="utf-8")
+    (root / ".gitignore").write_text("node_modules\n", encoding="utf-8")
+
+    visited: list[str] = []
+    real_walk = os.walk
+
+    def recording_walk(top: Path) -> object:
+        for dirpath, dirnames, filenames in real_walk(top):
+            visited.append(dirpath)
+            yield dirpath, dirnames, filenames
+
+    monkeypatch.setattr(files.os, "walk", recording_walk)
+    assert sorted(get_file_list(str(root))) == [".gitignore", "main.js"]
+    assert visited == [str(root.resolve())]
+
+
+def test_get_file_list_repository_excludes(tmp_path: Path, isolated_git_config: Path) -> None:
+    root = tmp_path / "repo"
+    (root / ".git" / "info").mkdir(parents=True)
+    (root / ".git" / "info" / "exclude").write_text("local.txt\n", encoding="utf-8")
+    (isolated_git_config / "git" / "ignore").write_text("*.swp\n", encoding="utf-8")
+    (root / "sub").mkdir()
+    (root / ".gitignore").write_text("sub/generated.txt\n", encoding="utf-8")
+    for name in ["local.txt", "notes.swp", "sub/generated.txt", "sub/code.py"]:
+        (root / name).write_text("x", encoding="utf-8")
+
+    assert sorted(get_file_list(str(root))) == [".gitignore", "sub/code.py"]
+    # Scanning a subdirectory still applies rules from the repository root.
+    assert get_file_list(str(root / "sub")) == ["code.py"]
+
+
+def test_get_file_list_core_excludes_file(tmp_path: Path, isolated_git_config: Path) -> None:
+    excludes = tmp_path / "my-excludes"
+    excludes.write_text("*.bak\n", encoding="utf-8")
+    (isolated_git_config / "gitconfig").write_text(f"[core]\n\texcludesFile = {excludes}\n", encoding="utf-8")
+    root = tmp_path / "repo"
+    (root / ".git").mkdir(parents=True)
+    (root / "a.bak").write_text("x", encoding="utf-8")
+    (root / "a.txt").write_text("x", encoding="utf-8")
+
+    assert get_file_list(str(root)) == ["a.txt"]
+
+
+def test_get_file_list_depth_size_glob_and_type_filters(tmp_path: Path, isolated_git_config: Path) -> None:
+    root = tmp_path / "repo"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / ".gitignore").write_text("generated.py\n", encoding="utf-8")
+    for name in ["README.md", "NOTES.MD", "setup.py", "generated.py", "src/app.py", "src/pkg/mod.py"]:
+        (root / name).write_text("x", encoding="utf-8")
+    (root / "src" / "data.py").write_text("x" * 2048, encoding="utf-8")
+
+    def listed(**kwargs: object) -> list[str]:
+        return sorted(get_file_list(str(root), ScanFilters(**kwargs)))  # type: ignore[arg-type]
+
+    assert listed(max_depth=1) == ["NOTES.MD", "README.md", "setup.py"]
+    assert listed(max_depth=2, types=("py",)) == ["setup.py", "src/app.py", "src/data.py"]
+    assert listed(types=("py",), max_filesize=1024) == ["setup.py", "src/app.py", "src/pkg/mod.py"]
+    assert listed(globs=("*.md",)) == ["README.md"]
+    assert listed(iglobs=("*.md",)) == ["NOTES.MD", "README.md"]
+    assert listed(globs=("!src", "*.py")) == ["generated.py", "setup.py"]
+    assert listed(max_depth=0) == []
+
+
+@pytest.mark.parametrize(
+    ("head", "expected"),
+    [
+        (b"plain text", "utf-8"),
+        (b"\xef\xbb\xbfbom", "utf-8"),
+        (b"\xff\xfeh\x00", "utf-16-le"),
+        (b"\xfe\xff\x00h", "utf-16-be"),
+        (b"\xff\xfe\x00\x00h\x00\x00\x00", "utf-32-le"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", None),
+    ],
+)
+def test_sniff_encoding(head: bytes, expected: str | None) -> None:
+    assert files.sniff_encoding(head) == expected
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-16-le", "utf-16-be"])
+def test_read_text_round_trips_bom_and_line_endings(tmp_path: Path, encoding: str) -> None:
+    original = "\ufeffline one 😊\r\nline two\r\n".encode(encoding)
+    path = tmp_path / "file.txt"
+    path.write_bytes(original)
+
+    text, detected = files.read_text(path)
+    assert detected == encoding
+    assert "😊" in text
+    atomic_write_text(path, text, encoding=detected, newline="")
+    assert path.read_bytes() == original
+
+
+def test_read_text_rejects_binary_files(tmp_path: Path) -> None:
+    path = tmp_path / "image.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+    with pytest.raises(files.BinaryFileError):
+        files.read_text(path)
+
+
+def test_atomic_rewrite_can_abandon_the_rewrite(tmp_path: Path) -> None:
+    path = tmp_path / "file.txt"
+    path.write_text("original", encoding="utf-8")
+
+    def write(f: TextIO) -> bool:
+        f.write("partial")
+        return False
+
+    assert files.atomic_rewrite(path, write) is False
+    assert path.read_text(encoding="utf-8") == "original"
+    assert [p.name for p in tmp_path.iterdir()] == ["file.txt"]
+
+
+def test_get_file_list_skips_hidden_entries_for_scans(tmp_path: Path) -> None:
+    (tmp_path / ".github").mkdir()
+    (tmp_path / ".github" / "ci.yml").write_text("x", encoding="utf-8")
+    (tmp_path / ".env").write_text("x", encoding="utf-8")
+    (tmp_path / ".ignore").write_text("!.keep\n", encoding="utf-8")
+    (tmp_path / ".keep").write_text("x", encoding="utf-8")
+    (tmp_path / "main.py").write_text("x", encoding="utf-8")
+
+    # Scan filters skip hidden entries, as ripgrep does, unless whitelisted or asked for.
+    assert sorted(get_file_list(str(tmp_path), ScanFilters())) == [".keep", "main.py"]
+    assert sorted(get_file_list(str(tmp_path), ScanFilters(globs=(".env",)))) == [".env"]
+    assert (
+        sorted(get_file_list(str(tmp_path)))
+        == sorted(get_file_list(str(tmp_path), ScanFilters(hidden=True)))
+        == [
+            ".env",
+            ".github/ci.yml",
+            ".ignore",
+            ".keep",
+            "main.py",
+        ]
+    )
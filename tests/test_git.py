@@ -0,0 +1,120 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from rmoji.git import GitError, diff_changes, in_ranges, parse_unified_diff
+from rmoji.scanner import _iter_changed_scan_results
+
+DIFF = """\
+diff --git a/notes.md b/notes.md
+index 1111111..2222222 100644
+--- a/notes.md
++++ b/notes.md
+@@ -2,0 +3,2 @@ intro
++new line 😊
++another 🍕
+@@ -9 +11 @@ tail
+-old
++replaced 🎉
+@@ -20,3 +22,0 @@ gone
+-a
+-b
+-c
+diff --git a/gone.txt b/gone.txt
+deleted file mode 100644
+--- a/gone.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-bye
+diff --git "a/caf\\303\\251 \\"x\\".txt" "b/caf\\303\\251 \\"x\\".txt"
+--- "a/caf\\303\\251 \\"x\\".txt"
++++ "b/caf\\303\\251 \\"x\\".txt"
+@@ -0,0 +1 @@
++hi
+"""
+
+
+@pytest.fixture
+def repo(tmp_path: Path, git: Callable[..., None]) -> Path:
+    git(tmp_path, "init", "-q")
+    (tmp_path / "committed.md").write_text("one 😊\ntwo\nthree 🍕\n", encoding="utf-8")
+    (tmp_path / "untouched.md").write_text("keep 🎉\n", encoding="utf-8")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+def test_parse_unified_diff() -> None:
+    assert parse_unified_diff(DIFF) == {
+        "notes.md": [(3, 4), (11, 11)],
+        'café "x".txt': [(1, 1)],
+    }
+
+
+def test_parse_unified_diff_reads_added_lines_that_look_like_headers() -> None:
+    diff = """\
+diff --git a/main.c b/main.c
+--- a/main.c
++++ b/main.c
+@@ -3,0 +4,2 @@ int main(void)
++++ counter;
++@@ not a hunk 🍕
+@@ -9 +11 @@ return
+-        return 1;
++        return 0; /* 🎉 */
+\\ No newline at end of file
+"""
+    assert parse_unified_diff(diff) == {"main.c": [(4, 5), (11, 11)]}
+
+
+def test_in_ranges() -> None:
+    contains = in_ranges([(11, 11), (3, 4)])
+    assert [n for n in range(1, 13) if contains(n)] == [3, 4, 11]
+
+
+def test_diff_changes_staged_and_unstaged(repo: Path, git: Callable[..., None]) -> None:
+    (repo / "committed.md").write_text("one 😊\ntwo 🚀\nthree 🍕\n", encoding="utf-8")
+    git(repo, "add", "committed.md")
+    (repo / "new.md").write_text("fresh 🌟\n", encoding="utf-8")
+    git(repo, "add", "new.md")
+    (repo / "untouched.md").write_text("keep 🎉\nedit 🌈\n", encoding="utf-8")
+
+    staged = diff_changes(str(repo), staged=True)
+    assert staged.lines == {str(repo / "committed.md"): [(2, 2)], str(repo / "new.md"): [(1, 1)]}
+
+    unstaged = diff_changes(str(repo))
+    assert unstaged.lines == {str(repo / "untouched.md"): [(2, 2)]}
+
+    since = diff_changes(str(repo), since="HEAD")
+    assert set(since.lines) == {str(repo / name) for name in ("committed.md", "new.md", "untouched.md")}
+
+
+def test_diff_changes_outside_repository(tmp_path: Path) -> None:
+    with pytest.raises(GitError):
+        diff_changes(str(tmp_path), staged=True)
+
+
+def test_changed_scan_counts_only_changed_lines(repo: Path, git: Callable[..., None]) -> None:
+    (repo / "committed.md").write_text("one 😊\ntwo 🚀\nthree 🍕\n", encoding="utf-8")
+    git(repo, "add", "committed.md")
+
+    whole = list(_iter_changed_scan_results(str(repo), diff_changes(str(repo), staged=True)))
+    assert [result[:3] for result in whole] == [(3, "committed.md", str(repo / "committed.md"))]
+
+    hunks = list(_iter_changed_scan_results(str(repo), diff_changes(str(repo), staged=True, hunks_only=True)))
+    assert [result[:3] for result in hunks] == [(1, "committed.md", str(repo / "committed.md"))]
+
+
+def test_changed_scan_reads_partially_staged_files_from_the_index(repo: Path, git: Callable[..., None]) -> None:
+    (repo / "committed.md").write_text("one 😊\ntwo 🚀\nthree 🍕\n", encoding="utf-8")
+    git(repo, "add", "committed.md")
+    (repo / "committed.md").write_text("unstaged\none 😊\ntwo 🚀\nthree 🍕 🎉\n", encoding="utf-8")
+
+    changes = diff_changes(str(repo), staged=True, hunks_only=True)
+    assert changes.partially_staged == {str(repo / "committed.md")}
+    hunks = list(_iter_changed_scan_results(str(repo), changes))
+    assert [(result.occurrences, dict(result.emojis)) for result in hunks] == [(1, {"🚀": 1})]
+
+    whole = list(_iter_changed_scan_results(str(repo), diff_changes(str(repo), staged=True)))
+    assert [result.occurrences for result in whole] == [3]
@@ -0,0 +1,87 @@
+import os
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from rmoji import index as index_module
+from rmoji.index import INDEX_DIR, INDEX_FILE, ScanIndex, file_digest
+
+
+@pytest.fixture
+def old_file(tmp_path: Path) -> Path:
+    file_path = tmp_path / "notes.txt"
+    file_path.write_text("Hello 😊", encoding="utf-8")
+    os.utime(file_path, ns=(1_000_000_000, 1_000_000_000))
+    return file_path
+
+
+def _store(index: ScanIndex, file_path: Path) -> None:
+    data = file_path.read_bytes()
+    index.store(str(file_path), file_path.stat(), file_digest(data), Counter({"😊": 1}))
+
+
+def test_index_round_trips_through_disk(tmp_path: Path, old_file: Path) -> None:
+    with ScanIndex(tmp_path) as index:
+        _store(index, old_file)
+
+    assert (tmp_path / INDEX_DIR / INDEX_FILE).exists()
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(old_file), old_file.stat()) == {"😊": 1}
+
+
+def test_index_misses_when_stat_changes(tmp_path: Path, old_file: Path) -> None:
+    with ScanIndex(tmp_path) as index:
+        _store(index, old_file)
+
+    old_file.write_text("Hello 😊 and more", encoding="utf-8")
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(old_file), old_file.stat()) is None
+        assert index.lookup_content(str(old_file), old_file.stat()) is None
+
+
+def test_index_reuses_counts_when_only_mtime_changes(tmp_path: Path, old_file: Path) -> None:
+    with ScanIndex(tmp_path) as index:
+        _store(index, old_file)
+
+    os.utime(old_file, ns=(2_000_000_000, 2_000_000_000))
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(old_file), old_file.stat()) is None
+        assert index.lookup_content(str(old_file), old_file.stat()) == {"😊": 1}
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(old_file), old_file.stat()) == {"😊": 1}
+
+
+def test_index_does_not_trust_recently_modified_files(tmp_path: Path) -> None:
+    fresh = tmp_path / "fresh.txt"
+    fresh.write_text("Hello 😊", encoding="utf-8")
+    with ScanIndex(tmp_path) as index:
+        _store(index, fresh)
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(fresh), fresh.stat()) is None
+
+
+def test_index_prune_forgets_missing_files(tmp_path: Path, old_file: Path) -> None:
+    st = old_file.stat()
+    with ScanIndex(tmp_path) as index:
+        _store(index, old_file)
+    with ScanIndex(tmp_path) as index:
+        # Files merely left out of a filtered scan are kept.
+        index.prune([])
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(old_file), st) is not None
+    old_file.unlink()
+    with ScanIndex(tmp_path) as index:
+        index.prune([])
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(old_file), st) is None
+
+
+def test_index_is_discarded_when_matcher_changes(
+    tmp_path: Path, old_file: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    with ScanIndex(tmp_path) as index:
+        _store(index, old_file)
+    monkeypatch.setattr(index_module, "_cache_key", lambda: "different")
+    with ScanIndex(tmp_path) as index:
+        assert index.lookup(str(old_file), old_file.stat()) is None
@@ -0,0 +1,99 @@
+import json
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+import emoji
+import pytest
+
+from rmoji import matcher
+from rmoji.constants import BLACKLIST
+from rmoji.matcher import build_trie_regex, emoji_bytes_matcher, emoji_matcher, emoji_regex, emoji_sequences
+
+
+@pytest.fixture
+def fresh_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    monkeypatch.setenv("RMOJI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(matcher, "_precomputed", lambda: None)
+    matcher._load.cache_clear()
+    yield tmp_path
+    matcher._load.cache_clear()
+
+
+def test_build_trie_regex_matches_longest_sequence() -> None:
+    pattern = re.compile(build_trie_regex(["a", "ab", "abc", "b", "c", "#1"]))
+    assert pattern.findall("abcab b #1 c") == ["abc", "ab", "b", "#1", "c"]
+
+
+def test_build_trie_regex_collapses_ranges() -> None:
+    assert build_trie_regex(["a", "b", "c", "e"]) == "[a-ce]"
+
+
+def test_emoji_sequences_excludes_blacklist() -> None:
+    sequences = emoji_sequences()
+    assert not set(BLACKLIST) & set(sequences)
+    text_style = [e for e, data in emoji.EMOJI_DATA.items() if matcher._is_text_style(e, data["status"])]
+    assert len(sequences) == len(emoji.EMOJI_DATA) - len(BLACKLIST) - len(text_style)
+
+
+def test_text_style_symbols_only_match_with_variation_selector() -> None:
+    assert emoji_matcher().findall("© 2024 ACME™ ↔ ©\ufe0f ❤ ▶\ufe0f") == ["©\ufe0f", "❤", "▶\ufe0f"]
+
+
+def test_emoji_matcher_matches_every_sequence() -> None:
+    pattern = emoji_matcher()
+    sequences = emoji_sequences()
+    assert all(pattern.fullmatch(seq) for seq in sequences)
+    assert pattern.findall("".join(sequences)) == sequences
+
+
+def test_emoji_matcher_keeps_zwj_and_flag_sequences_whole() -> None:
+    assert emoji_matcher().findall("family 👨‍👩‍👧 flag 🇺🇸 pizza 🍕🎉") == ["👨‍👩‍👧", "🇺🇸", "🍕", "🎉"]
+
+
+def test_cache_is_written_and_reused(fresh_cache: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    regex = emoji_regex()
+    (cache_file,) = fresh_cache.glob("matcher-*.json")
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["regex"] == regex
+
+    matcher._load.cache_clear()
+    monkeypatch.setattr(matcher, "_build", lambda: pytest.fail("cache was not reused"))
+    assert emoji_regex() == regex
+
+
+def test_cache_key_tracks_blacklist(fresh_cache: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    key = matcher._cache_key()
+    monkeypatch.setattr(matcher, "BLACKLIST", [*BLACKLIST, "😊"])
+    assert matcher._cache_key() != key
+
+
+def test_emoji_bytes_matcher_agrees_with_text_matcher() -> None:
+    text = "x".join(emoji_sequences()) + " plain © 1️⃣ 👨‍👩‍👧 🇫🇷"
+    expected = emoji_matcher().findall(text)
+    assert [m.decode("utf-8") for m in emoji_bytes_matcher().findall(text.encode("utf-8"))] == expected
+
+
+def test_precomputed_table_matches_installed_emoji_data() -> None:
+    table = matcher._precomputed()
+    assert table is not None, "rmoji/_emoji_table.py is stale, run `make emoji-table`"
+    assert table["emoji_version"] == matcher._installed_emoji_version()
+    assert {key: table[key] for key in ("sequences", "regex", "bytes_regex")} == matcher._build()
+
+
+@pytest.mark.parametrize("stale", ["_MATCHER_VERSION", "_installed_emoji_version"])
+def test_stale_table_falls_back_to_building(stale: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RMOJI_CACHE_DIR", str(tmp_path))
+    if stale == "_MATCHER_VERSION":
+        monkeypatch.setattr(matcher, "_MATCHER_VERSION", "stale")
+    else:
+        # An upgraded emoji package with the old table still shipped.
+        monkeypatch.setattr(matcher, "_installed_emoji_version", lambda: "999.0.0")
+    matcher._precomputed.cache_clear()
+    matcher._load.cache_clear()
+    try:
+        assert matcher._precomputed() is None
+        assert emoji_sequences() == matcher._build()["sequences"]
+        assert list(tmp_path.glob("matcher-*.json"))
+    finally:
+        matcher._precomputed.cache_clear()
+        matcher._load.cache_clear()
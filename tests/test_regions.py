@@ -0,0 +1,92 @@
+import random
+import re
+
+import pytest
+
+from rmoji.emoji import remove_emojis
+from rmoji.regions import (
+    RegionRules,
+    code_spans,
+    lexed_spans,
+    merge_spans,
+    outside_line_spans,
+    protected_spans,
+    remove_emojis_outside,
+    task_list_spans,
+)
+
+
+def _per_line_reference(text: str, exclude_task_lists: bool, lines: list[tuple[int, int]] | None) -> str:
+    cleaned = []
+    for number, line in enumerate(text.split("\n"), start=1):
+        is_task = exclude_task_lists and re.match(r"^[^\S\n]*[-+*][^\S\n]*\[[ xX]\]", line)
+        out_of_scope = lines is not None and not any(start <= number <= end for start, end in lines)
+        cleaned.append(line if is_task or out_of_scope else remove_emojis(line))
+    return "\n".join(cleaned)
+
+
+def test_task_list_spans_merge_consecutive_lines() -> None:
+    text = "# Plan 🚀\n- [ ] a 🍕\n  * [x] b ✅\n\ntext 😊\n+ [X] c 🎉"
+    spans = list(task_list_spans(text))
+    assert [text[start:end] for start, end in spans] == ["- [ ] a 🍕\n  * [x] b ✅\n", "+ [X] c 🎉"]
+
+
+def test_outside_line_spans() -> None:
+    text = "one\ntwo\nthree\nfour\n"
+    assert [text[s:e] for s, e in outside_line_spans(text, [(2, 2), (4, 9)])] == ["one\n", "three\n"]
+    assert [text[s:e] for s, e in outside_line_spans(text, [])] == [text]
+    assert list(outside_line_spans(text, [(1, 5)])) == []
+
+
+def test_merge_spans() -> None:
+    assert merge_spans([(5, 7), (0, 2), (2, 3), (6, 9), (4, 4)]) == [(0, 3), (5, 9)]
+
+
+@pytest.mark.parametrize("exclude_task_lists", [False, True])
+@pytest.mark.parametrize("lines", [None, [(2, 3), (6, 6)]])
+def test_remove_emojis_outside_matches_per_line_cleaning(
+    exclude_task_lists: bool, lines: list[tuple[int, int]] | None
+) -> None:
+    alphabet = ["- [ ] ", "* [x] ", "  ", "text ", "\n", "\n", "🍕", "👍🏽", "✅"]
+    rng = random.Random(0)
+    for _ in range(200):
+        text = "".join(rng.choices(alphabet, k=15))
+        protected = []
+        if exclude_task_lists:
+            protected.extend(task_list_spans(text))
+        if lines is not None:
+            protected.extend(outside_line_spans(text, lines))
+        assert remove_emojis_outside(text, protected) == _per_line_reference(text, exclude_task_lists, lines)
+
+
+def test_lexed_spans_python() -> None:
+    text = 'x = "keep 🍕 # not a comment"  # drop 😊 "q"\ns = """doc 🎉\nstill 🚀"""\n'
+    comments, strings = lexed_spans(text, "mod.py")
+    assert [text[s:e] for s, e in comments] == ['# drop 😊 "q"']
+    assert [text[s:e] for s, e in strings] == ['"keep 🍕 # not a comment"', '"""doc 🎉\nstill 🚀"""']
+
+
+def test_lexed_spans_javascript_and_unknown_types() -> None:
+    text = "const a = `t 🍕 ${b}`; // hi 😊\n/* block\n 🎉 */ 'c'"
+    comments, strings = lexed_spans(text, "src/app.ts")
+    assert [text[s:e] for s, e in comments] == ["// hi 😊", "/* block\n 🎉 */"]
+    assert [text[s:e] for s, e in strings] == ["`t 🍕 ${b}`", "'c'"]
+    assert lexed_spans(text, "notes.unknown") == ([], [])
+
+
+def test_code_spans() -> None:
+    text = "text 🍕\n```py\ncode 🎉\n```\nafter `inline 😊` 🚀\n~~~\nunclosed 🎉"
+    assert [text[s:e] for s, e in code_spans(text)] == ["```py\ncode 🎉\n```", "~~~\nunclosed 🎉", "`inline 😊`"]
+
+
+@pytest.mark.parametrize(
+    ("rules", "expected"),
+    [
+        (RegionRules(strings=True), 'x = "🍕"  # \n'),
+        (RegionRules(only_comments=True), 'x = "🍕" 🎉 # \n'),
+        (RegionRules(patterns=(r"^x = .*?🎉",)), 'x = "🍕" 🎉 # \n'),
+    ],
+)
+def test_protected_spans(rules: RegionRules, expected: str) -> None:
+    text = 'x = "🍕" 🎉 # 😊\n'
+    assert remove_emojis_outside(text, protected_spans(text, rules, "mod.py")) == expected
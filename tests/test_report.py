@@ -0,0 +1,63 @@
+import io
+import json
+from collections import Counter
+
+import pytest
+
+from rmoji.report import OutputFormat, RecordWriter
+from rmoji.scanner import ScanResult
+
+
+@pytest.fixture
+def result() -> ScanResult:
+    return ScanResult(3, "a.md", "/repo/a.md", Counter({"😊": 1, "🍕": 2}), ((1, 1, "🍕"), (1, 5, "🍕"), (2, 4, "😊")))
+
+
+def _writer(output_format: OutputFormat, locations: bool = False) -> tuple[RecordWriter, io.StringIO]:
+    out = io.StringIO()
+    return RecordWriter(output_format, locations, out), out
+
+
+def test_jsonl_records(result: ScanResult) -> None:
+    writer, out = _writer(OutputFormat.JSONL, locations=True)
+    writer.scan_result(result)
+    writer.scan_result(ScanResult(-1, "bad.txt", "/repo/bad.txt", Counter()))
+    writer.summary(1, result.emojis, errors=1)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert records == [
+        {
+            "type": "file",
+            "path": "a.md",
+            "count": 3,
+            "emojis": {"🍕": 2, "😊": 1},
+            "locations": [[1, 1, "🍕"], [1, 5, "🍕"], [2, 4, "😊"]],
+        },
+        {"type": "error", "path": "bad.txt", "count": -1},
+        {"type": "summary", "files": 1, "count": 3, "errors": 1, "emojis": {"🍕": 2, "😊": 1}},
+    ]
+
+
+def test_csv_writes_header_once(result: ScanResult) -> None:
+    writer, out = _writer(OutputFormat.CSV)
+    writer.scan_result(result)
+    writer.scan_result(result._replace(display_path="b, c.md"))
+    assert out.getvalue().splitlines() == ["path,count,emojis", "a.md,3,🍕:2 😊:1", '"b, c.md",3,🍕:2 😊:1']
+
+
+def test_csv_nuke_records() -> None:
+    writer, out = _writer(OutputFormat.CSV)
+    writer.nuke_result("a.md", None)
+    writer.nuke_result("b.md", "Permission denied")
+    assert out.getvalue().splitlines() == ["path,status,error", "a.md,ok,", "b.md,error,Permission denied"]
+
+
+def test_csv_locations_column_does_not_depend_on_the_first_record(result: ScanResult) -> None:
+    writer, out = _writer(OutputFormat.CSV, locations=True)
+    writer.scan_result(ScanResult(-1, "bad.txt", "/repo/bad.txt", Counter()))
+    writer.scan_result(result)
+    assert out.getvalue().splitlines() == [
+        "path,count,emojis,locations",
+        "bad.txt,-1,,",
+        "a.md,3,🍕:2 😊:1,1:1:🍕 1:5:🍕 2:4:😊",
+    ]
@@ -1,9 +1,32 @@
+import base64
+import os
+import shutil
+import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from typing import Any
+from unittest.mock import patch
 
 import pytest
 
-from rmoji.scanner import _display_scan_results, _nuke_file, _scan_for_emojis
+from rmoji import scanner
+from rmoji.files import ScanFilters
+from rmoji.regions import RegionRules
+from rmoji.scanner import (
+    _NATIVE_INLINE_LIMIT,
+    Engine,
+    ScanError,
+    ScanOptions,
+    _BatchedPrinter,
+    _clean_content,
+    _display_scan_results,
+    _iter_rg_file_matches,
+    _nuke_file,
+    _nuke_files,
+    _preview_file,
+    _rg_messages,
+    _scan_for_emojis,
+    _stream_json_lines,
+)
 
 
 @pytest.fixture
@@ -21,15 +44,15 @@ def emoji_dir() -> Path:
 def test_scan_for_emojis(emoji_dir: Path) -> None:
     total_count, results = _scan_for_emojis(str(emoji_dir))
 
-    assert total_count == 4  # file1 (1) + file2 (1) + file4 (2 unique emojis)
-    result_dict = {file_display: count for count, file_display, _ in results}
+    assert total_count == 5  # file1 (1) + file2 (1) + file4 (3 occurrences of 2 emojis)
+    result_dict = {result.display_path: result.occurrences for result in results}
     assert result_dict.get("file1.txt") == 1
     assert result_dict.get("file2.txt") == 1
-    assert result_dict.get("file4.txt") == 2
+    assert result_dict.get("file4.txt") == 3
 
 
 def test_nuke_file(emoji_file: Path) -> None:
-    success = _nuke_file(str(emoji_file), exclude=None, exclude_task_lists=False)
+    success = _nuke_file(str(emoji_file), exclude=None, rules=RegionRules())
     assert success
 
     content = emoji_file.read_text(encoding="utf-8")
@@ -62,7 +85,7 @@ def test_display_scan_results_error(capsys: pytest.CaptureFixture[str]) -> None:
 def test_nuke_file_empty_content(tmp_path: Path) -> None:
     empty_file = tmp_path / "empty.txt"
     empty_file.write_text("", encoding="utf-8")
-    success = _nuke_file(str(empty_file), exclude=None, exclude_task_lists=False)
+    success = _nuke_file(str(empty_file), exclude=None, rules=RegionRules())
     assert success
     assert empty_file.read_text(encoding="utf-8") == ""
 
@@ -71,7 +94,7 @@ def test_nuke_file_with_exclude_task_lists(tmp_path: Path) -> None:
     task_file = tmp_path / "tasks.md"
     content = "# Tasks\n- [ ] Complete task 😊\n- [x] Done task 🎉\nRegular line with emoji 🍕"
     task_file.write_text(content, encoding="utf-8")
-    success = _nuke_file(str(task_file), exclude=None, exclude_task_lists=True)
+    success = _nuke_file(str(task_file), exclude=None, rules=RegionRules(task_lists=True))
     assert success
 
     result = task_file.read_text(encoding="utf-8")
@@ -85,7 +108,7 @@ def test_nuke_file_with_exclude_task_lists(tmp_path: Path) -> None:
 def test_nuke_file_with_exclude(tmp_path: Path) -> None:
     file_path = tmp_path / "emoji_file.txt"
     file_path.write_text("Hello 😊 and 🍕 pizza!", encoding="utf-8")
-    success = _nuke_file(str(file_path), exclude=["🍕"], exclude_task_lists=False)
+    success = _nuke_file(str(file_path), exclude=["🍕"], rules=RegionRules())
     assert success
 
     content = file_path.read_text(encoding="utf-8")
@@ -107,44 +130,61 @@ def test_scan_for_emojis_no_valid_paths(tmp_path: Path) -> None:
 
     This is a defensive check for malformed ripgrep output - requires mocking.
     """
-    mock_rg_instance = MagicMock()
-    mock_rg_instance.json.return_value = mock_rg_instance
-    mock_rg_instance.run.return_value.as_dict = [
+    messages = [
         {"type": "match", "data": {"lines": {"text": "some text"}}},  # No path key
         {"type": "summary"},  # No data key
     ]
 
-    with patch("ripgrepy.Ripgrepy", return_value=mock_rg_instance):
-        total_count, results = _scan_for_emojis(str(tmp_path))
+    with patch("rmoji.scanner._rg_messages", return_value=iter(messages)):
+        total_count, results = _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.RG))
         assert total_count == 0
         assert results == []
 
 
-def test_scan_for_emojis_file_read_error(tmp_path: Path) -> None:
-    """Test when a file cannot be read after ripgrep finds it.
+def _rg_match(path: Path, *emojis: str) -> dict[str, Any]:
+    return {
+        "type": "match",
+        "data": {
+            "path": {"text": str(path)},
+            "submatches": [{"match": {"text": e}, "start": 0, "end": len(e.encode())} for e in emojis],
+        },
+    }
 
-    This tests a race condition where ripgrep finds a file but it becomes
-    unreadable before we process it. We simulate this by creating a file,
-    letting ripgrep cache find it, then replacing it with a broken symlink.
+
+def test_scan_for_emojis_counts_from_submatches(tmp_path: Path) -> None:
+    """Counts come from ripgrep's submatches; matched files are not read again.
+
+    The file is deleted after ripgrep "found" it, which would fail any re-read.
     """
-    # Create a real file with emoji that ripgrep will find
     emoji_file = tmp_path / "emoji.txt"
-    emoji_file.write_text("Hello 😊", encoding="utf-8")
 
-    # Mock ripgrep to return this file path, then break the file
-    mock_rg_instance = MagicMock()
-    mock_rg_instance.json.return_value = mock_rg_instance
-    mock_rg_instance.run.return_value.as_dict = [
-        {"data": {"path": {"text": str(emoji_file)}}},
+    messages = [
+        {"type": "begin", "data": {"path": {"text": str(emoji_file)}}},
+        _rg_match(emoji_file, "😊", "🍕"),
+        _rg_match(emoji_file, "😊"),
+        {"type": "end", "data": {"path": {"text": str(emoji_file)}}},
     ]
 
-    # Delete the file so reading fails
-    emoji_file.unlink()
+    with patch("rmoji.scanner._rg_messages", return_value=iter(messages)):
+        total_count, results = _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.RG))
+        assert total_count == 3
+        assert results == [(3, "emoji.txt", str(emoji_file), {"😊": 2, "🍕": 1}, ())]
 
-    with patch("ripgrepy.Ripgrepy", return_value=mock_rg_instance):
-        total_count, results = _scan_for_emojis(str(tmp_path))
-        assert total_count == -1
-        assert results == []
+
+def test_scan_for_emojis_decodes_byte_submatches(tmp_path: Path) -> None:
+    emoji_file = tmp_path / "emoji.txt"
+    encoded = base64.b64encode("😊".encode()).decode("ascii")
+
+    messages = [
+        {
+            "type": "match",
+            "data": {"path": {"text": str(emoji_file)}, "submatches": [{"match": {"bytes": encoded}}]},
+        },
+    ]
+
+    with patch("rmoji.scanner._rg_messages", return_value=iter(messages)):
+        total_count, _ = _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.RG))
+        assert total_count == 1
 
 
 def test_scan_for_emojis_relative_path_fallback(tmp_path: Path) -> None:
@@ -155,17 +195,308 @@ def test_scan_for_emojis_relative_path_fallback(tmp_path: Path) -> None:
     emoji_file = tmp_path / "emoji.txt"
     emoji_file.write_text("Hello 😊", encoding="utf-8")
 
-    mock_rg_instance = MagicMock()
-    mock_rg_instance.json.return_value = mock_rg_instance
-    mock_rg_instance.run.return_value.as_dict = [
-        {"data": {"path": {"text": str(emoji_file)}}},
-    ]
+    messages = [_rg_match(emoji_file, "😊")]
 
     other_dir = tmp_path / "other"
     other_dir.mkdir()
 
-    with patch("ripgrepy.Ripgrepy", return_value=mock_rg_instance):
-        total_count, results = _scan_for_emojis(str(other_dir))
+    with patch("rmoji.scanner._rg_messages", return_value=iter(messages)):
+        total_count, results = _scan_for_emojis(str(other_dir), options=ScanOptions(engine=Engine.RG))
         assert total_count == 1
         assert len(results) == 1
         assert results[0][1] == str(emoji_file)
+
+
+def test_iter_rg_file_matches_yields_each_file_on_end(tmp_path: Path) -> None:
+    first, second = tmp_path / "a.txt", tmp_path / "b.txt"
+    messages = iter(
+        [
+            _rg_match(first, "😊"),
+            {"type": "end", "data": {"path": {"text": str(first)}}},
+            _rg_match(second, "🍕", "🍕"),
+            {"type": "end", "data": {"path": {"text": str(second)}}},
+            {"type": "summary", "data": {}},
+        ]
+    )
+    stream = _iter_rg_file_matches(messages)
+    assert next(stream) == (str(first), {"😊": 1}, [])
+    # The first file is available before the second file's messages are consumed.
+    assert len(list(messages)) == 3
+    assert list(stream) == []
+
+
+def test_stream_json_lines_reads_command_output() -> None:
+    script = "import json\nfor i in range(3): print(json.dumps({'n': i}))"
+    assert [m["n"] for m in _stream_json_lines([sys.executable, "-c", script])] == [0, 1, 2]
+
+
+def test_stream_json_lines_raises_on_failure() -> None:
+    script = "import sys; sys.stderr.write('boom'); sys.exit(2)"
+    with pytest.raises(ScanError, match="boom"):
+        list(_stream_json_lines([sys.executable, "-c", script]))
+
+
+def test_scan_for_emojis_native_engine(emoji_dir: Path) -> None:
+    total_count, results = _scan_for_emojis(str(emoji_dir), options=ScanOptions(engine=Engine.NATIVE, jobs=1))
+    assert total_count == 5
+    assert {result.display_path: result.occurrences for result in results} == {
+        "file1.txt": 1,
+        "file2.txt": 1,
+        "file4.txt": 3,
+    }
+
+
+def test_scan_for_emojis_native_engine_process_pool(tmp_path: Path) -> None:
+    for i in range(_NATIVE_INLINE_LIMIT + 1):
+        (tmp_path / f"file{i}.txt").write_text("Hello 😊" if i % 2 else "plain", encoding="utf-8")
+    total_count, results = _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.NATIVE, jobs=2))
+    assert total_count == len(results) == (_NATIVE_INLINE_LIMIT + 1) // 2
+
+
+def test_scan_for_emojis_native_engine_single_file(emoji_file: Path) -> None:
+    total_count, results = _scan_for_emojis(str(emoji_file), options=ScanOptions(engine=Engine.NATIVE))
+    assert total_count == 3
+    assert results[0][2] == str(emoji_file)
+
+
+def test_scan_for_emojis_native_engine_missing_path(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        _scan_for_emojis(str(tmp_path / "missing"), options=ScanOptions(engine=Engine.NATIVE))
+
+
+def test_auto_engine_falls_back_to_native_without_ripgrep(emoji_dir: Path) -> None:
+    with patch("shutil.which", return_value=None), patch("rmoji.scanner._rg_messages") as rg_messages:
+        total_count, _ = _scan_for_emojis(str(emoji_dir))
+    assert total_count == 5
+    rg_messages.assert_not_called()
+
+
+def test_nuke_files_process_pool(tmp_path: Path) -> None:
+    files = []
+    for i in range(_NATIVE_INLINE_LIMIT + 5):
+        file_path = tmp_path / f"file{i}.txt"
+        file_path.write_text(f"line {i} 😊 🍕", encoding="utf-8")
+        files.append(str(file_path))
+    missing = str(tmp_path / "missing.txt")
+
+    results = dict(_nuke_files([*files, missing], exclude=["🍕"], rules=RegionRules(), jobs=2))
+
+    assert set(results) == {*files, missing}
+    assert all(results[f] is None for f in files)
+    assert isinstance(results[missing], FileNotFoundError)
+    assert Path(files[3]).read_text(encoding="utf-8") == "line 3  🍕"
+
+
+def test_nuke_files_inline(emoji_file: Path) -> None:
+    assert list(_nuke_files([str(emoji_file)], None, RegionRules(), jobs=1)) == [(str(emoji_file), None)]
+    assert "😊" not in emoji_file.read_text(encoding="utf-8")
+
+
+def test_batched_printer_prints_in_batches(capsys: pytest.CaptureFixture[str]) -> None:
+    printer = _BatchedPrinter(batch_size=2)
+    printer.add("one")
+    assert capsys.readouterr().out == ""
+    printer.add("two")
+    assert capsys.readouterr().out == "one\ntwo\n"
+    printer.add("three")
+    printer.flush()
+    assert capsys.readouterr().out == "three\n"
+
+
+def test_nuke_file_skips_unchanged_content(tmp_path: Path) -> None:
+    task_file = tmp_path / "tasks.md"
+    task_file.write_text("- [ ] Ship it 🚀\n", encoding="utf-8")
+    os.utime(task_file, ns=(0, 0))
+
+    assert _nuke_file(str(task_file), exclude=None, rules=RegionRules(task_lists=True))
+    assert task_file.stat().st_mtime_ns == 0
+
+
+def test_preview_file_reports_byte_delta_without_writing(emoji_file: Path) -> None:
+    original = emoji_file.read_text(encoding="utf-8")
+    preview = _preview_file(str(emoji_file), exclude=None, rules=RegionRules())
+    assert preview == f"-12 bytes\t{emoji_file}"
+    assert emoji_file.read_text(encoding="utf-8") == original
+
+
+def test_preview_file_unified_diff(tmp_path: Path) -> None:
+    file_path = tmp_path / "notes.txt"
+    file_path.write_text("keep\nHello 😊\n", encoding="utf-8")
+    preview = _preview_file(str(file_path), exclude=None, rules=RegionRules(), diff=True)
+    assert "-Hello 😊" in preview.splitlines()
+    assert "+Hello " in preview.splitlines()
+
+
+def test_preview_file_unchanged_is_empty(tmp_path: Path) -> None:
+    file_path = tmp_path / "plain.txt"
+    file_path.write_text("plain", encoding="utf-8")
+    assert _preview_file(str(file_path), exclude=None, rules=RegionRules()) == ""
+
+
+def test_scan_for_emojis_with_index_only_rescans_changed_files(tmp_path: Path) -> None:
+    for name in ["a.txt", "b.txt", "c.txt"]:
+        (tmp_path / name).write_text(f"{name} 😊", encoding="utf-8")
+
+    assert _scan_for_emojis(str(tmp_path), options=ScanOptions(jobs=1, use_index=True))[0] == 3
+
+    (tmp_path / "b.txt").write_text("b.txt 😊🍕", encoding="utf-8")
+    (tmp_path / "c.txt").unlink()
+    with patch("rmoji.scanner._index_file", side_effect=scanner._index_file) as index_file:
+        total_count, results = _scan_for_emojis(str(tmp_path), options=ScanOptions(jobs=1, use_index=True))
+
+    index_file.assert_called_once_with(str(tmp_path / "b.txt"))
+    assert total_count == 3
+    assert {result.display_path: result.occurrences for result in results} == {"a.txt": 1, "b.txt": 2}
+
+
+def test_rg_messages_passes_filters() -> None:
+    filters = ScanFilters(max_depth=2, max_filesize=1024, globs=("*.md",), iglobs=("!*.LOG",), types=("py",))
+    with (
+        patch("ripgrepy.which", return_value="/usr/bin/rg"),
+        patch("rmoji.scanner._stream_json_lines", return_value=iter([])) as stream,
+    ):
+        list(_rg_messages("src", filters))
+    command = stream.call_args.args[0]
+    for flag in (["--max-depth", "2"], ["--max-filesize", "1024"], ["--glob", "*.md"], ["--iglob", "!*.LOG"]):
+        index = command.index(flag[0])
+        assert command[index : index + 2] == flag
+    assert command[command.index("--type") + 1] == "py"
+    assert command[-2:] == ["--", "src"]
+
+
+@pytest.mark.skipif(not shutil.which("rg"), reason="ripgrep is not installed")
+@pytest.mark.parametrize("hidden", [False, True])
+def test_engines_select_the_same_files(tmp_path: Path, hidden: bool) -> None:
+    (tmp_path / ".github").mkdir()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / ".gitignore").write_text("*.log\n", encoding="utf-8")
+    (tmp_path / "sub" / ".ignore").write_text("secret.txt\n", encoding="utf-8")
+    for name in [".env", ".github/ci.yml", "app.log", "main.py", "sub/secret.txt", "sub/notes.md"]:
+        (tmp_path / name).write_text("Hello 😊", encoding="utf-8")
+
+    def scanned(engine: Engine) -> list[str]:
+        filters = ScanFilters(hidden=hidden)
+        _, results = _scan_for_emojis(str(tmp_path), filters, options=ScanOptions(engine=engine, jobs=1))
+        return sorted(result.display_path for result in results)
+
+    visible = [".env", ".github/ci.yml", "main.py", "sub/notes.md"] if hidden else ["main.py", "sub/notes.md"]
+    assert scanned(Engine.NATIVE) == visible
+    assert scanned(Engine.RG) == visible
+
+
+def test_rg_engine_without_ripgrep_raises_scan_error(tmp_path: Path) -> None:
+    with patch("ripgrepy.which", return_value=None), pytest.raises(ScanError, match="--engine native"):
+        _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.RG))
+
+
+def test_scan_for_emojis_native_engine_applies_filters(tmp_path: Path) -> None:
+    (tmp_path / "sub" / "deeper").mkdir(parents=True)
+    for name in ["top.md", "top.py", "sub/mid.py", "sub/deeper/low.py"]:
+        (tmp_path / name).write_text("Hello 😊", encoding="utf-8")
+    (tmp_path / "huge.py").write_text("😊" + "x" * 4096, encoding="utf-8")
+
+    def scanned(filters: ScanFilters) -> list[str]:
+        _, results = _scan_for_emojis(str(tmp_path), filters, options=ScanOptions(engine=Engine.NATIVE, jobs=1))
+        return sorted(result.display_path for result in results)
+
+    assert scanned(ScanFilters(max_depth=2, max_filesize=1024, types=("py",))) == ["sub/mid.py", "top.py"]
+    assert scanned(ScanFilters(max_depth=1)) == ["huge.py", "top.md", "top.py"]
+
+
+def test_native_scan_skips_binary_and_survives_invalid_utf8(tmp_path: Path) -> None:
+    (tmp_path / "image.png").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00" + "😊".encode())
+    (tmp_path / "latin1.txt").write_bytes("café 😊".encode() + b" \xe9t\xe9")
+    (tmp_path / "wide.txt").write_bytes("\ufeffHello 🍕".encode("utf-16-le"))
+
+    total_count, results = _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.NATIVE, jobs=1))
+    assert total_count == 2
+    assert sorted(result.display_path for result in results) == ["latin1.txt", "wide.txt"]
+
+
+def test_nuke_files_keeps_encoding_and_reports_undecodable_files(tmp_path: Path) -> None:
+    wide = tmp_path / "wide.txt"
+    wide.write_bytes("\ufeffHello 🍕\r\n".encode("utf-16-be"))
+    latin1 = tmp_path / "latin1.txt"
+    latin1.write_bytes(b"caf\xe9 " + "😊".encode())
+
+    results = dict(_nuke_files([str(wide), str(latin1)], None, RegionRules(), jobs=1))
+    assert results[str(wide)] is None
+    assert wide.read_bytes() == "\ufeffHello \r\n".encode("utf-16-be")
+    assert isinstance(results[str(latin1)], UnicodeDecodeError)
+    assert latin1.read_bytes() == b"caf\xe9 " + "😊".encode()
+
+
+@pytest.mark.parametrize(("exclude_task_lists", "lines"), [(False, None), (True, None), (False, [(2, 3)])])
+def test_nuke_file_streams_large_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, exclude_task_lists: bool, lines: list[tuple[int, int]] | None
+) -> None:
+    content = "- [ ] task 😊\r\nfamily 👨‍👩‍👧\r\n🍕🍕🍕\r\nend 🎉\r\n" * 3
+    expected = _clean_content(content, None, RegionRules(task_lists=exclude_task_lists), lines)
+    file_path = tmp_path / "big.txt"
+    file_path.write_bytes(content.encode("utf-8"))
+    monkeypatch.setattr(scanner, "_STREAM_THRESHOLD", 0)
+    monkeypatch.setattr(scanner, "_STREAM_CHUNK_SIZE", 5)
+
+    assert _nuke_file(str(file_path), None, RegionRules(task_lists=exclude_task_lists), lines=lines)
+    assert file_path.read_bytes() == expected.encode("utf-8")
+
+
+def test_nuke_file_streaming_skips_unchanged_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    file_path = tmp_path / "big.txt"
+    file_path.write_text("nothing to see\n" * 10, encoding="utf-8")
+    os.utime(file_path, ns=(1_000_000_000, 1_000_000_000))
+    monkeypatch.setattr(scanner, "_STREAM_THRESHOLD", 0)
+    monkeypatch.setattr(scanner, "_STREAM_CHUNK_SIZE", 7)
+
+    assert _nuke_file(str(file_path), None, RegionRules())
+    assert file_path.stat().st_mtime_ns == 1_000_000_000
+
+
+def test_native_scan_counts_mapped_files_without_decoding(tmp_path: Path) -> None:
+    (tmp_path / "empty.txt").write_bytes(b"")
+    (tmp_path / "plain.txt").write_bytes(b"no emojis \xff here")
+    (tmp_path / "emoji.txt").write_bytes("Hi 👨‍👩‍👧 and 🍕🍕".encode())
+
+    with patch.object(scanner, "emoji_matcher", side_effect=AssertionError("decoded")):
+        total_count, results = _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.NATIVE, jobs=1))
+    assert total_count == 3
+    assert [result.display_path for result in results] == ["emoji.txt"]
+
+
+def test_scan_reports_histograms_and_locations_in_one_pass(tmp_path: Path) -> None:
+    content = "a 😊\nbé 🍕😊\n"
+    (tmp_path / "utf8.txt").write_text(content, encoding="utf-8")
+    (tmp_path / "wide.txt").write_bytes(("\ufeff" + content).encode("utf-16-le"))
+    expected = ((1, 3, "😊"), (2, 5, "🍕"), (2, 9, "😊"))
+
+    _, results = _scan_for_emojis(str(tmp_path), options=ScanOptions(engine=Engine.NATIVE, jobs=1, locations=True))
+
+    by_name = {result.display_path: result for result in results}
+    assert by_name["utf8.txt"].occurrences == 3
+    assert by_name["utf8.txt"].emojis == {"😊": 2, "🍕": 1}
+    assert by_name["utf8.txt"].locations == expected
+    # The BOM counts towards the first line's columns, as it would in a UTF-8 file.
+    assert by_name["wide.txt"].locations[1:] == expected[1:]
+
+
+def test_scan_with_locations_bypasses_index(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("x\n 😊", encoding="utf-8")
+    options = ScanOptions(jobs=1, use_index=True, locations=True)
+    _, results = _scan_for_emojis(str(tmp_path), options=options)
+    assert results[0].locations == ((2, 2, "😊"),)
+    assert not (tmp_path / ".rmoji").exists()
+
+
+def test_iter_rg_file_matches_locates_submatches(tmp_path: Path) -> None:
+    match = _rg_match(tmp_path / "a.txt", "😊", "🍕")
+    match["data"]["line_number"] = 7
+    match["data"]["submatches"][1]["start"] = 9
+    [(_, counts, locations)] = _iter_rg_file_matches([match], locate=True)
+    assert counts == {"😊": 1, "🍕": 1}
+    assert locations == [(7, 1, "😊"), (7, 10, "🍕")]
+
+
+def test_run_file_tasks_keeps_falsy_items() -> None:
+    items = list(range(scanner._NATIVE_INLINE_LIMIT))
+    results = dict(scanner._run_file_tasks(str, items, jobs=2))
+    assert results == {item: str(item) for item in items}
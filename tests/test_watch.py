@@ -0,0 +1,119 @@
+import json
+import os
+import socket
+import stat
+import sys
+import time
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+from rmoji import watch
+from rmoji.watch import FileChange, Watcher, WatchOptions
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.txt").write_text("hi 🍕\n", encoding="utf-8")
+    (tmp_path / "sub" / "b.txt").write_text("plain\n", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("ignored.txt\n", encoding="utf-8")
+    (tmp_path / "ignored.txt").write_text("🎉\n", encoding="utf-8")
+    return tmp_path
+
+
+def _poll_until(watcher: Watcher, count: int) -> list[FileChange]:
+    changes: list[FileChange] = []
+    deadline = time.monotonic() + 5
+    while len(changes) < count and time.monotonic() < deadline:
+        changes.extend(watcher.poll())
+    return changes
+
+
+def _current(watcher: Watcher) -> list[tuple[str, int]]:
+    return [(r.display_path, r.occurrences) for r in watcher.results()]
+
+
+def test_polling_rescans_only_changed_files(tree: Path) -> None:
+    with Watcher(str(tree), options=WatchOptions(polling=True)) as watcher:
+        assert [r.display_path for r in watcher.start()] == ["a.txt"]
+        assert watcher.backend == "polling"
+
+        (tree / "sub" / "b.txt").write_text("now 🚀🚀\n", encoding="utf-8")
+        (tree / "ignored.txt").write_text("🎉🎉\n", encoding="utf-8")
+        (tree / "a.txt").unlink()
+        changes = sorted(watcher.resync())
+
+    assert [(c.result.display_path, c.result.occurrences) for c in changes] == [("a.txt", 0), ("sub/b.txt", 2)]
+    assert _current(watcher) == [("sub/b.txt", 2)]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_picks_up_new_directories_and_cleans(tree: Path) -> None:
+    options = WatchOptions(clean=True, exclude=("✅",), interval=0.1)
+    with Watcher(str(tree), options=options) as watcher:
+        watcher.start()
+        assert watcher.backend == "inotify"
+
+        (tree / "new").mkdir()
+        (tree / "new" / "c.md").write_text("- ✅ done 👍🏽\n", encoding="utf-8")
+        changes = _poll_until(watcher, 1)
+
+    assert changes == [FileChange(changes[0].result, removed=1)]
+    assert changes[0].result.display_path == "new/c.md"
+    assert (tree / "new" / "c.md").read_text(encoding="utf-8") == "- ✅ done \n"
+    assert _current(watcher) == [("a.txt", 1), ("new/c.md", 1)]
+
+
+def test_socket_answers_queries(tree: Path) -> None:
+    socket_path = tree / "q.sock"
+    with Watcher(str(tree), options=WatchOptions(polling=True)) as watcher:
+        watcher.start()
+        assert watcher.serve(socket_path) == socket_path
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(str(socket_path))
+            reader = client.makefile("r", encoding="utf-8")
+            client.sendall(b'{"command": "results"}\n{"command": "results", "path": "sub"}\n[]\n')
+            replies = [json.loads(reader.readline()) for _ in range(4)]
+            client.sendall(b'{"command": "status"}\n')
+            status = [json.loads(reader.readline()) for _ in range(2)]
+
+    summary = {"type": "summary", "files": 1, "count": 1, "errors": 0, "emojis": {"🍕": 1}}
+    assert replies[0] == {"type": "file", "path": "a.txt", "count": 1, "emojis": {"🍕": 1}}
+    assert replies[1:3] == [summary, summary]
+    assert replies[3] == {"type": "error", "error": "expected a JSON object"}
+    assert status == [{"type": "status", "watched": 2, "backend": "polling"}, summary]
+    assert not socket_path.exists()
+
+
+def test_socket_is_private_and_its_resyncs_are_reported_by_poll(tree: Path) -> None:
+    with Watcher(str(tree), options=WatchOptions(polling=True, interval=0)) as watcher:
+        watcher.start()
+        socket_path = watcher.serve()
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+        (tree / "sub" / "b.txt").write_text("now 🚀🚀\n", encoding="utf-8")
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(str(socket_path))
+            client.sendall(b'{"command": "resync"}\n')
+            assert json.loads(client.makefile("r", encoding="utf-8").readline())["count"] == 3
+        changes = watcher.poll()
+
+    assert [(c.result.display_path, c.result.occurrences) for c in changes] == [("sub/b.txt", 2)]
+
+
+def test_resync_after_ignore_file_event_rescans_the_files_events_name(tree: Path) -> None:
+    a = tree / "a.txt"
+    with Watcher(str(tree), options=WatchOptions(polling=True)) as watcher:
+        watcher.start()
+        # Same size and mtime, so only the event tells the file changed.
+        before = a.stat()
+        a.write_text("hi 🚀\n", encoding="utf-8")
+        os.utime(a, ns=(before.st_atime_ns, before.st_mtime_ns))
+        events = [
+            (PurePosixPath(), "a.txt", watch._IN_CLOSE_WRITE),
+            (PurePosixPath(), ".gitignore", watch._IN_CLOSE_WRITE),
+        ]
+        changes = watcher._apply(events)
+
+    assert [(c.result.display_path, dict(c.result.emojis)) for c in changes] == [("a.txt", {"🚀": 1})]